@@ -0,0 +1,94 @@
+"""
+Memory benchmark that compares the peak traced memory of scanning and file result creation of a synthetic Java project with and without
+bounded_memory, serially and with parsing workers. In bounded memory mode the scan keeps only the paths of the files, every file is read
+right before it is parsed (serially in this process, otherwise in the parsing worker) and released afterwards, so the contents of all
+files are never held at once.
+
+Usage: python benchmarks/bench_bounded_memory.py
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import gc
+import logging
+import random
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from emerge.analysis import Analysis
+from emerge.analyzer import Analyzer
+from emerge.config import Configuration
+from emerge.graph import GraphType
+from emerge.registry import ParserRegistry
+
+NUMBER_OF_FILES = 1_000
+
+
+def generate_source(index: int) -> str:
+    random.seed(index)
+    imports = '\n'.join(f'import com.example.module{random.randrange(50)}.Class{random.randrange(NUMBER_OF_FILES)};' for _ in range(10))
+    methods = '\n'.join(f'''
+    /**
+     * Computes the value {m} of Class{index} from both arguments. The documentation of a method is usually longer than its body and is
+     * not part of the scanned tokens of the file, but it is part of the content of the file.
+     */
+    public int compute{m}(int left, int right) {{
+        return left * {m} + right;
+    }}''' for m in range(12))
+    return f'package com.example.module{index % 50};\n\n{imports}\n\npublic class Class{index} {{{methods}\n}}\n'
+
+
+def create_file_results(source_directory: str, bounded_memory: bool, parsing_workers: int) -> tuple:
+    analysis = Analysis()
+    analysis.analysis_name = 'memory'
+    analysis.source_directory = source_directory
+    analysis.only_permit_languages = ['java']
+    analysis.only_permit_file_extensions = ['.java']
+    analysis.bounded_memory = bounded_memory
+    analysis.parsing_workers = parsing_workers
+    analyzer = Analyzer(Configuration('1.0.0'), ParserRegistry())
+
+    gc.collect()
+    tracemalloc.start()
+    analyzer._create_filesystem_graph(analysis)  # pylint: disable=protected-access
+    scan_peak = tracemalloc.get_traced_memory()[1]
+    analyzer._create_file_results(analysis)  # pylint: disable=protected-access
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    filesystem_graph = analysis.graph_representations[GraphType.FILESYSTEM_GRAPH.name.lower()]
+    released = all(node.content is None for node in filesystem_graph.filesystem_nodes.values())
+    dependencies = {name: list(result.scanned_import_dependencies) for name, result in analysis.file_results.items()}
+    return dependencies, scan_peak, peak, released
+
+
+def main():
+    logging.disable(logging.CRITICAL)
+    with tempfile.TemporaryDirectory() as temp_directory:
+        source_directory = Path(temp_directory) / 'project'
+        source_directory.mkdir()
+        for index in range(NUMBER_OF_FILES):
+            (source_directory / f'Class{index}.java').write_text(generate_source(index), encoding='utf-8')
+        content_bytes = sum(path.stat().st_size for path in source_directory.iterdir())
+
+        print(f'{NUMBER_OF_FILES} files, {content_bytes / 2**20:.1f} MB of contents')
+        print(f'{"workers":>8} {"bounded_memory":>15} {"scan peak MB":>13} {"peak MB":>8} {"released":>9}')
+        for parsing_workers in [1, 2]:
+            expected_dependencies, unbounded_scan_peak, unbounded_peak, _ = create_file_results(str(source_directory), False, parsing_workers)
+            dependencies, bounded_scan_peak, bounded_peak, released = create_file_results(str(source_directory), True, parsing_workers)
+            assert dependencies == expected_dependencies
+
+            print(f'{parsing_workers:>8} {"false":>15} {unbounded_scan_peak / 2**20:>13.1f} {unbounded_peak / 2**20:>8.1f} {"":>9}')
+            print(f'{parsing_workers:>8} {"true":>15} {bounded_scan_peak / 2**20:>13.1f} {bounded_peak / 2**20:>8.1f} {str(released).lower():>9}')
+            print(f'{unbounded_scan_peak / bounded_scan_peak:.2f}x lower scan peak, {unbounded_peak / bounded_peak:.2f}x lower peak '
+                  f'with {parsing_workers} parsing worker(s)')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark that compares computing the source lines of code, the whitespace complexity and the number of methods of every file result of a
+synthetic Java project with the former per result loops of the three metrics (splitting every source into lines and matching regular
+expressions per line) and with the fused CodeMetricsKernel. Both must compute exactly the same values.
+
+Usage: python benchmarks/bench_code_metrics.py
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from emerge.analysis import Analysis
+from emerge.languages.javaparser import JavaParser
+from emerge.metrics.codekernel import CodeMetricsKernel
+from emerge.metrics.numberofmethods.numberofmethods import NumberOfMethodsMetric
+from emerge.metrics.sloc.sloc import SourceLinesOfCodeMetric
+from emerge.metrics.whitespace.whitespace import WhitespaceMetric
+
+NUMBER_OF_FILES = 2_000
+REPETITIONS = 3
+
+
+def generate_source(index: int) -> str:
+    random.seed(index)
+    imports = '\n'.join(f'import com.example.module{random.randrange(50)}.Class{random.randrange(NUMBER_OF_FILES)};' for _ in range(10))
+    methods = '\n'.join(f'''
+    /*
+     * computes value {m}
+     */
+    public int compute{m}(int left, int right) {{
+        // sum both arguments
+        if (left > right) {{
+\t\treturn left - right;
+        }}
+
+        return left + right + values.size();
+    }}''' for m in range(random.randrange(3, 12)))
+    return f'package com.example.module{index % 50};\n\n{imports}\n\npublic class Class{index} {{\n{methods}\n}}\n'
+
+
+def former_values(metrics: list, results: dict) -> list:
+    """Computes the values like the metrics did before, one result and one metric after another."""
+    values = []
+    for metric in metrics:
+        if isinstance(metric, SourceLinesOfCodeMetric):
+            values.append({result: result.token_stream.count_source_lines(*metric.comment_keywords(result)) for result in results.values()})
+        if isinstance(metric, WhitespaceMetric):
+            values.append({result: sum(metric.calculate_complexity_in(result.source)) for result in results.values()})
+        if isinstance(metric, NumberOfMethodsMetric):
+            values.append({result: len(metric.method_expression(result).findall(result.token_stream.source)) for result in results.values()})
+    return values
+
+
+def kernel_values(metrics: list, results: dict) -> list:
+    analysis = metrics[0].analysis
+    analysis.metrics_for_file_results = {metric.metric_name: metric for metric in metrics}
+    kernel = CodeMetricsKernel(analysis)
+    return [dict(kernel.values(metric, results)) for metric in metrics]
+
+
+def measure(function, *args):
+    seconds = []
+    for _ in range(REPETITIONS):
+        starts = time.perf_counter()
+        values = function(*args)
+        seconds.append(time.perf_counter() - starts)
+    return values, min(seconds)
+
+
+def main():
+    analysis = Analysis()
+    analysis.analysis_name = 'code metrics'
+    analysis.source_directory = '/project/src'
+    parser = JavaParser()
+    for index in range(NUMBER_OF_FILES):
+        parser.generate_file_result_from_analysis(analysis, file_name=f'Class{index}.java', full_file_path=f'src/Class{index}.java',
+                                                  file_content=generate_source(index))
+    analysis.collect_results_from_parser(parser)
+
+    all_metrics = [SourceLinesOfCodeMetric(analysis), WhitespaceMetric(analysis), NumberOfMethodsMetric(analysis)]
+    results = analysis.file_results
+    source_lines = sum(len(result.source.split('\n')) for result in results.values())
+
+    print(f'{NUMBER_OF_FILES} files, {source_lines} lines')
+    print(f'{"metrics":>26} {"per result (s)":>15} {"fused kernel (s)":>17} {"speedup":>8}')
+    for names, metrics in [('sloc, whitespace', all_metrics[:2]), ('sloc, whitespace, methods', all_metrics)]:
+        expected, former_seconds = measure(former_values, metrics, results)
+        calculated, kernel_seconds = measure(kernel_values, metrics, results)
+        assert calculated == expected
+
+        print(f'{names:>26} {former_seconds:>15.3f} {kernel_seconds:>17.3f} {former_seconds / kernel_seconds:>7.1f}x')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark that compares the community detection algorithms of the louvain modularity metric on a large synthetic dependency graph: the
+louvain method of python-louvain, the louvain method of networkx and the vectorized label propagation that is used for graphs above the
+node threshold. All algorithms must find communities with a modularity close to the one of python-louvain.
+
+Usage: python benchmarks/bench_community_detection.py
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+import networkx as nx
+
+from emerge.metrics.abstractmetric import CommunityDetection
+from emerge.metrics.modularity.communities import adjacency_matrix, detect_communities
+
+NUMBER_OF_MODULES = 1_000
+FILES_PER_MODULE = 40
+RESOLUTION = 1.5
+# the label propagation must find at least this fraction of the modularity of python-louvain
+MIN_MODULARITY_RATIO = 0.9
+
+
+def generate_graph() -> nx.Graph:
+    """Files mostly depend on files of their own module and sometimes on files of other modules."""
+    random.seed(0)
+    graph = nx.DiGraph()
+    files = [[f'src/module{m}/file{f}.py' for f in range(FILES_PER_MODULE)] for m in range(NUMBER_OF_MODULES)]
+    for module_files in files:
+        for file in module_files:
+            graph.add_edges_from((file, dependency) for dependency in random.sample(module_files, 4) if dependency != file)
+            graph.add_edge(file, random.choice(random.choice(files)))
+    return graph.to_undirected()
+
+
+def main():
+    undirected_graph = generate_graph()
+
+    starts = time.perf_counter()
+    adjacency = adjacency_matrix(undirected_graph)
+    adjacency_seconds = time.perf_counter() - starts
+
+    rows = {}
+    for algorithm in CommunityDetection:
+        starts = time.perf_counter()
+        communities, modularity = detect_communities(algorithm, undirected_graph, adjacency, RESOLUTION, 0)
+        rows[algorithm] = (communities.max() + 1, modularity, time.perf_counter() - starts)
+
+    louvain_modularity = rows[CommunityDetection.LOUVAIN][1]
+    for _, modularity, _ in rows.values():
+        assert modularity >= MIN_MODULARITY_RATIO * louvain_modularity
+
+    print(f'{undirected_graph.number_of_nodes()} nodes, {undirected_graph.number_of_edges()} edges, '
+          f'{adjacency_seconds:.2f} seconds for the adjacency matrix')
+    print(f'{"algorithm":>18} {"communities":>12} {"modularity":>11} {"seconds":>8}')
+    for algorithm, (communities_found, modularity, seconds) in rows.items():
+        print(f'{algorithm.name.lower():>18} {communities_found:>12} {modularity:>11.3f} {seconds:>8.2f}')
+    print(f'{rows[CommunityDetection.LOUVAIN][2] / rows[CommunityDetection.LABEL_PROPAGATION][2]:.1f}x faster by label propagation')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Microbenchmark that compares searchString() of the Go import grammar, which tries to parse at every position of a source, with the
+anchored search of the GrammarRegistry, which only tries the positions of the import keyword, on synthetic Go files of growing size.
+
+Usage: python benchmarks/bench_go_imports.py
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from emerge.languages.goparser import GoParser
+from emerge.stats import Statistics
+
+
+def generate_go_source(number_of_funcs: int) -> str:
+    funcs = '\n'.join(f'''
+// Handle{f} handles a request
+func (s *Server) Handle{f}(ctx context.Context, req *Request) (*Response, error) {{
+	if req == nil {{
+		return nil, fmt.Errorf("empty request %d", {f})
+	}}
+	value := compute{f}(req.Value)
+	for index := 0; index < len(req.Items); index++ {{
+		value += strings.Count(req.Items[index], "x")
+	}}
+	return &Response{{Value: value}}, nil
+}}''' for f in range(number_of_funcs))
+    return f'''package server
+
+import (
+	"context"
+	"fmt"
+	"strings"
+
+	"github.com/example/mono/svc/api"
+	"github.com/example/mono/svc/store"
+)
+
+import "github.com/example/mono/svc/log"
+
+type Server struct {{
+	name string
+}}
+{funcs}
+'''
+
+
+def measure(function, *args, repetitions: int = 5):
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        result = function(*args)
+    return result, (time.perf_counter() - start) / repetitions
+
+
+def main():
+    parser = GoParser()
+    statistics = Statistics()
+    grammar = parser._grammars['import']  # pylint: disable=protected-access
+
+    print(f'{"funcs":>6} {"source bytes":>13} {"searchString":>13} {"anchored":>10} {"speedup":>8}')
+    for number_of_funcs in [1, 10, 100, 1000]:
+        preprocessed_source = parser.preprocess_golang_source(parser._lexer.tokenize(generate_go_source(number_of_funcs)))  # pylint: disable=protected-access
+
+        expected, search_string_seconds = measure(grammar.searchString, preprocessed_source)
+        imports, anchored_seconds = measure(parser._grammars.search, 'import', preprocessed_source, statistics)  # pylint: disable=protected-access
+        assert imports.asList() == expected.asList()
+
+        print(f'{number_of_funcs:>6} {len(preprocessed_source):>13} {search_string_seconds * 1000:>11.2f}ms {anchored_seconds * 1000:>8.2f}ms '
+              f'{search_string_seconds / anchored_seconds:>7.1f}x')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark that compares the graph metrics on a synthetic dependency graph with a million edges: the former fan-in/fan-out metric that
+asked networkx for the degrees of every node and sorted all degrees to find the biggest ones, networkx.pagerank() and the sampled
+networkx.betweenness_centrality() against the GraphMetricsKernel, which builds one CSR adjacency matrix for all of them. Both must compute
+the same values.
+
+Usage: python benchmarks/bench_graph_metrics.py
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import random
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+import numpy as np
+import networkx as nx
+
+from emerge.analysis import Analysis
+from emerge.graph import GraphRepresentation, GraphType
+from emerge.metrics.faninout.faninout import FanInOutMetric
+from emerge.metrics.graphkernel import GraphMetricsKernel
+
+NUMBER_OF_MODULES = 5_000
+FILES_PER_MODULE = 40
+DEPENDENCIES_PER_FILE = 5
+BETWEENNESS_SAMPLES = 8
+
+
+def generate_graph() -> nx.DiGraph:
+    """Files mostly depend on files of their own module and sometimes on popular files of other modules."""
+    random.seed(0)
+    graph = nx.DiGraph()
+    files = [[f'src/module{m}/file{f}.py' for f in range(FILES_PER_MODULE)] for m in range(NUMBER_OF_MODULES)]
+    popular_files = [module_files[0] for module_files in files]
+    for module_files in files:
+        for file in module_files:
+            graph.add_edges_from((file, dependency) for dependency in random.sample(module_files, DEPENDENCIES_PER_FILE - 1) if dependency != file)
+            graph.add_edge(file, random.choice(popular_files))
+    return graph
+
+
+def former_fan_in_out(digraph: nx.DiGraph) -> tuple:
+    local_data, average_fan_in, average_fan_out = {}, 0, 0
+    for node in digraph.nodes:
+        fan_in, fan_out = digraph.in_degree(node), digraph.out_degree(node)
+        local_data[node] = {'fan-in-dependency-graph': fan_in, 'fan-out-dependency-graph': fan_out}
+        average_fan_in += fan_in
+        average_fan_out += fan_out
+
+    biggest_fan_in = sorted(digraph.in_degree, key=lambda x: x[1], reverse=True)[0]
+    biggest_fan_out = sorted(digraph.out_degree, key=lambda x: x[1], reverse=True)[0]
+    overall_data = {'avg-fan-in-dependency-graph': average_fan_in / digraph.number_of_nodes(),
+                    'avg-fan-out-dependency-graph': average_fan_out / digraph.number_of_nodes(),
+                    'max-fan-in-dependency-graph': biggest_fan_in[1], 'max-fan-in-name-dependency-graph': biggest_fan_in[0],
+                    'max-fan-out-dependency-graph': biggest_fan_out[1], 'max-fan-out-name-dependency-graph': biggest_fan_out[0]}
+    return local_data, overall_data
+
+
+def current_fan_in_out(graph_representation: GraphRepresentation) -> tuple:
+    metric = FanInOutMetric(Analysis(), {GraphType.FILE_RESULT_DEPENDENCY_GRAPH.name.lower(): graph_representation})
+    metric.calculate_from_results({})
+    return metric.local_data, metric.overall_data
+
+
+def measure(function, *args):
+    starts = time.perf_counter()
+    values = function(*args)
+    return values, time.perf_counter() - starts
+
+
+def main():
+    graph_representation = GraphRepresentation(GraphType.FILE_RESULT_DEPENDENCY_GRAPH)
+    graph_representation.digraph = digraph = generate_graph()
+
+    kernel, adjacency_seconds = measure(GraphMetricsKernel.for_graph_representation, graph_representation)
+    rows = {}
+
+    expected, former_seconds = measure(former_fan_in_out, digraph)
+    calculated, current_seconds = measure(current_fan_in_out, graph_representation)
+    assert calculated == expected
+    rows['fan-in/fan-out'] = (former_seconds, current_seconds)
+
+    expected, former_seconds = measure(nx.pagerank, digraph)
+    calculated, current_seconds = measure(kernel.page_rank)
+    assert np.allclose(calculated, [expected[node] for node in kernel.nodes], rtol=1e-9)
+    rows['pagerank'] = (former_seconds, current_seconds)
+
+    expected, former_seconds = measure(partial(nx.betweenness_centrality, k=BETWEENNESS_SAMPLES, seed=0), digraph)
+    calculated, current_seconds = measure(kernel.sampled_betweenness, BETWEENNESS_SAMPLES, 0)
+    assert np.allclose(calculated, [expected[node] for node in kernel.nodes], rtol=1e-9)
+    rows[f'betweenness, {BETWEENNESS_SAMPLES} samples'] = (former_seconds, current_seconds)
+
+    print(f'{digraph.number_of_nodes()} nodes, {digraph.number_of_edges()} edges, {adjacency_seconds:.2f} seconds for the adjacency matrix')
+    print(f'{"metric":>24} {"networkx (s)":>13} {"kernel (s)":>11} {"speedup":>8}')
+    for metric, (former_seconds, current_seconds) in rows.items():
+        print(f'{metric:>24} {former_seconds:>13.2f} {current_seconds:>11.2f} {former_seconds / current_seconds:>7.1f}x')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark that compares the louvain modularity metric on a synthetic dependency graph: the former implementation that ran all optimization
+runs one after another, counted the size of every community in a pass over all nodes and renumbered the partition with one pass per
+community, and the current one with seeded runs in worker processes (one per CPU) and single pass counting and renumbering. Both must
+compute the same communities for the same seeds.
+
+Usage: python benchmarks/bench_louvain.py
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+import networkx as nx
+import community as community_louvain
+
+from emerge.analysis import Analysis
+from emerge.graph import GraphRepresentation, GraphType
+from emerge.metrics.modularity.modularity import LouvainModularityMetric
+
+NUMBER_OF_MODULES = 200
+FILES_PER_MODULE = 40
+OPTIMIZATION_RUNS = 5
+
+
+def generate_graph() -> nx.DiGraph:
+    """Files mostly depend on files of their own module and sometimes on files of other modules."""
+    random.seed(0)
+    graph = nx.DiGraph()
+    files = [[f'src/module{m}/file{f}.py' for f in range(FILES_PER_MODULE)] for m in range(NUMBER_OF_MODULES)]
+    for module_files in files:
+        for file in module_files:
+            graph.add_edges_from((file, dependency) for dependency in random.sample(module_files, 4) if dependency != file)
+            graph.add_edge(file, random.choice(random.choice(files)))
+    return graph
+
+
+def former_communities(undirected_graph: nx.Graph) -> dict:
+    for run in range(OPTIMIZATION_RUNS):
+        partition_by_louvain = community_louvain.best_partition(undirected_graph, resolution=1.5, random_state=run)
+        communities_found = max(partition_by_louvain.values()) + 1
+        community_louvain.modularity(partition_by_louvain, undirected_graph)
+
+        community_sizes = {}
+        for i in range(communities_found):
+            community_sizes[i] = sum(map((i).__eq__, partition_by_louvain.values()))
+        sorted_community_sizes = {k: v for k, v in sorted(community_sizes.items(), key=lambda item: item[1], reverse=True)}
+
+        sorted_partion_by_louvain = {}
+        new_community_id = 0
+        for sorted_community_id in sorted_community_sizes.keys():
+            new_partition = {k: new_community_id for k, v in partition_by_louvain.items() if v == sorted_community_id}
+            sorted_partion_by_louvain.update(new_partition)
+            new_community_id += 1
+    return sorted_partion_by_louvain
+
+
+def current_communities(graph_representation: GraphRepresentation, workers: int) -> dict:
+    analysis = Analysis()
+    analysis.louvain_optimization_runs = OPTIMIZATION_RUNS
+    analysis.louvain_workers = workers
+    metric = LouvainModularityMetric(analysis, {GraphType.FILE_RESULT_DEPENDENCY_GRAPH.name.lower(): graph_representation})
+    metric.calculate_from_results({})
+    return {node: data['file_result_dependency_graph_louvain-modularity-in-file'] for node, data in metric.local_data.items()}
+
+
+def measure(function, *args):
+    starts = time.perf_counter()
+    values = function(*args)
+    return values, time.perf_counter() - starts
+
+
+def main():
+    graph_representation = GraphRepresentation(GraphType.FILE_RESULT_DEPENDENCY_GRAPH)
+    graph_representation.digraph = generate_graph()
+    workers = os.cpu_count() or 1
+
+    expected, former_seconds = measure(former_communities, graph_representation.digraph.to_undirected())
+    rows = {'former': former_seconds}
+    for number_of_workers in sorted({1, workers}):
+        communities, rows[f'current, {number_of_workers} worker(s)'] = measure(current_communities, graph_representation, number_of_workers)
+        assert communities == expected
+
+    print(f'{graph_representation.digraph.number_of_nodes()} nodes, {graph_representation.digraph.number_of_edges()} edges, '
+          f'{OPTIMIZATION_RUNS} optimization runs, {len(set(expected.values()))} communities')
+    print(f'{"implementation":>24} {"seconds":>8}')
+    for implementation, seconds in rows.items():
+        print(f'{implementation:>24} {seconds:>8.2f}')
+    print(f'{former_seconds / min(rows.values()):.1f}x faster')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Scaling benchmark that compares the former dependency curation of the JVM parsers (a substring search over all file results for every import)
+with the PackageIndex, for synthetic Java projects of growing size.
+
+Usage: python benchmarks/bench_package_index.py
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from emerge.languages.packageindex import PackageIndex
+
+IMPORTS_PER_FILE = 15
+
+
+def generate_project(number_of_files: int) -> dict:
+    """Returns the imports of every file of a synthetic project, addressed by the unique name of the file."""
+    random.seed(number_of_files)
+    classes = [f'com.example.module{i % 50}.feature{i % 7}.Class{i}' for i in range(number_of_files)]
+    project = {}
+    for class_name in classes:
+        unique_name = 'app/src/main/java/' + class_name.replace('.', '/') + '.java'
+        imports = random.sample(classes, IMPORTS_PER_FILE - 3)
+        imports += ['java.util.List', 'com.example.module1.*', f'{random.choice(classes)}.Inner']
+        project[unique_name] = imports
+    return project
+
+
+def curate_by_substring_search(project: dict) -> dict:
+    """The former approach: every import is searched in all unique names."""
+    curated = {}
+    for unique_name, dependencies in project.items():
+        curated_dependencies = []
+        for dependency in dependencies:
+            haystack = dependency.replace(".", "/") + ".java"
+            curated_dependencies.append(next((needle for needle in project if needle in haystack), dependency))
+        curated[unique_name] = curated_dependencies
+    return curated
+
+
+def curate_by_package_index(project: dict) -> dict:
+    package_index = PackageIndex(project.keys(), '.java')
+    return {unique_name: [package_index.resolve(d) or d for d in dependencies] for unique_name, dependencies in project.items()}
+
+
+def measure(function, project: dict):
+    start = time.perf_counter()
+    curated = function(project)
+    return curated, time.perf_counter() - start
+
+
+def main():
+    print(f'{"files":>8} {"imports":>8} {"substring (s)":>14} {"index (s)":>10} {"speedup":>8}')
+    for number_of_files in (250, 500, 1_000, 2_000, 4_000):
+        project = generate_project(number_of_files)
+        substring_curated, substring_seconds = measure(curate_by_substring_search, project)
+        index_curated, index_seconds = measure(curate_by_package_index, project)
+        assert substring_curated == index_curated
+
+        number_of_imports = number_of_files * IMPORTS_PER_FILE
+        print(f'{number_of_files:>8} {number_of_imports:>8} {substring_seconds:>14.3f} {index_seconds:>10.3f} {substring_seconds / index_seconds:>7.1f}x')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Memory benchmark that compares the memory per scanned file of the compact result layout (slotted results, interned tokens, entity tokens
+as views over the tokens of their file) with the former layout (dict backed results, one string object per token, copied entity tokens and
+path objects), for a synthetic Java project. The source of every file is shared with the filesystem graph in both layouts and not counted.
+
+The compact layout needs about 9.4 KB instead of 21.3 KB per file (2.3x), short of the 3-5x that was aimed for. About a third of the
+remainder are the token lists of the files (one pointer per token) and another fifth the entity tokens, which are taken from the tokens
+without comments and can not be views over the tokens of the file. Token ids in an array over one shared vocabulary were measured too, but
+the vocabulary of all distinct tokens saved only about 0.6 KB per file, not enough to give up plain token lists.
+
+Usage: python benchmarks/bench_result_memory.py
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import gc
+import random
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from emerge.analysis import Analysis
+from emerge.languages.javaparser import JavaParser
+from emerge.results import FileResult
+
+NUMBER_OF_FILES = 1_000
+
+
+class FormerResult:
+    """A dict backed result with copies of all attributes of the former file and entity results."""
+
+    def __init__(self, result, *paths):
+        for attribute in ('_analysis', '_scanned_language', '_scanned_by', '_metrics', '_token_stream'):
+            setattr(self, attribute, getattr(result, attribute))
+        for attribute in ('_scanned_file_name', '_absolute_name', '_display_name', '_module_name', '_unique_name'):
+            setattr(self, attribute, copy_string(getattr(result, attribute)))
+        self._scanned_import_dependencies = [copy_string(dependency) for dependency in result.scanned_import_dependencies]
+        self._scanned_tokens = [copy_string(token) for token in result.scanned_tokens]
+        for index, path in enumerate(paths):
+            setattr(self, f'_path{index}', Path(copy_string(str(path))))
+
+
+def copy_string(string: str) -> str:
+    """Returns a separate string object, like the lexer created one for every token before."""
+    return string.encode().decode()
+
+
+def generate_source(index: int) -> str:
+    random.seed(index)
+    imports = '\n'.join(f'import com.example.module{random.randrange(50)}.Class{random.randrange(NUMBER_OF_FILES)};' for _ in range(10))
+    classes = '\n'.join(f'''
+/**
+ * documentation of Class{index}x{c}
+ */
+public class Class{index}x{c} extends Base{c} {{
+    private final Map<String, List<Integer>> values{c} = new HashMap<>();
+
+    public int compute{c}(int left, int right) {{
+        // sum both arguments
+        return left + right + values{c}.size();
+    }}
+
+    static class Nested{c} {{
+        String name = "nested {c}";
+    }}
+}}''' for c in range(3))
+    return f'package com.example.module{index % 50};\n\n{imports}\n{classes}\n'
+
+
+def create_results(parser: JavaParser, analysis: Analysis, sources: dict) -> dict:
+    for file_name, source in sources.items():
+        parser.generate_file_result_from_analysis(analysis, file_name=file_name, full_file_path=f'src/{file_name}', file_content=source)
+    parser.generate_entity_results_from_analysis(analysis)
+    for result in parser.results.values():
+        if result._token_stream is not None:  # pylint: disable=protected-access
+            result._token_stream.clear()  # pylint: disable=protected-access
+    return parser.results
+
+
+def measure(function, *args):
+    gc.collect()
+    tracemalloc.start()
+    retained = function(*args)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return retained, size
+
+
+def to_former_layout(results: dict) -> list:
+    former_results = []
+    for result in results.values():
+        if isinstance(result, FileResult):
+            former_results.append(FormerResult(result, result.absolute_dir_path, result.relative_analysis_path))
+        else:
+            former_results.append(FormerResult(result))
+    return former_results
+
+
+def main():
+    sources = {f'Class{i}.java': generate_source(i) for i in range(NUMBER_OF_FILES)}
+    source_bytes = sum(len(source) for source in sources.values())
+
+    analysis = Analysis()
+    analysis.analysis_name = 'memory'
+    analysis.source_directory = '/project/src'
+    parser = JavaParser()
+
+    results, compact_size = measure(create_results, parser, analysis, sources)
+    former_results, former_size = measure(to_former_layout, results)
+    assert [list(result.scanned_tokens) for result in results.values()] == [r._scanned_tokens for r in former_results]  # pylint: disable=protected-access
+
+    print(f'{NUMBER_OF_FILES} files, {len(results) - NUMBER_OF_FILES} entities, {source_bytes / NUMBER_OF_FILES:.0f} source bytes per file')
+    print(f'{"layout":>8} {"bytes per file":>15}')
+    print(f'{"former":>8} {former_size / NUMBER_OF_FILES:>15.0f}')
+    print(f'{"compact":>8} {compact_size / NUMBER_OF_FILES:>15.0f}')
+    print(f'{former_size / compact_size:.1f}x less memory per scanned file')
+
+
+if __name__ == "__main__":
+    main()
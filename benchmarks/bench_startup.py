@@ -0,0 +1,68 @@
+"""
+Startup benchmark that measures the import time of emerge in fresh interpreters: importing the entry module (parsers and metrics are
+imported on demand), additionally creating what a Python only analysis with graph metrics needs, and eagerly importing every parser and
+metric module, like every analysis did before the registry.
+
+Usage: python benchmarks/bench_startup.py
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from emerge.registry import PARSER_CLASSES, METRIC_CLASSES
+
+REPETITIONS = 5
+
+MEASURE = '''
+import sys, time
+starts = time.perf_counter()
+{statements}
+print(time.perf_counter() - starts, 'sklearn' in sys.modules, 'pydriller' in sys.modules)
+'''
+
+SCENARIOS = {
+    'entry module': ['import emerge.appear'],
+    'python analysis': [
+        'import emerge.appear',
+        'from emerge.registry import ParserRegistry, metric_class',
+        "ParserRegistry().get_or_create('PYTHON_PARSER')",
+        "[metric_class(key) for key in ('source_lines_of_code', 'fan_in_out', 'louvain_modularity')]",
+    ],
+    'all parsers and metrics': ['import emerge.appear'] + [f'import {module}' for module, _, _ in PARSER_CLASSES.values()] +
+                               [f'import {module}' for module, _ in METRIC_CLASSES.values()],
+}
+
+
+def measure(statements: list) -> tuple:
+    """Returns the median import time of the statements in fresh interpreters and which optional libraries they imported."""
+    seconds = []
+    for _ in range(REPETITIONS):
+        output = subprocess.run([sys.executable, '-c', MEASURE.format(statements='\n'.join(statements))], capture_output=True, text=True,
+                                check=True, cwd=Path(__file__).resolve().parent.parent).stdout.split()
+        seconds.append(float(output[0]))
+    return statistics.median(seconds), output[1] == 'True', output[2] == 'True'
+
+
+def main():
+    print(f'{"scenario":>24} {"import (s)":>11} {"sklearn":>8} {"pydriller":>10}')
+    results = {}
+    for scenario, statements in SCENARIOS.items():
+        results[scenario] = measure(statements)
+        seconds, sklearn_imported, pydriller_imported = results[scenario]
+        print(f'{scenario:>24} {seconds:>11.3f} {str(sklearn_imported):>8} {str(pydriller_imported):>10}')
+
+    # optional libraries must only be imported by the metrics that need them
+    assert results['entry module'][1:] == (False, False)
+    assert results['python analysis'][1:] == (False, False)
+
+
+if __name__ == "__main__":
+    main()
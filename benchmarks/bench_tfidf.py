@@ -0,0 +1,108 @@
+"""
+Benchmark that compares the keyword extraction of the TF-IDF metric for a synthetic corpus: the former implementation that fitted the
+vectorizer, transformed every single document again, read every score from the sparse response and sorted all terms of a document, and
+the current one that selects the top scores of every row of the fitted sparse matrix. Both must select exactly the same tags.
+Further compares the peak memory of the exact and the streaming mode, which hashes words and processes the results in chunks.
+
+Usage: python benchmarks/bench_tfidf.py
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from emerge.analysis import Analysis
+from emerge.languages.abstractparser import LanguageType
+from emerge.metrics.abstractmetric import TFIDFMode
+from emerge.metrics.tfidf.tfidf import TFIDFMetric
+
+NUMBER_OF_DOCUMENTS = 5_000
+NUMBER_OF_WORDS = 20_000
+# smaller than the corpus, as chunks are for corpora of millions of documents
+STREAMING_CHUNK_SIZE = 500
+
+
+def generate_documents() -> dict:
+    random.seed(0)
+    words = [''.join(random.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(random.randrange(3, 10))) for _ in range(NUMBER_OF_WORDS)]
+    # a few frequent words and a long tail, like identifiers in source code
+    weights = [1 / (rank + 1) for rank in range(NUMBER_OF_WORDS)]
+    return {f'document{d}': ''.join(f'{word} ' for word in random.choices(words, weights, k=random.randrange(50, 400)))
+            for d in range(NUMBER_OF_DOCUMENTS)}
+
+
+def former_tags(documents: dict) -> dict:
+    tfidf = TfidfVectorizer()
+    tfidf.fit_transform(documents.values())
+    feature_names = tfidf.get_feature_names_out()
+
+    tags = {}
+    for name, document in documents.items():
+        response = tfidf.transform([document])
+        scores = {feature_names[col]: response[0, col] for col in response.nonzero()[1]}
+        ordered_scores = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        tags[name] = dict([('tag_' + k, v) for k, v in ordered_scores if 0.2 < v][:7])
+    return tags
+
+
+def current_tags(documents: dict) -> dict:
+    metric = TFIDFMetric(Analysis())
+    metric.result_tokens = documents
+    metric.calculate_tfidf()
+    return metric.local_data
+
+
+def peak_memory_of_mode(mode: TFIDFMode, results: dict) -> tuple:
+    metric = TFIDFMetric(Analysis(), mode)
+    metric.CHUNK_SIZE = STREAMING_CHUNK_SIZE
+    tracemalloc.start()
+    metric.calculate_from_results(results)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return metric.local_data, peak
+
+
+def measure(function, *args):
+    starts = time.perf_counter()
+    values = function(*args)
+    return values, time.perf_counter() - starts
+
+
+def main():
+    documents = generate_documents()
+
+    expected, former_seconds = measure(former_tags, documents)
+    calculated, current_seconds = measure(current_tags, documents)
+    assert [list(tags.items()) for tags in calculated.values()] == [list(tags.items()) for tags in expected.values()]
+
+    print(f'{NUMBER_OF_DOCUMENTS} documents, {sum(len(tags) for tags in calculated.values())} tags')
+    print(f'{"implementation":>22} {"seconds":>8}')
+    print(f'{"transform per document":>22} {former_seconds:>8.2f}')
+    print(f'{"sparse top scores":>22} {current_seconds:>8.2f}')
+    print(f'{former_seconds / current_seconds:.1f}x faster')
+
+    # results with the words of every document as tokens, the tags of both modes only differ for words that share a hashed feature
+    results = {name: SimpleNamespace(unique_name=name, scanned_language=LanguageType.JAVA, scanned_tokens=document.split())
+               for name, document in documents.items()}
+    exact_tags, exact_peak = peak_memory_of_mode(TFIDFMode.EXACT, results)
+    streaming_tags, streaming_peak = peak_memory_of_mode(TFIDFMode.STREAMING, results)
+    equal_tags = sum(list(exact_tags[name]) == list(streaming_tags[name]) for name in exact_tags)
+
+    print(f'{"mode":>22} {"peak memory (MB)":>17}')
+    print(f'{"exact":>22} {exact_peak / 2**20:>17.1f}')
+    print(f'{"streaming":>22} {streaming_peak / 2**20:>17.1f} ({STREAMING_CHUNK_SIZE} documents per chunk)')
+    print(f'{equal_tags / len(exact_tags):.1%} of the documents with equal tags in both modes')
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Microbenchmark that compares the former copying read ahead (a list slice and a joined string for every token)
+with the TokenCursor, by extracting the imports of synthetic Java files of growing size.
+
+Usage: python benchmarks/bench_token_cursor.py
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import sys
+import time
+from pathlib import Path
+
+import pyparsing as pp
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# pylint: disable=wrong-import-position
+from emerge.languages.abstractparser import TokenCursor
+
+IMPORT_EXPRESSION = pp.Keyword('import') + pp.Word(pp.alphanums + '._*').setResultsName('import_name')
+
+
+def generate_java_tokens(number_of_lines: int) -> list:
+    tokens = []
+    for line in range(number_of_lines):
+        if line % 20 == 0:
+            tokens.extend(['import', f'com.example.package{line}.Class{line}', ';'])
+        else:
+            tokens.extend(['int', f'field{line}', '=', str(line), ';'])
+    return tokens
+
+
+def copying_read_ahead(tokens: list) -> list:
+    """The former approach: every token creates a copy of all following tokens and joins them into a new string."""
+    imports = []
+    for index, obj in enumerate(tokens):
+        following = tokens[index + 1:]
+        if obj != 'import':
+            continue
+        read_ahead_string = obj + " " + " ".join(following)
+        imports.append(IMPORT_EXPRESSION.parseString(read_ahead_string).import_name)
+    return imports
+
+
+def token_cursor(tokens: list) -> list:
+    imports = []
+    cursor = TokenCursor(tokens)
+    for index, obj in cursor:
+        if obj != 'import':
+            continue
+        imports.append(cursor.parse(IMPORT_EXPRESSION, index).import_name)
+    return imports
+
+
+def measure(function, tokens: list) -> float:
+    start = time.perf_counter()
+    function(tokens)
+    return time.perf_counter() - start
+
+
+def main():
+    print(f'{"lines":>8} {"tokens":>8} {"copying (s)":>12} {"cursor (s)":>12} {"speedup":>8}')
+    for number_of_lines in (1_000, 2_500, 5_000, 10_000, 20_000):
+        tokens = generate_java_tokens(number_of_lines)
+        assert copying_read_ahead(tokens) == token_cursor(tokens)
+
+        copying_seconds = measure(copying_read_ahead, tokens)
+        cursor_seconds = measure(token_cursor, tokens)
+        print(f'{number_of_lines:>8} {len(tokens):>8} {copying_seconds:>12.3f} {cursor_seconds:>12.3f} {copying_seconds / cursor_seconds:>7.1f}x')
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,21 @@
 """
-All abstract result classes.
+All abstract result classes and the ResultStore, which indexes results as they are added.
 """
 
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
 from abc import ABC, abstractmethod
+from collections.abc import MutableMapping
 from pathlib import Path
-from typing import Any, List, Dict
+from types import MappingProxyType
+from typing import Any, Iterator, List, Dict, Mapping, Optional, Tuple
 
 
 class AbstractResult(ABC):
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def unique_name(self) -> str:
@@ -32,6 +36,11 @@ class AbstractResult(ABC):
     def scanned_tokens(self) -> List[str]:
         ...
 
+    @property
+    @abstractmethod
+    def token_stream(self) -> Any:
+        ...
+
     @property
     @abstractmethod
     def scanned_file_name(self) -> str:
@@ -59,6 +68,8 @@ class AbstractResult(ABC):
 
 class AbstractFileResult(AbstractResult):
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def relative_file_path_to_analysis(self) -> str:
@@ -114,12 +125,14 @@ class AbstractFileResult(AbstractResult):
         ...
     
     @abstractmethod
-    def generate_entity_results_from_scopes(self, entity_keywords, entity_expression, comment_keywords) -> List:
+    def generate_entity_results_from_scopes(self, entity_keywords, entity_expression, comment_keywords, grammars=None, grammar_name: str = 'entity') -> List:
         ...
 
 
 class AbstractEntityResult(AbstractResult):
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def scanned_tokens(self) -> List[str]:
@@ -168,3 +181,109 @@ class AbstractEntityResult(AbstractResult):
     @parent_file_result.setter
     def parent_file_result(self, value):
         ...
+
+
+class _ResultIndexes:
+    """Indexes of the results of a ResultStore by kind, by analysis, by language, by unique name and by entity name, built in the order
+    the results were added. The name lookups keep the name of the first added result with a unique/entity name.
+    """
+
+    __slots__ = ('file_results', 'entity_results', 'results_by_analysis', 'results_by_language', 'name_by_unique_name', 'name_by_entity_name')
+
+    def __init__(self, results: Dict[str, AbstractResult]):
+        self.file_results: Dict[str, AbstractFileResult] = {}
+        self.entity_results: Dict[str, AbstractEntityResult] = {}
+        self.results_by_analysis: Dict[Tuple[Any, type], Dict[str, AbstractResult]] = {}
+        self.results_by_language: Dict[Any, Dict[str, AbstractResult]] = {}
+        self.name_by_unique_name: Dict[str, str] = {}
+        self.name_by_entity_name: Dict[str, str] = {}
+
+        for name, result in results.items():
+            if isinstance(result, AbstractEntityResult):
+                kind = AbstractEntityResult
+                self.entity_results[name] = result
+                self.name_by_entity_name.setdefault(result.entity_name, name)
+            else:
+                kind = AbstractFileResult
+                self.file_results[name] = result
+            self.results_by_analysis.setdefault((result.analysis, kind), {})[name] = result
+            self.results_by_language.setdefault(result.scanned_language, {})[name] = result
+            self.name_by_unique_name.setdefault(result.unique_name, name)
+
+
+class ResultStore(MutableMapping):
+    """A mapping of results by name, that indexes results by kind (file or entity results), by analysis, by language, by unique name and
+    by entity name. All results of a kind, analysis or language are returned as read only views and results are looked up by name in
+    constant time, instead of filtering all results again for every query.
+    The indexes are built on the first query after results were added or removed, so that a store that is only filled, like the store of a
+    parser while parsing, keeps no indexes at all. Views therefore contain the results at the time of the query.
+    """
+
+    def __init__(self, results: Optional[Mapping[str, AbstractResult]] = None):
+        self._results: Dict[str, AbstractResult] = {}
+        self._indexes: Optional[_ResultIndexes] = None
+        if results:
+            self.update(results)
+
+    @property
+    def _indexed(self) -> _ResultIndexes:
+        if self._indexes is None:
+            self._indexes = _ResultIndexes(self._results)
+        return self._indexes
+
+    def __getitem__(self, name: str) -> AbstractResult:
+        return self._results[name]
+
+    def __setitem__(self, name: str, result: AbstractResult) -> None:
+        self._results[name] = result
+        self._indexes = None
+
+    def __delitem__(self, name: str) -> None:
+        del self._results[name]
+        self._indexes = None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._results)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __contains__(self, name) -> bool:
+        return name in self._results
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self._results!r})'
+
+    def clear(self) -> None:
+        self._results = {}
+        self._indexes = None
+
+    @property
+    def file_results(self) -> Mapping[str, AbstractFileResult]:
+        return MappingProxyType(self._indexed.file_results)
+
+    @property
+    def entity_results(self) -> Mapping[str, AbstractEntityResult]:
+        return MappingProxyType(self._indexed.entity_results)
+
+    def file_results_of(self, analysis) -> Mapping[str, AbstractFileResult]:
+        """Returns all file results that belong to the given analysis."""
+        return MappingProxyType(self._indexed.results_by_analysis.get((analysis, AbstractFileResult), {}))
+
+    def entity_results_of(self, analysis) -> Mapping[str, AbstractEntityResult]:
+        """Returns all entity results that belong to the given analysis."""
+        return MappingProxyType(self._indexed.results_by_analysis.get((analysis, AbstractEntityResult), {}))
+
+    def results_in_language(self, language) -> Mapping[str, AbstractResult]:
+        """Returns all results of the given language type."""
+        return MappingProxyType(self._indexed.results_by_language.get(language, {}))
+
+    def result_by_unique_name(self, unique_name: str) -> Optional[AbstractResult]:
+        """Returns the first added result with the given unique name, otherwise None."""
+        name = self._indexed.name_by_unique_name.get(unique_name)
+        return self._results[name] if name is not None else None
+
+    def result_by_entity_name(self, entity_name: str) -> Optional[AbstractEntityResult]:
+        """Returns the first added entity result with the given entity name, otherwise None."""
+        name = self._indexed.name_by_entity_name.get(entity_name)
+        return self._results[name] if name is not None else None
@@ -5,24 +5,27 @@ An Analysis holds configuration, metrics and the generated results.
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Mapping
 import logging
+import copy
 from datetime import datetime, timedelta
 import os
 from pathlib import Path
 import coloredlogs
 import pyperclip
 
-from emerge.languages.abstractparser import AbstractResult, AbstractParser, LanguageType
-from emerge.metrics.abstractmetric import AbstractMetric, AbstractCodeMetric, AbstractGraphMetric, MetricResultFilter
+from emerge.languages.abstractparser import AbstractParser, LanguageType, ImportExtractor, ParserBackend
+from emerge.languages.moduleresolver import ModuleResolver
+from emerge.languages.ignorerules import IgnoreRules
+from emerge.metrics.abstractmetric import AbstractMetric, AbstractCodeMetric, AbstractGraphMetric, MetricResultFilter, CommunityDetection
 
 from emerge.files import FileManager
-from emerge.abstractresult import AbstractEntityResult, AbstractFileResult
+from emerge.abstractresult import AbstractResult, AbstractEntityResult, AbstractFileResult, ResultStore
 from emerge.graph import GraphRepresentation, GraphType, FileSystemNode, FileSystemNodeType
 from emerge.stats import Statistics
 from emerge.log import Logger
 from emerge.core import format_timedelta
-from emerge.files import truncate_directory, LanguageExtension
+from emerge.files import truncate_directory, LanguageExtension, FileSystemScanner, SourceLoader
 
 from emerge.export import GraphExporter, TableExporter, JSONExporter, D3Exporter
 
@@ -99,22 +102,43 @@ class Analysis:
         self.only_permit_files_matching_absolute_path: List[str] = []
         self.ignore_directories_containing: List = []
         self.ignore_files_containing: List = []
+        self.scan_threads: Optional[int] = None
+        self.parsing_workers: int = 1
+        self.cache_directory: Optional[str] = None
+        self.cache_max_size_in_mb: int = 512
+        self.bounded_memory: bool = False
+        self.source_cache_max_files: int = SourceLoader.DEFAULT_MAX_CACHED_FILES
+        self.louvain_optimization_runs: int = 5
+        self.louvain_resolution: float = 1.5
+        self.louvain_random_seed: int = 0
+        self.louvain_workers: int = 1
+        self.community_detection: CommunityDetection = CommunityDetection.LOUVAIN
+        self.community_detection_node_threshold: int = 100_000
+        self.betweenness_samples: int = 32
+        self.betweenness_random_seed: int = 0
         self.ignore_dependencies_containing: List[str] = []
         self.ignore_dependencies_matching: List[str] = []
         self.ignore_entities_containing: List[str] = []
         self.ignore_entities_matching: List[str] = []
         self.import_aliases_available: bool = False
         self.import_aliases: Dict[str, str] = {}
+        self.include_directories: List[str] = []
+        self.import_extractor: ImportExtractor = ImportExtractor.PYPARSING
+        self.parser_backend: ParserBackend = ParserBackend.TOKENS
 
         self.override_resolve_dependencies: List[str] = []
         self.override_do_not_resolve_dependencies: List[str] = []
 
-        self.results: Dict[str, AbstractResult] = {}
+        self.results: ResultStore = ResultStore()
 
         self.absolute_scanned_file_names: Set[str] = set()
 
         # memoization
         self.scanned_files_nodes_in_directories = {}
+        self._module_resolver: Optional[ModuleResolver] = None
+        self._dependency_ignore_rules: Optional[IgnoreRules] = None
+        self._entity_ignore_rules: Optional[IgnoreRules] = None
+        self._source_loader: Optional[SourceLoader] = None
 
         self.local_metric_results: Dict[str, Dict[str, Any]] = {}
         self.overall_metric_results: Dict[str, Any] = {}
@@ -133,6 +157,19 @@ class Analysis:
 
         self.statistics = Statistics()
 
+    def copy_for_parsing(self) -> 'Analysis':
+        """Returns a lightweight copy that only contains the configuration needed by parsers, e.g. to send it to parsing worker processes.
+        """
+        analysis_copy = copy.copy(self)
+        analysis_copy.results = ResultStore()
+        analysis_copy.metrics_for_file_results = {}
+        analysis_copy.metrics_for_entity_results = {}
+        analysis_copy.local_metric_results = {}
+        analysis_copy.overall_metric_results = {}
+        analysis_copy.graph_representations = {k: None for k in self.graph_representations}
+        analysis_copy.statistics = Statistics()
+        return analysis_copy
+
     def add_results(self, results) -> None:
         """Add results to this analysis.
 
@@ -327,24 +364,22 @@ class Analysis:
             LOGGER.info_done('... also tried to copy the link to your pasteboard, just try to paste it in your browser 🚀')
 
     @property
-    def entity_results(self) -> Dict[str, AbstractEntityResult]:
-        """Returns a dictionary of all entity results from this analysis.
+    def entity_results(self) -> Mapping[str, AbstractEntityResult]:
+        """Returns a read only view of all entity results from this analysis.
 
         Returns:
-            Dict[str, AbstractEntityResult]: entity results hashed by name.
+            Mapping[str, AbstractEntityResult]: entity results hashed by name.
         """
-        entity_results: Dict[str, AbstractEntityResult] = {k: v for (k, v) in self.results.items() if isinstance(v, AbstractEntityResult)}
-        return entity_results
+        return self.results.entity_results
 
     @property
-    def file_results(self) -> Dict[str, AbstractFileResult]:
-        """Returns a dictionary of all file results from this analysis.
+    def file_results(self) -> Mapping[str, AbstractFileResult]:
+        """Returns a read only view of all file results from this analysis.
 
         Returns:
-            Dict[str, AbstractFileResult]: file results hashed by name.
+            Mapping[str, AbstractFileResult]: file results hashed by name.
         """
-        file_results: Dict[str, AbstractFileResult] = {k: v for (k, v) in self.results.items() if isinstance(v, AbstractFileResult)}
-        return file_results
+        return self.results.file_results
 
     @property
     def number_of_file_results(self) -> int:
@@ -364,7 +399,7 @@ class Analysis:
         """
         return len(self.entity_results)
 
-    def filtered_results(self, result_filter: MetricResultFilter) -> Dict[str, Any]:
+    def filtered_results(self, result_filter: MetricResultFilter) -> Mapping[str, Any]:
         """Returns a filtered set of metric results, based on MetricResultFilter.
 
         Args:
@@ -388,11 +423,9 @@ class Analysis:
         Returns:
             Optional[AbstractEntityResult]: the first found result given by entity name, otherwise None.
         """
-        res: Dict[str, AbstractEntityResult] = {k: v for (k, v) in results.items(
-        ) if isinstance(v, AbstractEntityResult) and v.entity_name == name}
-        if bool(res):
-            return res[list(res.keys())[0]]
-        return None
+        if isinstance(results, ResultStore):
+            return results.result_by_entity_name(name)
+        return next((v for v in results.values() if isinstance(v, AbstractEntityResult) and v.entity_name == name), None)
 
     def result_by_unique_name(self, unique_name: str) -> Optional[AbstractResult]:
         """Returns the first found result given by unique name, otherwise None.
@@ -403,11 +436,7 @@ class Analysis:
         Returns:
             Optional[AbstractResult]: the first found result given by unique name, otherwise None.
         """
-        results: Dict[str, AbstractResult] = {k: v for (k, v) in self.results.items(
-        ) if isinstance(v, AbstractResult) and v.unique_name == unique_name}
-        if bool(results):
-            return results[list(results.keys())[0]]
-        return None
+        return self.results.result_by_unique_name(unique_name)
 
     def create_graph_representation(self, graph_type: GraphType) -> None:
         """Creates a graph representation in this analysis, given by a graph type.
@@ -450,7 +479,14 @@ class Analysis:
             display_name=filesystem_root_node.absolute_name
         )
 
-        for root, dirs, files in os.walk(self.source_directory):
+        scanner = FileSystemScanner(max_workers=self.scan_threads, ignore_directories=self.ignore_directories_containing)
+        scanner.scan(self.source_directory)
+
+        # file contents are read concurrently after the walk, nodes are created in walk order and get their content assigned later
+        file_nodes_to_read: List[FileSystemNode] = []
+        absolute_paths_to_read: List[str] = []
+
+        for root, dirs, files in scanner.walk(self.source_directory):
             # exclude directories and scans
 
             if self.ignore_directories_containing:
@@ -494,7 +530,7 @@ class Analysis:
                         LOGGER.info(f'got file {absolute_path_to_file}')
 
                 # watch out for symlinks
-                if os.path.islink(absolute_path_to_file):
+                if scanner.is_symlink(absolute_path_to_file):
                     LOGGER.debug(f'possible symlink found: {absolute_path_to_file}')
                     absolute_path_to_file_resolved_symlink = os.path.realpath(absolute_path_to_file)
                     if os.path.exists(absolute_path_to_file_resolved_symlink):
@@ -534,34 +570,84 @@ class Analysis:
                 else:
                     self.scanned_files_nodes_in_directories[relative_root].append(relative_file_path_to_analysis)
 
-                with open(absolute_path_to_file, encoding="ISO-8859-1") as file:
-                    file_content = file.read()
-                    file_node = FileSystemNode(FileSystemNodeType.FILE, relative_file_path_to_analysis, file_content)
-                    filesystem_graph.filesystem_nodes[file_node.absolute_name] = file_node
-
-                    filesystem_graph.digraph.add_node(
-                        file_node.absolute_name,
-                        directory=False,
-                        file=True,
-                        display_name=Path(file_node.absolute_name).name,
-                        result_name=relative_file_path_to_analysis
-                    )
+                file_node = FileSystemNode(FileSystemNodeType.FILE, relative_file_path_to_analysis, path=absolute_path_to_file)
+                filesystem_graph.filesystem_nodes[file_node.absolute_name] = file_node
+                file_nodes_to_read.append(file_node)
+                absolute_paths_to_read.append(absolute_path_to_file)
 
-                    filesystem_graph.digraph.add_edge(relative_root, file_node.absolute_name)
+                filesystem_graph.digraph.add_node(
+                    file_node.absolute_name,
+                    directory=False,
+                    file=True,
+                    display_name=Path(file_node.absolute_name).name,
+                    result_name=relative_file_path_to_analysis
+                )
 
-                    scanned_files += 1
+                filesystem_graph.digraph.add_edge(relative_root, file_node.absolute_name)
+
+                scanned_files += 1
+
+        # with bounded_memory only the paths are kept, every file is read right before it is parsed and released afterwards
+        if not self.bounded_memory:
+            for file_node, file_content in zip(file_nodes_to_read, scanner.read_files(absolute_paths_to_read)):
+                file_node.content = file_content
 
         scanning_stops = datetime.now()
+        scanning_seconds = (scanning_stops - scanning_starts).total_seconds()
 
         self.statistics.add(key=Statistics.Key.SCANNING_RUNTIME, value=scanning_stops - scanning_starts)
         self.statistics.add(key=Statistics.Key.SCANNED_FILES, value=scanned_files)
         self.statistics.add(key=Statistics.Key.SKIPPED_FILES, value=skipped_files)
+        self.statistics.add(key=Statistics.Key.SCANNING_THREADS, value=scanner.max_workers)
+        scanning_throughput = f'{scanned_files / scanning_seconds if scanning_seconds > 0 else 0:.1f} files/s'
+        if not self.bounded_memory:
+            scanning_throughput += f', {scanner.scanned_bytes / 1024 / 1024 / scanning_seconds if scanning_seconds > 0 else 0:.2f} MB/s'
+        self.statistics.add(key=Statistics.Key.SCANNING_THROUGHPUT, value=scanning_throughput)
+
+    def module_resolver(self) -> ModuleResolver:
+        """Returns a resolver that answers the existence checks of dependency and include resolution from all scanned file names."""
+        if self._module_resolver is None:
+            self._module_resolver = ModuleResolver(self.source_directory, self.absolute_scanned_file_names, self.import_aliases,
+                                                   self.include_directories)
+        return self._module_resolver
+
+    def load_source(self, absolute_name: str) -> str:
+        """Reads the content of a scanned file again after it was released, from the same path it was scanned from."""
+        if self._source_loader is None:
+            self._source_loader = SourceLoader(self.source_cache_max_files)
+
+        filesystem_graph = self.graph_representations[GraphType.FILESYSTEM_GRAPH.name.lower()]
+        file_node = filesystem_graph.filesystem_nodes.get(absolute_name) if filesystem_graph is not None else None
+        if file_node is not None and file_node.path:
+            return self._source_loader.load(file_node.path)
+        return self._source_loader.load(f'{Path(self.source_directory).parent}/{absolute_name}')
+
+    @property
+    def reloaded_sources(self) -> int:
+        return self._source_loader.loaded_files if self._source_loader is not None else 0
+
+    def compile_ignore_rules(self) -> None:
+        """Compiles the ignore lists for dependencies and entities, this is necessary again whenever an ignore list changes after it was used."""
+        self._dependency_ignore_rules = IgnoreRules(self.ignore_dependencies_containing, self.ignore_dependencies_matching, case_insensitive=True)
+        self._entity_ignore_rules = IgnoreRules(self.ignore_entities_containing, self.ignore_entities_matching)
+
+    def dependency_ignore_rules(self) -> IgnoreRules:
+        """Returns the compiled ignore_dependencies_containing/ignore_dependencies_matching rules, substrings are matched case insensitive."""
+        if self._dependency_ignore_rules is None:
+            self.compile_ignore_rules()
+        return self._dependency_ignore_rules
+
+    def entity_ignore_rules(self) -> IgnoreRules:
+        """Returns the compiled ignore_entities_containing/ignore_entities_matching rules."""
+        if self._entity_ignore_rules is None:
+            self.compile_ignore_rules()
+        return self._entity_ignore_rules
 
     def calculate_graph_representations(self) -> None:
         """Calculate all necessary graph representations for this analysis in a specific order.
         """
-        file_results = {k: v for (k, v) in self.results.items() if isinstance(v, AbstractFileResult)}
-        entity_results = {k: v for (k, v) in self.results.items() if isinstance(v, AbstractEntityResult)}
+        file_results = self.file_results
+        entity_results = self.entity_results
 
         # make sure we compute dependency/inheritance graphs before composing complete graphs
         simple_graph_representations = {k: v for (k, v) in self.graph_representations.items() if v is not None and
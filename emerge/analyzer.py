@@ -7,7 +7,8 @@ Defines 'Analyzer' which brings together the current configuration, analyses, pa
 
 import os
 import logging
-from typing import Any, List, Dict
+from typing import Any, List, Dict, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 from datetime import datetime
@@ -15,12 +16,16 @@ import coloredlogs
 
 from emerge.metrics.abstractmetric import AbstractCodeMetric, AbstractGraphMetric, AbstractMetric
 from emerge.languages.abstractparser import AbstractParser
+from emerge.languages.lexer import intern_tokens
+from emerge.abstractresult import AbstractFileResult
 
 from emerge.graph import GraphType, FileSystemNode, FileSystemNodeType
 from emerge.config import Configuration
 from emerge.analysis import Analysis
 from emerge.stats import Statistics
-from emerge.files import FileScanMapper
+from emerge.files import FileScanMapper, read_source_file
+from emerge.cache import ParseCache
+from emerge.registry import ParserRegistry
 from emerge.log import Logger
 from emerge.core import format_timedelta
 
@@ -29,7 +34,10 @@ coloredlogs.install(level='E', logger=LOGGER.logger(), fmt=Logger.log_format)
 
 
 class Analyzer:
-    def __init__(self, config: Configuration, parsers):
+    # upper bound of files that are sent to a parsing worker process at once
+    MAX_PARSING_BATCH_SIZE = 32
+
+    def __init__(self, config: Configuration, parsers: ParserRegistry):
         self._config: Configuration = config
         self._parsers = parsers
         self._results: Dict[str, Any] = {}
@@ -89,6 +97,10 @@ class Analyzer:
         if analysis.contains_code_metrics:
             self._calculate_code_metric_results(analysis)
 
+        # the data derived from the tokens (joined source, lines, tokens without comments) is only needed for scanning and code metrics
+        for result in analysis.results.values():
+            result.token_stream.clear()
+
         if analysis.contains_graph_metrics:
             analysis.calculate_graph_representations()
             self._calculate_graph_metric_results(analysis)
@@ -96,6 +108,13 @@ class Analyzer:
 
         self._collect_all_results()
 
+        if analysis.bounded_memory:
+            analysis.statistics.add(key=Statistics.Key.RELOADED_SOURCES, value=analysis.reloaded_sources)
+
+        peak_memory_in_mb = Statistics.peak_memory_in_mb()
+        if peak_memory_in_mb is not None:
+            analysis.statistics.add(key=Statistics.Key.PEAK_MEMORY, value=f'{peak_memory_in_mb:.1f} MB')
+
         stop_time = datetime.now()
         delta_total_runtime = stop_time - start_time
         analysis.total_runtime = format_timedelta(delta_total_runtime, '%H:%M:%S + %s ms')
@@ -122,6 +141,13 @@ class Analyzer:
 
         filesystem_graph = analysis.graph_representations[GraphType.FILESYSTEM_GRAPH.name.lower()]
 
+        parse_cache: Optional[ParseCache] = None
+        if analysis.cache_directory:
+            parse_cache = ParseCache(analysis.cache_directory, analysis.cache_max_size_in_mb)
+
+        # collect all files that can be parsed, in the order of the filesystem graph
+        files_to_parse: List[Tuple[str, str, FileSystemNode]] = []
+
         project_node: FileSystemNode
         for _, filesystem_node in filesystem_graph.filesystem_nodes.items():
             project_node = filesystem_node
@@ -132,33 +158,191 @@ class Analyzer:
 
                 parser_name = FileScanMapper.choose_parser(file_extension, analysis.only_permit_languages)
 
-                if parser_name in self._parsers:
-                    parser: AbstractParser = self._parsers[parser_name]
+                if self._parsers.is_available(parser_name):
+                    if project_node.content is None and not analysis.bounded_memory:
+                        raise Exception(f'file content is None for file: {project_node.absolute_name}')
+
+                    # with bounded_memory the content is only read when the file is parsed, so that it can be released right afterwards
+                    files_to_parse.append((parser_name, file_name, project_node))
 
-                    file_content = project_node.content
+        if analysis.parsing_workers > 1 and len(files_to_parse) > 1:
+            self._create_file_results_in_parallel(analysis, files_to_parse, parse_cache)
+        else:
+            for parser_name, file_name, project_node in files_to_parse:
+                parser: AbstractParser = self._parsers.get_or_create(parser_name)
+                file_content = self._content_of(project_node)
 
-                    if file_content is None:
-                        raise Exception(f'file content is None for file: {project_node.absolute_name}')
-                    
+                if parse_cache is not None:
+                    self._create_file_result_with_cache(analysis, parser, parse_cache, file_name, project_node.absolute_name, file_content)
+                else:
                     parser.generate_file_result_from_analysis(
                         analysis,
                         file_name=file_name,
                         full_file_path=project_node.absolute_name,
                         file_content=file_content
                     )
-                    
-                    results = self._parsers[parser_name].results
-                    analysis.add_results(results)
+
+                analysis.add_results(parser.results)
+
+                if analysis.bounded_memory:
+                    self._release_file_content(analysis, project_node)
 
         for parser_name, parser in self._parsers.items():
             if bool(parser.results):
                 parser.after_generated_file_results(analysis)
 
+        if parse_cache is not None:
+            analysis.statistics.add(key=Statistics.Key.PARSE_CACHE_EVICTIONS, value=parse_cache.evict())
+
         file_result_creation_stops = datetime.now()
 
         analysis.statistics.add(key=Statistics.Key.EXTRACTED_FILE_RESULTS, value=analysis.number_of_file_results)
         analysis.statistics.add(key=Statistics.Key.FILE_RESULTS_CREATION_RUNTIME, value=file_result_creation_stops - file_result_creation_starts)
 
+    @staticmethod
+    def _content_of(filesystem_node: FileSystemNode) -> str:
+        """Returns the content of a scanned file, with bounded_memory it is read from the scanned path right now."""
+        return filesystem_node.content if filesystem_node.content is not None else read_source_file(filesystem_node.path)
+
+    @staticmethod
+    def _size_of(filesystem_node: FileSystemNode) -> int:
+        return len(filesystem_node.content) if filesystem_node.content is not None else os.path.getsize(filesystem_node.path)
+
+    @staticmethod
+    def _unique_name_of(analysis: Analysis, full_file_path: str) -> str:
+        parent_analysis_source_path = f"{Path(analysis.source_directory).parent}/"
+        return full_file_path.replace(parent_analysis_source_path, "")
+
+    @staticmethod
+    def _release_file_content(analysis: Analysis, filesystem_node: FileSystemNode):
+        """Releases the source of a parsed file from its file result, together with the data that was derived from its tokens while parsing,
+        like parsing workers do. The file result reads its source again and derives the token data on demand.
+        """
+        file_result = analysis.results.get(Analyzer._unique_name_of(analysis, filesystem_node.absolute_name))
+        if file_result is not None:
+            file_result.source = None
+            file_result.token_stream.clear()
+
+    @staticmethod
+    def _create_file_result_with_cache(analysis: Analysis, parser: AbstractParser, parse_cache: ParseCache,
+                                       file_name: str, full_file_path: str, file_content: str):
+        """Restores the file result from the parse cache if possible, otherwise lets the parser generate it and stores it in the cache.
+        """
+        cache_key = parse_cache.key(parser, analysis, full_file_path, file_content)
+        cache_entry = parse_cache.load(cache_key)
+
+        if cache_entry is not None:
+            file_result = ParseCache.file_result_from_entry(cache_entry, parser, analysis, full_file_path=full_file_path, file_content=file_content)
+            file_result.extracted_import_dependencies = None
+            parser.results[file_result.unique_name] = file_result
+            analysis.statistics.increment(Statistics.Key.PARSE_CACHE_HITS)
+            return
+
+        analysis.statistics.increment(Statistics.Key.PARSE_CACHE_MISSES)
+        parsing_hits_before = analysis.statistics.data.get(Statistics.Key.PARSING_HITS.name.lower(), 0)
+        parsing_misses_before = analysis.statistics.data.get(Statistics.Key.PARSING_MISSES.name.lower(), 0)
+
+        parser.generate_file_result_from_analysis(analysis, file_name=file_name, full_file_path=full_file_path, file_content=file_content)
+
+        unique_name = Analyzer._unique_name_of(analysis, full_file_path)
+        if unique_name in parser.results:
+            parse_cache.store(cache_key, ParseCache.entry_from_file_result(
+                parser.results[unique_name],
+                analysis.statistics.data.get(Statistics.Key.PARSING_HITS.name.lower(), 0) - parsing_hits_before,
+                analysis.statistics.data.get(Statistics.Key.PARSING_MISSES.name.lower(), 0) - parsing_misses_before
+            ))
+            # the extracted import dependencies are only needed for the cache entry
+            parser.results[unique_name].extracted_import_dependencies = None
+
+    def _create_file_results_in_parallel(self, analysis: Analysis, files_to_parse: List[Tuple[str, str, FileSystemNode]], parse_cache: Optional[ParseCache]):
+        """Generates file results in worker processes. Cached file results are restored in this process, all other files are sharded
+        into batches, where batches of the largest files are scheduled first. All results are merged back in the original file order,
+        so that the outcome is identical to a serial run. after_generated_file_results still runs in this process afterwards.
+        With bounded_memory, only the paths of a batch are sent, every worker reads the contents of its batch right before parsing them.
+
+        Args:
+            analysis (Analysis): A given analysis.
+            files_to_parse (List[Tuple[str, str, FileSystemNode]]): parser name, file name and filesystem node of every file.
+            parse_cache (Optional[ParseCache]): the parse cache if enabled.
+        """
+        parsed_file_results: Dict[int, Tuple[List[AbstractFileResult], int, int]] = {}
+        cache_keys: Dict[int, str] = {}
+        indices_to_parse: List[int] = []
+
+        for index, (parser_name, _, filesystem_node) in enumerate(files_to_parse):
+            if parse_cache is not None:
+                parser: AbstractParser = self._parsers.get_or_create(parser_name)
+                full_file_path, file_content = filesystem_node.absolute_name, self._content_of(filesystem_node)
+                cache_key = parse_cache.key(parser, analysis, full_file_path, file_content)
+                cache_entry = parse_cache.load(cache_key)
+
+                if cache_entry is not None:
+                    file_result = ParseCache.file_result_from_entry(cache_entry, parser, analysis, full_file_path=full_file_path, file_content=file_content)
+                    file_result.extracted_import_dependencies = None
+                    parsed_file_results[index] = ([file_result], 0, 0)
+                    analysis.statistics.increment(Statistics.Key.PARSE_CACHE_HITS)
+                    if analysis.bounded_memory:
+                        file_result.source = None
+                    continue
+
+                analysis.statistics.increment(Statistics.Key.PARSE_CACHE_MISSES)
+                cache_keys[index] = cache_key
+
+            indices_to_parse.append(index)
+
+        # schedule the largest files first, so that no long running file is started last
+        indices_to_parse.sort(key=lambda index: self._size_of(files_to_parse[index][2]), reverse=True)
+        batch_size = max(1, min(Analyzer.MAX_PARSING_BATCH_SIZE, len(indices_to_parse) // (analysis.parsing_workers * 4)))
+        batches = [indices_to_parse[i:i + batch_size] for i in range(0, len(indices_to_parse), batch_size)]
+
+        LOGGER.info(f'parsing {len(indices_to_parse)} files in {len(batches)} batches with {analysis.parsing_workers} worker processes')
+
+        with ProcessPoolExecutor(
+            max_workers=analysis.parsing_workers,
+            initializer=_initialize_parsing_worker,
+            initargs=(analysis.copy_for_parsing(), self._parsers)
+        ) as executor:
+            futures = [executor.submit(_generate_file_results_in_worker, self._files_of_batch(files_to_parse, batch)) for batch in batches]
+            for future in as_completed(futures):
+                parsed_batch, parser_statistics = future.result()
+                for index, file_results, parsing_hits, parsing_misses in parsed_batch:
+                    parsed_file_results[index] = (file_results, parsing_hits, parsing_misses)
+                analysis.statistics.merge(parser_statistics)
+
+        for index, (parser_name, _, filesystem_node) in enumerate(files_to_parse):
+            file_results, parsing_hits, parsing_misses = parsed_file_results[index]
+            parser = self._parsers.get_or_create(parser_name)
+
+            # tokens of different batches are separate string objects after being sent back, intern them to share equal tokens again
+            # with bounded_memory the source stays released, file results read it again on demand
+            for file_result in file_results:
+                file_result.analysis = analysis
+                file_result.source = filesystem_node.content
+                intern_tokens(file_result.scanned_tokens)
+                parser.results[file_result.unique_name] = file_result
+                analysis.add_results({file_result.unique_name: file_result})
+
+            if parsing_hits > 0:
+                analysis.statistics.increment(Statistics.Key.PARSING_HITS, parsing_hits)
+            if parsing_misses > 0:
+                analysis.statistics.increment(Statistics.Key.PARSING_MISSES, parsing_misses)
+
+            if index in cache_keys and len(file_results) == 1:
+                parse_cache.store(cache_keys[index], ParseCache.entry_from_file_result(file_results[0], parsing_hits, parsing_misses))
+                file_results[0].extracted_import_dependencies = None
+
+    @staticmethod
+    def _files_of_batch(files_to_parse: List[Tuple[str, str, FileSystemNode]],
+                        batch: List[int]) -> List[Tuple[int, str, str, str, str, Optional[str]]]:
+        """Returns index, parser name, file name, full file path, scanned path and file content of every file of a batch, as sent to a
+        parsing worker. With bounded_memory the content is None, the worker reads it from the scanned path.
+        """
+        files_of_batch = []
+        for index in batch:
+            parser_name, file_name, filesystem_node = files_to_parse[index]
+            files_of_batch.append((index, parser_name, file_name, filesystem_node.absolute_name, filesystem_node.path, filesystem_node.content))
+        return files_of_batch
+
     def _create_entity_results(self, analysis: Analysis):
         """Creates entity results from the file results of a given analysis for every active parser.
         After the results are stored in the analysis, statistics are added.
@@ -232,3 +416,54 @@ class Analyzer:
         parser: AbstractParser
         for _, parser in self._parsers.items():
             parser.results.clear()
+
+
+# state of a parsing worker process, set once by the initializer of the process pool
+_worker_analysis: Optional[Analysis] = None
+_worker_parsers: Optional[ParserRegistry] = None
+
+
+def _initialize_parsing_worker(analysis: Analysis, parsers: ParserRegistry):
+    # pylint: disable=global-statement
+    global _worker_analysis, _worker_parsers
+    _worker_analysis = analysis
+    _worker_parsers = parsers
+
+
+def _generate_file_results_in_worker(
+        batch: List[Tuple[int, str, str, str, str, Optional[str]]]) -> Tuple[List[Tuple[int, List[AbstractFileResult], int, int]], Dict[str, Any]]:
+    """Generates the file results for a batch of files within a parsing worker process.
+    Returns the generated file results of every file together with the parsing hits/misses they caused, and the remaining parser statistics
+    of the batch (grammar runtimes, fast path and syntax error fallback counts) that are merged into the statistics of the analysis.
+    """
+    parsed_batch = []
+    statistics = _worker_analysis.statistics
+
+    for index, parser_name, file_name, full_file_path, file_path, file_content in batch:
+        parser = _worker_parsers.get_or_create(parser_name)
+        if file_content is None:
+            file_content = read_source_file(file_path)
+        parsing_hits_before = statistics.data.get(Statistics.Key.PARSING_HITS.name.lower(), 0)
+        parsing_misses_before = statistics.data.get(Statistics.Key.PARSING_MISSES.name.lower(), 0)
+
+        parser.generate_file_result_from_analysis(_worker_analysis, file_name=file_name, full_file_path=full_file_path, file_content=file_content)
+
+        # detach the results from the worker analysis, they get attached to the real analysis after being sent back
+        # derived token data and the source are not sent back, it is cheaper to derive it again on demand and the source is already known
+        file_results = list(parser.results.values())
+        for file_result in file_results:
+            file_result.analysis = None
+            file_result.source = None
+            file_result.token_stream.clear()
+        parser.results.clear()
+
+        parsed_batch.append((
+            index,
+            file_results,
+            statistics.data.get(Statistics.Key.PARSING_HITS.name.lower(), 0) - parsing_hits_before,
+            statistics.data.get(Statistics.Key.PARSING_MISSES.name.lower(), 0) - parsing_misses_before
+        ))
+
+    parser_statistics = statistics.pop_prefixed(Statistics.Key.GRAMMAR_RUNTIME)
+    parser_statistics.update(statistics.pop(Statistics.Key.FAST_PATH_HITS, Statistics.Key.FAST_PATH_FALLBACKS, Statistics.Key.SYNTAX_ERROR_FALLBACKS))
+    return parsed_batch, parser_statistics
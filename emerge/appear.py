@@ -10,19 +10,7 @@ import logging
 
 import coloredlogs
 
-from emerge.languages.abstractparser import AbstractParser
-from emerge.languages.javaparser import JavaParser
-from emerge.languages.swiftparser import SwiftParser
-from emerge.languages.cparser import CParser
-from emerge.languages.cppparser import CPPParser
-from emerge.languages.groovyparser import GroovyParser
-from emerge.languages.javascriptparser import JavaScriptParser
-from emerge.languages.typescriptparser import TypeScriptParser
-from emerge.languages.kotlinparser import KotlinParser
-from emerge.languages.objcparser import ObjCParser
-from emerge.languages.rubyparser import RubyParser
-from emerge.languages.pyparser import PythonParser
-from emerge.languages.goparser import GoParser
+from emerge.registry import ParserRegistry, supported_languages
 
 from emerge.config import Configuration
 from emerge.analyzer import Analyzer
@@ -44,22 +32,9 @@ class Emerge:
         """Initialize all collected results, available parsers and set the log level.
         """
         self._results: Dict[str, AbstractResult] = {}
-        self._parsers: Dict[str, AbstractParser] = {
-            JavaParser.parser_name(): JavaParser(),
-            SwiftParser.parser_name(): SwiftParser(),
-            CParser.parser_name(): CParser(),
-            CPPParser.parser_name(): CPPParser(),
-            GroovyParser.parser_name(): GroovyParser(),
-            JavaScriptParser.parser_name(): JavaScriptParser(),
-            TypeScriptParser.parser_name(): TypeScriptParser(),
-            KotlinParser.parser_name(): KotlinParser(),
-            ObjCParser.parser_name(): ObjCParser(),
-            RubyParser.parser_name(): RubyParser(),
-            PythonParser.parser_name(): PythonParser(),
-            GoParser.parser_name(): GoParser()
-        }
-
-        self.config.supported_languages = [x.language_type() for x in self._parsers.values()]
+        self._parsers: ParserRegistry = ParserRegistry()
+
+        self.config.supported_languages = supported_languages()
         self.config.setup_commang_line_arguments()
         self.set_log_level(LogLevel.ERROR)
 
@@ -0,0 +1,198 @@
+"""
+Contains a persistent, content-addressed cache for file results, so that unchanged files do not have to be parsed again.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+from typing import Dict, Any, Optional
+import hashlib
+import inspect
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+import coloredlogs
+
+from emerge.languages.abstractparser import AbstractParser, LanguageType
+from emerge.languages.lexer import intern_tokens
+from emerge.results import FileResult
+from emerge.stats import Statistics
+from emerge.log import Logger
+
+LOGGER = Logger(logging.getLogger('analysis'))
+coloredlogs.install(level='E', logger=LOGGER.logger(), fmt=Logger.log_format)
+
+
+class ParseCache:
+    """An on-disk cache that stores the parsed state of file results (tokens, module name, preprocessed source and import dependencies).
+    Entries are addressed by a hash over the file content, its path, the parser (name and source), the emerge version and the
+    parts of the analysis configuration that influence parsing. The cache is bounded by size and evicts the least recently used entries.
+
+    Parsers that resolve import dependencies against other scanned files store them as extracted from the source, they are resolved
+    again on every cache hit. Adding or removing other files therefore does not invalidate any entry.
+    """
+
+    # bump this whenever the layout of a cache entry changes
+    CACHE_FORMAT_VERSION = 2
+    ENTRY_SUFFIX = '.json'
+
+    def __init__(self, cache_directory: str, max_size_in_mb: int = 512):
+        self.cache_directory: Path = Path(cache_directory).expanduser()
+        self.max_size_in_bytes: int = max_size_in_mb * 1024 * 1024
+        self.cache_directory.mkdir(parents=True, exist_ok=True)
+
+        self._parser_fingerprints: Dict[str, str] = {}
+
+    @staticmethod
+    def _hash(*parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(part.encode('utf-8', errors='surrogatepass'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    @staticmethod
+    def configuration_fingerprint(analysis) -> str:
+        """All analysis configuration that is used while generating file results."""
+        configuration = {
+            'source_directory': str(analysis.source_directory),
+            'ignore_dependencies_containing': list(analysis.ignore_dependencies_containing),
+            'ignore_dependencies_matching': [getattr(x, 'pattern', str(x)) for x in analysis.ignore_dependencies_matching],
+            'import_aliases': analysis.import_aliases,
+            'include_directories': list(analysis.include_directories),
+            'override_resolve_dependencies': list(analysis.override_resolve_dependencies),
+            'override_do_not_resolve_dependencies': list(analysis.override_do_not_resolve_dependencies),
+        }
+        return json.dumps(configuration, sort_keys=True, default=str)
+
+    def _parser_fingerprint(self, parser: AbstractParser) -> str:
+        """Hashes the source of the parser module, so that changes to a parser invalidate its entries even without a version bump."""
+        parser_name = parser.parser_name()
+        if parser_name not in self._parser_fingerprints:
+            sources = []
+            for cls in (type(parser), AbstractParser):
+                try:
+                    sources.append(Path(inspect.getsourcefile(cls)).read_text(encoding='utf-8'))
+                except (OSError, TypeError):
+                    sources.append(cls.__qualname__)
+            self._parser_fingerprints[parser_name] = ParseCache._hash(parser_name, *sources)
+        return self._parser_fingerprints[parser_name]
+
+    def key(self, parser: AbstractParser, analysis, full_file_path: str, file_content: str) -> str:
+        return ParseCache._hash(
+            str(ParseCache.CACHE_FORMAT_VERSION),
+            str(analysis.emerge_version),
+            self._parser_fingerprint(parser),
+            ParseCache.configuration_fingerprint(analysis),
+            parser.cache_context(analysis),
+            full_file_path,
+            file_content
+        )
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_directory / key[:2] / f'{key}{ParseCache.ENTRY_SUFFIX}'
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, encoding='utf-8') as entry_file:
+                entry = json.load(entry_file)
+        except (OSError, ValueError):
+            return None
+
+        # touch the entry, the modification time serves as the last access time for LRU eviction
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return entry
+
+    def store(self, key: str, entry: Dict[str, Any]) -> None:
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(exist_ok=True)
+            # write to a temporary file first, so that concurrent or interrupted runs never see partial entries
+            file_descriptor, temporary_path = tempfile.mkstemp(dir=entry_path.parent, suffix='.tmp')
+            with os.fdopen(file_descriptor, 'w', encoding='utf-8') as entry_file:
+                json.dump(entry, entry_file)
+            os.replace(temporary_path, entry_path)
+        except OSError as ex:
+            LOGGER.warning(f'could not write parse cache entry {entry_path}: {ex}')
+
+    def evict(self) -> int:
+        """Removes the least recently used entries until the cache fits into its size limit. Returns the number of evicted entries."""
+        entries = []
+        total_size = 0
+        for entry_path in self.cache_directory.glob(f'*/*{ParseCache.ENTRY_SUFFIX}'):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+            total_size += stat.st_size
+
+        evicted_entries = 0
+        entries.sort()
+        for _, size, entry_path in entries:
+            if total_size <= self.max_size_in_bytes:
+                break
+            try:
+                entry_path.unlink()
+                total_size -= size
+                evicted_entries += 1
+            except OSError:
+                pass
+
+        return evicted_entries
+
+    @staticmethod
+    def entry_from_file_result(file_result: FileResult, parsing_hits: int, parsing_misses: int) -> Dict[str, Any]:
+        return {
+            'scanned_file_name': file_result.scanned_file_name,
+            'display_name': file_result.display_name,
+            'module_name': file_result.module_name,
+            'scanned_by': file_result.scanned_by,
+            'scanned_language': file_result.scanned_language.name,
+            'scanned_tokens': file_result.scanned_tokens,
+            'preprocessed_source': file_result.preprocessed_source,
+            'scanned_import_dependencies': file_result.scanned_import_dependencies,
+            'extracted_import_dependencies': file_result.extracted_import_dependencies,
+            'parsing_hits': parsing_hits,
+            'parsing_misses': parsing_misses
+        }
+
+    @staticmethod
+    def file_result_from_entry(entry: Dict[str, Any], parser: AbstractParser, analysis, *, full_file_path: str, file_content: str) -> FileResult:
+        """Restores a file result from a cache entry, exactly as the parser would have created it. Parsing statistics are replayed and
+        extracted import dependencies are resolved against the scanned files of the given analysis.
+        """
+        parent_analysis_source_path = f"{Path(analysis.source_directory).parent}/"
+        relative_file_path_to_analysis = full_file_path.replace(parent_analysis_source_path, "")
+
+        file_result = FileResult.create_file_result(
+            analysis=analysis,
+            scanned_file_name=entry['scanned_file_name'],
+            relative_file_path_to_analysis=relative_file_path_to_analysis,
+            absolute_name=full_file_path,
+            display_name=entry['display_name'],
+            module_name=entry['module_name'],
+            scanned_by=entry['scanned_by'],
+            scanned_language=LanguageType[entry['scanned_language']],
+            scanned_tokens=intern_tokens(entry['scanned_tokens']),
+            source=file_content,
+            preprocessed_source=entry['preprocessed_source']
+        )
+        if entry['extracted_import_dependencies'] is None:
+            file_result.scanned_import_dependencies = entry['scanned_import_dependencies']
+        else:
+            parser.add_import_dependencies(file_result, entry['extracted_import_dependencies'], analysis)
+
+        if entry['parsing_hits'] > 0:
+            analysis.statistics.increment(Statistics.Key.PARSING_HITS, entry['parsing_hits'])
+        if entry['parsing_misses'] > 0:
+            analysis.statistics.increment(Statistics.Key.PARSING_MISSES, entry['parsing_misses'])
+
+        return file_result
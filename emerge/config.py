@@ -18,17 +18,12 @@ import yaml
 
 import coloredlogs
 
-from emerge.metrics.numberofmethods.numberofmethods import NumberOfMethodsMetric
-from emerge.metrics.sloc.sloc import SourceLinesOfCodeMetric
-from emerge.metrics.faninout.faninout import FanInOutMetric
-from emerge.metrics.modularity.modularity import LouvainModularityMetric
-from emerge.metrics.tfidf.tfidf import TFIDFMetric
-from emerge.metrics.git.git import GitMetrics
-from emerge.metrics.whitespace.whitespace import WhitespaceMetric
-
 from emerge.graph import GraphType
+from emerge.languages.abstractparser import ImportExtractor, ParserBackend
 from emerge.log import Logger
 from emerge.analysis import Analysis
+from emerge.registry import metric_class
+from emerge.metrics.abstractmetric import TFIDFMode, CommunityDetection
 
 
 LOGGER = Logger(logging.getLogger('config'))
@@ -82,6 +77,23 @@ class ConfigKeyAnalysis(EnumKeyValid, Enum):
     OVERRIDE_RESOLVE_DEPENDENCIES = auto()
     OVERRIDE_DO_NOT_RESOLVE_DEPENDENCIES = auto()
     IMPORT_ALIASES = auto()
+    INCLUDE_DIRECTORIES = auto()
+    IMPORT_EXTRACTOR = auto()
+    PARSER_BACKEND = auto()
+    SCAN_THREADS = auto()
+    PARSING_WORKERS = auto()
+    CACHE_DIRECTORY = auto()
+    CACHE_MAX_SIZE_IN_MB = auto()
+    BOUNDED_MEMORY = auto()
+    SOURCE_CACHE_MAX_FILES = auto()
+    LOUVAIN_OPTIMIZATION_RUNS = auto()
+    LOUVAIN_RESOLUTION = auto()
+    LOUVAIN_RANDOM_SEED = auto()
+    LOUVAIN_WORKERS = auto()
+    COMMUNITY_DETECTION = auto()
+    COMMUNITY_DETECTION_NODE_THRESHOLD = auto()
+    BETWEENNESS_SAMPLES = auto()
+    BETWEENNESS_RANDOM_SEED = auto()
     FILE_SCAN = auto()
     ENTITY_SCAN = auto()
     EXPORT = auto()
@@ -99,6 +111,8 @@ class ConfigKeyFileScan(EnumKeyValid, Enum):
     FAN_IN_OUT = auto()
     LOUVAIN_MODULARITY = auto()
     TFIDF = auto()
+    PAGE_RANK = auto()
+    BETWEENNESS_CENTRALITY = auto()
 
 
 @unique
@@ -113,6 +127,8 @@ class ConfigKeyEntityScan(EnumKeyValid, Enum):
     FAN_IN_OUT = auto()
     LOUVAIN_MODULARITY = auto()
     TFIDF = auto()
+    PAGE_RANK = auto()
+    BETWEENNESS_CENTRALITY = auto()
 
 
 @unique
@@ -154,6 +170,7 @@ class Configuration:
         self.version = version
         self.arg_parser: Any = None
         self.supported_languages: List[str] = []
+        self.parsing_workers: Optional[int] = None
 
     def _get_own__dict__(self):
         return self.__dict__
@@ -165,6 +182,7 @@ class Configuration:
         self.arg_parser.add_argument('-v', '--verbose', dest='verbose', help='set logging level to INFO', action='store_true')
         self.arg_parser.add_argument('-d', '--debug', dest='debug', help='set logging level to DEBUG', action='store_true')
         self.arg_parser.add_argument('-e', '--error', dest='error', help='set logging level to ERROR', action='store_true')
+        self.arg_parser.add_argument('-w', '--workers', dest='workers', type=int, help='set the number of worker processes that parse files in parallel')
         self.arg_parser.add_argument(
             '-a',
             '--add-config',
@@ -190,6 +208,22 @@ class Configuration:
                 return [s.strip() for s in options.split(',')]
         return None
 
+    def _tfidf_mode_for_value(self, value: str) -> TFIDFMode:
+        """Returns the TF-IDF mode of a configured tfidf metric, e.g. 'tfidf(streaming)', the exact mode is used without any option.
+
+        Args:
+            value (str): A given configuration value.
+
+        Returns:
+            TFIDFMode: The configured TF-IDF mode.
+        """
+        options = self._options_for_value(str(value))
+        if not options:
+            return TFIDFMode.EXACT
+        if len(options) == 1 and options[0].upper() in TFIDFMode.__members__:
+            return TFIDFMode[options[0].upper()]
+        raise Exception(f'❗️the option of {value} must be one of {[e.name.lower() for e in TFIDFMode]}.')
+
     def parse_args(self) -> None:
         """Parses the command line arguments."""
         args = self.arg_parser.parse_args()
@@ -232,6 +266,11 @@ class Configuration:
             LOGGER.set_logging_level_to_error()
             LOGGER.override_level_from_command_line_arg = True
 
+        if args.workers is not None:
+            if args.workers < 1:
+                self.arg_parser.error('the number of workers must be a positive integer')
+            self.parsing_workers = args.workers
+
         self.yaml_config_path = args.yamlconfig
 
     def print_config_dict(self) -> None:
@@ -300,6 +339,22 @@ class Configuration:
 
         return all_constant_names
 
+    @staticmethod
+    def _positive_int(analysis_dict: Dict, key: ConfigKeyAnalysis) -> int:
+        """Returns the value of a key in an analysis configuration, raises an exception if it is no positive integer."""
+        value = analysis_dict[key.name.lower()]
+        if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+            return value
+        raise Exception(f'❗️{key.name.lower()} must be a positive integer.')
+
+    @staticmethod
+    def _non_negative_int(analysis_dict: Dict, key: ConfigKeyAnalysis) -> int:
+        """Returns the value of a key in an analysis configuration, raises an exception if it is no non-negative integer."""
+        value = analysis_dict[key.name.lower()]
+        if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+            return value
+        raise Exception(f'❗️{key.name.lower()} must be a non-negative integer.')
+
     def _check_if_yaml_config_is_valid(self, yaml_config: Dict) -> bool:
         """Performs validity checks against a given yaml config.
 
@@ -504,6 +559,71 @@ class Configuration:
                 for file in analysis_dict[ConfigKeyAnalysis.IGNORE_FILES_CONTAINING.name.lower()]:
                     analysis.ignore_files_containing.append(file)
 
+            # set the number of threads that scan directories and read files
+            if ConfigKeyAnalysis.SCAN_THREADS.name.lower() in analysis_dict:
+                analysis.scan_threads = self._positive_int(analysis_dict, ConfigKeyAnalysis.SCAN_THREADS)
+
+            # set the number of worker processes that generate file results, a command line argument takes precedence
+            if ConfigKeyAnalysis.PARSING_WORKERS.name.lower() in analysis_dict:
+                analysis.parsing_workers = self._positive_int(analysis_dict, ConfigKeyAnalysis.PARSING_WORKERS)
+
+            if self.parsing_workers is not None:
+                analysis.parsing_workers = self.parsing_workers
+
+            # enable the parse cache if a cache directory is given
+            if ConfigKeyAnalysis.CACHE_DIRECTORY.name.lower() in analysis_dict:
+                analysis.cache_directory = analysis_dict[ConfigKeyAnalysis.CACHE_DIRECTORY.name.lower()]
+
+            if ConfigKeyAnalysis.CACHE_MAX_SIZE_IN_MB.name.lower() in analysis_dict:
+                analysis.cache_max_size_in_mb = self._positive_int(analysis_dict, ConfigKeyAnalysis.CACHE_MAX_SIZE_IN_MB)
+
+            # release file contents after parsing and read them again on demand
+            if ConfigKeyAnalysis.BOUNDED_MEMORY.name.lower() in analysis_dict:
+                bounded_memory = analysis_dict[ConfigKeyAnalysis.BOUNDED_MEMORY.name.lower()]
+                if isinstance(bounded_memory, bool):
+                    analysis.bounded_memory = bounded_memory
+                else:
+                    raise Exception(f'❗️{ConfigKeyAnalysis.BOUNDED_MEMORY.name.lower()} must be true or false.')
+
+            if ConfigKeyAnalysis.SOURCE_CACHE_MAX_FILES.name.lower() in analysis_dict:
+                analysis.source_cache_max_files = self._positive_int(analysis_dict, ConfigKeyAnalysis.SOURCE_CACHE_MAX_FILES)
+
+            # configure the louvain optimization runs of the louvain modularity metric
+            if ConfigKeyAnalysis.LOUVAIN_OPTIMIZATION_RUNS.name.lower() in analysis_dict:
+                analysis.louvain_optimization_runs = self._positive_int(analysis_dict, ConfigKeyAnalysis.LOUVAIN_OPTIMIZATION_RUNS)
+
+            if ConfigKeyAnalysis.LOUVAIN_RESOLUTION.name.lower() in analysis_dict:
+                louvain_resolution = analysis_dict[ConfigKeyAnalysis.LOUVAIN_RESOLUTION.name.lower()]
+                if isinstance(louvain_resolution, (int, float)) and not isinstance(louvain_resolution, bool) and louvain_resolution > 0:
+                    analysis.louvain_resolution = float(louvain_resolution)
+                else:
+                    raise Exception(f'❗️{ConfigKeyAnalysis.LOUVAIN_RESOLUTION.name.lower()} must be a positive number.')
+
+            if ConfigKeyAnalysis.LOUVAIN_RANDOM_SEED.name.lower() in analysis_dict:
+                analysis.louvain_random_seed = self._non_negative_int(analysis_dict, ConfigKeyAnalysis.LOUVAIN_RANDOM_SEED)
+
+            if ConfigKeyAnalysis.LOUVAIN_WORKERS.name.lower() in analysis_dict:
+                analysis.louvain_workers = self._positive_int(analysis_dict, ConfigKeyAnalysis.LOUVAIN_WORKERS)
+
+            # configure the community detection algorithm of the louvain modularity metric
+            if ConfigKeyAnalysis.COMMUNITY_DETECTION.name.lower() in analysis_dict:
+                community_detection = str(analysis_dict[ConfigKeyAnalysis.COMMUNITY_DETECTION.name.lower()])
+                if community_detection.upper() in CommunityDetection.__members__:
+                    analysis.community_detection = CommunityDetection[community_detection.upper()]
+                else:
+                    raise Exception(f'❗️{ConfigKeyAnalysis.COMMUNITY_DETECTION.name.lower()} must be one of '
+                                    f'{[e.name.lower() for e in CommunityDetection]}.')
+
+            if ConfigKeyAnalysis.COMMUNITY_DETECTION_NODE_THRESHOLD.name.lower() in analysis_dict:
+                analysis.community_detection_node_threshold = self._positive_int(analysis_dict, ConfigKeyAnalysis.COMMUNITY_DETECTION_NODE_THRESHOLD)
+
+            # configure the sampled shortest paths of the betweenness centrality metric
+            if ConfigKeyAnalysis.BETWEENNESS_SAMPLES.name.lower() in analysis_dict:
+                analysis.betweenness_samples = self._positive_int(analysis_dict, ConfigKeyAnalysis.BETWEENNESS_SAMPLES)
+
+            if ConfigKeyAnalysis.BETWEENNESS_RANDOM_SEED.name.lower() in analysis_dict:
+                analysis.betweenness_random_seed = self._non_negative_int(analysis_dict, ConfigKeyAnalysis.BETWEENNESS_RANDOM_SEED)
+
             # ignore dependencies if given in the configuration
             if ConfigKeyAnalysis.IGNORE_DEPENDENCIES_CONTAINING.name.lower() in analysis_dict:
                 for ignored_dependency in analysis_dict[ConfigKeyAnalysis.IGNORE_DEPENDENCIES_CONTAINING.name.lower()]:
@@ -524,6 +644,9 @@ class Configuration:
                 for ignored_entity_re_str in analysis_dict[ConfigKeyAnalysis.IGNORE_ENTITIES_MATCHING.name.lower()]:
                     analysis.ignore_entities_matching.append(re.compile(ignored_entity_re_str))
 
+            # compile all ignore rules into one matcher for dependencies and one for entities
+            analysis.compile_ignore_rules()
+
             # add replace dependency substring mappings
             if ConfigKeyAnalysis.IMPORT_ALIASES.name.lower() in analysis_dict:
                 for mapping in analysis_dict[ConfigKeyAnalysis.IMPORT_ALIASES.name.lower()]:
@@ -532,6 +655,30 @@ class Configuration:
                             analysis.import_aliases_available = True
                         analysis.import_aliases[dependency_substring] = replaced_dependency_substring
 
+            # add directories that includes of C based languages are searched in
+            if ConfigKeyAnalysis.INCLUDE_DIRECTORIES.name.lower() in analysis_dict:
+                if isinstance(analysis_dict[ConfigKeyAnalysis.INCLUDE_DIRECTORIES.name.lower()], list):
+                    for include_directory in analysis_dict[ConfigKeyAnalysis.INCLUDE_DIRECTORIES.name.lower()]:
+                        analysis.include_directories.append(str(include_directory))
+                else:
+                    raise Exception(f'❗️{ConfigKeyAnalysis.INCLUDE_DIRECTORIES.name.lower()} must be a list of strings.')
+
+            # select the engine that extracts import dependencies
+            if ConfigKeyAnalysis.IMPORT_EXTRACTOR.name.lower() in analysis_dict:
+                import_extractor = str(analysis_dict[ConfigKeyAnalysis.IMPORT_EXTRACTOR.name.lower()])
+                if import_extractor.upper() in ImportExtractor.__members__:
+                    analysis.import_extractor = ImportExtractor[import_extractor.upper()]
+                else:
+                    raise Exception(f'❗️{ConfigKeyAnalysis.IMPORT_EXTRACTOR.name.lower()} must be one of {[e.name.lower() for e in ImportExtractor]}.')
+
+            # select the backend that creates results from source files
+            if ConfigKeyAnalysis.PARSER_BACKEND.name.lower() in analysis_dict:
+                parser_backend = str(analysis_dict[ConfigKeyAnalysis.PARSER_BACKEND.name.lower()])
+                if parser_backend.upper() in ParserBackend.__members__:
+                    analysis.parser_backend = ParserBackend[parser_backend.upper()]
+                else:
+                    raise Exception(f'❗️{ConfigKeyAnalysis.PARSER_BACKEND.name.lower()} must be one of {[e.name.lower() for e in ParserBackend]}.')
+
             # check if the analysis should only consider specified files
             if ConfigKeyAnalysis.ONLY_PERMIT_FILES_MATCHING_ABSOLUTE_PATH.name.lower() in analysis_dict:
                 if isinstance(analysis_dict[ConfigKeyAnalysis.ONLY_PERMIT_FILES_MATCHING_ABSOLUTE_PATH.name.lower()], list):
@@ -564,7 +711,7 @@ class Configuration:
 
                     # number of methods
                     if configured_metric == ConfigKeyFileScan.NUMBER_OF_METHODS.name.lower():
-                        number_of_methods_metric = NumberOfMethodsMetric(analysis)
+                        number_of_methods_metric = metric_class(ConfigKeyFileScan.NUMBER_OF_METHODS.name.lower())(analysis)
                         LOGGER.debug(f'adding {number_of_methods_metric.pretty_metric_name}...')
                         analysis.metrics_for_file_results.update({
                             number_of_methods_metric.metric_name: number_of_methods_metric
@@ -572,7 +719,7 @@ class Configuration:
 
                     # source lines of code
                     if configured_metric == ConfigKeyFileScan.SOURCE_LINES_OF_CODE.name.lower():
-                        source_lines_of_code_metric = SourceLinesOfCodeMetric(analysis)
+                        source_lines_of_code_metric = metric_class(ConfigKeyFileScan.SOURCE_LINES_OF_CODE.name.lower())(analysis)
                         LOGGER.debug(f'adding {source_lines_of_code_metric.pretty_metric_name}...')
                         analysis.metrics_for_file_results.update({
                             source_lines_of_code_metric.metric_name: source_lines_of_code_metric
@@ -580,34 +727,53 @@ class Configuration:
 
                     # fan-in, fan-out
                     if ConfigKeyFileScan.FAN_IN_OUT.name.lower() in configured_metric:
-                        LOGGER.debug(f'adding {FanInOutMetric.pretty_metric_name}...')
                         graph_representations = analysis.existing_graph_representations
-                        fan_in_out_metric = FanInOutMetric(analysis, graph_representations)
+                        fan_in_out_metric = metric_class(ConfigKeyFileScan.FAN_IN_OUT.name.lower())(analysis, graph_representations)
+                        LOGGER.debug(f'adding {fan_in_out_metric.pretty_metric_name}...')
                         analysis.metrics_for_file_results.update({
                             fan_in_out_metric.metric_name: fan_in_out_metric
                         })
 
                     # louvain-modularity
                     if ConfigKeyFileScan.LOUVAIN_MODULARITY.name.lower() in configured_metric:
-                        LOGGER.debug(f'adding {LouvainModularityMetric.pretty_metric_name}...')
                         graph_representations = analysis.existing_graph_representations
-                        louvain_modularity_metric = LouvainModularityMetric(analysis, graph_representations)
+                        louvain_modularity_metric = metric_class(ConfigKeyFileScan.LOUVAIN_MODULARITY.name.lower())(analysis, graph_representations)
+                        LOGGER.debug(f'adding {louvain_modularity_metric.pretty_metric_name}...')
                         analysis.metrics_for_file_results.update({
                             louvain_modularity_metric.metric_name: louvain_modularity_metric
                         })
 
+                    # page rank
+                    if ConfigKeyFileScan.PAGE_RANK.name.lower() in configured_metric:
+                        graph_representations = analysis.existing_graph_representations
+                        page_rank_metric = metric_class(ConfigKeyFileScan.PAGE_RANK.name.lower())(analysis, graph_representations)
+                        LOGGER.debug(f'adding {page_rank_metric.pretty_metric_name}...')
+                        analysis.metrics_for_file_results.update({
+                            page_rank_metric.metric_name: page_rank_metric
+                        })
+
+                    # betweenness centrality
+                    if ConfigKeyFileScan.BETWEENNESS_CENTRALITY.name.lower() in configured_metric:
+                        graph_representations = analysis.existing_graph_representations
+                        betweenness_metric = metric_class(ConfigKeyFileScan.BETWEENNESS_CENTRALITY.name.lower())(analysis, graph_representations)
+                        LOGGER.debug(f'adding {betweenness_metric.pretty_metric_name}...')
+                        analysis.metrics_for_file_results.update({
+                            betweenness_metric.metric_name: betweenness_metric
+                        })
+
                     # tfidf
                     if ConfigKeyFileScan.TFIDF.name.lower() in configured_metric:
-                        LOGGER.debug(f'adding {TFIDFMetric.pretty_metric_name}...')
                         graph_representations = analysis.existing_graph_representations
-                        tfidf_metric = TFIDFMetric(analysis)
+                        tfidf_mode = self._tfidf_mode_for_value(configured_metric)
+                        tfidf_metric = metric_class(ConfigKeyFileScan.TFIDF.name.lower())(analysis, tfidf_mode)
+                        LOGGER.debug(f'adding {tfidf_metric.pretty_metric_name}...')
                         analysis.metrics_for_file_results.update({
                             tfidf_metric.metric_name: tfidf_metric
                         })
 
                     # whitespace complexity
                     if ConfigKeyFileScan.WS_COMPLEXITY.name.lower() in configured_metric:
-                        whitespace_metric = WhitespaceMetric(analysis)
+                        whitespace_metric = metric_class(ConfigKeyFileScan.WS_COMPLEXITY.name.lower())(analysis)
                         LOGGER.debug(f'adding {whitespace_metric.pretty_metric_name}...')
                         analysis.metrics_for_file_results.update({
                             whitespace_metric.metric_name: whitespace_metric
@@ -615,7 +781,7 @@ class Configuration:
 
                     # git metrics
                     if ConfigKeyFileScan.GIT.name.lower() in configured_metric:
-                        git_metrics = GitMetrics(analysis)
+                        git_metrics = metric_class(ConfigKeyFileScan.GIT.name.lower())(analysis)
                         LOGGER.debug(f'adding {git_metrics.pretty_metric_name}...')
                         analysis.metrics_for_file_results.update({
                             git_metrics.metric_name: git_metrics
@@ -638,8 +804,8 @@ class Configuration:
 
                     # number of methods
                     if configured_metric == ConfigKeyEntityScan.NUMBER_OF_METHODS.name.lower():
-                        LOGGER.debug(f'adding {NumberOfMethodsMetric.pretty_metric_name}...')
-                        number_of_methods_metric = NumberOfMethodsMetric(analysis)
+                        number_of_methods_metric = metric_class(ConfigKeyEntityScan.NUMBER_OF_METHODS.name.lower())(analysis)
+                        LOGGER.debug(f'adding {number_of_methods_metric.pretty_metric_name}...')
 
                         analysis.metrics_for_entity_results.update({
                             number_of_methods_metric.metric_name: number_of_methods_metric
@@ -647,17 +813,17 @@ class Configuration:
 
                     # source lines of code
                     if configured_metric == ConfigKeyEntityScan.SOURCE_LINES_OF_CODE.name.lower():
-                        LOGGER.debug(f'adding {SourceLinesOfCodeMetric.pretty_metric_name}...')
-                        source_lines_of_code_metric = SourceLinesOfCodeMetric(analysis)
+                        source_lines_of_code_metric = metric_class(ConfigKeyEntityScan.SOURCE_LINES_OF_CODE.name.lower())(analysis)
+                        LOGGER.debug(f'adding {source_lines_of_code_metric.pretty_metric_name}...')
                         analysis.metrics_for_entity_results.update({
                             source_lines_of_code_metric.metric_name: source_lines_of_code_metric
                         })
 
                     # fan-in, fan-out
                     if ConfigKeyEntityScan.FAN_IN_OUT.name.lower() in configured_metric:
-                        LOGGER.debug(f'adding {FanInOutMetric.pretty_metric_name}...')
                         graph_representations = analysis.existing_graph_representations
-                        fan_in_out_metric = FanInOutMetric(analysis, graph_representations)
+                        fan_in_out_metric = metric_class(ConfigKeyEntityScan.FAN_IN_OUT.name.lower())(analysis, graph_representations)
+                        LOGGER.debug(f'adding {fan_in_out_metric.pretty_metric_name}...')
 
                         analysis.metrics_for_entity_results.update({
                             fan_in_out_metric.metric_name: fan_in_out_metric
@@ -665,19 +831,38 @@ class Configuration:
 
                     # louvain-modularity
                     if ConfigKeyEntityScan.LOUVAIN_MODULARITY.name.lower() in configured_metric:
-                        LOGGER.debug(f'adding {LouvainModularityMetric.pretty_metric_name}...')
                         graph_representations = analysis.existing_graph_representations
-                        louvain_modularity_metric = LouvainModularityMetric(analysis, graph_representations)
+                        louvain_modularity_metric = metric_class(ConfigKeyEntityScan.LOUVAIN_MODULARITY.name.lower())(analysis, graph_representations)
+                        LOGGER.debug(f'adding {louvain_modularity_metric.pretty_metric_name}...')
 
                         analysis.metrics_for_entity_results.update({
                             louvain_modularity_metric.metric_name: louvain_modularity_metric
                         })
 
+                    # page rank
+                    if ConfigKeyEntityScan.PAGE_RANK.name.lower() in configured_metric:
+                        graph_representations = analysis.existing_graph_representations
+                        page_rank_metric = metric_class(ConfigKeyEntityScan.PAGE_RANK.name.lower())(analysis, graph_representations)
+                        LOGGER.debug(f'adding {page_rank_metric.pretty_metric_name}...')
+                        analysis.metrics_for_entity_results.update({
+                            page_rank_metric.metric_name: page_rank_metric
+                        })
+
+                    # betweenness centrality
+                    if ConfigKeyEntityScan.BETWEENNESS_CENTRALITY.name.lower() in configured_metric:
+                        graph_representations = analysis.existing_graph_representations
+                        betweenness_metric = metric_class(ConfigKeyEntityScan.BETWEENNESS_CENTRALITY.name.lower())(analysis, graph_representations)
+                        LOGGER.debug(f'adding {betweenness_metric.pretty_metric_name}...')
+                        analysis.metrics_for_entity_results.update({
+                            betweenness_metric.metric_name: betweenness_metric
+                        })
+
                      # tfidf
                     if ConfigKeyEntityScan.TFIDF.name.lower() in configured_metric:
-                        LOGGER.debug(f'adding {TFIDFMetric.pretty_metric_name}...')
                         graph_representations = analysis.existing_graph_representations
-                        tfidf_metric = TFIDFMetric(analysis)
+                        tfidf_mode = self._tfidf_mode_for_value(configured_metric)
+                        tfidf_metric = metric_class(ConfigKeyEntityScan.TFIDF.name.lower())(analysis, tfidf_mode)
+                        LOGGER.debug(f'adding {tfidf_metric.pretty_metric_name}...')
                         analysis.metrics_for_entity_results.update({
                             tfidf_metric.metric_name: tfidf_metric
                         })
@@ -1,33 +1,24 @@
 """
 Handles all mappings to languages and relevant file extensions.
-Contains FileManager to handle filesystem specific functionality.
+Contains FileManager to handle filesystem specific functionality and SourceLoader to read released file contents again.
 """
 
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
 from enum import Enum, unique, auto
-from typing import Optional
+from typing import Optional, Dict, List, Set, Tuple, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 
 import os
+import mmap
 import shutil
 import logging
 
 import coloredlogs
-from emerge.languages.goparser import GoParser
-
-from emerge.languages.javaparser import JavaParser
-from emerge.languages.swiftparser import SwiftParser
-from emerge.languages.cparser import CParser
-from emerge.languages.cppparser import CPPParser
-from emerge.languages.groovyparser import GroovyParser
-from emerge.languages.javascriptparser import JavaScriptParser
-from emerge.languages.typescriptparser import TypeScriptParser
-from emerge.languages.kotlinparser import KotlinParser
-from emerge.languages.objcparser import ObjCParser
-from emerge.languages.rubyparser import RubyParser
-from emerge.languages.pyparser import PythonParser
 
+from emerge.languages.abstractparser import Parser
 from emerge.log import Logger
 
 LOGGER = Logger(logging.getLogger('emerge'))
@@ -79,48 +70,189 @@ class LanguageExtension(Enum):
 
 
 class FileScanMapper:
+    # parser names by file extension, header files are mapped by the languages an analysis permits
+    PARSER_NAMES_BY_EXTENSION: Dict[str, str] = {
+        LanguageExtension.JAVA.value: Parser.JAVA_PARSER.name,
+        LanguageExtension.SWIFT.value: Parser.SWIFT_PARSER.name,
+        LanguageExtension.C.value: Parser.C_PARSER.name,
+        LanguageExtension.CPP.value: Parser.CPP_PARSER.name,
+        LanguageExtension.GROOVY.value: Parser.GROOVY_PARSER.name,
+        LanguageExtension.JAVASCRIPT.value: Parser.JAVASCRIPT_PARSER.name,
+        LanguageExtension.JSX.value: Parser.JAVASCRIPT_PARSER.name,
+        LanguageExtension.TYPESCRIPT.value: Parser.TYPESCRIPT_PARSER.name,
+        LanguageExtension.TSX.value: Parser.TYPESCRIPT_PARSER.name,
+        LanguageExtension.KOTLIN.value: Parser.KOTLIN_PARSER.name,
+        LanguageExtension.OBJC.value: Parser.OBJC_PARSER.name,
+        LanguageExtension.RUBY.value: Parser.RUBY_PARSER.name,
+        LanguageExtension.PYTHON.value: Parser.PYTHON_PARSER.name,
+        LanguageExtension.GO.value: Parser.GO_PARSER.name,
+    }
+    HEADER_PARSER_NAMES_BY_LANGUAGE: List[Tuple[str, str]] = [
+        ('objc', Parser.OBJC_PARSER.name),
+        ('c', Parser.C_PARSER.name),
+        ('cpp', Parser.CPP_PARSER.name),
+    ]
+
     @staticmethod
     def choose_parser(file_extension, only_permit_languages=None) -> Optional[str]:
         """
         Returns:
             Optional[str]: Returns a parser name, if a matching of file extension/parser can be found, otherwise None.
         """
-        if file_extension == LanguageExtension.JAVA.value:
-            return JavaParser.parser_name()
-        if file_extension == LanguageExtension.SWIFT.value:
-            return SwiftParser.parser_name()
-        if file_extension == LanguageExtension.C.value:
-            return CParser.parser_name()
-        if file_extension == LanguageExtension.CPP.value:
-            return CPPParser.parser_name()
-        if file_extension == LanguageExtension.GROOVY.value:
-            return GroovyParser.parser_name()
-        if file_extension == LanguageExtension.JAVASCRIPT.value or file_extension == LanguageExtension.JSX.value:
-            return JavaScriptParser.parser_name()
-        if file_extension == LanguageExtension.TYPESCRIPT.value or file_extension == LanguageExtension.TSX.value:
-            return TypeScriptParser.parser_name()
-        if file_extension == LanguageExtension.KOTLIN.value:
-            return KotlinParser.parser_name()
-        if file_extension == LanguageExtension.OBJC.value:
-            return ObjCParser.parser_name()
-        if file_extension == LanguageExtension.RUBY.value:
-            return RubyParser.parser_name()
-        if file_extension == LanguageExtension.PYTHON.value:
-            return PythonParser.parser_name()
-        if file_extension == LanguageExtension.GO.value:
-            return GoParser.parser_name()
-        if file_extension == LanguageExtension.C_HEADER.value:
-            if only_permit_languages:
-                if 'objc' in only_permit_languages:
-                    return ObjCParser.parser_name()
-                if 'c' in only_permit_languages:
-                    return CParser.parser_name()
-                if 'cpp' in only_permit_languages:
-                    return CPPParser.parser_name()
+        parser_name = FileScanMapper.PARSER_NAMES_BY_EXTENSION.get(file_extension)
+        if parser_name is not None:
+            return parser_name
+
+        if file_extension == LanguageExtension.C_HEADER.value and only_permit_languages:
+            for language, header_parser_name in FileScanMapper.HEADER_PARSER_NAMES_BY_LANGUAGE:
+                if language in only_permit_languages:
+                    return header_parser_name
 
         return None
 
 
+class FileSystemScanner:
+    """Scans a directory tree with os.scandir and reads file contents concurrently from a thread pool.
+    All directory listings are fetched level by level up front, so that walk() can afterwards replay them in the exact
+    top-down order of os.walk. This keeps the resulting filesystem graph deterministic, regardless of the number of threads.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, ignore_directories: Optional[List[str]] = None):
+        self.max_workers: int = max_workers if max_workers else FileSystemScanner.default_workers()
+        self.ignore_directories: List[str] = ignore_directories if ignore_directories else []
+        self.scanned_bytes: int = 0
+
+        self._listings: Dict[str, Tuple[List[str], List[str]]] = {}
+        self._symlinks: Set[str] = set()
+
+    @staticmethod
+    def default_workers() -> int:
+        # same default as ThreadPoolExecutor, scanning and reading is mostly I/O bound
+        return min(32, (os.cpu_count() or 1) + 4)
+
+    def scan(self, top: str) -> None:
+        """Fetches the listings of all directories below top, one tree level at a time."""
+        self._listings.clear()
+        self._symlinks.clear()
+        pending_directories = [top]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending_directories:
+                listings = list(executor.map(self._list_directory, pending_directories))
+                next_directories = []
+
+                for directory, listing in zip(pending_directories, listings):
+                    if listing is None:
+                        continue
+                    dirs, files, symlinks = listing
+                    self._listings[directory] = (dirs, files)
+                    self._symlinks.update(symlinks)
+
+                    # just like os.walk, do not follow symlinked directories
+                    next_directories.extend(path for d in dirs if (path := os.path.join(directory, d)) not in self._symlinks)
+
+                pending_directories = next_directories
+
+    def walk(self, top: str) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """Replays the scanned listings in the same top-down order as os.walk(top). Directories removed from dirs by the caller are not descended into."""
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            if directory not in self._listings:
+                continue
+
+            dirs, files = self._listings[directory]
+            dirs, files = list(dirs), list(files)
+            yield directory, dirs, files
+
+            for d in reversed(dirs):
+                if (path := os.path.join(directory, d)) not in self._symlinks:
+                    stack.append(path)
+
+    def is_symlink(self, path: str) -> bool:
+        return path in self._symlinks
+
+    def read_files(self, paths: List[str]) -> List[str]:
+        """Reads the contents of all given files concurrently, the order of the returned contents matches the order of paths."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            contents = list(executor.map(read_source_file, paths))
+
+        self.scanned_bytes += sum(len(content) for content in contents)
+        return contents
+
+    def _list_directory(self, directory: str) -> Optional[Tuple[List[str], List[str], List[str]]]:
+        dirs, files, symlinks = [], [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+
+                    if is_dir:
+                        if entry.name in self.ignore_directories:
+                            continue
+                        dirs.append(entry.name)
+                    else:
+                        files.append(entry.name)
+
+                    try:
+                        if entry.is_symlink():
+                            symlinks.append(entry.path)
+                    except OSError:
+                        pass
+
+        except OSError as ex:
+            # os.walk silently skips directories that can not be listed, do the same but leave a trace
+            LOGGER.debug(f'could not scan directory {directory}: {ex}')
+            return None
+
+        return dirs, files, symlinks
+
+
+class SourceLoader:
+    """Reads the contents of scanned files again on demand, e.g. for metrics that need the source of a file after its content was released.
+    The most recently loaded contents are kept up to a maximum number of files. Large files are read through mmap, so that they are
+    decoded from the mapped pages without reading them into an intermediate buffer first.
+    """
+
+    DEFAULT_MAX_CACHED_FILES = 128
+    MMAP_THRESHOLD_IN_BYTES = 1024 * 1024
+
+    def __init__(self, max_cached_files: int = DEFAULT_MAX_CACHED_FILES, mmap_threshold_in_bytes: int = MMAP_THRESHOLD_IN_BYTES):
+        self.max_cached_files: int = max_cached_files
+        self.mmap_threshold_in_bytes: int = mmap_threshold_in_bytes
+        self.loaded_files: int = 0
+        self._contents: OrderedDict[str, str] = OrderedDict()
+
+    def load(self, path: str) -> str:
+        """Returns the content of a file, exactly as FileSystemScanner read it."""
+        content = self._contents.get(path)
+        if content is not None:
+            self._contents.move_to_end(path)
+            return content
+
+        content = self.read_file(path)
+        self.loaded_files += 1
+        self._contents[path] = content
+        if len(self._contents) > self.max_cached_files:
+            self._contents.popitem(last=False)
+        return content
+
+    def read_file(self, path: str) -> str:
+        if os.path.getsize(path) < self.mmap_threshold_in_bytes:
+            return read_source_file(path)
+
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            content = str(mapped_file, encoding="ISO-8859-1")
+
+        # same universal newlines as reading the file in text mode
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
+
+
 class FileManager:
     @staticmethod
     def copy_force_graph_template_to_export_dir(target_export_path: str):
@@ -149,6 +281,12 @@ class FileManager:
             LOGGER.error(f'{ex}')
 
 
+def read_source_file(path: str) -> str:
+    """Reads the content of a source file, newlines of any kind are translated to '\\n' just like by universal newlines."""
+    with open(path, encoding="ISO-8859-1") as file:
+        return file.read()
+
+
 def truncate_directory(directory: str) -> str:
     """Simple truncation of a given directory path as string."""
 
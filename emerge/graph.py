@@ -170,10 +170,12 @@ class FileSystemNode:
     """Small representation of a filesystem object, e.g. a directory or a file. This class is currently used to build the filesystem graph.
     """
 
-    def __init__(self, node_type: FileSystemNodeType, absolute_name: str, content: Optional[str] = None):
+    def __init__(self, node_type: FileSystemNodeType, absolute_name: str, content: Optional[str] = None, path: Optional[str] = None):
         self.type: FileSystemNodeType = node_type
         self.absolute_name: str = absolute_name
         self.content: Optional[str] = content
+        # the path the content of a file is read from
+        self.path: Optional[str] = path
 
     def __hash__(self):
         return hash(self.absolute_name)
@@ -5,16 +5,23 @@ Contains all abstract parsing classes and relevant enums.
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-import re
 import logging
 
 from abc import ABC, abstractmethod
 from enum import Enum, unique, auto
-from typing import Dict, List, Generator, Optional, Tuple
+from typing import Dict, List, Generator, Optional, Tuple, Iterator, Pattern, Match
+from datetime import timedelta
 from pathlib import Path
+import bisect
+import time
+import re
+
 import coloredlogs
+import pyparsing as pp
 
-from emerge.abstractresult import AbstractResult, AbstractEntityResult
+from emerge.abstractresult import AbstractFileResult, AbstractEntityResult, ResultStore
+from emerge.languages.lexer import Lexer, TokenStream
+from emerge.stats import Statistics
 from emerge.log import Logger
 
 LOGGER = Logger(logging.getLogger('parser'))
@@ -53,6 +60,20 @@ class Parser(Enum):
     GO_PARSER = auto()
 
 
+@unique
+class ImportExtractor(Enum):
+    """Engines that extract import dependencies, selectable by the import_extractor key of an analysis configuration."""
+    PYPARSING = auto()  # parse every import statement with the pyparsing grammar of a parser
+    REGEX = auto()  # match import statements with regular expressions, fall back to pyparsing where no regular expression matches
+
+
+@unique
+class ParserBackend(Enum):
+    """Backends that create results from source files, selectable by the parser_backend key of an analysis configuration."""
+    TOKENS = auto()  # tokenize the source and parse it with pyparsing grammars, supported by all parsers
+    AST = auto()  # parse the source into a syntax tree, only supported by the Python parser (others use tokens)
+
+
 @unique
 class CoreParsingKeyword(Enum):
     ENTITY_NAME = "entity_name"
@@ -84,8 +105,198 @@ class CoreParsingKeyword(Enum):
     NEWLINE = "\n"
 
 
+class TokenCursor:
+    """A cursor over a list of tokens that gives access to the tokens following any position without copying them.
+    The tokens are joined only once into a source string (exactly like " ".join(tokens)) and the character offset of every token is kept.
+    Parsing at a token position runs directly on this source string, starting at the offset of the token. This is equivalent to parsing
+    the joined read ahead string of all following tokens, but only costs as much as the given expression actually consumes.
+    """
+
+    def __init__(self, tokens: List[str]):
+        self.tokens: List[str] = tokens
+        self._source: Optional[str] = None
+        self._offsets: List[int] = []
+        self._matches: Dict[Pattern, Dict[int, Match]] = {}
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        return enumerate(self.tokens)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    @property
+    def source(self) -> str:
+        if self._source is None:
+            offset = 0
+            for token in self.tokens:
+                self._offsets.append(offset)
+                offset += len(token) + 1
+            self._source = " ".join(self.tokens)
+        return self._source
+
+    def offset(self, index: int) -> int:
+        """Returns the character offset of the token at index within the joined source string."""
+        if self._source is None:
+            _ = self.source
+        return self._offsets[index]
+
+    def matches(self, pattern: Pattern) -> Dict[int, Match]:
+        """Returns all matches of a regular expression within the joined source string by the index of the token they start at.
+        Matches that do not start at the beginning of a token are ignored. The source is only searched once per pattern.
+        """
+        if pattern not in self._matches:
+            source = self.source
+            matches_by_index: Dict[int, Match] = {}
+            for match in pattern.finditer(source):
+                index = bisect.bisect_left(self._offsets, match.start())
+                if index < len(self._offsets) and self._offsets[index] == match.start():
+                    matches_by_index[index] = match
+            self._matches[pattern] = matches_by_index
+        return self._matches[pattern]
+
+    def read_ahead(self, index: int, max_tokens: int) -> List[str]:
+        """Returns a bounded look ahead window: the token at index, followed by at most max_tokens tokens."""
+        return self.tokens[index:index + max_tokens + 1]
+
+    def following(self, index: int) -> Iterator[str]:
+        """Lazily iterates over the token at index and all tokens following it."""
+        # index the tokens directly, islice() would step over all tokens before index
+        return map(self.tokens.__getitem__, range(index, len(self.tokens)))
+
+    def read_ahead_string(self, index: int) -> str:
+        """Returns the token at index and all following tokens as a string. This creates a copy, prefer parse() where possible."""
+        return self.source[self.offset(index):]
+
+    def parse(self, expression: pp.ParserElement, index: int) -> pp.ParseResults:
+        """Equivalent to expression.parseString(self.read_ahead_string(index)), but without creating the read ahead string.
+        Raises a ParseException if the expression does not match at the token with the given index.
+        """
+        source = self.source
+        if not expression.streamlined:
+            expression.streamline()
+
+        try:
+            # pylint: disable=protected-access
+            _, parse_results = expression._parse(source, self._offsets[index])
+        except pp.ParseBaseException as exception:
+            # same as parseString, clear out the pyparsing internal stack trace
+            raise exception.with_traceback(None)
+
+        return parse_results
+
+
+class GrammarRegistry:
+    """Contains all pyparsing grammars of a parser by name. Grammars are registered once when a parser is constructed, instead of being built
+    again for every matched token or file. The time spent parsing with a grammar is recorded in the statistics, e.g. as java-import-grammar_runtime.
+
+    A grammar can additionally have a regular expression as fast path, which is tried first if requested (see ImportExtractor.REGEX).
+    The named groups of the regular expression correspond to the results names of the grammar and it must only match where the grammar
+    would create exactly the same results, everything else falls back to the grammar.
+
+    A grammar that is searched in a whole source can have an anchor, a literal that every match of the grammar starts with. The search
+    then only tries the positions of the anchor instead of every position of the source.
+    """
+
+    def __init__(self, language: str):
+        self.language: str = language.lower()
+        self._grammars: Dict[str, pp.ParserElement] = {}
+        self._patterns: Dict[str, Pattern] = {}
+        self._anchors: Dict[str, str] = {}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._grammars
+
+    def __getitem__(self, name: str) -> pp.ParserElement:
+        return self._grammars[name]
+
+    def register(self, name: str, expression: pp.ParserElement, anchor: Optional[str] = None) -> pp.ParserElement:
+        expression.streamline()
+        self._grammars[name] = expression
+        if anchor is not None:
+            self._anchors[name] = anchor
+        return expression
+
+    def register_pattern(self, name: str, pattern: str) -> Pattern:
+        compiled_pattern = re.compile(pattern)
+        self._patterns[name] = compiled_pattern
+        return compiled_pattern
+
+    def qualified_name(self, name: str) -> str:
+        return f'{self.language}-{name}'
+
+    def record_runtime(self, name: str, seconds: float, statistics: Statistics) -> None:
+        statistics.increment(Statistics.Key.GRAMMAR_RUNTIME, timedelta(seconds=seconds), prefix=self.qualified_name(name))
+
+    def parse(self, name: str, token_cursor: TokenCursor, index: int, statistics: Statistics, fast_path: bool = False) -> pp.ParseResults:
+        """Parses with the grammar of the given name at a token cursor position, see TokenCursor.parse().
+        With fast_path, the regular expression of the grammar (if any) is tried first. It is matched once against all tokens of the cursor.
+        """
+        if fast_path and name in self._patterns:
+            matching_starts = time.perf_counter()
+            match = token_cursor.matches(self._patterns[name]).get(index)
+            self.record_runtime(f'{name}-pattern', time.perf_counter() - matching_starts, statistics)
+
+            if match is not None:
+                statistics.increment(Statistics.Key.FAST_PATH_HITS)
+                return pp.ParseResults.from_dict(match.groupdict())
+            statistics.increment(Statistics.Key.FAST_PATH_FALLBACKS)
+
+        parsing_starts = time.perf_counter()
+        try:
+            return token_cursor.parse(self._grammars[name], index)
+        finally:
+            self.record_runtime(name, time.perf_counter() - parsing_starts, statistics)
+
+    def search(self, name: str, source: str, statistics: Statistics) -> pp.ParseResults:
+        """Searches the given source for all matches of the grammar of the given name, equivalent to searchString()."""
+        parsing_starts = time.perf_counter()
+        try:
+            if name not in self._anchors:
+                return self._grammars[name].searchString(source)
+            return self._search_at_anchors(self._grammars[name], self._anchors[name], source)
+        finally:
+            self.record_runtime(name, time.perf_counter() - parsing_starts, statistics)
+
+    @staticmethod
+    def _search_at_anchors(expression: pp.ParserElement, anchor: str, source: str) -> pp.ParseResults:
+        """Same as searchString(), which tries to parse at every position of the source and continues after every match, but only tries the
+        positions where the anchor starts. No other position can start a match, so the matches are the same.
+        """
+        if not expression.keepTabs:
+            source = source.expandtabs()
+
+        matches = []
+        location = source.find(anchor)
+        while location >= 0:
+            try:
+                # pylint: disable=protected-access
+                end, tokens = expression._parse(source, location, callPreParse=False)
+            except pp.ParseException:
+                location = source.find(anchor, location + 1)
+                continue
+            matches.append(tokens)
+            location = source.find(anchor, end)
+        return pp.ParseResults(matches)
+
+    def parse_string(self, name: str, source: str, statistics: Statistics, fast_path: bool = False) -> pp.ParseResults:
+        if fast_path and name in self._patterns:
+            match = self._patterns[name].match(source)
+            if match is not None:
+                statistics.increment(Statistics.Key.FAST_PATH_HITS)
+                return pp.ParseResults.from_dict(match.groupdict())
+            statistics.increment(Statistics.Key.FAST_PATH_FALLBACKS)
+
+        parsing_starts = time.perf_counter()
+        try:
+            return self._grammars[name].parseString(source)
+        finally:
+            self.record_runtime(name, time.perf_counter() - parsing_starts, statistics)
+
+
 class ParsingMixin(ABC):
 
+    __slots__ = ()
+
     class Constants(Enum):
         MAX_DEBUG_TOKENS_READAHEAD = 10
 
@@ -149,15 +360,6 @@ class ParsingMixin(ABC):
         read_before_and_ahead += following  # or += following[:5]
         return " ".join(read_before_and_ahead)
 
-    @staticmethod
-    def _gen_word_read_ahead(list_of_words) -> Generator:
-        following = None
-        length = len(list_of_words)
-        for index, obj in enumerate(list_of_words):
-            if index < (length - 1):
-                following = list_of_words[index + 1:]
-            yield index, obj, following
-
     @staticmethod
     def _gen_word_before_and_read_ahead(list_of_words) -> Generator:
         previous = following = None
@@ -171,91 +373,35 @@ class ParsingMixin(ABC):
 
     @staticmethod
     def _filter_source_tokens_without_comments(list_of_words, line_comment_string, start_comment_string, stop_comment_string) -> str:
-        source = " ".join(list_of_words)
-        source_lines = source.splitlines()
-        source_lines_without_comments = []
-        active_block_comment = False
-
-        for line in source_lines:
-            if start_comment_string in line:
-                active_block_comment = True
-                continue
-            if stop_comment_string in line:
-                active_block_comment = False
-                continue
-            if line.strip().startswith(line_comment_string):
-                continue
-
-            if not active_block_comment:
-                source_lines_without_comments.append(line)
-
-        return "\n".join(source_lines_without_comments)
+        return TokenStream(list_of_words).source_without_comments(line_comment_string, start_comment_string, stop_comment_string)
 
     def read_input_from_file(self, path_with_file_name) -> str:
         with open(path_with_file_name, encoding="ISO-8859-1") as file:
             file_content = file.read()
             return file_content
 
-    @classmethod
-    def create_read_ahead_string(cls, obj, following) -> str:
-        read_ahead = [obj]
-        read_ahead += following
-        return " ".join(read_ahead)
-
     @staticmethod
     def _is_dependency_in_ignore_list(dependency: str, analysis) -> bool:
-        ignored_dependency: str
-        if bool(analysis.ignore_dependencies_containing):
-            for ignored_dependency in analysis.ignore_dependencies_containing:
-                if ignored_dependency.lower() in dependency.lower():
-                    return True
-        if bool(analysis.ignore_dependencies_matching):
-            for ignored_dependency_re in analysis.ignore_dependencies_matching:
-                if ignored_dependency_re.match(dependency):
-                    return True
-        return False
+        return analysis.dependency_ignore_rules().is_ignored(dependency)
 
     @staticmethod
     def is_entity_in_ignore_list(entity: str, analysis) -> bool:
-        if bool(analysis.ignore_entities_containing):
-            for ignored_entity in analysis.ignore_entities_containing:
-                if ignored_entity in entity:
-                    return True
-        if bool(analysis.ignore_entities_matching):
-            for ignored_entity_re in analysis.ignore_entities_matching:
-                if ignored_entity_re.match(entity):
-                    return True
-        return False
+        return analysis.entity_ignore_rules().is_ignored(entity)
 
     @classmethod
     def preprocess_file_content_and_generate_token_list(cls, file_content: str) -> List[str]:
-        return re.findall(r'\S+|\n', file_content.replace(':', ' : ')
-                                                 .replace(';', ' ; ')
-                                                 .replace('{', ' { ')
-                                                 .replace('}', ' } ')
-                                                 .replace('(', ' ( ')
-                                                 .replace(')', ' ) ')
-                                                 .replace('[', ' [ ')
-                                                 .replace(']', ' ] ')
-                                                 .replace('?', ' ? ')
-                                                 .replace('!', ' ! ')
-                                                 .replace(',', ' , ')
-                                                 .replace('<', ' < ')
-                                                 .replace('>', ' > ')
-                          )
+        return Lexer.default().tokenize(file_content)
 
     @classmethod
     def preprocess_file_content_and_generate_token_list_by_mapping(cls, file_content: str, mapping_dict: Dict[str, str]) -> List[str]:
-        for origin, mapped in mapping_dict.items():
-            file_content = file_content.replace(origin, mapped)
-        return re.findall(r'\S+|\n', file_content)
+        return Lexer.for_mapping(mapping_dict).tokenize(file_content)
 
 
 class AbstractParser(ParsingMixin, ABC):
 
     @property
     @abstractmethod
-    def results(self) -> Dict[str, AbstractResult]:
+    def results(self) -> ResultStore:
         ...
 
     # pylint: disable=unused-argument
@@ -288,3 +434,33 @@ class AbstractParser(ParsingMixin, ABC):
     @abstractmethod
     def create_unique_entity_name(self, entity: AbstractEntityResult) -> None:
         ...
+
+    def cache_context(self, analysis) -> str:
+        """Returns any additional state (besides file content and configuration) that the file results of this parser depend on.
+        This is part of the parse cache key. The set of scanned files is not, dependencies that are resolved against other files are
+        added by add_import_dependencies(), which the parse cache calls again on every cache hit.
+        """
+        return ''
+
+    def add_import_dependencies(self, result: AbstractFileResult, import_dependencies: List[str], analysis) -> None:
+        """Resolves the import dependencies of a file result as extracted from its source and adds them to the result, unless they
+        are ignored. With a parse cache the extracted dependencies are kept with the result, so that they can be stored and resolved
+        against the scanned files of later analyses.
+        """
+        if analysis.cache_directory:
+            result.extracted_import_dependencies = list(import_dependencies)
+
+        for dependency in self.resolve_import_dependencies(result, import_dependencies, analysis):
+            if self._is_dependency_in_ignore_list(dependency, analysis):
+                LOGGER.debug(f'ignoring dependency from {result.unique_name} to {dependency}')
+            else:
+                result.scanned_import_dependencies.append(dependency)
+                LOGGER.debug(f'adding import: {dependency}')
+
+    def resolve_import_dependencies(self, result: AbstractFileResult, import_dependencies: List[str], analysis) -> List[str]:
+        """Resolves extracted import dependencies against the scanned files, by default one by one with try_resolve_dependency()."""
+        return [self.try_resolve_dependency(dependency, result, analysis) for dependency in import_dependencies]
+
+    # pylint: disable=unused-argument
+    def try_resolve_dependency(self, dependency: str, result: AbstractFileResult, analysis) -> str:
+        return dependency
@@ -5,18 +5,19 @@ Contains the implementation of the C language parser and a relevant keyword enum
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import Dict
+from typing import Dict, List
 from enum import Enum, unique
 import logging
 from pathlib import Path
-import os
 
 import pyparsing as pp
 import coloredlogs
 
-from emerge.languages.abstractparser import AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType
+from emerge.languages.abstractparser import (AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType, TokenCursor, GrammarRegistry,
+                                             ImportExtractor)
+from emerge.languages.lexer import Lexer
 from emerge.results import FileResult
-from emerge.abstractresult import AbstractResult, AbstractFileResult, AbstractEntityResult
+from emerge.abstractresult import AbstractFileResult, AbstractEntityResult, ResultStore
 from emerge.log import Logger
 from emerge.stats import Statistics
 
@@ -37,7 +38,7 @@ class CParsingKeyword(Enum):
 class CParser(AbstractParser, ParsingMixin):
 
     def __init__(self):
-        self._results: Dict[str, AbstractResult] = {}
+        self._results: ResultStore = ResultStore()
         self._token_mappings: Dict[str, str] = {
             ':': ' : ',
             ';': ' ; ',
@@ -54,6 +55,22 @@ class CParser(AbstractParser, ParsingMixin):
             '>': ' > ',
             '"': ' " '
         }
+        self._lexer: Lexer = Lexer.for_mapping(self._token_mappings)
+        self._grammars: GrammarRegistry = GrammarRegistry(self.language_type())
+        self._register_grammars()
+
+    def _register_grammars(self) -> None:
+        include_name = pp.Word(pp.alphanums + CoreParsingKeyword.DOT.value + CoreParsingKeyword.SLASH.value +
+                               CoreParsingKeyword.DOUBLE_QUOTE.value + CoreParsingKeyword.UNDERSCORE.value + CoreParsingKeyword.DASH.value)
+
+        include_expression = pp.Keyword(CParsingKeyword.INCLUDE.value) + \
+            pp.ZeroOrMore(pp.Suppress(CoreParsingKeyword.OPENING_ANGLE_BRACKET.value) |
+                          pp.Suppress(CoreParsingKeyword.CLOSING_ANGLE_BRACKET.value) |
+                          pp.Suppress(CoreParsingKeyword.DOUBLE_QUOTE.value)) + \
+            include_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value)
+        self._grammars.register('include', include_expression)
+        # fast path for e.g. '#include " foo.h "' or '#include < stdio.h >'
+        self._grammars.register_pattern('include', r'(?<!\S)#include(?: [<>"])* (?P<import_entity_name>[A-Za-z0-9./_-][A-Za-z0-9./"_-]*)')
 
     @classmethod
     def parser_name(cls) -> str:
@@ -64,7 +81,7 @@ class CParser(AbstractParser, ParsingMixin):
         return LanguageType.C.name
 
     @property
-    def results(self) -> Dict[str, AbstractResult]:
+    def results(self) -> ResultStore:
         return self._results
 
     @results.setter
@@ -73,7 +90,7 @@ class CParser(AbstractParser, ParsingMixin):
 
     def generate_file_result_from_analysis(self, analysis, *, file_name: str, full_file_path: str, file_content: str) -> None:
         LOGGER.debug('generating file results...')
-        scanned_tokens = self.preprocess_file_content_and_generate_token_list_by_mapping(file_content, self._token_mappings)
+        scanned_tokens = self._lexer.tokenize(file_content)
 
         # make sure to create unique names by using the relative analysis path as a base for the result
         parent_analysis_source_path = f"{Path(analysis.source_directory).parent}/"
@@ -108,58 +125,42 @@ class CParser(AbstractParser, ParsingMixin):
 
     def _add_imports_to_result(self, result: AbstractFileResult, analysis):
         LOGGER.debug(f'extracting imports from file result {result.scanned_file_name}...')
-        list_of_words_with_newline_strings = result.scanned_tokens
-        
-        source_string_no_comments = self._filter_source_tokens_without_comments(
-            list_of_words_with_newline_strings,
+        filtered_list_no_comments = result.token_stream.tokens_without_comments(
             CParsingKeyword.INLINE_COMMENT.value,
             CParsingKeyword.START_BLOCK_COMMENT.value,
-            CParsingKeyword.STOP_BLOCK_COMMENT.value
+            CParsingKeyword.STOP_BLOCK_COMMENT.value,
+            self._lexer
         )
 
-        filtered_list_no_comments = self.preprocess_file_content_and_generate_token_list_by_mapping(source_string_no_comments, self._token_mappings)
-
-        for _, obj, following in self._gen_word_read_ahead(filtered_list_no_comments):
+        fast_path = analysis.import_extractor is ImportExtractor.REGEX
+        token_cursor = TokenCursor(filtered_list_no_comments)
+        import_dependencies: List[str] = []
+        for index, obj in token_cursor:
             if obj == CParsingKeyword.INCLUDE.value:
-                read_ahead_string = self.create_read_ahead_string(obj, following)
-
-                include_name = pp.Word(pp.alphanums + CoreParsingKeyword.DOT.value + CoreParsingKeyword.SLASH.value +
-                                       CoreParsingKeyword.DOUBLE_QUOTE.value + CoreParsingKeyword.UNDERSCORE.value + CoreParsingKeyword.DASH.value)
-
-                expression_to_match = pp.Keyword(CParsingKeyword.INCLUDE.value) + \
-                    pp.ZeroOrMore(pp.Suppress(CoreParsingKeyword.OPENING_ANGLE_BRACKET.value) |
-                                  pp.Suppress(CoreParsingKeyword.CLOSING_ANGLE_BRACKET.value) |
-                                  pp.Suppress(CoreParsingKeyword.DOUBLE_QUOTE.value)) + \
-                    include_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value)
-
                 try:
-                    parsing_result = expression_to_match.parseString(read_ahead_string)
+                    parsing_result = self._grammars.parse('include', token_cursor, index, analysis.statistics, fast_path)
                 except pp.ParseException as exception:
                     result.analysis.statistics.increment(Statistics.Key.PARSING_MISSES)
                     LOGGER.warning(f'warning: could not parse result {result=}\n{exception}')
-                    LOGGER.warning(f'next tokens: {[obj] + following[:ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value]}')
+                    LOGGER.warning(f'next tokens: {token_cursor.read_ahead(index, ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value)}')
                     continue
 
                 analysis.statistics.increment(Statistics.Key.PARSING_HITS)
 
-                # ignore any dependency substring from the config ignore list
+                # keep angle bracket includes as '<dependency>', only quoted includes may be resolved by their path suffix
                 dependency = getattr(parsing_result, CoreParsingKeyword.IMPORT_ENTITY_NAME.value)
+                quoted = token_cursor.read_ahead(index, 1)[-1] == CoreParsingKeyword.DOUBLE_QUOTE.value
+                import_dependencies.append(dependency if quoted else f'<{dependency}>')
 
-                # try to resolve the dependency
-                resolved_dependency = self.try_resolve_dependency(dependency, result, analysis)
-
-                if self._is_dependency_in_ignore_list(resolved_dependency, analysis):
-                    LOGGER.debug(f'ignoring dependency from {result.unique_name} to {resolved_dependency}')
-                else:
-                    result.scanned_import_dependencies.append(resolved_dependency)
-                    LOGGER.debug(f'adding import: {resolved_dependency}')
+        self.add_import_dependencies(result, import_dependencies, analysis)
 
     def try_resolve_dependency(self, dependency: str, result: AbstractFileResult, analysis) -> str:
-        resolved_dependency = self.resolve_relative_dependency_path(dependency, str(result.absolute_dir_path), analysis.source_directory)
-        check_dependency_path = f"{ Path(analysis.source_directory).parent}/{resolved_dependency}"
-        if os.path.exists(check_dependency_path):
-            dependency = resolved_dependency
-        return dependency
+        quoted = not dependency.startswith(CoreParsingKeyword.OPENING_ANGLE_BRACKET.value)
+        include = dependency if quoted else dependency[1:-1]
+        module_resolver = analysis.module_resolver()
+        return module_resolver.memoize(self.parser_name(), str(result.absolute_dir_path), dependency,
+                                       lambda: module_resolver.resolve_include(include, str(result.absolute_dir_path),
+                                                                               str(result.relative_analysis_path), quoted) or include)
 
     def _add_package_name_to_result(self, result: FileResult):
         result.module_name = ""
@@ -5,7 +5,7 @@ Contains the implementation of the Go language parser and a relevant keyword enu
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import Dict, List, Any
+from typing import Dict, List, Optional, Pattern
 from enum import Enum, unique
 import logging
 import re
@@ -16,9 +16,10 @@ import pyparsing as pp
 import coloredlogs
 from emerge.graph import GraphType
 
-from emerge.languages.abstractparser import AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType
+from emerge.languages.abstractparser import AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType, GrammarRegistry
+from emerge.languages.lexer import Lexer, TokenStream
 from emerge.results import FileResult
-from emerge.abstractresult import AbstractFileResult, AbstractEntityResult
+from emerge.abstractresult import AbstractFileResult, AbstractEntityResult, ResultStore
 from emerge.log import Logger
 from emerge.stats import Statistics
 
@@ -33,10 +34,75 @@ class GoParsingKeyword(Enum):
     STOP_BLOCK_COMMENT = "*/"
 
 
+class GoPackageIndex:
+    """An index of the go files and packages (directories) of an analysis that is built once after all file results exist.
+    Imports are resolved by looking up their suffixes, instead of checking every scanned file and every directory for every import.
+    The func/struct symbols of every file result are extracted once and compiled into a single pattern that finds any of them in a source.
+    """
+
+    def __init__(self, analysis, results: Dict[str, AbstractFileResult], func_grammar: Pattern, struct_grammar: Pattern):
+        self._results = results
+        self._func_grammar = func_grammar
+        self._struct_grammar = struct_grammar
+
+        # scanned go files addressed by their name without extension
+        self._scanned_files: Dict[str, str] = {}
+        for scanned_file_name in analysis.absolute_scanned_file_names:
+            scanned_file_name_without_extension = scanned_file_name.replace('.go', '')
+            self._scanned_files[scanned_file_name_without_extension] = f'{scanned_file_name_without_extension}.go'
+        self._scanned_file_name_lengths = sorted({len(k) for k in self._scanned_files}, reverse=True)
+
+        # directories in the order of the filesystem graph, every directory is a package candidate
+        filesystem_graph = analysis.graph_representations[GraphType.FILESYSTEM_GRAPH.name.lower()]
+        self._directory_positions: Dict[str, int] = {}
+        for node_name, filesystem_node in filesystem_graph.digraph.nodes.items():
+            if filesystem_node['directory'] is not False:
+                self._directory_positions[node_name] = len(self._directory_positions)
+        self._directory_name_lengths = sorted({len(k) for k in self._directory_positions})
+        self._files_in_directories: Dict[str, List[str]] = analysis.scanned_files_nodes_in_directories
+
+        self._symbol_patterns: Dict[str, Optional[Pattern]] = {}
+
+    def scanned_file(self, dependency: str) -> Optional[str]:
+        """Returns the longest scanned file name (with a .go extension) whose name without extension is a suffix of the dependency."""
+        for length in self._scanned_file_name_lengths:
+            if length <= len(dependency):
+                scanned_file_name = self._scanned_files.get(dependency[len(dependency) - length:])
+                if scanned_file_name is not None:
+                    return scanned_file_name
+        return None
+
+    def package_results(self, dependency: str) -> List[AbstractFileResult]:
+        """Returns the file results of all directories that are a suffix of the dependency, in the order of the filesystem graph."""
+        directories = []
+        for length in self._directory_name_lengths:
+            if length <= len(dependency):
+                directory = dependency[len(dependency) - length:]
+                if directory in self._directory_positions:
+                    directories.append(directory)
+
+        package_results = []
+        for directory in sorted(directories, key=self._directory_positions.__getitem__):
+            for unique_name in self._files_in_directories.get(directory, []):
+                if unique_name in self._results:
+                    package_results.append(self._results[unique_name])
+        return package_results
+
+    def uses_symbols_of(self, source: str, package_result: AbstractFileResult) -> bool:
+        """Checks if any func or struct name that is declared by a file result of a package is contained in a source."""
+        if package_result.unique_name not in self._symbol_patterns:
+            symbols = {x for x in self._func_grammar.findall(package_result.preprocessed_source) if x}
+            symbols.update(x for x in self._struct_grammar.findall(package_result.preprocessed_source) if x)
+            self._symbol_patterns[package_result.unique_name] = re.compile('|'.join(map(re.escape, sorted(symbols)))) if symbols else None
+
+        symbol_pattern = self._symbol_patterns[package_result.unique_name]
+        return symbol_pattern is not None and symbol_pattern.search(source) is not None
+
+
 class GoParser(AbstractParser, ParsingMixin):
 
     def __init__(self):
-        self._results: Dict[str, AbstractFileResult] = {}
+        self._results: ResultStore = ResultStore()
         self._token_mappings: Dict[str, str] = {
             ':': ' : ',
             ';': ' ; ',
@@ -55,7 +121,10 @@ class GoParser(AbstractParser, ParsingMixin):
             '&': ' & ',
             '...': ' ... ',
         }
-        self.dependencies_grammar = self.create_golang_dependencies_grammar()
+        self._lexer: Lexer = Lexer.for_mapping(self._token_mappings)
+        self._grammars: GrammarRegistry = GrammarRegistry(self.language_type())
+        # every go import starts with the import keyword, so the grammar is only tried there instead of at every position of a source
+        self._grammars.register('import', self.create_golang_dependencies_grammar(), anchor=GoParsingKeyword.IMPORT.value)
         self.compiled_func_grammar = self.compile_golang_func_grammar_with_re()
         self.compiled_struct_grammar = self.compile_golang_struct_grammar_with_re()
 
@@ -68,7 +137,7 @@ class GoParser(AbstractParser, ParsingMixin):
         return LanguageType.GO.name
 
     @property
-    def results(self) -> Dict[str, Any]:
+    def results(self) -> ResultStore:
         return self._results
 
     @results.setter
@@ -76,19 +145,18 @@ class GoParser(AbstractParser, ParsingMixin):
         self._results = value
 
     def preprocess_golang_source(self, scanned_tokens) -> str:
-        source_string_no_comments = self._filter_source_tokens_without_comments(
-            scanned_tokens,
+        filtered_list_no_comments = TokenStream(scanned_tokens).tokens_without_comments(
             GoParsingKeyword.INLINE_COMMENT.value,
             GoParsingKeyword.START_BLOCK_COMMENT.value,
-            GoParsingKeyword.STOP_BLOCK_COMMENT.value
+            GoParsingKeyword.STOP_BLOCK_COMMENT.value,
+            self._lexer
         )
-        filtered_list_no_comments = self.preprocess_file_content_and_generate_token_list_by_mapping(source_string_no_comments, self._token_mappings)
         preprocessed_source_string = " ".join(filtered_list_no_comments)
         return preprocessed_source_string
 
     def generate_file_result_from_analysis(self, analysis, *, file_name: str, full_file_path: str, file_content: str) -> None:
         LOGGER.debug('generating file results...')
-        scanned_tokens = self.preprocess_file_content_and_generate_token_list_by_mapping(file_content, self._token_mappings)
+        scanned_tokens = self._lexer.tokenize(file_content)
 
         # make sure to create unique names by using the relative analysis path as a base for the result
         parent_analysis_source_path = f"{Path(analysis.source_directory).parent}/"
@@ -113,9 +181,11 @@ class GoParser(AbstractParser, ParsingMixin):
         self._results[file_result.unique_name] = file_result
 
     def after_generated_file_results(self, analysis) -> None:
+        package_index = GoPackageIndex(analysis, self._results, self.compiled_func_grammar, self.compiled_struct_grammar)
+
         file_result: AbstractFileResult
         for _, file_result in self._results.items():
-            self._add_imports_to_result(file_result, analysis)
+            self._add_imports_to_result(file_result, analysis, package_index)
 
     def generate_entity_results_from_analysis(self, analysis):
         raise NotImplementedError(f'currently not implemented in {self.parser_name()}')
@@ -123,10 +193,10 @@ class GoParser(AbstractParser, ParsingMixin):
     def create_unique_entity_name(self, entity: AbstractEntityResult) -> None:
         raise NotImplementedError(f'currently not implemented in {self.parser_name()}')
 
-    def parse_grammar(self, analysis, grammar, preprocessed_source_string: str) -> List[str]:
+    def parse_grammar(self, analysis, grammar_name: str, preprocessed_source_string: str) -> List[str]:
         try:
             # searchString: skim through the input looking for matches, instead of requiring a complete match of all the content in the input string
-            parsing_result = grammar.searchString(preprocessed_source_string)
+            parsing_result = self._grammars.search(grammar_name, preprocessed_source_string, analysis.statistics)
         except pp.ParseException as exception:
             analysis.statistics.increment(Statistics.Key.PARSING_MISSES)
             LOGGER.warning(f'warning: could not parse result: {exception}')
@@ -193,11 +263,10 @@ class GoParser(AbstractParser, ParsingMixin):
         # pylint: enable=invalid-name
         return grammar
 
-    def _add_imports_to_result(self, result: AbstractFileResult, analysis):
+    def _add_imports_to_result(self, result: AbstractFileResult, analysis, package_index: GoPackageIndex):
         LOGGER.debug(f'extracting imports from file result {result.scanned_file_name}...')
 
-        filesystem_graph = analysis.graph_representations[GraphType.FILESYSTEM_GRAPH.name.lower()]
-        extracted_dependencies = self.parse_grammar(analysis, self.dependencies_grammar, result.preprocessed_source)
+        extracted_dependencies = self.parse_grammar(analysis, 'import', result.preprocessed_source)
 
         for parsed_dependency in extracted_dependencies:
             analysis.statistics.increment(Statistics.Key.PARSING_HITS)
@@ -213,68 +282,29 @@ class GoParser(AbstractParser, ParsingMixin):
             else:
                 dependency_is_resolved = False
                 if '/' in dependency:
-                    
+
                     # we already have hashed all scanned dependency paths, if the new dependency was already
                     # scanned before and we can resolve it by checking if it fits at the end of the new dependency
-                    for scanned_dependency in analysis.absolute_scanned_file_names:
-                        check_for_scanned_dependency = scanned_dependency.replace('.go', '')
-                        if dependency.endswith(check_for_scanned_dependency):
-                            dependency = f'{check_for_scanned_dependency}.go'
-                            dependency_is_resolved = True
+                    scanned_file_name = package_index.scanned_file(dependency)
+                    if scanned_file_name is not None:
+                        dependency = scanned_file_name
+                        dependency_is_resolved = True
 
                     # otherwise we have to try resolving a package dependency based on our constructed file graph
                     # where a package may use symbols from all golang source files only in the imported target directory
                     # the approach here is: check if any important symbols (e.g. methods, structs) from each source file
                     # in the given directory is used in the new dependency. if so, add to its imported dependencies.
                     if dependency_is_resolved is False:
-                        some_nodes = filesystem_graph.digraph.nodes
-
-                        for node_name, filesystem_node in some_nodes.items():
-                            if filesystem_node['directory'] is False:
-                                continue
-
-                            if dependency.endswith(node_name):
-
-                                file_nodes_from_dir_node = []
-                                if node_name in analysis.scanned_files_nodes_in_directories:
-                                    file_nodes_from_dir_node = analysis.scanned_files_nodes_in_directories[node_name]
-                                
-                                # get all possible source files that might be an import candidate
-                                potential_imported_results = []
-                                for filesystem_result in file_nodes_from_dir_node:
-                                    results: Dict[str, AbstractFileResult] = {k: v for (k, v) in self._results.items() if v.unique_name == filesystem_result}
-                                    if bool(results):
-                                        potential_imported_result = results[list(results.keys())[0]]
-                                        potential_imported_results.append(potential_imported_result)
-   
-                                for potential_imported_result in potential_imported_results:
-                                    
-                                    preprocessed_golang_source = potential_imported_result.preprocessed_source
-                                    
-                                    # now we get all possible function and struct names
-                                    funcs = self.compiled_func_grammar.findall(preprocessed_golang_source)
-                                    funcs = [x for x in funcs if x]
-
-                                    structs = self.compiled_struct_grammar.findall(preprocessed_golang_source)
-                                    structs = [x for x in structs if x]
-                                    all_tokens = structs + funcs
-                                    
-                                    # check if any of those tokes is contained in the source of the new dependency
-                                    should_add_dependency = False
-                                    for possibe_token in all_tokens:
-                                        if possibe_token in result.preprocessed_source:
-                                            should_add_dependency = True
-                                            break
-                                    
-                                    if should_add_dependency is True:
-                                        result.scanned_import_dependencies.append(potential_imported_result.unique_name)
-                                        LOGGER.debug(f'adding import: {potential_imported_result.unique_name}')
-                                        dependency_is_resolved = True
+                        for potential_imported_result in package_index.package_results(dependency):
+                            if package_index.uses_symbols_of(result.preprocessed_source, potential_imported_result):
+                                result.scanned_import_dependencies.append(potential_imported_result.unique_name)
+                                LOGGER.debug(f'adding import: {potential_imported_result.unique_name}')
+                                dependency_is_resolved = True
 
                         if dependency_is_resolved is False:
                             result.scanned_import_dependencies.append(dependency)
                             LOGGER.debug(f'adding import: {dependency}')
-                            
+
                     else:
                         result.scanned_import_dependencies.append(dependency)
                         LOGGER.debug(f'adding import: {dependency}')
@@ -283,7 +313,6 @@ class GoParser(AbstractParser, ParsingMixin):
                     result.scanned_import_dependencies.append(dependency)
                     LOGGER.debug(f'adding import: {dependency}')
 
-    
     def _add_package_name_to_result(self, result: FileResult):
         result.module_name = ""
 
@@ -0,0 +1,58 @@
+"""
+Contains IgnoreRules, which compile the configured ignore lists for dependencies and entities into a single matcher.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+from typing import Dict, Iterable, List, Optional, Pattern, Union
+import re
+
+
+class IgnoreRules:
+    """Decides if a name (a dependency or an entity) is ignored, because it contains any of the ignored substrings or any of the ignored
+    regular expressions matches at its beginning. All substrings are compiled into one alternation and all regular expressions into one
+    combined expression, except for expressions with groups or global flags, which are kept separately to preserve their semantics.
+    Verdicts are memoized up to a maximum number of names.
+    """
+
+    DEFAULT_MAX_MEMOIZED_VERDICTS = 100_000
+
+    def __init__(self, ignored_substrings: Iterable[str], ignored_expressions: Iterable[Union[str, Pattern]], case_insensitive: bool = False,
+                 max_memoized_verdicts: int = DEFAULT_MAX_MEMOIZED_VERDICTS):
+        self._case_insensitive = case_insensitive
+        self._max_memoized_verdicts = max_memoized_verdicts
+        self._verdicts: Dict[str, bool] = {}
+
+        substrings = {substring.lower() if case_insensitive else substring for substring in ignored_substrings}
+        self._substrings: Optional[Pattern] = re.compile('|'.join(re.escape(s) for s in sorted(substrings))) if substrings else None
+
+        combinable_expressions: List[str] = []
+        self._expressions: List[Pattern] = []
+        default_flags = re.compile('').flags
+        for expression in ignored_expressions:
+            compiled_expression = re.compile(expression)
+            if compiled_expression.groups == 0 and compiled_expression.flags == default_flags:
+                combinable_expressions.append(f'(?:{compiled_expression.pattern})')
+            else:
+                self._expressions.append(compiled_expression)
+        if combinable_expressions:
+            self._expressions.insert(0, re.compile('|'.join(combinable_expressions)))
+
+    def __bool__(self) -> bool:
+        return self._substrings is not None or bool(self._expressions)
+
+    def _is_ignored(self, name: str) -> bool:
+        if self._substrings is not None and self._substrings.search(name.lower() if self._case_insensitive else name):
+            return True
+        return any(expression.match(name) for expression in self._expressions)
+
+    def is_ignored(self, name: str) -> bool:
+        """Checks if a name is ignored by any of the rules."""
+        verdict = self._verdicts.get(name)
+        if verdict is None:
+            verdict = self._is_ignored(name)
+            if len(self._verdicts) >= self._max_memoized_verdicts:
+                del self._verdicts[next(iter(self._verdicts))]
+            self._verdicts[name] = verdict
+        return verdict
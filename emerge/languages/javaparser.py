@@ -13,9 +13,12 @@ from pathlib import Path
 import pyparsing as pp
 import coloredlogs
 
-from emerge.languages.abstractparser import AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType
+from emerge.languages.abstractparser import (AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType, TokenCursor, GrammarRegistry,
+                                             ImportExtractor)
+from emerge.languages.lexer import Lexer
+from emerge.languages.packageindex import PackageIndex
 from emerge.results import EntityResult, FileResult
-from emerge.abstractresult import AbstractResult, AbstractEntityResult
+from emerge.abstractresult import AbstractEntityResult, ResultStore
 from emerge.stats import Statistics
 from emerge.log import Logger
 
@@ -39,7 +42,7 @@ class JavaParsingKeyword(Enum):
 
 class JavaParser(AbstractParser, ParsingMixin):
     def __init__(self):
-        self._results: Dict[str, AbstractResult] = {}
+        self._results: ResultStore = ResultStore()
         self._token_mappings: Dict[str, str] = {
             ':': ' : ',
             ';': ' ; ',
@@ -56,6 +59,32 @@ class JavaParser(AbstractParser, ParsingMixin):
             '>': ' > ',
             '"': ' " ',
         }
+        self._lexer: Lexer = Lexer.for_mapping(self._token_mappings)
+        self._grammars: GrammarRegistry = GrammarRegistry(self.language_type())
+        self._register_grammars()
+
+    def _register_grammars(self) -> None:
+        entity_name = pp.Word(pp.alphanums)
+        self._grammars.register('entity', pp.Keyword(JavaParsingKeyword.CLASS.value) +
+            entity_name.setResultsName(CoreParsingKeyword.ENTITY_NAME.value) +
+            pp.Optional(pp.Keyword(JavaParsingKeyword.EXTENDS.value) +
+                        entity_name.setResultsName(CoreParsingKeyword.INHERITED_ENTITY_NAME.value)) +
+            pp.SkipTo(pp.FollowedBy(JavaParsingKeyword.OPEN_SCOPE.value)))
+
+        imported_entity_name = pp.Word(pp.alphanums + CoreParsingKeyword.DOT.value + CoreParsingKeyword.ASTERISK.value)
+        self._grammars.register('import', pp.Keyword(JavaParsingKeyword.IMPORT.value) +
+            imported_entity_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value) + pp.FollowedBy(CoreParsingKeyword.SEMICOLON.value))
+        # fast path for e.g. 'import com.example.Foo ;'
+        self._grammars.register_pattern('import', r'(?<!\S)import (?P<import_entity_name>[A-Za-z0-9.*]+) ;')
+
+        package_name = pp.Word(pp.alphanums + CoreParsingKeyword.DOT.value)
+        self._grammars.register('package', pp.Keyword(JavaParsingKeyword.PACKAGE.value) +
+            package_name.setResultsName(JavaParsingKeyword.PACKAGE_NAME.value) + pp.FollowedBy(CoreParsingKeyword.SEMICOLON.value))
+
+        self._grammars.register('inheritance', pp.Keyword(JavaParsingKeyword.CLASS.value) +
+            entity_name.setResultsName(CoreParsingKeyword.ENTITY_NAME.value) +
+            pp.Optional(pp.Keyword(JavaParsingKeyword.EXTENDS.value) + entity_name.setResultsName(CoreParsingKeyword.INHERITED_ENTITY_NAME.value)) +
+            pp.SkipTo(pp.FollowedBy(JavaParsingKeyword.OPEN_SCOPE.value)))
 
     @classmethod
     def parser_name(cls) -> str:
@@ -66,7 +95,7 @@ class JavaParser(AbstractParser, ParsingMixin):
         return LanguageType.JAVA.name
 
     @property
-    def results(self) -> Dict[str, AbstractResult]:
+    def results(self) -> ResultStore:
         return self._results
 
     @results.setter
@@ -75,7 +104,7 @@ class JavaParser(AbstractParser, ParsingMixin):
 
     def generate_file_result_from_analysis(self, analysis, *, file_name: str, full_file_path: str, file_content: str) -> None:
         LOGGER.debug('generating file results...')
-        scanned_tokens = self.preprocess_file_content_and_generate_token_list_by_mapping(file_content, self._token_mappings)
+        scanned_tokens = self._lexer.tokenize(file_content)
 
         # make sure to create unique names by using the relative analysis path as a base for the result
         parent_analysis_source_path = f"{Path(analysis.source_directory).parent}/"
@@ -101,25 +130,13 @@ class JavaParser(AbstractParser, ParsingMixin):
 
     def after_generated_file_results(self, analysis) -> None:
         # curate dependencies from the first scan java module format that actually exists, to match the real dependencies
-        filtered_results = {k: v for (k, v) in self.results.items() if v.analysis is analysis and isinstance(v, FileResult)}
+        filtered_results = self.results.file_results_of(analysis)
+
+        package_index = PackageIndex(filtered_results.keys(), '.java')
 
         result: FileResult
         for _, result in filtered_results.items():
-            curated_dependencies = []
-
-            for dependency in result.scanned_import_dependencies:
-                curated = False
-                haystack = dependency.replace(".", "/") + ".java"
-
-                for needle, v in filtered_results.items():
-                    if needle in haystack:
-                        curated = True
-                        curated_dependencies.append(needle)
-                        break
-                if not curated:
-                    curated_dependencies.append(dependency)
-
-            result.scanned_import_dependencies = curated_dependencies
+            result.scanned_import_dependencies = [package_index.resolve(dependency) or dependency for dependency in result.scanned_import_dependencies]
 
     def create_unique_entity_name(self, entity: AbstractEntityResult) -> None:
         if entity.module_name:
@@ -129,18 +146,13 @@ class JavaParser(AbstractParser, ParsingMixin):
 
     def generate_entity_results_from_analysis(self, analysis):
         LOGGER.debug('generating entity results...')
-        filtered_results = {k: v for (k, v) in self.results.items() if v.analysis is analysis and isinstance(v, FileResult)}
+        filtered_results = self.results.file_results_of(analysis)
 
         result: FileResult
         for _, result in filtered_results.items():
 
             entity_keywords: List[str] = [JavaParsingKeyword.CLASS.value]
-            entity_name = pp.Word(pp.alphanums)
-            match_expression = pp.Keyword(JavaParsingKeyword.CLASS.value) + \
-                entity_name.setResultsName(CoreParsingKeyword.ENTITY_NAME.value) + \
-                pp.Optional(pp.Keyword(JavaParsingKeyword.EXTENDS.value) +
-                            entity_name.setResultsName(CoreParsingKeyword.INHERITED_ENTITY_NAME.value)) + \
-                pp.SkipTo(pp.FollowedBy(JavaParsingKeyword.OPEN_SCOPE.value))
+            match_expression = self._grammars['entity']
 
             comment_keywords: Dict[str, str] = {
                 CoreParsingKeyword.LINE_COMMENT.value: JavaParsingKeyword.INLINE_COMMENT.value,
@@ -148,7 +160,7 @@ class JavaParser(AbstractParser, ParsingMixin):
                 CoreParsingKeyword.STOP_BLOCK_COMMENT.value: JavaParsingKeyword.STOP_BLOCK_COMMENT.value
             }
 
-            entity_results = result.generate_entity_results_from_scopes(entity_keywords, match_expression, comment_keywords)
+            entity_results = result.generate_entity_results_from_scopes(entity_keywords, match_expression, comment_keywords, self._grammars)
 
             entity_results: List[EntityResult]
             for entity_result in entity_results:
@@ -167,31 +179,22 @@ class JavaParser(AbstractParser, ParsingMixin):
 
     def _add_imports_to_result(self, result: FileResult, analysis):
         LOGGER.debug('extracting imports from file result {result.scanned_file_name}...')
-        list_of_words_with_newline_strings = result.scanned_tokens
-
-        source_string_no_comments = self._filter_source_tokens_without_comments(
-            list_of_words_with_newline_strings,
+        filtered_list_no_comments = result.token_stream.tokens_without_comments(
             JavaParsingKeyword.INLINE_COMMENT.value,
             JavaParsingKeyword.START_BLOCK_COMMENT.value,
             JavaParsingKeyword.STOP_BLOCK_COMMENT.value
         )
 
-        filtered_list_no_comments = self.preprocess_file_content_and_generate_token_list(source_string_no_comments)
-
-        for _, obj, following in self._gen_word_read_ahead(filtered_list_no_comments):
+        fast_path = analysis.import_extractor is ImportExtractor.REGEX
+        token_cursor = TokenCursor(filtered_list_no_comments)
+        for index, obj in token_cursor:
             if obj == JavaParsingKeyword.IMPORT.value:
-                read_ahead_string = self.create_read_ahead_string(obj, following)
-
-                imported_entity_name = pp.Word(pp.alphanums + CoreParsingKeyword.DOT.value + CoreParsingKeyword.ASTERISK.value)
-                expression_to_match = pp.Keyword(JavaParsingKeyword.IMPORT.value) + \
-                    imported_entity_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value) + pp.FollowedBy(CoreParsingKeyword.SEMICOLON.value)
-
                 try:
-                    parsing_result = expression_to_match.parseString(read_ahead_string)
+                    parsing_result = self._grammars.parse('import', token_cursor, index, analysis.statistics, fast_path)
                 except pp.ParseException as exception:
                     result.analysis.statistics.increment(Statistics.Key.PARSING_MISSES)
                     LOGGER.warning(f'warning: could not parse result {result=}\n{exception}')
-                    LOGGER.warning(f'next tokens: {[obj] + following[:ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value]}')
+                    LOGGER.warning(f'next tokens: {token_cursor.read_ahead(index, ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value)}')
                     continue
 
                 analysis.statistics.increment(Statistics.Key.PARSING_HITS)
@@ -208,20 +211,15 @@ class JavaParser(AbstractParser, ParsingMixin):
     def _add_package_name_to_result(self, result: FileResult):
         LOGGER.debug(f'extracting package name from base result {result.scanned_file_name}...')
         list_of_words = result.scanned_tokens
-        for _, obj, following in self._gen_word_read_ahead(list_of_words):
+        token_cursor = TokenCursor(list_of_words)
+        for index, obj in token_cursor:
             if obj == JavaParsingKeyword.PACKAGE.value:
-                read_ahead_string = self.create_read_ahead_string(obj, following)
-
-                package_name = pp.Word(pp.alphanums + CoreParsingKeyword.DOT.value)
-                expression_to_match = pp.Keyword(JavaParsingKeyword.PACKAGE.value) + package_name.setResultsName(JavaParsingKeyword.PACKAGE_NAME.value) + \
-                    pp.FollowedBy(CoreParsingKeyword.SEMICOLON.value)
-
                 try:
-                    parsing_result = expression_to_match.parseString(read_ahead_string)
+                    parsing_result = self._grammars.parse('package', token_cursor, index, result.analysis.statistics)
                 except pp.ParseException as exception:
                     result.analysis.statistics.increment(Statistics.Key.PARSING_MISSES)
                     LOGGER.warning(f'warning: could not parse result {result=}\n{exception}')
-                    LOGGER.warning(f'next tokens: {obj} {following[:10]}')
+                    LOGGER.warning(f'next tokens: {token_cursor.read_ahead(index, ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value)}')
                     continue
 
                 result.module_name = parsing_result.package_name
@@ -232,25 +230,19 @@ class JavaParser(AbstractParser, ParsingMixin):
     def _add_inheritance_to_entity_result(self, result: AbstractEntityResult):
         LOGGER.debug(f'extracting inheritance from entity result {result.entity_name}...')
         list_of_words = result.scanned_tokens
-        for _, obj, following in self._gen_word_read_ahead(list_of_words):
+        token_cursor = TokenCursor(list_of_words)
+        for index, obj in token_cursor:
             if obj == JavaParsingKeyword.CLASS.value:
-                read_ahead_string = self.create_read_ahead_string(obj, following)
-
-                entity_name = pp.Word(pp.alphanums)
-                expression_to_match = pp.Keyword(JavaParsingKeyword.CLASS.value) + entity_name.setResultsName(CoreParsingKeyword.ENTITY_NAME.value) + \
-                    pp.Optional(pp.Keyword(JavaParsingKeyword.EXTENDS.value) + entity_name.setResultsName(CoreParsingKeyword.INHERITED_ENTITY_NAME.value)) + \
-                    pp.SkipTo(pp.FollowedBy(JavaParsingKeyword.OPEN_SCOPE.value))
-
                 try:
-                    parsing_result = expression_to_match.parseString(read_ahead_string)
+                    parsing_result = self._grammars.parse('inheritance', token_cursor, index, result.analysis.statistics)
                 except pp.ParseException as exception:
                     result.analysis.statistics.increment(Statistics.Key.PARSING_MISSES)
                     LOGGER.warning(f'warning: could not parse result {result=}\n{exception}')
-                    LOGGER.warning(f'next tokens: {obj} {following[:10]}')
+                    LOGGER.warning(f'next tokens: {token_cursor.read_ahead(index, ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value)}')
                     continue
 
                 if len(parsing_result) > 0:
-                    parsing_result = expression_to_match.parseString(read_ahead_string)
+                    parsing_result = self._grammars.parse('inheritance', token_cursor, index, result.analysis.statistics)
 
                     if getattr(parsing_result, CoreParsingKeyword.INHERITED_ENTITY_NAME.value) is not None and \
                     bool(getattr(parsing_result, CoreParsingKeyword.INHERITED_ENTITY_NAME.value)):
@@ -5,18 +5,19 @@ Contains the implementation of the JavaScript language parser and a relevant key
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import Dict
+from typing import Dict, List
 from enum import Enum, unique
 import logging
 from pathlib import Path
-import os
 
 import pyparsing as pp
 import coloredlogs
 
-from emerge.languages.abstractparser import AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType
+from emerge.languages.abstractparser import (AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType, TokenCursor, GrammarRegistry,
+                                             ImportExtractor)
+from emerge.languages.lexer import Lexer
 from emerge.results import FileResult
-from emerge.abstractresult import AbstractResult, AbstractFileResult, AbstractEntityResult
+from emerge.abstractresult import AbstractResult, AbstractFileResult, AbstractEntityResult, ResultStore
 from emerge.stats import Statistics
 from emerge.log import Logger
 
@@ -40,7 +41,7 @@ class JavaScriptParsingKeyword(Enum):
 class JavaScriptParser(AbstractParser, ParsingMixin):
 
     def __init__(self):
-        self._results: Dict[str, AbstractResult] = {}
+        self._results: ResultStore = ResultStore()
         self._token_mappings: Dict[str, str] = {
             ':': ' : ',
             ';': ' ; ',
@@ -58,6 +59,25 @@ class JavaScriptParser(AbstractParser, ParsingMixin):
             '"': ' " ',
             "'": " ' "
         }
+        self._lexer: Lexer = Lexer.for_mapping(self._token_mappings)
+        self._grammars: GrammarRegistry = GrammarRegistry(self.language_type())
+        self._register_grammars()
+
+    def _register_grammars(self) -> None:
+        valid_name = pp.Word(pp.alphanums + CoreParsingKeyword.AT.value + CoreParsingKeyword.DOT.value + CoreParsingKeyword.ASTERISK.value +
+                             CoreParsingKeyword.UNDERSCORE.value + CoreParsingKeyword.DASH.value + CoreParsingKeyword.SLASH.value)
+        quote = pp.Suppress(pp.Literal(CoreParsingKeyword.SINGLE_QUOTE.value)) | pp.Suppress(pp.Literal(CoreParsingKeyword.DOUBLE_QUOTE.value))
+
+        self._grammars.register('import', pp.SkipTo(pp.Literal(JavaScriptParsingKeyword.FROM.value)) + pp.Literal(JavaScriptParsingKeyword.FROM.value) +
+            pp.OneOrMore(quote) + pp.FollowedBy(pp.OneOrMore(valid_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value))))
+        # fast path for e.g. "import { Foo } from ' ./foo '", only if 'from' is found on the same line
+        self._grammars.register_pattern('import', r'''(?<!\S)import (?:(?!from)[^\n])*from (?:['"] )+(?P<import_entity_name>[A-Za-z0-9@.*_/-]+)(?= ['"])''')
+
+        self._grammars.register('require', pp.SkipTo(pp.Literal(CoreParsingKeyword.OPENING_ROUND_BRACKET.value)) +
+            pp.Literal(CoreParsingKeyword.OPENING_ROUND_BRACKET.value) +
+            pp.OneOrMore(quote) + pp.FollowedBy(pp.OneOrMore(valid_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value))))
+        # fast path for e.g. "const foo = require ( ' ./foo ' )", only if the bracket is found on the same line
+        self._grammars.register_pattern('require', r'''(?<!\S)require [^(\n]*\( (?:['"] )+(?P<import_entity_name>[A-Za-z0-9@.*_/-]+)(?= ['"])''')
 
     @classmethod
     def parser_name(cls) -> str:
@@ -68,7 +88,7 @@ class JavaScriptParser(AbstractParser, ParsingMixin):
         return LanguageType.JAVASCRIPT.name
 
     @property
-    def results(self) -> Dict[str, AbstractResult]:
+    def results(self) -> ResultStore:
         return self._results
 
     @results.setter
@@ -113,65 +133,49 @@ class JavaScriptParser(AbstractParser, ParsingMixin):
         LOGGER.debug(f'extracting imports from base result {result.scanned_file_name}...')
 
         # prepare list of tokens
-        list_of_words_with_newline_strings = result.scanned_tokens
-        
-        source_string_no_comments = self._filter_source_tokens_without_comments(
-            list_of_words_with_newline_strings,
+        filtered_list_no_comments = result.token_stream.tokens_without_comments(
             JavaScriptParsingKeyword.INLINE_COMMENT.value,
             JavaScriptParsingKeyword.START_BLOCK_COMMENT.value,
-            JavaScriptParsingKeyword.STOP_BLOCK_COMMENT.value
+            JavaScriptParsingKeyword.STOP_BLOCK_COMMENT.value,
+            self._lexer
         )
 
-        filtered_list_no_comments = self.preprocess_file_content_and_generate_token_list_by_mapping(source_string_no_comments, self._token_mappings)
-
-        for _, obj, following in self._gen_word_read_ahead(filtered_list_no_comments):
+        fast_path = analysis.import_extractor is ImportExtractor.REGEX
+        token_cursor = TokenCursor(filtered_list_no_comments)
+        import_dependencies: List[str] = []
+        for index, obj in token_cursor:
             if obj != JavaScriptParsingKeyword.IMPORT.value and obj != JavaScriptParsingKeyword.REQUIRE.value:
                 continue
 
-            read_ahead_string = self.create_read_ahead_string(obj, following)
-
-            # create parsing expression
-            valid_name = pp.Word(pp.alphanums + CoreParsingKeyword.AT.value + CoreParsingKeyword.DOT.value + CoreParsingKeyword.ASTERISK.value +
-                                 CoreParsingKeyword.UNDERSCORE.value + CoreParsingKeyword.DASH.value + CoreParsingKeyword.SLASH.value)
-
-            if obj == JavaScriptParsingKeyword.IMPORT.value:
-                expression_to_match = pp.SkipTo(pp.Literal(JavaScriptParsingKeyword.FROM.value)) + pp.Literal(JavaScriptParsingKeyword.FROM.value) + \
-                    pp.OneOrMore(pp.Suppress(pp.Literal(CoreParsingKeyword.SINGLE_QUOTE.value)) | \
-                         pp.Suppress(pp.Literal(CoreParsingKeyword.DOUBLE_QUOTE.value))) + \
-                    pp.FollowedBy(pp.OneOrMore(valid_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value)))
-            elif obj == JavaScriptParsingKeyword.REQUIRE.value:
-                expression_to_match = pp.SkipTo(pp.Literal(CoreParsingKeyword.OPENING_ROUND_BRACKET.value)) + \
-                    pp.Literal(CoreParsingKeyword.OPENING_ROUND_BRACKET.value) + \
-                    pp.OneOrMore(pp.Suppress(pp.Literal(CoreParsingKeyword.SINGLE_QUOTE.value)) | \
-                         pp.Suppress(pp.Literal(CoreParsingKeyword.DOUBLE_QUOTE.value))) + \
-                    pp.FollowedBy(pp.OneOrMore(valid_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value)))
+            # the parsing expression depends on whether an import or a require was found
+            grammar_name = 'import' if obj == JavaScriptParsingKeyword.IMPORT.value else 'require'
 
             try:
                 # parse the dependency based on the expression
-                parsing_result = expression_to_match.parseString(read_ahead_string)
+                parsing_result = self._grammars.parse(grammar_name, token_cursor, index, analysis.statistics, fast_path)
             except pp.ParseException as exception:
                 result.analysis.statistics.increment(Statistics.Key.PARSING_MISSES)
                 LOGGER.warning(f'warning: could not parse result {result=}\n{exception}')
-                LOGGER.warning(f'next tokens: {[obj] + following[:ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value]}')
+                LOGGER.warning(f'next tokens: {token_cursor.read_ahead(index, ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value)}')
                 continue
 
             analysis.statistics.increment(Statistics.Key.PARSING_HITS)
 
-            # now try to resolve/adjust the dependency to have a unique path
-            dependency = getattr(parsing_result, CoreParsingKeyword.IMPORT_ENTITY_NAME.value)
-            resolved_dependency = self.try_resolve_dependency(dependency, result, analysis)
+            import_dependencies.append(getattr(parsing_result, CoreParsingKeyword.IMPORT_ENTITY_NAME.value))
 
-            # ignore any dependency substring from the config ignore list
-            if self._is_dependency_in_ignore_list(resolved_dependency, analysis):
-                LOGGER.debug(f'ignoring dependency from {result.unique_name} to {resolved_dependency}')
-            else:
-                result.scanned_import_dependencies.append(resolved_dependency)
-                LOGGER.debug(f'adding import: {resolved_dependency} to {result.unique_name}')
+        # now try to resolve/adjust the dependencies to have a unique path
+        self.add_import_dependencies(result, import_dependencies, analysis)
 
     def try_resolve_dependency(self, dependency: str, result: AbstractFileResult, analysis) -> str:
+        return analysis.module_resolver().memoize(self.parser_name(), str(result.absolute_dir_path), dependency,
+                                                  lambda: self._resolve_dependency(dependency, result, analysis))
+
+    def _resolve_dependency(self, dependency: str, result: AbstractFileResult, analysis) -> str:
+        module_resolver = analysis.module_resolver()
+
         # check if there are any configured dependency substrings to be replaced directly, e.g. '@scope/sub/path' -> src/sub/path
         if analysis.import_aliases_available:
-            renamed_dependency = self.replace_substring_if_any_mapping_key_in_string_exists(dependency, analysis.import_aliases)
+            renamed_dependency = module_resolver.replace_import_alias(dependency)
             if renamed_dependency != dependency:
                 LOGGER.info(f'renamed dependency: {dependency} -> {renamed_dependency}')
                 dependency = renamed_dependency
@@ -186,10 +190,10 @@ class JavaScriptParser(AbstractParser, ParsingMixin):
                 check_package_subpath_import = f"{analysis.source_directory}/{subpath}.js"
 
                 # check if there is a package index .ts file
-                if os.path.exists(check_package_index_export):
+                if module_resolver.exists(check_package_index_export):
                     dependency = self.create_relative_analysis_file_path(analysis.source_directory, check_package_index_export)
                 # check if the subpath exists as a .ts file
-                if os.path.exists(check_package_subpath_import):
+                if module_resolver.exists(check_package_subpath_import):
                     dependency = self.create_relative_analysis_file_path(analysis.source_directory, check_package_subpath_import)
 
             # pylint: disable=unnecessary-pass
@@ -198,9 +202,9 @@ class JavaScriptParser(AbstractParser, ParsingMixin):
         # check for index.js imports (https://nodejs.org/api/modules.html#modules_all_together)
         elif dependency == CoreParsingKeyword.DOT.value:
             index_dependency = dependency.replace(CoreParsingKeyword.DOT.value, './index.js')
-            index_dependency = self.resolve_relative_dependency_path(index_dependency, str(result.absolute_dir_path), analysis.source_directory)
+            index_dependency = module_resolver.resolve_relative_path(index_dependency, str(result.absolute_dir_path))
             check_dependency_path = f"{ Path(analysis.source_directory).parent}/{index_dependency}"
-            if os.path.exists(check_dependency_path):  # check if the resolved index_dependency exists, then modify
+            if module_resolver.exists(check_dependency_path):  # check if the resolved index_dependency exists, then modify
                 dependency = f"{index_dependency}"
 
         elif dependency.count(CoreParsingKeyword.POSIX_CURRENT_DIRECTORY.value) == 1 and \
@@ -211,16 +215,16 @@ class JavaScriptParser(AbstractParser, ParsingMixin):
             dependency = self.create_relative_analysis_path_for_dependency(dependency, str(result.relative_analysis_path))
 
         elif JavaScriptParsingKeyword.PARENT_DIRECTORY.value in dependency:  # contains at least one relative parent element '../
-            dependency = self.resolve_relative_dependency_path(dependency, str(result.absolute_dir_path), analysis.source_directory)
+            dependency = module_resolver.resolve_relative_path(dependency, str(result.absolute_dir_path))
 
         # check and verify if we need to add a remaining .js suffix
         check_dependency_path = f"{ Path(analysis.source_directory).parent}/{dependency}.js"
-        if Path(dependency).suffix != ".js" and os.path.exists(check_dependency_path):
+        if Path(dependency).suffix != ".js" and module_resolver.exists(check_dependency_path):
             dependency = f"{dependency}.js"
 
         # check if the dependency maybe results from an index.js import
         check_dependency_path_for_index_file = f"{ Path(analysis.source_directory).parent}/{dependency}/index.js"
-        if os.path.exists(check_dependency_path_for_index_file):
+        if module_resolver.exists(check_dependency_path_for_index_file):
             dependency = f"{dependency}/index.js"
 
         return dependency
@@ -0,0 +1,307 @@
+"""
+Contains a compiled single pass lexer, a token stream that is shared by parsers and code metrics, a token view and an inverted token index.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple
+from collections.abc import Sequence as SequenceABC
+from enum import IntFlag
+import bisect
+import re
+import sys
+
+# every character of this mapping is separated into a token of its own, this is the default tokenization of all parsers
+DEFAULT_TOKEN_MAPPING: Dict[str, str] = {
+    ':': ' : ',
+    ';': ' ; ',
+    '{': ' { ',
+    '}': ' } ',
+    '(': ' ( ',
+    ')': ' ) ',
+    '[': ' [ ',
+    ']': ' ] ',
+    '?': ' ? ',
+    '!': ' ! ',
+    ',': ' , ',
+    '<': ' < ',
+    '>': ' > ',
+}
+
+NEWLINE_TOKEN = '\n'
+
+
+def intern_tokens(tokens: List[str]) -> List[str]:
+    """Interns all tokens of a list in place, so that equal tokens of all results share a single string object. Returns the list."""
+    tokens[:] = map(sys.intern, tokens)
+    return tokens
+
+
+class Lexer:
+    """Splits a source string into a token list in a single pass of one compiled regular expression.
+    A token mapping maps a string to the same string surrounded by spaces (e.g. '{': ' { '), so that every occurrence becomes a token of its own.
+    The result is exactly the same as applying all replacements of the mapping one after another and finding all non-whitespace/newline tokens
+    afterwards. Mappings that can not be expressed like this (e.g. overlapping keys) fall back to this sequential replacement.
+    """
+
+    _lexers: Dict[Tuple[Tuple[str, str], ...], 'Lexer'] = {}
+
+    def __init__(self, token_mapping: Dict[str, str]):
+        self.token_mapping: Dict[str, str] = dict(token_mapping)
+        self.key: Tuple[Tuple[str, str], ...] = tuple(self.token_mapping.items())
+        self._pattern: Optional[Pattern] = Lexer._compile(self.token_mapping)
+
+    @classmethod
+    def for_mapping(cls, token_mapping: Dict[str, str]) -> 'Lexer':
+        """Returns a compiled lexer for the given token mapping, lexers are only compiled once per mapping."""
+        key = tuple(token_mapping.items())
+        if key not in cls._lexers:
+            cls._lexers[key] = Lexer(token_mapping)
+        return cls._lexers[key]
+
+    @classmethod
+    def default(cls) -> 'Lexer':
+        return cls.for_mapping(DEFAULT_TOKEN_MAPPING)
+
+    @staticmethod
+    def _compile(token_mapping: Dict[str, str]) -> Optional[Pattern]:
+        separators = list(token_mapping.keys())
+        for separator, mapped in token_mapping.items():
+            if not separator or mapped != f' {separator} ' or any(c.isspace() for c in separator):
+                return None
+
+        single_characters = [s for s in separators if len(s) == 1]
+        multiple_characters = [s for s in separators if len(s) > 1]
+
+        # the order of replacements only does not matter as long as multi character separators do not share any character with other separators
+        for separator in multiple_characters:
+            other_characters = set(''.join(s for s in separators if s != separator))
+            if set(separator) & other_characters:
+                return None
+
+        character_class = ''.join(re.escape(c) for c in single_characters)
+        separator_alternatives = [re.escape(s) for s in multiple_characters]
+        if character_class:
+            separator_alternatives.append(f'[{character_class}]')
+
+        word = f'[^\\s{character_class}]'
+        if multiple_characters:
+            word = f'(?:(?!{"|".join(re.escape(s) for s in multiple_characters)}){word})'
+
+        if separator_alternatives:
+            return re.compile(f'{"|".join(separator_alternatives)}|{word}+|\\n')
+        return re.compile(r'\S+|\n')
+
+    def tokenize(self, source: str) -> List[str]:
+        """Returns all tokens of a source string, newlines are kept as separate tokens. All tokens are interned."""
+        if self._pattern is not None:
+            return intern_tokens(self._pattern.findall(source))
+
+        for origin, mapped in self.token_mapping.items():
+            source = source.replace(origin, mapped)
+        return intern_tokens(re.findall(r'\S+|\n', source))
+
+
+class LineMark(IntFlag):
+    """Marks that describe the comment state of a single source line."""
+    NONE = 0
+    LINE_COMMENT = 1  # the line starts with a line comment
+    START_BLOCK_COMMENT = 2  # the line contains the start of a block comment
+    STOP_BLOCK_COMMENT = 4  # the line contains the end of a block comment
+    BLANK = 8  # the line does not contain any token
+
+
+# plain integer flags for the hot loops, combining IntFlag members is comparably slow
+_LINE_COMMENT = int(LineMark.LINE_COMMENT)
+_START_BLOCK_COMMENT = int(LineMark.START_BLOCK_COMMENT)
+_STOP_BLOCK_COMMENT = int(LineMark.STOP_BLOCK_COMMENT)
+_BLANK = int(LineMark.BLANK)
+
+
+class TokenStream:
+    """A token stream over the scanned tokens of a result, in which source lines, line numbers and comment lines are derived only once and then
+    shared by everyone who consumes the tokens (e.g. parsers and code metrics). Lines are the tokens between newline tokens, exactly like the lines
+    of the joined tokens. All derived data is computed lazily and cached, the tokens themselves must not be modified afterwards.
+    """
+
+    def __init__(self, tokens: List[str]):
+        self.tokens: List[str] = tokens
+        self._source: Optional[str] = None
+        self._lines: Optional[List[str]] = None
+        self._newline_indices: Optional[List[int]] = None
+        self._line_marks: Dict[Tuple[str, str, str], List[int]] = {}
+        self._sources_without_comments: Dict[Tuple[str, str, str], str] = {}
+        self._tokens_without_comments: Dict[Tuple[Tuple[str, str, str], Tuple], List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    @property
+    def source(self) -> str:
+        """All tokens joined by a space."""
+        if self._source is None:
+            self._source = " ".join(self.tokens)
+        return self._source
+
+    @property
+    def lines(self) -> List[str]:
+        """All source lines, every line contains the space separated tokens between two newline tokens."""
+        if self._lines is None:
+            self._lines = self.source.splitlines()
+        return self._lines
+
+    def line_number(self, index: int) -> int:
+        """Returns the line number (starting at 1) of the token at the given index."""
+        if self._newline_indices is None:
+            self._newline_indices = [i for i, token in enumerate(self.tokens) if token == NEWLINE_TOKEN]
+        return bisect.bisect_left(self._newline_indices, index) + 1
+
+    def line_marks(self, line_comment: str, start_block_comment: str, stop_block_comment: str) -> List[int]:
+        """Returns the LineMark flags of every source line. Since lines only contain space separated tokens, a keyword is always found within one token."""
+        comment_keywords = (line_comment, start_block_comment, stop_block_comment)
+        if comment_keywords not in self._line_marks:
+            marks = []
+            for line in self.lines:
+                mark = 0
+                stripped_line = line.strip()
+                if not stripped_line:
+                    mark |= _BLANK
+                elif stripped_line.startswith(line_comment):
+                    mark |= _LINE_COMMENT
+                if start_block_comment in line:
+                    mark |= _START_BLOCK_COMMENT
+                if stop_block_comment in line:
+                    mark |= _STOP_BLOCK_COMMENT
+                marks.append(mark)
+            self._line_marks[comment_keywords] = marks
+        return self._line_marks[comment_keywords]
+
+    def source_without_comments(self, line_comment: str, start_block_comment: str, stop_block_comment: str) -> str:
+        """Returns all source lines that are not comments, joined by newlines. Any line containing a start block comment keyword opens a block comment
+        that lasts until a line that contains a stop block comment keyword, both lines are skipped.
+        """
+        comment_keywords = (line_comment, start_block_comment, stop_block_comment)
+        if comment_keywords not in self._sources_without_comments:
+            lines_without_comments = []
+            active_block_comment = False
+            for line, mark in zip(self.lines, self.line_marks(*comment_keywords)):
+                if mark & _START_BLOCK_COMMENT:
+                    active_block_comment = True
+                    continue
+                if mark & _STOP_BLOCK_COMMENT:
+                    active_block_comment = False
+                    continue
+                if mark & _LINE_COMMENT:
+                    continue
+
+                if not active_block_comment:
+                    lines_without_comments.append(line)
+
+            self._sources_without_comments[comment_keywords] = "\n".join(lines_without_comments)
+        return self._sources_without_comments[comment_keywords]
+
+    def tokens_without_comments(self, line_comment: str, start_block_comment: str, stop_block_comment: str, lexer: Optional[Lexer] = None) -> List[str]:
+        """Returns the tokens of all source lines that are not comments, tokenized by the given lexer (or the default lexer).
+        The returned list is shared between all consumers with the same comment keywords and lexer and must not be modified.
+        """
+        if lexer is None:
+            lexer = Lexer.default()
+        key = ((line_comment, start_block_comment, stop_block_comment), lexer.key)
+        if key not in self._tokens_without_comments:
+            source_without_comments = self.source_without_comments(line_comment, start_block_comment, stop_block_comment)
+            self._tokens_without_comments[key] = lexer.tokenize(source_without_comments)
+        return self._tokens_without_comments[key]
+
+    def count_source_lines(self, line_comment: str, start_block_comment: str, stop_block_comment: str) -> int:
+        """Counts all non-blank lines that are not comments. Other than in source_without_comments, a line that contains both a start and a stop
+        block comment keyword is a one line block comment.
+        """
+        source_lines = 0
+        active_block_comment = False
+        for mark in self.line_marks(line_comment, start_block_comment, stop_block_comment):
+            starts_block_comment = bool(mark & _START_BLOCK_COMMENT)
+            stops_block_comment = bool(mark & _STOP_BLOCK_COMMENT)
+
+            if starts_block_comment and not stops_block_comment:
+                active_block_comment = True
+                continue
+            if stops_block_comment and not starts_block_comment:
+                active_block_comment = False
+                continue
+            if starts_block_comment and stops_block_comment:
+                continue
+            if mark & _LINE_COMMENT:
+                continue
+
+            if not active_block_comment and not mark & _BLANK:
+                source_lines += 1
+
+        return source_lines
+
+    def clear(self) -> None:
+        """Drops all derived data, e.g. after all consumers are done with the tokens."""
+        self._source = None
+        self._lines = None
+        self._newline_indices = None
+        self._line_marks.clear()
+        self._sources_without_comments.clear()
+        self._tokens_without_comments.clear()
+
+
+class TokenView(SequenceABC):
+    """A read only view of the tokens [start, stop) of a token list, e.g. the tokens of an entity within the tokens of its file.
+    The tokens are not copied, the view behaves like (and compares equal to) the list of the tokens it covers. Contiguous slices of a view
+    are views as well, slices with a step are lists.
+    """
+
+    __slots__ = ('_tokens', '_start', '_stop')
+
+    def __init__(self, tokens: Sequence[str], start: int, stop: int):
+        self._tokens = tokens
+        self._start = start
+        self._stop = max(start, min(stop, len(tokens)))
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __iter__(self) -> Iterator[str]:
+        # index the covered tokens directly, islice() would step over all tokens before start
+        return map(self._tokens.__getitem__, range(self._start, self._stop))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return TokenView(self._tokens, self._start + start, self._start + stop)
+            return [self._tokens[self._start + i] for i in range(start, stop, step)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('token view index out of range')
+        return self._tokens[self._start + index]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (list, tuple, TokenView)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class TokenIndex:
+    """An inverted index from tokens to the names of the results whose tokens contain them, e.g. to find all files that mention an identifier
+    without scanning the tokens of every file for every identifier. Names are kept in the order in which they were added.
+    """
+
+    def __init__(self):
+        self._names_by_token: Dict[str, List[str]] = {}
+
+    def add(self, name: str, tokens: Iterable[str]) -> None:
+        for token in set(tokens):
+            self._names_by_token.setdefault(token, []).append(name)
+
+    def names_containing(self, token: str) -> List[str]:
+        """Returns the names of all results that contain the given token."""
+        return self._names_by_token.get(token, [])
@@ -0,0 +1,148 @@
+"""
+Contains the ModuleResolver, which resolves the dependencies of module based languages (TypeScript, JavaScript, Ruby) and the includes of
+C based languages (C, C++, Objective-C) without filesystem access.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, TypeVar
+from pathlib import Path
+import os
+import posixpath
+
+T = TypeVar('T')
+
+
+class ModuleResolver:
+    """Answers the existence checks of dependency resolution from the set of scanned files of an analysis, normalizes paths as pure strings
+    and memoizes resolved dependencies per parser, directory and dependency. Only scanned files exist for the resolver, so a dependency
+    is never resolved to a file that is excluded from the scan.
+    """
+
+    # key of the alias that ends at a node of the alias trie
+    _ALIAS_END = ''
+
+    def __init__(self, source_directory: str, scanned_file_names: Iterable[str], import_aliases: Dict[str, str],
+                 include_directories: Sequence[str] = ()):
+        self._source_directory = source_directory
+        self._source_directory_parent = str(Path(source_directory).parent)
+        self._working_directory = os.getcwd()
+
+        # scanned file names are relative to the parent of the analysis source directory
+        self._scanned_file_names: List[str] = sorted(scanned_file_names)
+        self._scanned_paths: Set[str] = {self._normalize(f'{self._source_directory_parent}/{name}') for name in self._scanned_file_names}
+        self._normalized_source_directory_parent = self._normalize(self._source_directory_parent)
+
+        # include directories are relative to the analysis source directory
+        self._include_directories = [self._normalize(f'{source_directory}/{include_directory}') for include_directory in include_directories]
+        self._scanned_file_names_by_basename: Optional[Dict[str, List[str]]] = None
+
+        # a character trie of all import aliases, where every alias ends with the position of the alias in the configuration
+        self._import_aliases = list(import_aliases.items())
+        self._alias_trie: Dict = {}
+        for position, (alias, _) in enumerate(self._import_aliases):
+            node = self._alias_trie
+            for character in alias:
+                node = node.setdefault(character, {})
+            node.setdefault(self._ALIAS_END, position)
+
+        self._resolved_dependencies: Dict[Tuple[str, str, str], Any] = {}
+
+    def _normalize(self, path: str) -> str:
+        if not path.startswith('/'):
+            path = f'{self._working_directory}/{path}'
+        return posixpath.normpath(path)
+
+    def exists(self, path: str) -> bool:
+        """Checks if a path (absolute or relative to the working directory) is a scanned file."""
+        return self._normalize(path) in self._scanned_paths
+
+    def resolve_relative_path(self, dependency: str, result_absolute_dir_path: str) -> str:
+        """Resolves a dependency relative to the directory of a result, see ParsingMixin.resolve_relative_dependency_path()."""
+        if not self._source_directory:
+            return dependency
+
+        resolved_path = self._normalize(f'{result_absolute_dir_path}/{dependency}')
+        project_scanning_path = self._source_directory if self._source_directory.endswith('/') else f'{self._source_directory}/'
+
+        # if the resolved path is still inside the project path, construct a dependency path that is only relative to the project_scanning_path
+        if project_scanning_path in resolved_path:
+            return resolved_path.replace(f'{self._source_directory_parent}/', '')
+        return dependency
+
+    def replace_import_alias(self, dependency: str) -> str:
+        """Replaces the first configured import alias (in the order of the configuration) that is contained in a dependency."""
+        first_position: Optional[int] = self._alias_trie.get(self._ALIAS_END)
+        for start in range(len(dependency)):
+            node = self._alias_trie
+            for character in dependency[start:]:
+                node = node.get(character)
+                if node is None:
+                    break
+                position = node.get(self._ALIAS_END)
+                if position is not None and (first_position is None or position < first_position):
+                    first_position = position
+
+        if first_position is None:
+            return dependency
+        alias, replacement = self._import_aliases[first_position]
+        return dependency.replace(alias, replacement)
+
+    def _scanned_file_name(self, normalized_path: str) -> Optional[str]:
+        """Returns the scanned file name (relative to the parent of the analysis source directory) of a normalized path, if it was scanned."""
+        if normalized_path not in self._scanned_paths:
+            return None
+        return posixpath.relpath(normalized_path, self._normalized_source_directory_parent)
+
+    def resolve_include(self, include: str, result_absolute_dir_path: str, result_relative_dir_path: str, quoted: bool = True) -> Optional[str]:
+        """Resolves an include to a scanned file name by searching
+        1. relative to the directory of the including result,
+        2. in all configured include directories (in their configured order),
+        3. only for quoted includes ("..."), in all scanned files whose path ends with the include.
+        If several scanned files end with the include, the one that shares the most leading directories with the including result wins,
+        then the one with the fewest directories, then the alphabetically first one. Returns None if the include can not be resolved.
+        Angle bracket includes (<...>) usually name system or library headers, e.g. <time.h>, which must not be resolved to a scanned file
+        that only happens to have the same name.
+        """
+        resolved_include = self.resolve_relative_path(include, result_absolute_dir_path)
+        if self.exists(f'{self._source_directory_parent}/{resolved_include}'):
+            return resolved_include
+
+        for include_directory in self._include_directories:
+            scanned_file_name = self._scanned_file_name(posixpath.normpath(f'{include_directory}/{include}'))
+            if scanned_file_name is not None:
+                return scanned_file_name
+
+        if not quoted or '..' in include.split('/'):
+            return None
+
+        if self._scanned_file_names_by_basename is None:
+            self._scanned_file_names_by_basename = {}
+            for scanned_file_name in self._scanned_file_names:
+                self._scanned_file_names_by_basename.setdefault(posixpath.basename(scanned_file_name), []).append(scanned_file_name)
+
+        normalized_include = posixpath.normpath(include)
+        candidates = [name for name in self._scanned_file_names_by_basename.get(posixpath.basename(normalized_include), [])
+                      if name.endswith(f'/{normalized_include}')]
+        if not candidates:
+            return None
+
+        result_directories = result_relative_dir_path.split('/')
+
+        def shared_leading_directories(candidate: str) -> int:
+            shared = 0
+            for result_directory, candidate_directory in zip(result_directories, candidate.split('/')[:-1]):
+                if result_directory != candidate_directory:
+                    break
+                shared += 1
+            return shared
+
+        return min(candidates, key=lambda c: (-shared_leading_directories(c), c.count('/'), c))
+
+    def memoize(self, parser_name: str, directory: str, dependency: str, resolve: Callable[[], T]) -> T:
+        """Returns the memoized resolved dependency of a parser for a directory, or resolves and memoizes it."""
+        key = (parser_name, directory, dependency)
+        if key not in self._resolved_dependencies:
+            self._resolved_dependencies[key] = resolve()
+        return self._resolved_dependencies[key]
@@ -0,0 +1,67 @@
+"""
+Contains the PackageIndex, which resolves the imports of JVM languages (Java, Kotlin, Groovy) to the file results of an analysis.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+from typing import Dict, Iterable, List, Optional
+
+
+class PackageIndex:
+    """Resolves imports like 'a.b.C' to the unique names (relative file paths) of file results, e.g. 'src/a/b/C.java'.
+    An import is resolved to the first file result (in the given order) whose unique name is contained in the import path 'a/b/C.java',
+    or with match_enclosing_paths also to the first one whose unique name contains the import path. Imports that are not resolved,
+    e.g. wildcard imports 'a.b.*', are kept as they are.
+
+    An import path contains no dot except the one of the file extension, so every matching unique name has the same file name component
+    as the import path (unless either of them contains no slash). Unique names are therefore grouped by all file name components that end
+    with the file extension and only the file results of one group are checked, instead of all file results for every import.
+    """
+
+    def __init__(self, unique_names: Iterable[str], file_extension: str, match_enclosing_paths: bool = False):
+        self._unique_names: List[str] = list(unique_names)
+        self._file_extension = file_extension
+        self._match_enclosing_paths = match_enclosing_paths
+
+        # positions of unique names grouped by file name components, e.g. 'C.java'
+        self._positions_by_file_name: Dict[str, List[int]] = {}
+        # positions of unique names that can not be grouped, they are checked for every import
+        self._ungrouped_positions: List[int] = []
+        self._resolved: Dict[str, Optional[str]] = {}
+
+        for position, unique_name in enumerate(self._unique_names):
+            if '/' not in unique_name or not unique_name.endswith(file_extension):
+                self._ungrouped_positions.append(position)
+                continue
+
+            for file_name in self._file_names(unique_name):
+                self._positions_by_file_name.setdefault(file_name, []).append(position)
+
+    def _file_names(self, unique_name: str) -> set:
+        """Returns all path components of a unique name that end with the file extension (usually only the last component)."""
+        file_names = set()
+        end = unique_name.find(self._file_extension)
+        while end != -1:
+            end += len(self._file_extension)
+            file_names.add(unique_name[unique_name.rfind('/', 0, end) + 1:end])
+            end = unique_name.find(self._file_extension, end - len(self._file_extension) + 1)
+        return file_names
+
+    def _matches(self, unique_name: str, import_path: str) -> bool:
+        return unique_name in import_path or (self._match_enclosing_paths and import_path in unique_name)
+
+    def resolve(self, dependency: str) -> Optional[str]:
+        """Returns the unique name of the file result that an import resolves to, or None if it can not be resolved."""
+        if dependency in self._resolved:
+            return self._resolved[dependency]
+
+        import_path = dependency.replace('.', '/') + self._file_extension
+        if '/' in import_path:
+            candidates = sorted(self._positions_by_file_name.get(import_path[import_path.rfind('/') + 1:], []) + self._ungrouped_positions)
+        else:
+            candidates = list(range(len(self._unique_names)))
+
+        resolved = next((self._unique_names[p] for p in candidates if self._matches(self._unique_names[p], import_path)), None)
+        self._resolved[dependency] = resolved
+        return resolved
@@ -5,13 +5,16 @@ Contains the implementation of the Python language parser and a relevant keyword
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import Dict, Set
+from typing import Dict, List, Optional, Set, Tuple
 from enum import Enum, unique
 
 import logging
 from pathlib import Path
+import ast
 import os
+import posixpath
 import sys
+import time
 
 import pkg_resources
 from pip._internal.operations.freeze import freeze
@@ -19,9 +22,11 @@ from pip._internal.operations.freeze import freeze
 import coloredlogs
 import pyparsing as pp
 
-from emerge.languages.abstractparser import AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType
-from emerge.results import FileResult
-from emerge.abstractresult import AbstractResult, AbstractFileResult, AbstractEntityResult
+from emerge.languages.abstractparser import (AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType, GrammarRegistry, ImportExtractor,
+                                             ParserBackend)
+from emerge.languages.lexer import Lexer
+from emerge.results import FileResult, EntityResult
+from emerge.abstractresult import AbstractFileResult, AbstractEntityResult, ResultStore
 from emerge.log import Logger
 from emerge.stats import Statistics
 
@@ -44,12 +49,24 @@ class PythonParsingKeyword(Enum):
     RELATIVE_FROM_CURRENT_DIR = "from . "
     RELATIVE_FROM_PARENT_DIR = "from .. "
     PY_FILE_EXTENSION = ".py"
+    PACKAGE_INIT_FILE = "__init__.py"
+
+
+class PythonClassDefinition:
+    """A class definition from a python syntax tree. Base classes and referenced names are qualified by the imports and classes of its module."""
+
+    def __init__(self, *, entity_name: str, first_line: int, last_line: int, bases: List[str], references: List[str]):
+        self.entity_name = entity_name
+        self.first_line = first_line
+        self.last_line = last_line
+        self.bases = bases
+        self.references = references
 
 
 class PythonParser(AbstractParser, ParsingMixin):
 
     def __init__(self):
-        self._results: Dict[str, AbstractResult] = {}
+        self._results: ResultStore = ResultStore()
         self._token_mappings: Dict[str, str] = {
             ':': ' : ',
             ';': ' ; ',
@@ -66,7 +83,53 @@ class PythonParser(AbstractParser, ParsingMixin):
             '>': ' > ',
             '"': ' " '
         }
+        self._lexer: Lexer = Lexer.for_mapping(self._token_mappings)
+        self._grammars: GrammarRegistry = GrammarRegistry(self.language_type())
+        self._register_grammars()
         self.global_dependency_autodetect_set: Set[str] = self.create_autodetect_set()
+        # the class definitions of every file result parsed into a syntax tree by this parser, by unique name together with the parsed result
+        self._class_definitions: Dict[str, Tuple[FileResult, List[PythonClassDefinition]]] = {}
+
+    def _register_grammars(self) -> None:
+        valid_name = pp.Word(
+            pp.alphanums + \
+            CoreParsingKeyword.DOT.value + \
+            CoreParsingKeyword.UNDERSCORE.value + \
+            CoreParsingKeyword.DASH.value + \
+            CoreParsingKeyword.SLASH.value
+        )
+
+        valid_name_comma_seperated_imports = pp.Word(
+            pp.alphanums + \
+            CoreParsingKeyword.DOT.value + \
+            CoreParsingKeyword.UNDERSCORE.value + \
+            CoreParsingKeyword.DASH.value + \
+            CoreParsingKeyword.SLASH.value + \
+            CoreParsingKeyword.COMMA.value + " "
+        )
+
+        # case 'from . import <dependencies>'
+        self._grammars.register('from-current-dir', pp.Keyword(PythonParsingKeyword.FROM.value) + \
+            pp.Keyword(PythonParsingKeyword.PYTHON_IMPORT_CURRENT_DIR.value) + \
+            pp.Keyword(PythonParsingKeyword.IMPORT.value) + \
+            pp.OneOrMore(valid_name_comma_seperated_imports.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value)))
+        # fast path for e.g. 'from . import foo , bar'
+        self._grammars.register_pattern('from-current-dir', r'from \. import (?P<import_entity_name>[A-Za-z0-9._/,-][A-Za-z0-9._/, -]*)')
+
+        # case 'from .. import <dependencies>'
+        self._grammars.register('from-parent-dir', pp.Keyword(PythonParsingKeyword.FROM.value) + \
+            pp.Keyword(PythonParsingKeyword.PYTHON_IMPORT_PARENT_DIR.value) + \
+            pp.Keyword(PythonParsingKeyword.IMPORT.value) + \
+            pp.OneOrMore(valid_name_comma_seperated_imports.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value)))
+        # fast path for e.g. 'from .. import foo , bar'
+        self._grammars.register_pattern('from-parent-dir', r'from \.\. import (?P<import_entity_name>[A-Za-z0-9._/,-][A-Za-z0-9._/, -]*)')
+
+        # all other cases e.g. 'import <dependency>' or 'from foo.bar import <dependency>
+        self._grammars.register('import', (pp.Keyword(PythonParsingKeyword.IMPORT.value) | pp.Keyword(PythonParsingKeyword.FROM.value)) + \
+            valid_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value) + \
+            pp.Optional(pp.FollowedBy(pp.Keyword(PythonParsingKeyword.IMPORT.value))))
+        # fast path for e.g. 'import foo.bar' or 'from foo.bar import baz'
+        self._grammars.register_pattern('import', r'(?:import|from) (?P<import_entity_name>[A-Za-z0-9._/-]+)')
 
     @classmethod
     def parser_name(cls) -> str:
@@ -77,7 +140,7 @@ class PythonParser(AbstractParser, ParsingMixin):
         return LanguageType.PY.name
 
     @property
-    def results(self) -> Dict[str, AbstractResult]:
+    def results(self) -> ResultStore:
         return self._results
 
     @results.setter
@@ -86,7 +149,7 @@ class PythonParser(AbstractParser, ParsingMixin):
 
     def generate_file_result_from_analysis(self, analysis, *, file_name: str, full_file_path: str, file_content: str) -> None:
         LOGGER.debug('generating file results...')
-        scanned_tokens = self.preprocess_file_content_and_generate_token_list_by_mapping(file_content, self._token_mappings)
+        scanned_tokens = self._lexer.tokenize(file_content)
 
         # make sure to create unique names by using the relative analysis path as a base for the result
         parent_analysis_source_path = f"{Path(analysis.source_directory).parent}/"
@@ -107,32 +170,328 @@ class PythonParser(AbstractParser, ParsingMixin):
         )
 
         self._add_package_name_to_result(file_result)
-        self._add_imports_to_result(file_result, analysis)
+
+        syntax_tree = None
+        if analysis.parser_backend is ParserBackend.AST:
+            syntax_tree = self._parse_syntax_tree(file_result, analysis)
+            self._class_definitions[file_result.unique_name] = (file_result, [])
+
+        if syntax_tree is not None:
+            import_aliases = self._add_imports_from_syntax_tree(file_result, syntax_tree, analysis)
+            self._class_definitions[file_result.unique_name] = (file_result, self._collect_class_definitions(file_result, syntax_tree, import_aliases))
+        else:
+            self._add_imports_to_result(file_result, analysis)
+
         self._results[file_result.unique_name] = file_result
 
     def after_generated_file_results(self, analysis) -> None:
         pass
 
+    def cache_context(self, analysis) -> str:
+        # the backend decides how imports are extracted, they are resolved against the scanned files and global modules on every cache hit
+        return analysis.parser_backend.name
+
+    def resolve_import_dependencies(self, result: AbstractFileResult, import_dependencies: List[str], analysis) -> List[str]:
+        dependencies = super().resolve_import_dependencies(result, import_dependencies, analysis)
+        # the syntax tree backend adds every dependency only once
+        if any(dependency.startswith(f'{ParserBackend.AST.name.lower()}:') for dependency in import_dependencies):
+            return list(dict.fromkeys(dependencies))
+        return dependencies
+
+    def try_resolve_dependency(self, dependency: str, result: AbstractFileResult, analysis) -> str:
+        """Resolves an import statement as extracted by a backend, e.g. 'ast:from ..models import Account' or 'tokens:import os'."""
+        backend, _, statement = dependency.partition(':')
+        if backend == ParserBackend.AST.name.lower():
+            return self._resolve_import_statement(statement, result, analysis)[0]
+        return self._resolve_import_line(statement, result, analysis)
+
     def generate_entity_results_from_analysis(self, analysis):
-        raise NotImplementedError(f'currently not implemented in {self.parser_name()}')
+        if analysis.parser_backend is not ParserBackend.AST:
+            raise NotImplementedError(f'currently only implemented with parser_backend {ParserBackend.AST.name.lower()} in {self.parser_name()}')
+
+        LOGGER.debug('generating entity results...')
+        filtered_results = self.results.file_results_of(analysis)
+
+        entity_results: List[Tuple[EntityResult, PythonClassDefinition]] = []
+        result: FileResult
+        for _, result in filtered_results.items():
+            source_lines = result.source.splitlines(keepends=True)
+            for class_definition in self._class_definitions_of(result, analysis):
+                if self.is_entity_in_ignore_list(class_definition.entity_name, analysis):
+                    LOGGER.debug(f'ignoring entity {class_definition.entity_name}')
+                    continue
+
+                entity_result = EntityResult(
+                    analysis=analysis,
+                    scanned_file_name=result.scanned_file_name,
+                    absolute_name=result.absolute_name + CoreParsingKeyword.SLASH.value + class_definition.entity_name,
+                    display_name=class_definition.entity_name,
+                    scanned_by=self.parser_name(),
+                    scanned_language=LanguageType.PY,
+                    scanned_tokens=self._lexer.tokenize(''.join(source_lines[class_definition.first_line - 1:class_definition.last_line])),
+                    scanned_import_dependencies=[],
+                    entity_name=class_definition.entity_name,
+                    module_name=self._module_name_of_path(result.unique_name),
+                    unique_name=class_definition.entity_name,
+                    parent_file_result=result
+                )
+                self.create_unique_entity_name(entity_result)
+                entity_results.append((entity_result, class_definition))
+                analysis.statistics.increment(Statistics.Key.PARSING_HITS)
+
+        # dependencies can only be linked once all entities are known
+        entity_names = {entity_result.unique_name for entity_result, _ in entity_results}
+        for entity_result, class_definition in entity_results:
+            self._add_dependencies_to_entity_result(entity_result, class_definition, entity_names, analysis)
+            self._results[entity_result.unique_name] = entity_result
+
+    def _class_definitions_of(self, result: FileResult, analysis) -> List[PythonClassDefinition]:
+        """Returns the class definitions that were collected when the file result was parsed. Results from parsing workers, the parse cache or
+        of an earlier analysis of a file with the same name were not parsed by this parser, so their source is parsed again.
+        """
+        parsed_result, class_definitions = self._class_definitions.pop(result.unique_name, (None, []))
+        if parsed_result is result:
+            return class_definitions
+
+        syntax_tree = self._parse_syntax_tree(result, analysis, count_fallback=False)
+        if syntax_tree is None:
+            return []
+        import_aliases = self._add_imports_from_syntax_tree(result, syntax_tree, analysis, add_dependencies=False)
+        return self._collect_class_definitions(result, syntax_tree, import_aliases)
 
     def create_unique_entity_name(self, entity: AbstractEntityResult) -> None:
-        raise NotImplementedError(f'currently not implemented in {self.parser_name()}')
+        if entity.module_name:
+            entity.unique_name = entity.module_name + CoreParsingKeyword.DOT.value + entity.entity_name
+        else:
+            entity.unique_name = entity.entity_name
+
+    def _add_dependencies_to_entity_result(self, entity_result: EntityResult, class_definition: PythonClassDefinition, entity_names: Set[str], analysis):
+        for base in class_definition.bases:
+            dependency = self._find_entity_name(base, entity_names) or base
+            if self._is_dependency_in_ignore_list(dependency, analysis):
+                LOGGER.debug(f'ignoring inheritance from {entity_result.unique_name} to {dependency}')
+            elif dependency not in entity_result.scanned_inheritance_dependencies:
+                entity_result.scanned_inheritance_dependencies.append(dependency)
+
+        for reference in class_definition.references:
+            dependency = self._find_entity_name(reference, entity_names)
+            if dependency is None or dependency == entity_result.unique_name or dependency in entity_result.scanned_inheritance_dependencies:
+                continue
+            if self._is_dependency_in_ignore_list(dependency, analysis):
+                LOGGER.debug(f'ignoring dependency from {entity_result.unique_name} to {dependency}')
+            elif dependency not in entity_result.scanned_import_dependencies:
+                entity_result.scanned_import_dependencies.append(dependency)
+
+    @staticmethod
+    def _find_entity_name(qualified_name: str, entity_names: Set[str]) -> Optional[str]:
+        """Returns the longest entity name that is a dotted prefix of a qualified name, e.g. 'pkg.mod.Foo' for 'pkg.mod.Foo.bar'."""
+        components = qualified_name.split(CoreParsingKeyword.DOT.value)
+        for length in range(len(components), 0, -1):
+            name = CoreParsingKeyword.DOT.value.join(components[:length])
+            if name in entity_names:
+                return name
+        return None
+
+    def _parse_syntax_tree(self, result: FileResult, analysis, count_fallback: bool = True) -> Optional[ast.Module]:
+        """Parses the source of a file result into a syntax tree, returns None if the source is no valid python for the running interpreter."""
+        parsing_starts = time.perf_counter()
+        try:
+            return ast.parse(result.source, filename=result.unique_name)
+        except (SyntaxError, ValueError) as exception:
+            if count_fallback:
+                analysis.statistics.increment(Statistics.Key.SYNTAX_ERROR_FALLBACKS)
+                LOGGER.warning(f'warning: could not parse {result.unique_name} into a syntax tree, falling back to tokens\n{exception}')
+            return None
+        finally:
+            self._grammars.record_runtime('ast', time.perf_counter() - parsing_starts, analysis.statistics)
+
+    def _add_imports_from_syntax_tree(self, result: FileResult, syntax_tree: ast.Module, analysis, add_dependencies: bool = True) -> Dict[str, str]:
+        """Adds the resolved dependencies of all import statements to a file result.
+        Returns the qualified names bound by the imports, e.g. {'np': 'numpy'} for 'import numpy as np'.
+        """
+        LOGGER.debug(f'extracting imports from syntax tree of file result {result.scanned_file_name}...')
+        import_aliases: Dict[str, str] = {}
+        import_statements: List[str] = []
+
+        import_nodes = [node for node in ast.walk(syntax_tree) if isinstance(node, (ast.Import, ast.ImportFrom))]
+        for node in sorted(import_nodes, key=lambda n: (n.lineno, n.col_offset)):
+            if isinstance(node, ast.Import):
+                for alias in node.names:
+                    import_statements.append(f'{PythonParsingKeyword.IMPORT.value} {alias.name}')
+                    if alias.asname:
+                        import_aliases[alias.asname] = self._resolve_import_statement(import_statements[-1], result, analysis)[1]
+                    else:  # 'import a.b' only binds 'a'
+                        top_level_name = alias.name.split(CoreParsingKeyword.DOT.value)[0]
+                        import_aliases[top_level_name] = self._resolve_absolute_module(top_level_name, analysis)[1]
+            else:
+                for alias in node.names:
+                    import_statements.append(f'{PythonParsingKeyword.FROM.value} {"." * node.level}{node.module or ""} '
+                                             f'{PythonParsingKeyword.IMPORT.value} {alias.name}')
+                    if alias.name != '*':
+                        import_aliases[alias.asname or alias.name] = self._resolve_import_statement(import_statements[-1], result, analysis)[1]
+            # imports of results that are only walked again for their aliases were already counted when the result was parsed
+            if add_dependencies:
+                analysis.statistics.increment(Statistics.Key.PARSING_HITS)
+
+        if add_dependencies:
+            self.add_import_dependencies(result, [f'{ParserBackend.AST.name.lower()}:{statement}' for statement in import_statements], analysis)
+
+        return import_aliases
+
+    def _resolve_import_statement(self, statement: str, result: FileResult, analysis) -> Tuple[str, str]:
+        """Resolves an import statement of a single name, e.g. 'import a.b' or 'from ..a import b', to the dependency of a scanned file
+        and the qualified name it binds.
+        """
+        keyword, _, imported = statement.partition(PythonParsingKeyword.BLANK.value)
+        if keyword == PythonParsingKeyword.IMPORT.value:
+            return analysis.module_resolver().memoize(self.parser_name(), str(result.absolute_dir_path), statement,
+                                                      lambda: self._resolve_absolute_module(imported, analysis))
+
+        relative_module, _, name = imported.partition(f' {PythonParsingKeyword.IMPORT.value} ')
+        module = relative_module.lstrip(CoreParsingKeyword.DOT.value)
+        return analysis.module_resolver().memoize(self.parser_name(), str(result.absolute_dir_path), statement,
+                                                  lambda: self._resolve_import_from(len(relative_module) - len(module), module, name, result, analysis))
+
+    def _resolve_absolute_module(self, module: str, analysis) -> Tuple[str, str]:
+        """Resolves an absolute module name to the dependency of a scanned file and its qualified name.
+        Global modules and modules that can not be found are kept by their name.
+        """
+        top_level_name = module.split(CoreParsingKeyword.DOT.value)[0]
+        if self.dependency_is_global(module, analysis) or self.dependency_is_global(top_level_name, analysis):
+            return module, module
+
+        module_path = self._find_module_path(module, analysis)
+        if module_path is not None:
+            return module_path, self._module_name_of_path(module_path)
+
+        # same as the token backend, assume the module is located in the analysis source directory
+        posix_module = module.replace(CoreParsingKeyword.DOT.value, CoreParsingKeyword.SLASH.value)
+        if analysis.source_directory == CoreParsingKeyword.DOT.value:
+            return posix_module, module
+        return f'{Path(analysis.source_directory).name}/{posix_module}', module
+
+    def _resolve_import_from(self, level: int, module: str, name: str, result: FileResult, analysis) -> Tuple[str, str]:
+        """Resolves 'from <module> import <name>' to the dependency of a scanned file (a submodule if <name> is one) and the qualified <name>.
+        The level is the number of leading dots of a relative import.
+        """
+        if level == 0:
+            submodule_path = self._find_module_path(f'{module}.{name}', analysis)
+            if submodule_path is not None:
+                return submodule_path, self._module_name_of_path(submodule_path)
+            dependency, qualified_module = self._resolve_absolute_module(module, analysis)
+            return dependency, f'{qualified_module}.{name}'
+
+        # relative imports, every level above the first goes up by one package
+        package_path = str(result.relative_analysis_path)
+        for _ in range(level - 1):
+            package_path = posixpath.dirname(package_path)
+        module_path = posixpath.normpath(posixpath.join(package_path, *module.split(CoreParsingKeyword.DOT.value)))
+
+        submodule_path = self._existing_module_path(posixpath.join(module_path, name), analysis)
+        if submodule_path is not None:
+            return submodule_path, self._module_name_of_path(submodule_path)
+
+        existing_module_path = self._existing_module_path(module_path, analysis)
+        if existing_module_path is not None:
+            return existing_module_path, f'{self._module_name_of_path(existing_module_path)}.{name}'
+
+        # same as the token backend, default to a module file
+        if module:
+            dependency = f'{module_path}{PythonParsingKeyword.PY_FILE_EXTENSION.value}'
+        else:
+            dependency = f'{posixpath.join(module_path, name)}{PythonParsingKeyword.PY_FILE_EXTENSION.value}'
+        return dependency, f'{self._module_name_of_path(module_path)}.{name}'
+
+    def _find_module_path(self, module: str, analysis) -> Optional[str]:
+        """Finds a module relative to the analysis source directory or its parent directory."""
+        posix_module = module.replace(CoreParsingKeyword.DOT.value, CoreParsingKeyword.SLASH.value)
+        search_paths = [posix_module]
+        if analysis.source_directory != CoreParsingKeyword.DOT.value:
+            search_paths.insert(0, f'{Path(analysis.source_directory).name}/{posix_module}')
+
+        for search_path in search_paths:
+            module_path = self._existing_module_path(search_path, analysis)
+            if module_path is not None:
+                return module_path
+        return None
+
+    @staticmethod
+    def _existing_module_path(path: str, analysis) -> Optional[str]:
+        """Returns the module file or package init file of a path relative to the parent of the analysis source directory, if it exists."""
+        for module_path in [f'{path}{PythonParsingKeyword.PY_FILE_EXTENSION.value}', posixpath.join(path, PythonParsingKeyword.PACKAGE_INIT_FILE.value)]:
+            if os.path.isfile(f'{Path(analysis.source_directory).parent}/{module_path}'):
+                return module_path
+        return None
+
+    @staticmethod
+    def _module_name_of_path(path: str) -> str:
+        """Converts a path of a module file or package to a dotted module name, e.g. 'a/b/__init__.py' to 'a.b'."""
+        if path.endswith(PythonParsingKeyword.PACKAGE_INIT_FILE.value):
+            path = posixpath.dirname(path)
+        elif path.endswith(PythonParsingKeyword.PY_FILE_EXTENSION.value):
+            path = path[:-len(PythonParsingKeyword.PY_FILE_EXTENSION.value)]
+        return path.strip(CoreParsingKeyword.SLASH.value).replace(CoreParsingKeyword.SLASH.value, CoreParsingKeyword.DOT.value)
+
+    def _collect_class_definitions(self, result: FileResult, syntax_tree: ast.Module, import_aliases: Dict[str, str]) -> List[PythonClassDefinition]:
+        """Collects all classes of a module, including nested classes but no classes that are local to functions."""
+        module_name = self._module_name_of_path(result.unique_name)
+        qualified_names = dict(import_aliases)
+        for node in syntax_tree.body:
+            if isinstance(node, ast.ClassDef):
+                qualified_names[node.name] = f'{module_name}.{node.name}'
+
+        def qualify(node: ast.AST) -> Optional[str]:
+            dotted_name = self._dotted_name(node)
+            if dotted_name is None:
+                return None
+            first_name, _, remaining_names = dotted_name.partition(CoreParsingKeyword.DOT.value)
+            qualified_name = qualified_names.get(first_name)
+            if qualified_name is None:
+                return dotted_name
+            return f'{qualified_name}.{remaining_names}' if remaining_names else qualified_name
+
+        class_definitions: List[PythonClassDefinition] = []
+
+        def collect(parent: ast.AST, prefix: str) -> None:
+            for node in ast.iter_child_nodes(parent):
+                if isinstance(node, ast.ClassDef):
+                    entity_name = prefix + node.name
+                    references = [qualify(n) for n in ast.walk(node) if isinstance(n, (ast.Name, ast.Attribute))]
+                    class_definitions.append(PythonClassDefinition(
+                        entity_name=entity_name,
+                        first_line=node.lineno,
+                        last_line=node.end_lineno or node.lineno,
+                        bases=[b for b in (qualify(base) for base in node.bases) if b is not None],
+                        references=[r for r in dict.fromkeys(references) if r is not None]
+                    ))
+                    collect(node, entity_name + CoreParsingKeyword.DOT.value)
+                elif not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                    collect(node, prefix)
+
+        collect(syntax_tree, '')
+        return class_definitions
+
+    @staticmethod
+    def _dotted_name(node: ast.AST) -> Optional[str]:
+        """Returns the dotted name of a name or attribute chain, e.g. 'a.b.c', or None for any other expression."""
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Attribute):
+            value_name = PythonParser._dotted_name(node.value)
+            if value_name is not None:
+                return f'{value_name}.{node.attr}'
+        return None
 
     # pylint: disable=too-many-statements
     def _add_imports_to_result(self, result: AbstractFileResult, analysis):
         LOGGER.debug(f'extracting imports from file result {result.scanned_file_name}...')
-        list_of_words_with_newline_strings = result.scanned_tokens
-
-        source_string_no_comments = self._filter_source_tokens_without_comments(
-            list_of_words_with_newline_strings,
+        filtered_list_no_comments = result.token_stream.tokens_without_comments(
             PythonParsingKeyword.INLINE_COMMENT.value,
             PythonParsingKeyword.BLOCK_COMMENT.value,
-            PythonParsingKeyword.BLOCK_COMMENT.value
+            PythonParsingKeyword.BLOCK_COMMENT.value,
+            self._lexer
         )
 
-        filtered_list_no_comments = self.preprocess_file_content_and_generate_token_list_by_mapping(source_string_no_comments, self._token_mappings)
-
         # for simplicity we can parse python dependencies just line by line
         source_import_lines = []
         line = PythonParsingKeyword.EMPTY.value
@@ -148,161 +507,111 @@ class PythonParser(AbstractParser, ParsingMixin):
                     source_import_lines.append(line)
                 line = PythonParsingKeyword.EMPTY.value
 
-        # now iterate line by line are try to parse and resolve the dependencies
+        fast_path = analysis.import_extractor is ImportExtractor.REGEX
+        import_statements: List[str] = []
+        # now iterate line by line are try to parse the dependencies, they are resolved by _resolve_import_line()
         for line in source_import_lines:
-
-            relative_import = False
-            global_import = True
-            if PythonParsingKeyword.FROM.value in line:
-                global_import = False
-
-            expression_to_match = None
-            multiple_imports_from_relative_current_dir = False
-            multiple_imports_from_relative_parent_dir = False
-            multiple_dependencies = []
-
-            valid_name = pp.Word(
-                pp.alphanums + \
-                CoreParsingKeyword.DOT.value + \
-                CoreParsingKeyword.UNDERSCORE.value + \
-                CoreParsingKeyword.DASH.value + \
-                CoreParsingKeyword.SLASH.value
-            )
-
-            valid_name_comma_seperated_imports = pp.Word(
-                pp.alphanums + \
-                CoreParsingKeyword.DOT.value + \
-                CoreParsingKeyword.UNDERSCORE.value + \
-                CoreParsingKeyword.DASH.value + \
-                CoreParsingKeyword.SLASH.value + \
-                CoreParsingKeyword.COMMA.value + " "
-            )
+            grammar_name = 'import'
 
             # case 'from . import <dependencies>'
             if PythonParsingKeyword.RELATIVE_FROM_CURRENT_DIR.value in line:
-                multiple_imports_from_relative_current_dir = True
-                expression_to_match = pp.Keyword(PythonParsingKeyword.FROM.value) + \
-                    pp.Keyword(PythonParsingKeyword.PYTHON_IMPORT_CURRENT_DIR.value) + \
-                    pp.Keyword(PythonParsingKeyword.IMPORT.value) + \
-                    pp.OneOrMore(valid_name_comma_seperated_imports.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value))
+                grammar_name = 'from-current-dir'
 
             # case 'from .. import <dependencies>'
             elif PythonParsingKeyword.RELATIVE_FROM_PARENT_DIR.value in line:
-                multiple_imports_from_relative_parent_dir = True
-                expression_to_match = pp.Keyword(PythonParsingKeyword.FROM.value) + \
-                    pp.Keyword(PythonParsingKeyword.PYTHON_IMPORT_PARENT_DIR.value) + \
-                    pp.Keyword(PythonParsingKeyword.IMPORT.value) + \
-                    pp.OneOrMore(valid_name_comma_seperated_imports.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value))
-
-            # all other cases e.g. 'import <dependency>' or 'from foo.bar import <dependency>
-            else:
-                expression_to_match = (pp.Keyword(PythonParsingKeyword.IMPORT.value) | pp.Keyword(PythonParsingKeyword.FROM.value)) + \
-                    valid_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value) + \
-                    pp.Optional(pp.FollowedBy(pp.Keyword(PythonParsingKeyword.IMPORT.value)))
+                grammar_name = 'from-parent-dir'
 
             try:
-                parsing_result = expression_to_match.parseString(line)
-
-                # if there are multiple dependencies, throw them all in multiple_dependencies
-                if (multiple_imports_from_relative_current_dir or multiple_imports_from_relative_parent_dir) \
-                    and CoreParsingKeyword.COMMA.value in getattr(parsing_result, CoreParsingKeyword.IMPORT_ENTITY_NAME.value):
-                    multiple_results = getattr(parsing_result, CoreParsingKeyword.IMPORT_ENTITY_NAME.value)
-                    multiple_dependencies = multiple_results.split(',')
-                    multiple_dependencies = [s.strip() for s in multiple_dependencies]
-                else:
-                    multiple_imports_from_relative_current_dir = False
-                    multiple_imports_from_relative_parent_dir = False
-
+                parsing_result = self._grammars.parse_string(grammar_name, line, analysis.statistics, fast_path)
             except pp.ParseException as exception:
                 result.analysis.statistics.increment(Statistics.Key.PARSING_MISSES)
                 LOGGER.warning(f'warning: could not parse result {result=}\n{exception}')
                 continue
 
             analysis.statistics.increment(Statistics.Key.PARSING_HITS)
-
-            # ignore any dependency substring from the config ignore list
             dependency = getattr(parsing_result, CoreParsingKeyword.IMPORT_ENTITY_NAME.value)
 
-            # now try to resolve the dependency
-
-            # case: 'from .. import dependency1, ..., dependencyN
-            if multiple_imports_from_relative_parent_dir and not multiple_imports_from_relative_current_dir:
-                for dep in multiple_dependencies:
-                    resolved_dep = dep.replace(PythonParsingKeyword.PYTHON_IMPORT_PARENT_DIR.value, CoreParsingKeyword.POSIX_PARENT_DIRECTORY.value)
-
-                    if f'{PythonParsingKeyword.PY_FILE_EXTENSION.value}' not in resolved_dep:
-                        resolved_dep = f'{resolved_dep}{PythonParsingKeyword.PY_FILE_EXTENSION.value}'
-                    if self._is_dependency_in_ignore_list(resolved_dep, analysis):
-                        LOGGER.debug(f'ignoring dependency from {result.unique_name} to {resolved_dep}')
-                    else:
-                        result.scanned_import_dependencies.append(resolved_dep)
-                        LOGGER.debug(f'adding import: {resolved_dep}')
-
-            # case: 'from . import dependency1, ..., dependencyN
-            elif multiple_imports_from_relative_current_dir and not multiple_imports_from_relative_parent_dir:
-                for dep in multiple_dependencies:
-                    resolved_dep = self.create_relative_analysis_path_for_dependency(dep, str(result.relative_analysis_path))
-
-                    if f'{PythonParsingKeyword.PY_FILE_EXTENSION.value}' not in resolved_dep:
-                        resolved_dep = f'{resolved_dep}{PythonParsingKeyword.PY_FILE_EXTENSION.value}'
-                    if self._is_dependency_in_ignore_list(resolved_dep, analysis):
-                        LOGGER.debug(f'ignoring dependency from {result.unique_name} to {resolved_dep}')
-                    else:
-                        result.scanned_import_dependencies.append(resolved_dep)
-                        LOGGER.debug(f'adding import: {resolved_dep}')
-
-            # all other cases
-            elif not multiple_imports_from_relative_current_dir and not multiple_imports_from_relative_parent_dir:
-                
-                # try to autodetect | override if a dependency should be resolved or kept as global_import
-                if self.dependency_is_global(dependency, analysis):
-                    global_import = True
-
-                if PythonParsingKeyword.PYTHON_IMPORT_PARENT_DIR.value in dependency:
-                    relative_import = True
-                    dependency = dependency.replace(PythonParsingKeyword.PYTHON_IMPORT_PARENT_DIR.value, CoreParsingKeyword.POSIX_PARENT_DIRECTORY.value)
-
-                if len(dependency) > 1 and CoreParsingKeyword.DOT.value == dependency[0] and CoreParsingKeyword.DOT.value is not dependency[1]:
-                    relative_import = True
-                    dependency = dependency[1:]
-
-                if not global_import and relative_import and CoreParsingKeyword.POSIX_PARENT_DIRECTORY.value not in dependency:
-                    dependency = self.create_relative_analysis_path_for_dependency(dependency, str(result.relative_analysis_path))
-                elif not global_import and CoreParsingKeyword.POSIX_PARENT_DIRECTORY.value not in dependency:
-                    posix_dependency = dependency.replace(CoreParsingKeyword.DOT.value, CoreParsingKeyword.SLASH.value)
-
-                    if analysis.source_directory == CoreParsingKeyword.DOT.value:
-                        relative_path = posix_dependency
-                    else:
-                        relative_path = f'{Path(analysis.source_directory).name}/{posix_dependency}'
-
-                    check_dependency_path = f"{ Path(analysis.source_directory).parent}/{relative_path}"
-                    if os.path.exists(f'{check_dependency_path}{PythonParsingKeyword.PY_FILE_EXTENSION.value}'):
-                        dependency = f'{relative_path}{PythonParsingKeyword.PY_FILE_EXTENSION.value}'
-                    else:
-                        dependency = relative_path
-
-                    if self._is_dependency_in_ignore_list(dependency, analysis):
-                        LOGGER.debug(f'ignoring dependency from {result.unique_name} to {dependency}')
-                    else:
-                        result.scanned_import_dependencies.append(dependency)
-                        LOGGER.debug(f'adding import: {dependency}')
-                    continue
+            # case: 'from . import dependency1, ..., dependencyN' or 'from .. import dependency1, ..., dependencyN'
+            if grammar_name != 'import' and CoreParsingKeyword.COMMA.value in dependency:
+                relative_from = PythonParsingKeyword.RELATIVE_FROM_CURRENT_DIR if grammar_name == 'from-current-dir' \
+                    else PythonParsingKeyword.RELATIVE_FROM_PARENT_DIR
+                import_statements.extend(f'{relative_from.value}{PythonParsingKeyword.IMPORT.value} {dep.strip()}'
+                                         for dep in dependency.split(CoreParsingKeyword.COMMA.value))
+
+            # all other cases, any line with 'from' is no global import by default
+            elif PythonParsingKeyword.FROM.value in line:
+                import_statements.append(f'{PythonParsingKeyword.FROM.value} {dependency}')
+            else:
+                import_statements.append(f'{PythonParsingKeyword.IMPORT.value} {dependency}')
+
+        self.add_import_dependencies(result, [f'{ParserBackend.TOKENS.name.lower()}:{statement}' for statement in import_statements], analysis)
+
+    def _resolve_import_line(self, statement: str, result: AbstractFileResult, analysis) -> str:
+        """Resolves an import as extracted line by line by the token backend, i.e. 'from . import <dependency>' or
+        'from .. import <dependency>' for one of multiple relative imports, otherwise 'from <dependency>' or 'import <dependency>'.
+        """
+        # case: 'from .. import dependency1, ..., dependencyN
+        multiple_imports_from_relative_parent_dir = f'{PythonParsingKeyword.RELATIVE_FROM_PARENT_DIR.value}{PythonParsingKeyword.IMPORT.value} '
+        if statement.startswith(multiple_imports_from_relative_parent_dir):
+            resolved_dep = statement[len(multiple_imports_from_relative_parent_dir):]
+            resolved_dep = resolved_dep.replace(PythonParsingKeyword.PYTHON_IMPORT_PARENT_DIR.value, CoreParsingKeyword.POSIX_PARENT_DIRECTORY.value)
+
+            if f'{PythonParsingKeyword.PY_FILE_EXTENSION.value}' not in resolved_dep:
+                resolved_dep = f'{resolved_dep}{PythonParsingKeyword.PY_FILE_EXTENSION.value}'
+            return resolved_dep
+
+        # case: 'from . import dependency1, ..., dependencyN
+        multiple_imports_from_relative_current_dir = f'{PythonParsingKeyword.RELATIVE_FROM_CURRENT_DIR.value}{PythonParsingKeyword.IMPORT.value} '
+        if statement.startswith(multiple_imports_from_relative_current_dir):
+            resolved_dep = self.create_relative_analysis_path_for_dependency(statement[len(multiple_imports_from_relative_current_dir):],
+                                                                             str(result.relative_analysis_path))
+
+            if f'{PythonParsingKeyword.PY_FILE_EXTENSION.value}' not in resolved_dep:
+                resolved_dep = f'{resolved_dep}{PythonParsingKeyword.PY_FILE_EXTENSION.value}'
+            return resolved_dep
+
+        # all other cases
+        keyword, _, dependency = statement.partition(PythonParsingKeyword.BLANK.value)
+        relative_import = False
+        global_import = keyword == PythonParsingKeyword.IMPORT.value
+
+        # try to autodetect | override if a dependency should be resolved or kept as global_import
+        if self.dependency_is_global(dependency, analysis):
+            global_import = True
+
+        if PythonParsingKeyword.PYTHON_IMPORT_PARENT_DIR.value in dependency:
+            relative_import = True
+            dependency = dependency.replace(PythonParsingKeyword.PYTHON_IMPORT_PARENT_DIR.value, CoreParsingKeyword.POSIX_PARENT_DIRECTORY.value)
+
+        if len(dependency) > 1 and CoreParsingKeyword.DOT.value == dependency[0] and CoreParsingKeyword.DOT.value is not dependency[1]:
+            relative_import = True
+            dependency = dependency[1:]
+
+        if not global_import and relative_import and CoreParsingKeyword.POSIX_PARENT_DIRECTORY.value not in dependency:
+            dependency = self.create_relative_analysis_path_for_dependency(dependency, str(result.relative_analysis_path))
+        elif not global_import and CoreParsingKeyword.POSIX_PARENT_DIRECTORY.value not in dependency:
+            posix_dependency = dependency.replace(CoreParsingKeyword.DOT.value, CoreParsingKeyword.SLASH.value)
+
+            if analysis.source_directory == CoreParsingKeyword.DOT.value:
+                relative_path = posix_dependency
+            else:
+                relative_path = f'{Path(analysis.source_directory).name}/{posix_dependency}'
+
+            check_dependency_path = f"{ Path(analysis.source_directory).parent}/{relative_path}"
+            if os.path.exists(f'{check_dependency_path}{PythonParsingKeyword.PY_FILE_EXTENSION.value}'):
+                return f'{relative_path}{PythonParsingKeyword.PY_FILE_EXTENSION.value}'
+            return relative_path
 
-                if CoreParsingKeyword.POSIX_PARENT_DIRECTORY.value in dependency:  # contains at least one relative parent element '../'
-                    dependency = self.resolve_relative_dependency_path(dependency, str(result.absolute_dir_path), analysis.source_directory)
+        if CoreParsingKeyword.POSIX_PARENT_DIRECTORY.value in dependency:  # contains at least one relative parent element '../'
+            dependency = self.resolve_relative_dependency_path(dependency, str(result.absolute_dir_path), analysis.source_directory)
 
-                if not global_import:
-                    dependency = dependency.replace(CoreParsingKeyword.DOT.value, CoreParsingKeyword.SLASH.value)
+        if not global_import:
+            dependency = dependency.replace(CoreParsingKeyword.DOT.value, CoreParsingKeyword.SLASH.value)
 
-                if f'{PythonParsingKeyword.PY_FILE_EXTENSION.value}' not in dependency and not global_import:
-                    dependency = f'{dependency}{PythonParsingKeyword.PY_FILE_EXTENSION.value}'
+        if f'{PythonParsingKeyword.PY_FILE_EXTENSION.value}' not in dependency and not global_import:
+            dependency = f'{dependency}{PythonParsingKeyword.PY_FILE_EXTENSION.value}'
 
-                if self._is_dependency_in_ignore_list(dependency, analysis):
-                    LOGGER.debug(f'ignoring dependency from {result.unique_name} to {dependency}')
-                else:
-                    result.scanned_import_dependencies.append(dependency)
-                    LOGGER.debug(f'adding import: {dependency}')
+        return dependency
 
     def _add_package_name_to_result(self, result: FileResult):
         result.module_name = ""
@@ -330,8 +639,9 @@ class PythonParser(AbstractParser, ParsingMixin):
         for element in processed_result_second_detection:
             global_dependency_autodetect_set.add(element)
 
-        # third global dependency (built-in module) detection attempt
-        for builtin_module in sys.modules:
+        # third global dependency (built-in module) detection attempt, standard library modules are added even if they are not imported yet,
+        # since parsers are only imported on demand and the imported modules therefore depend on the configured analyses
+        for builtin_module in [*sys.modules, *sys.builtin_module_names, *getattr(sys, 'stdlib_module_names', [])]:
             if not builtin_module.startswith('_') and not '.' in builtin_module:
                 global_dependency_autodetect_set.add(builtin_module)
 
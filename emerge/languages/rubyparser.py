@@ -5,19 +5,20 @@ Contains the implementation of the Ruby language parser and a relevant keyword e
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import Dict
+from typing import Dict, List
 from enum import Enum, unique
 
 import logging
 from pathlib import Path
-import os
 
 import pyparsing as pp
 import coloredlogs
 
-from emerge.languages.abstractparser import AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType
+from emerge.languages.abstractparser import (AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType, TokenCursor, GrammarRegistry,
+                                             ImportExtractor)
+from emerge.languages.lexer import Lexer
 from emerge.results import FileResult
-from emerge.abstractresult import AbstractResult, AbstractFileResult, AbstractEntityResult
+from emerge.abstractresult import AbstractFileResult, AbstractEntityResult, ResultStore
 from emerge.stats import Statistics
 from emerge.log import Logger
 
@@ -39,7 +40,7 @@ class RubyParsingKeyword(Enum):
 class RubyParser(AbstractParser, ParsingMixin):
 
     def __init__(self):
-        self._results: Dict[str, AbstractResult] = {}
+        self._results: ResultStore = ResultStore()
         self._token_mappings: Dict[str, str] = {
             ':': ' : ',
             ';': ' ; ',
@@ -57,6 +58,33 @@ class RubyParser(AbstractParser, ParsingMixin):
             '"': ' " ',
             "'": " ' "
         }
+        self._lexer: Lexer = Lexer.for_mapping(self._token_mappings)
+        self._grammars: GrammarRegistry = GrammarRegistry(self.language_type())
+        self._register_grammars()
+
+    def _register_grammars(self) -> None:
+        import_name = pp.Word(pp.alphanums + CoreParsingKeyword.UNDERSCORE.value + CoreParsingKeyword.SLASH.value + CoreParsingKeyword.DOT.value)
+        ignore_between_require_and_import_name = pp.Word(pp.alphanums + CoreParsingKeyword.UNDERSCORE.value +
+                                                         CoreParsingKeyword.DOT.value + CoreParsingKeyword.OPENING_ROUND_BRACKET.value)
+
+        require_expression = (pp.Keyword(RubyParsingKeyword.REQUIRE.value) | pp.Keyword(RubyParsingKeyword.REQUIRE_RELATIVE.value)) + (
+
+            (pp.Keyword(CoreParsingKeyword.SINGLE_QUOTE.value) +
+             import_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value) +
+             pp.Keyword(CoreParsingKeyword.SINGLE_QUOTE.value)) |
+
+            (pp.Keyword(CoreParsingKeyword.DOUBLE_QUOTE.value) +
+             import_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value) +
+             pp.Keyword(CoreParsingKeyword.DOUBLE_QUOTE.value)) |
+
+            pp.OneOrMore(ignore_between_require_and_import_name) + \
+                 pp.Suppress(pp.Keyword(CoreParsingKeyword.SINGLE_QUOTE.value) | pp.Keyword(CoreParsingKeyword.DOUBLE_QUOTE.value)) +
+            import_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value)
+
+        )
+        self._grammars.register('require', require_expression)
+        # fast path for e.g. "require ' foo/bar '" or 'require_relative " foo "'
+        self._grammars.register_pattern('require', r'''(?<!\S)require(?:_relative)? (?P<quote>['"]) (?P<import_entity_name>[A-Za-z0-9_/.]+) (?P=quote)''')
 
     @classmethod
     def parser_name(cls) -> str:
@@ -67,7 +95,7 @@ class RubyParser(AbstractParser, ParsingMixin):
         return LanguageType.RUBY.name
 
     @property
-    def results(self) -> Dict[str, AbstractResult]:
+    def results(self) -> ResultStore:
         return self._results
 
     @results.setter
@@ -110,74 +138,48 @@ class RubyParser(AbstractParser, ParsingMixin):
 
     def _add_imports_to_result(self, result: AbstractFileResult, analysis):
         LOGGER.debug(f'extracting imports from file result {result.scanned_file_name}...')
-        list_of_words_with_newline_strings = result.scanned_tokens
-
-        source_string_no_comments = self._filter_source_tokens_without_comments(
-            list_of_words_with_newline_strings,
+        filtered_list_no_comments = result.token_stream.tokens_without_comments(
             RubyParsingKeyword.INLINE_COMMENT.value,
             RubyParsingKeyword.START_BLOCK_COMMENT.value,
-            RubyParsingKeyword.STOP_BLOCK_COMMENT.value
+            RubyParsingKeyword.STOP_BLOCK_COMMENT.value,
+            self._lexer
         )
 
-        filtered_list_no_comments = self.preprocess_file_content_and_generate_token_list_by_mapping(source_string_no_comments, self._token_mappings)
-
-        for _, obj, following in self._gen_word_read_ahead(filtered_list_no_comments):
+        fast_path = analysis.import_extractor is ImportExtractor.REGEX
+        token_cursor = TokenCursor(filtered_list_no_comments)
+        import_dependencies: List[str] = []
+        for index, obj in token_cursor:
             if obj == RubyParsingKeyword.REQUIRE.value or obj == RubyParsingKeyword.REQUIRE_RELATIVE.value:
-                read_ahead_string = self.create_read_ahead_string(obj, following)
-
-                import_name = pp.Word(pp.alphanums + CoreParsingKeyword.UNDERSCORE.value + CoreParsingKeyword.SLASH.value + CoreParsingKeyword.DOT.value)
-                ignore_between_require_and_import_name = pp.Word(pp.alphanums + CoreParsingKeyword.UNDERSCORE.value +
-                                                                 CoreParsingKeyword.DOT.value + CoreParsingKeyword.OPENING_ROUND_BRACKET.value)
-
-                expression_to_match = (pp.Keyword(RubyParsingKeyword.REQUIRE.value) | pp.Keyword(RubyParsingKeyword.REQUIRE_RELATIVE.value)) + (
-
-                    (pp.Keyword(CoreParsingKeyword.SINGLE_QUOTE.value) +
-                     import_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value) +
-                     pp.Keyword(CoreParsingKeyword.SINGLE_QUOTE.value)) |
-
-                    (pp.Keyword(CoreParsingKeyword.DOUBLE_QUOTE.value) +
-                     import_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value) +
-                     pp.Keyword(CoreParsingKeyword.DOUBLE_QUOTE.value)) |
-
-                    pp.OneOrMore(ignore_between_require_and_import_name) + \
-                         pp.Suppress(pp.Keyword(CoreParsingKeyword.SINGLE_QUOTE.value) | pp.Keyword(CoreParsingKeyword.DOUBLE_QUOTE.value)) +
-                    import_name.setResultsName(CoreParsingKeyword.IMPORT_ENTITY_NAME.value)
-
-                )
-
                 try:
-                    parsing_result = expression_to_match.parseString(read_ahead_string)
+                    parsing_result = self._grammars.parse('require', token_cursor, index, analysis.statistics, fast_path)
                 except pp.ParseException as exception:
                     result.analysis.statistics.increment(Statistics.Key.PARSING_MISSES)
                     LOGGER.warning(f'warning: could not parse result {result=}\n{exception}')
-                    LOGGER.warning(f'next tokens: {[obj] + following[:ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value]}')
+                    LOGGER.warning(f'next tokens: {token_cursor.read_ahead(index, ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value)}')
                     continue
 
                 analysis.statistics.increment(Statistics.Key.PARSING_HITS)
 
-                # ignore any dependency substring from the config ignore list
-                dependency = getattr(parsing_result, CoreParsingKeyword.IMPORT_ENTITY_NAME.value)
-
-                # try to resolve the dependency
-                resolved_dependency = self.try_resolve_dependency(dependency, result, analysis)
+                import_dependencies.append(getattr(parsing_result, CoreParsingKeyword.IMPORT_ENTITY_NAME.value))
 
-                if self._is_dependency_in_ignore_list(resolved_dependency, analysis):
-                    LOGGER.debug(f'ignoring dependency from {result.unique_name} to {resolved_dependency}')
-                else:
-                    result.scanned_import_dependencies.append(resolved_dependency)
-                    LOGGER.debug(f'adding import: {resolved_dependency}')
+        # try to resolve the dependencies
+        self.add_import_dependencies(result, import_dependencies, analysis)
 
     def try_resolve_dependency(self, dependency: str, result: AbstractFileResult, analysis) -> str:
+        return analysis.module_resolver().memoize(self.parser_name(), str(result.absolute_dir_path), dependency,
+                                                  lambda: self._resolve_dependency(dependency, result, analysis))
 
+    def _resolve_dependency(self, dependency: str, result: AbstractFileResult, analysis) -> str:
+        module_resolver = analysis.module_resolver()
         successfully_resolved_dependency = False
 
         # resolve in pure POSIX way
-        resolved_posix_dependency = self.resolve_relative_dependency_path(dependency, str(result.absolute_dir_path), analysis.source_directory)
+        resolved_posix_dependency = module_resolver.resolve_relative_path(dependency, str(result.absolute_dir_path))
         if '.rb' not in resolved_posix_dependency:
             resolved_posix_dependency = f"{resolved_posix_dependency}.rb"
 
         check_dependency_path = f"{Path(analysis.source_directory).parent}/{resolved_posix_dependency}"
-        if os.path.exists(check_dependency_path):
+        if module_resolver.exists(check_dependency_path):
             dependency = resolved_posix_dependency
             successfully_resolved_dependency = True
 
@@ -189,25 +191,25 @@ class RubyParser(AbstractParser, ParsingMixin):
             # resolve/check by reducing only the first ".." to "."
             if CoreParsingKeyword.POSIX_PARENT_DIRECTORY.value in dependency:
                 non_posix_dependency = dependency.replace(CoreParsingKeyword.POSIX_PARENT_DIRECTORY.value, CoreParsingKeyword.POSIX_CURRENT_DIRECTORY.value, 1)
-                resolved_non_posix_dependency = self.resolve_relative_dependency_path(
-                    non_posix_dependency, str(result.absolute_dir_path), analysis.source_directory
+                resolved_non_posix_dependency = module_resolver.resolve_relative_path(
+                    non_posix_dependency, str(result.absolute_dir_path)
                 )
                 if '.rb' not in resolved_non_posix_dependency:
                     resolved_non_posix_dependency = f"{resolved_non_posix_dependency}.rb"
 
                 check_dependency_path = f"{Path(analysis.source_directory).parent}/{resolved_non_posix_dependency}"
-                if os.path.exists(check_dependency_path):
+                if module_resolver.exists(check_dependency_path):
                     dependency = resolved_non_posix_dependency
                     successfully_resolved_dependency = True
 
         # as a last step, try to check if the dependency can be found in a local "lib" folder
         if not successfully_resolved_dependency:
 
-            resolved_lib_dependency = self.resolve_relative_dependency_path(f"lib/{dependency}.rb", analysis.source_directory, analysis.source_directory)
+            resolved_lib_dependency = module_resolver.resolve_relative_path(f"lib/{dependency}.rb", analysis.source_directory)
             # f"{Path(analysis.source_directory)}/lib/{dependency}.rb"
             check_resolved_lib_dependency_path = f"{Path(analysis.source_directory).parent}/{resolved_lib_dependency}"
 
-            if os.path.exists(check_resolved_lib_dependency_path):
+            if module_resolver.exists(check_resolved_lib_dependency_path):
                 dependency = resolved_lib_dependency
                 successfully_resolved_dependency = True
 
@@ -5,7 +5,7 @@ Contains the implementation of the Swift language parser and a relevant keyword
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import Dict, List
+from typing import Dict, List, Mapping, Set
 from enum import Enum, unique
 import logging
 from pathlib import Path
@@ -13,9 +13,10 @@ from pathlib import Path
 import pyparsing as pp
 import coloredlogs
 
-from emerge.languages.abstractparser import AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType
+from emerge.languages.abstractparser import AbstractParser, ParsingMixin, Parser, CoreParsingKeyword, LanguageType, TokenCursor, GrammarRegistry
+from emerge.languages.lexer import Lexer, TokenStream, TokenIndex
 from emerge.results import FileResult, EntityResult
-from emerge.abstractresult import AbstractResult, AbstractFileResult, AbstractEntityResult
+from emerge.abstractresult import AbstractEntityResult, ResultStore
 from emerge.stats import Statistics
 from emerge.log import Logger
 
@@ -43,7 +44,7 @@ class SwiftParsingKeyword(Enum):
 class SwiftParser(AbstractParser, ParsingMixin):
 
     def __init__(self):
-        self._results: Dict[str, AbstractResult] = {}
+        self._results: ResultStore = ResultStore()
 
         self._token_mappings: Dict[str, str] = {
             ':': ' : ',
@@ -62,12 +63,48 @@ class SwiftParser(AbstractParser, ParsingMixin):
             '"': ' " ',
             ".": ' . ',
         }
+        self._lexer: Lexer = Lexer.for_mapping(self._token_mappings)
+        self._grammars: GrammarRegistry = GrammarRegistry(self.language_type())
+        self._register_grammars()
 
         # WORKAROUND: filter out entities that resulted from obvious parsing errors
         self._ignore_entity_keywords: List[str] = [
             'class', 'struct', 'protocol', 'enum', 'var', 'let', 'func', 'extension', 'import', 'fileprivate', 'value'
         ]
 
+    def _register_grammars(self) -> None:
+        entity_type = (
+            pp.Keyword(SwiftParsingKeyword.CLASS.value) |
+            pp.Keyword(SwiftParsingKeyword.STRUCT.value) |
+            pp.Keyword(SwiftParsingKeyword.ENUM.value) |
+            pp.Keyword(SwiftParsingKeyword.PROTOCOL.value))
+        no_declaration = (~pp.Keyword(SwiftParsingKeyword.LET.value) &
+                          ~pp.Keyword(SwiftParsingKeyword.VAR.value) &
+                          ~pp.Keyword(SwiftParsingKeyword.FUNC.value))
+
+        entity_name = pp.Word(pp.alphanums + CoreParsingKeyword.DOT.value + CoreParsingKeyword.UNDERSCORE.value)
+        self._grammars.register('entity', entity_type + no_declaration +
+            entity_name.setResultsName(CoreParsingKeyword.ENTITY_NAME.value) +
+            pp.Optional(pp.Keyword(CoreParsingKeyword.COLON.value)) + pp.SkipTo(pp.FollowedBy(SwiftParsingKeyword.OPEN_SCOPE.value)))
+
+        # entities that are only extracted to resolve file imports
+        file_entity_name = pp.Word(pp.alphanums)
+        self._grammars.register('file-entity', entity_type + no_declaration +
+            file_entity_name.setResultsName(CoreParsingKeyword.ENTITY_NAME.value) +
+            pp.Optional(pp.Keyword(CoreParsingKeyword.COLON.value)) + pp.SkipTo(pp.FollowedBy(SwiftParsingKeyword.OPEN_SCOPE.value)))
+
+        entity_name_of_extension = pp.Word(pp.alphanums)
+        self._grammars.register('extension', pp.Keyword(SwiftParsingKeyword.EXTENSION.value) +
+            entity_name_of_extension.setResultsName(CoreParsingKeyword.ENTITY_NAME.value) +
+            pp.SkipTo(pp.FollowedBy(SwiftParsingKeyword.OPEN_SCOPE.value)))
+
+        inheritance_entity_name = pp.Word(pp.alphanums + CoreParsingKeyword.DOT.value)
+        self._grammars.register('inheritance', entity_type +
+            inheritance_entity_name.setResultsName(CoreParsingKeyword.ENTITY_NAME.value) +
+            pp.Keyword(CoreParsingKeyword.COLON.value) +
+            inheritance_entity_name.setResultsName(CoreParsingKeyword.INHERITED_ENTITY_NAME.value) +
+            pp.SkipTo(pp.FollowedBy(SwiftParsingKeyword.OPEN_SCOPE.value)))
+
     @classmethod
     def parser_name(cls) -> str:
         return Parser.SWIFT_PARSER.name
@@ -77,7 +114,7 @@ class SwiftParser(AbstractParser, ParsingMixin):
         return LanguageType.SWIFT.name
 
     @property
-    def results(self) -> Dict[str, AbstractResult]:
+    def results(self) -> ResultStore:
         return self._results
 
     @results.setter
@@ -85,13 +122,12 @@ class SwiftParser(AbstractParser, ParsingMixin):
         self._results = value
 
     def preprocess_swift_source(self, scanned_tokens) -> str:
-        source_string_no_comments = self._filter_source_tokens_without_comments(
-            scanned_tokens,
+        filtered_list_no_comments = TokenStream(scanned_tokens).tokens_without_comments(
             SwiftParsingKeyword.INLINE_COMMENT.value,
             SwiftParsingKeyword.START_BLOCK_COMMENT.value,
-            SwiftParsingKeyword.STOP_BLOCK_COMMENT.value
+            SwiftParsingKeyword.STOP_BLOCK_COMMENT.value,
+            self._lexer
         )
-        filtered_list_no_comments = self.preprocess_file_content_and_generate_token_list_by_mapping(source_string_no_comments, self._token_mappings)
         preprocessed_source_string = " ".join(filtered_list_no_comments)
         return preprocessed_source_string
 
@@ -130,8 +166,7 @@ class SwiftParser(AbstractParser, ParsingMixin):
 
     def generate_entity_results_from_analysis(self, analysis):
         LOGGER.debug('generating entity results...')
-        filtered_results: Dict[str, FileResult] = {k: v for (k, v) in self.results.items() \
-            if v.analysis is analysis and isinstance(v, AbstractFileResult)}
+        filtered_results: Mapping[str, FileResult] = self.results.file_results_of(analysis)
 
         result: FileResult
         for _, result in filtered_results.items():
@@ -143,18 +178,7 @@ class SwiftParser(AbstractParser, ParsingMixin):
                 SwiftParsingKeyword.PROTOCOL.value
             ]
 
-            entity_name = pp.Word(pp.alphanums + CoreParsingKeyword.DOT.value + CoreParsingKeyword.UNDERSCORE.value)
-
-            match_expression = (
-                pp.Keyword(SwiftParsingKeyword.CLASS.value) |
-                pp.Keyword(SwiftParsingKeyword.STRUCT.value) |
-                pp.Keyword(SwiftParsingKeyword.ENUM.value) |
-                pp.Keyword(SwiftParsingKeyword.PROTOCOL.value)) + \
-                (~pp.Keyword(SwiftParsingKeyword.LET.value) &
-                 ~pp.Keyword(SwiftParsingKeyword.VAR.value) &
-                 ~pp.Keyword(SwiftParsingKeyword.FUNC.value)) + \
-                entity_name.setResultsName(CoreParsingKeyword.ENTITY_NAME.value) + \
-                pp.Optional(pp.Keyword(CoreParsingKeyword.COLON.value)) + pp.SkipTo(pp.FollowedBy(SwiftParsingKeyword.OPEN_SCOPE.value))
+            match_expression = self._grammars['entity']
 
             comment_keywords: Dict[str, str] = {
                 CoreParsingKeyword.LINE_COMMENT.value: SwiftParsingKeyword.INLINE_COMMENT.value,
@@ -162,7 +186,7 @@ class SwiftParser(AbstractParser, ParsingMixin):
                 CoreParsingKeyword.STOP_BLOCK_COMMENT.value: SwiftParsingKeyword.STOP_BLOCK_COMMENT.value
             }
 
-            entity_results_unfiltered = result.generate_entity_results_from_scopes(entity_keywords, match_expression, comment_keywords)
+            entity_results_unfiltered = result.generate_entity_results_from_scopes(entity_keywords, match_expression, comment_keywords, self._grammars)
             entity_results: List[AbstractEntityResult] = []
 
             # WORKAROUND: filter out entities that resulted from obvious parsing errors
@@ -186,24 +210,18 @@ class SwiftParser(AbstractParser, ParsingMixin):
     def _add_extensions_to_entity_results(self, analysis) -> None:
         LOGGER.debug('adding swift extensions to entity results...')
 
-        entity_results: Dict[str, EntityResult] = {
-            k: v for (k, v) in self.results.items() if v.analysis is analysis and isinstance(v, EntityResult)
-        }
-
-        file_results: Dict[str, FileResult] = {
-            k: v for (k, v) in self.results.items() if v.analysis is analysis and isinstance(v, FileResult)
-        }
+        entity_results: Mapping[str, EntityResult] = self.results.entity_results_of(analysis)
+        file_results: Mapping[str, FileResult] = self.results.file_results_of(analysis)
 
-        entity_names: List[str] = [v.entity_name for _, v in entity_results.items()]
+        # the first entity result of every entity name
+        entity_results_by_name: Dict[str, AbstractEntityResult] = {}
+        for _, entity_result in entity_results.items():
+            entity_results_by_name.setdefault(entity_result.entity_name, entity_result)
 
         result: FileResult
         for _, result in file_results.items():
             entity_keywords: List[str] = [SwiftParsingKeyword.EXTENSION.value]
-            entity_name_of_extension = pp.Word(pp.alphanums)
-
-            match_expression = pp.Keyword(SwiftParsingKeyword.EXTENSION.value) + \
-                entity_name_of_extension.setResultsName(CoreParsingKeyword.ENTITY_NAME.value) + \
-                     pp.SkipTo(pp.FollowedBy(SwiftParsingKeyword.OPEN_SCOPE.value))
+            match_expression = self._grammars['extension']
 
             comment_keywords: Dict[str, str] = {CoreParsingKeyword.LINE_COMMENT.value: SwiftParsingKeyword.INLINE_COMMENT.value,
                                                 CoreParsingKeyword.START_BLOCK_COMMENT.value: SwiftParsingKeyword.START_BLOCK_COMMENT.value,
@@ -211,22 +229,21 @@ class SwiftParser(AbstractParser, ParsingMixin):
 
             extension_entity_results: List[EntityResult] = result.generate_entity_results_from_scopes(entity_keywords,
                                                                                                     match_expression,
-                                                                                                    comment_keywords)
+                                                                                                    comment_keywords,
+                                                                                                    self._grammars,
+                                                                                                    'extension')
 
             for extension in extension_entity_results:
-                if extension.entity_name in entity_names:
-                    entity_result: AbstractEntityResult = analysis.result_by_entity_name(extension.entity_name, entity_results)
-                    if entity_result is not None:
-                        entity_result.scanned_tokens.extend(extension.scanned_tokens)
-                        LOGGER.debug(f'added extension from file result {result=} to entity result: {entity_result=}.')
+                entity_result = entity_results_by_name.get(extension.entity_name)
+                if entity_result is not None:
+                    entity_result.scanned_tokens = [*entity_result.scanned_tokens, *extension.scanned_tokens]
+                    LOGGER.debug(f'added extension from file result {result=} to entity result: {entity_result=}.')
 
     def _add_imports_to_entity_results(self, analysis) -> None:
         LOGGER.debug('adding imports to entity result...')
-        entity_results: Dict[str, AbstractEntityResult] = {
-            k: v for (k, v) in self.results.items() if v.analysis is analysis and isinstance(v, AbstractEntityResult)
-        }
+        entity_results: Mapping[str, AbstractEntityResult] = self.results.entity_results_of(analysis)
 
-        entity_names: List[str] = [v.entity_name for _, v in entity_results.items()]
+        entity_names: Set[str] = {v.entity_name for _, v in entity_results.items()}
 
         for _, result in entity_results.items():
             for token in result.scanned_tokens:
@@ -244,8 +261,8 @@ class SwiftParser(AbstractParser, ParsingMixin):
         """Adds imports to file results. Since Swift has no direct include directives for files,
         we have to do a little workaround here:
         1. We extract all entities + entity names
-        2. We loop though all entity results/ file results and check if an entity name is part of a file results scanned tokens.
-        If this is the case we add an import dependency.
+        2. We loop though all entity results and look up the file results whose scanned tokens contain the entity name in an inverted token index.
+        For every such file result we add an import dependency.
 
         Args:
             analysis (Analysis): A given analysis.
@@ -253,7 +270,7 @@ class SwiftParser(AbstractParser, ParsingMixin):
         LOGGER.debug('adding imports to file results...')
         entity_results: Dict[str, EntityResult] = {}
 
-        filtered_results: Dict[str, FileResult] = {k: v for (k, v) in self.results.items() if v.analysis is analysis and isinstance(v, FileResult)}
+        filtered_results: Mapping[str, FileResult] = self.results.file_results_of(analysis)
 
         # 1. extract entities
         result: FileResult
@@ -266,15 +283,7 @@ class SwiftParser(AbstractParser, ParsingMixin):
                 SwiftParsingKeyword.PROTOCOL.value
             ]
 
-            entity_name = pp.Word(pp.alphanums)
-
-            match_expression = (pp.Keyword(SwiftParsingKeyword.CLASS.value) |
-                                pp.Keyword(SwiftParsingKeyword.STRUCT.value) |
-                                pp.Keyword(SwiftParsingKeyword.ENUM.value) |
-                                pp.Keyword(SwiftParsingKeyword.PROTOCOL.value)) + \
-                (~pp.Keyword(SwiftParsingKeyword.LET.value) & ~pp.Keyword(SwiftParsingKeyword.VAR.value) & ~pp.Keyword(SwiftParsingKeyword.FUNC.value)) + \
-                entity_name.setResultsName(CoreParsingKeyword.ENTITY_NAME.value) + \
-                pp.Optional(pp.Keyword(CoreParsingKeyword.COLON.value)) + pp.SkipTo(pp.FollowedBy(SwiftParsingKeyword.OPEN_SCOPE.value))
+            match_expression = self._grammars['file-entity']
 
             comment_keywords: Dict[str, str] = {
                 CoreParsingKeyword.LINE_COMMENT.value: SwiftParsingKeyword.INLINE_COMMENT.value,
@@ -282,7 +291,8 @@ class SwiftParser(AbstractParser, ParsingMixin):
                 CoreParsingKeyword.STOP_BLOCK_COMMENT.value: SwiftParsingKeyword.STOP_BLOCK_COMMENT.value
             }
 
-            entity_results_extracted_from_file = result.generate_entity_results_from_scopes(entity_keywords, match_expression, comment_keywords)
+            entity_results_extracted_from_file = result.generate_entity_results_from_scopes(entity_keywords, match_expression, comment_keywords,
+                                                                                            self._grammars, 'file-entity')
 
             # TODO: also add tokens from extensions
 
@@ -293,9 +303,14 @@ class SwiftParser(AbstractParser, ParsingMixin):
                 entity_results[entity_result.entity_name] = entity_result
 
         # 2. if entity names are present in scanned tokens of file results, add to import dependencies
+        token_index = TokenIndex()
+        for unique_name, file_result in filtered_results.items():
+            token_index.add(unique_name, file_result.scanned_tokens)
+
         for name, entity_result in entity_results.items():
-            for _, file_result in filtered_results.items():
-                if name in file_result.scanned_tokens and entity_result.scanned_file_name not in file_result.scanned_import_dependencies:
+            for unique_name in token_index.names_containing(name):
+                file_result = filtered_results[unique_name]
+                if entity_result.scanned_file_name not in file_result.scanned_import_dependencies:
 
                     # dependency = os.path.basename(os.path.normpath(entity_result.scanned_file_name))
                     dependency = entity_result.scanned_file_name
@@ -312,34 +327,23 @@ class SwiftParser(AbstractParser, ParsingMixin):
 
     def _add_inheritance_to_entity_result(self, result: AbstractEntityResult) -> None:
         LOGGER.debug(f'extracting inheritance from entity result {result.entity_name}...')
-        for _, obj, following in self._gen_word_read_ahead(result.scanned_tokens):
+        token_cursor = TokenCursor(result.scanned_tokens)
+        for index, obj in token_cursor:
             if obj == SwiftParsingKeyword.CLASS.value or \
                obj == SwiftParsingKeyword.STRUCT.value or \
                obj == SwiftParsingKeyword.ENUM.value or \
                obj == SwiftParsingKeyword.PROTOCOL.value:
-                read_ahead_string = self.create_read_ahead_string(obj, following)
-
-                entity_name = pp.Word(pp.alphanums + CoreParsingKeyword.DOT.value)
-                expression_to_match = (pp.Keyword(SwiftParsingKeyword.CLASS.value) |
-                                        pp.Keyword(SwiftParsingKeyword.STRUCT.value) |
-                                        pp.Keyword(SwiftParsingKeyword.ENUM.value) |
-                                        pp.Keyword(SwiftParsingKeyword.PROTOCOL.value) ) + \
-                                        entity_name.setResultsName(CoreParsingKeyword.ENTITY_NAME.value) + \
-                                        pp.Keyword(CoreParsingKeyword.COLON.value) + \
-                    entity_name.setResultsName(CoreParsingKeyword.INHERITED_ENTITY_NAME.value) + \
-                         pp.SkipTo(pp.FollowedBy(SwiftParsingKeyword.OPEN_SCOPE.value))
-
                 try:
-                    parsing_result = expression_to_match.parseString(read_ahead_string)
+                    parsing_result = self._grammars.parse('inheritance', token_cursor, index, result.analysis.statistics)
                 # pylint: disable=bare-except
                 except:
                     result.analysis.statistics.increment(Statistics.Key.PARSING_MISSES)
                     LOGGER.warning(f'warning: could not parse result {result=}')
-                    LOGGER.warning(f'next tokens: {[obj] + following[:ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value]}')
+                    LOGGER.warning(f'next tokens: {token_cursor.read_ahead(index, ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value)}')
                     continue
 
                 if len(parsing_result) > 0:
-                    parsing_result = expression_to_match.parseString(read_ahead_string)
+                    parsing_result = self._grammars.parse('inheritance', token_cursor, index, result.analysis.statistics)
 
                     if getattr(parsing_result, CoreParsingKeyword.INHERITED_ENTITY_NAME.value) is not None and \
                        bool(getattr(parsing_result, CoreParsingKeyword.INHERITED_ENTITY_NAME.value)):
@@ -33,6 +33,19 @@ class MetricResultFilter(Enum):
     ENTITY_RESULTS = auto()
 
 
+@unique
+class TFIDFMode(Enum):
+    EXACT = auto()
+    STREAMING = auto()
+
+
+@unique
+class CommunityDetection(Enum):
+    LOUVAIN = auto()
+    NETWORKX_LOUVAIN = auto()
+    LABEL_PROPAGATION = auto()
+
+
 class AbstractMetric(ABC):
 
     @property
@@ -0,0 +1,75 @@
+"""
+Contains the implementation of the betweenness centrality graph metric.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+from typing import Dict
+from enum import auto
+
+import logging
+import coloredlogs
+
+import numpy as np
+
+from emerge.abstractresult import AbstractResult
+from emerge.log import Logger
+from emerge.graph import GraphRepresentation
+
+# enums and superclass of the given metric
+from emerge.metrics.abstractmetric import EnumLowerKebabCase
+from emerge.metrics.metrics import GraphMetric
+from emerge.metrics.graphkernel import GraphMetricsKernel
+
+
+LOGGER = Logger(logging.getLogger('metrics'))
+coloredlogs.install(level='E', logger=LOGGER.logger(), fmt=Logger.log_format)
+
+
+class BetweennessCentralityMetric(GraphMetric):
+    """The betweenness centrality of every node, i.e. the fraction of shortest dependency paths that pass through a node. The shortest paths
+    are only followed from a configured number of sampled nodes, so that the metric stays fast on large graphs.
+    """
+
+    class Keys(EnumLowerKebabCase):
+        BETWEENNESS_CENTRALITY_DEPENDENCY_GRAPH = auto()
+        MAX_BETWEENNESS_CENTRALITY_DEPENDENCY_GRAPH = auto()
+        MAX_BETWEENNESS_CENTRALITY_NAME_DEPENDENCY_GRAPH = auto()
+
+        BETWEENNESS_CENTRALITY_INHERITANCE_GRAPH = auto()
+        MAX_BETWEENNESS_CENTRALITY_INHERITANCE_GRAPH = auto()
+        MAX_BETWEENNESS_CENTRALITY_NAME_INHERITANCE_GRAPH = auto()
+
+        BETWEENNESS_CENTRALITY_COMPLETE_GRAPH = auto()
+        MAX_BETWEENNESS_CENTRALITY_COMPLETE_GRAPH = auto()
+        MAX_BETWEENNESS_CENTRALITY_NAME_COMPLETE_GRAPH = auto()
+
+    def calculate_from_results(self, results: Dict[str, AbstractResult]):
+        self._calculate_metric_data()
+
+    def _calculate_metric_data(self):
+        graph_instance: GraphRepresentation
+
+        for graph_instance in self.graph_representations:
+            graph_name = self.graph_key_name(graph_instance.graph_type)
+            if graph_name is None:
+                continue
+
+            kernel = GraphMetricsKernel.for_graph_representation(graph_instance)
+            if kernel.number_of_nodes == 0:
+                LOGGER.error('graph representation has no nodes, skipping betweenness centrality')
+                continue
+
+            LOGGER.debug(f'sampling shortest paths from {min(self.analysis.betweenness_samples, kernel.number_of_nodes)} nodes '
+                         f'of {graph_instance.graph_type.name}')
+            centralities = kernel.sampled_betweenness(self.analysis.betweenness_samples, self.analysis.betweenness_random_seed)
+            centrality_key = self.Keys[f'BETWEENNESS_CENTRALITY_{graph_name}'].value
+            for node_with_unique_result_name, centrality in zip(kernel.nodes, centralities.tolist()):
+                self.add_local_data(node_with_unique_result_name, {centrality_key: centrality})
+
+            biggest_centrality_index = int(np.argmax(centralities))
+            self.overall_data.update({
+                self.Keys[f'MAX_BETWEENNESS_CENTRALITY_{graph_name}'].value: float(centralities[biggest_centrality_index]),
+                self.Keys[f'MAX_BETWEENNESS_CENTRALITY_NAME_{graph_name}'].value: kernel.nodes[biggest_centrality_index],
+            })
@@ -0,0 +1,225 @@
+"""
+Contains the CodeMetricsKernel, which computes the source lines of code, the whitespace complexity and the number of methods of results
+in one fused pass. Lines are not split into strings, the sources of many results are concatenated into one array of code points and every
+line based count is computed with NumPy over arrays of line boundaries.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+from typing import Any, Dict, Iterator, List, Mapping, Sequence, Tuple
+from enum import Enum, unique, auto
+from weakref import WeakKeyDictionary
+
+import numpy as np
+
+from emerge.abstractresult import AbstractResult
+
+
+# all characters for which str.isspace() is true
+WHITESPACE_CHARACTERS = '\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a' \
+                        '\u2028\u2029\u202f\u205f\u3000'
+
+# all characters at which str.splitlines() splits, where \r\n is a single line break
+LINE_BREAK_CHARACTERS = '\n\x0b\x0c\r\x1c\x1d\x1e\x85\u2028\u2029'
+
+
+def _character_table(characters: str) -> np.ndarray:
+    """Returns a lookup table of the characters by code point, where every larger code point is looked up at the last (unset) entry."""
+    table = np.zeros(max(ord(c) for c in characters) + 2, dtype=bool)
+    table[[ord(c) for c in characters]] = True
+    return table
+
+
+_WHITESPACE_TABLE = _character_table(WHITESPACE_CHARACTERS)
+_LINE_BREAK_TABLE = _character_table(LINE_BREAK_CHARACTERS)
+_NEWLINE, _CARRIAGE_RETURN, _TAB, _SPACE = ord('\n'), ord('\r'), ord('\t'), ord(' ')
+
+
+def _concatenate(texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns the code points of all texts, each followed by a newline, and the offset of every text."""
+    lengths = np.fromiter((len(text) + 1 for text in texts), dtype=np.int64, count=len(texts))
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    codes = np.frombuffer(('\n'.join(texts) + '\n').encode('utf-32-le', 'surrogatepass'), dtype='<u4')
+    return codes, offsets
+
+
+def _lookup(table: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    return table[np.minimum(codes, len(table) - 1)]
+
+
+def _cumulative_count(flags: np.ndarray) -> np.ndarray:
+    """Returns the number of set flags before every position (and in total at the end), to count them in any range by a subtraction."""
+    return np.concatenate(([0], np.cumsum(flags, dtype=np.int64)))
+
+
+def _occurrences(codes: np.ndarray, keyword: str) -> np.ndarray:
+    """Returns the positions at which the keyword starts."""
+    occurrences = np.zeros(len(codes), dtype=bool)
+    candidates = len(codes) - len(keyword) + 1
+    if candidates > 0:
+        matches = codes[:candidates] == ord(keyword[0])
+        for index, character in enumerate(keyword[1:], start=1):
+            matches &= codes[index:index + candidates] == ord(character)
+        occurrences[:candidates] = matches
+    return occurrences
+
+
+def _lines_containing(codes: np.ndarray, keyword: str, line_starts: np.ndarray, line_ends: np.ndarray) -> np.ndarray:
+    if not keyword:
+        return np.ones(len(line_starts), dtype=bool)
+
+    # a keyword never contains a line break, so every occurrence lies within the line in which it starts
+    occurrences = _cumulative_count(_occurrences(codes, keyword))
+    return occurrences[line_ends] > occurrences[line_starts]
+
+
+def count_source_lines(texts: Sequence[str], line_comment: str, start_block_comment: str, stop_block_comment: str) -> List[int]:
+    """Counts the source lines of every text exactly like TokenStream.count_source_lines() counts them for the lines of text.splitlines()."""
+    if not texts:
+        return []
+    codes, offsets = _concatenate(texts)
+
+    # every line ends at a line break, since every text is followed by a newline
+    is_line_break = _lookup(_LINE_BREAK_TABLE, codes)
+    crlf = np.zeros(len(codes), dtype=bool)
+    crlf[:-1] = (codes[:-1] == _CARRIAGE_RETURN) & (codes[1:] == _NEWLINE)
+    is_line_break[1:] &= ~crlf[:-1]
+    line_ends = np.flatnonzero(is_line_break)
+    line_starts = np.concatenate(([0], (line_ends + 1 + crlf[line_ends])[:-1]))
+
+    # blank lines contain only whitespace, any other line is a line comment if its first non whitespace character starts a line comment
+    is_whitespace = _lookup(_WHITESPACE_TABLE, codes)
+    non_whitespace = _cumulative_count(~is_whitespace)
+    blank = non_whitespace[line_ends] == non_whitespace[line_starts]
+
+    non_whitespace_positions = np.flatnonzero(~is_whitespace)
+    if line_comment and len(non_whitespace_positions) > 0:
+        first_positions = non_whitespace_positions[np.minimum(np.searchsorted(non_whitespace_positions, line_starts),
+                                                              len(non_whitespace_positions) - 1)]
+        line_comments = ~blank & _occurrences(codes, line_comment)[first_positions]
+    else:
+        line_comments = ~blank if not line_comment else np.zeros(len(line_starts), dtype=bool)
+
+    starts = _lines_containing(codes, start_block_comment, line_starts, line_ends)
+    stops = _lines_containing(codes, stop_block_comment, line_starts, line_ends)
+    opens = starts & ~stops
+    closes = stops & ~starts
+
+    # a line is within a block comment, if the last line that opened or closed a block comment in the same text opened one
+    line_texts = np.searchsorted(offsets, line_starts, side='right') - 1
+    first_lines = np.searchsorted(line_starts, offsets)
+    last_events = np.maximum.accumulate(np.where(opens | closes, np.arange(len(line_starts)), -1))
+    in_block_comment = (last_events >= first_lines[line_texts]) & opens[np.maximum(last_events, 0)]
+
+    source_lines = ~(starts | stops | line_comments | blank | in_block_comment)
+    return np.bincount(line_texts, weights=source_lines, minlength=len(texts)).astype(np.int64).tolist()
+
+
+def whitespace_complexities(texts: Sequence[str]) -> List[Any]:
+    """Computes the whitespace complexity of every text exactly like WhitespaceMetric.calculate_complexity_in() does for the lines of
+    text.split('\\n'): every line that contains code adds its leading tabs and a quarter of its leading spaces.
+    """
+    if not texts:
+        return []
+    codes, offsets = _concatenate(texts)
+
+    line_ends = np.flatnonzero(codes == _NEWLINE)
+    line_starts = np.concatenate(([0], line_ends[:-1] + 1))
+    line_texts = np.searchsorted(offsets, line_starts, side='right') - 1
+
+    non_whitespace = _cumulative_count(~_lookup(_WHITESPACE_TABLE, codes))
+    code_lines = non_whitespace[line_ends] > non_whitespace[line_starts]
+
+    # the indentation ends at the first character that is neither a tab nor a space, at the latest at the newline
+    is_tab = codes == _TAB
+    indentation_ends_at = np.flatnonzero(~(is_tab | (codes == _SPACE)))
+    indentation_ends = indentation_ends_at[np.searchsorted(indentation_ends_at, line_starts)]
+    tabs = _cumulative_count(is_tab)
+    leading_tabs = tabs[indentation_ends] - tabs[line_starts]
+    leading_spaces = indentation_ends - line_starts - leading_tabs
+
+    number_of_code_lines = np.bincount(line_texts, weights=code_lines, minlength=len(texts))
+    total_tabs = np.bincount(line_texts, weights=leading_tabs * code_lines, minlength=len(texts)).astype(np.int64)
+    total_spaces = np.bincount(line_texts, weights=leading_spaces * code_lines, minlength=len(texts)).astype(np.int64)
+
+    # the sum of an empty list of line complexities is the integer 0
+    return [int(t) + int(s) / 4 if lines else 0 for t, s, lines in zip(total_tabs, total_spaces, number_of_code_lines)]
+
+
+class CodeMetricsKernel:
+    """Computes the values of all code metrics that are configured for the same results (file or entity results) in one pass, as soon as
+    the first of them asks for its values. The metrics are thin views over the values of the kernel and only declare which value they need
+    (KERNEL_VALUE) and its language specific parameters. Results are processed in batches of a bounded number of characters.
+    """
+
+    @unique
+    class Value(Enum):
+        SOURCE_LINES_OF_CODE = auto()
+        WHITESPACE_COMPLEXITY = auto()
+        NUMBER_OF_METHODS = auto()
+
+    MAX_BATCH_CHARACTERS = 1 << 22
+
+    _kernels: 'WeakKeyDictionary[Any, CodeMetricsKernel]' = WeakKeyDictionary()
+
+    def __init__(self, analysis):
+        self._analysis = analysis
+        self._values: Dict[CodeMetricsKernel.Value, Dict[AbstractResult, Any]] = {value: {} for value in CodeMetricsKernel.Value}
+
+    @classmethod
+    def for_analysis(cls, analysis) -> 'CodeMetricsKernel':
+        """Returns the kernel that is shared by all code metrics of an analysis."""
+        if analysis not in cls._kernels:
+            cls._kernels[analysis] = CodeMetricsKernel(analysis)
+        return cls._kernels[analysis]
+
+    def values(self, metric, results: Mapping[str, AbstractResult]) -> Dict[AbstractResult, Any]:
+        """Returns the values of a metric for all results, the values of all fused metrics are computed if any of them is missing."""
+        values = self._values[metric.KERNEL_VALUE]
+        missing_results = [result for result in results.values() if result not in values]
+        if missing_results:
+            self._calculate(self._fused_metrics(metric), missing_results)
+        return values
+
+    def _fused_metrics(self, metric) -> List:
+        """Returns all kernel metrics that are configured for the same results as the given metric, or just the given metric."""
+        for configured_metrics in [self._analysis.metrics_for_file_results, self._analysis.metrics_for_entity_results]:
+            if any(configured_metric is metric for configured_metric in configured_metrics.values()):
+                return [m for m in configured_metrics.values() if hasattr(m, 'KERNEL_VALUE')]
+        return [metric]
+
+    def _batches(self, results: List[AbstractResult]) -> Iterator[List[AbstractResult]]:
+        batch: List[AbstractResult] = []
+        characters = 0
+        for result in results:
+            batch.append(result)
+            characters += len(result.token_stream.source) if result.token_stream is not None else 0
+            if characters >= self.MAX_BATCH_CHARACTERS:
+                yield batch
+                batch, characters = [], 0
+        if batch:
+            yield batch
+
+    def _calculate(self, metrics: List, results: List[AbstractResult]) -> None:
+        for batch in self._batches(results):
+            for metric in metrics:
+                values = self._values[metric.KERNEL_VALUE]
+
+                if metric.KERNEL_VALUE is CodeMetricsKernel.Value.SOURCE_LINES_OF_CODE:
+                    results_by_comment_keywords: Dict[Tuple[str, str, str], List[AbstractResult]] = {}
+                    for result in batch:
+                        results_by_comment_keywords.setdefault(metric.comment_keywords(result), []).append(result)
+                    for comment_keywords, keyword_results in results_by_comment_keywords.items():
+                        source_lines = count_source_lines([result.token_stream.source for result in keyword_results], *comment_keywords)
+                        values.update(zip(keyword_results, source_lines))
+
+                if metric.KERNEL_VALUE is CodeMetricsKernel.Value.WHITESPACE_COMPLEXITY:
+                    sources = {result: result.source for result in batch}
+                    values.update((result, None) for result, source in sources.items() if source is None)
+                    results_with_source = [result for result, source in sources.items() if source is not None]
+                    values.update(zip(results_with_source, whitespace_complexities([sources[result] for result in results_with_source])))
+
+                if metric.KERNEL_VALUE is CodeMetricsKernel.Value.NUMBER_OF_METHODS:
+                    for result in batch:
+                        values[result] = sum(1 for _ in metric.method_expression(result).finditer(result.token_stream.source))
@@ -11,15 +11,16 @@ from enum import auto
 import logging
 import coloredlogs
 
-from networkx import DiGraph
+import numpy as np
 
 from emerge.abstractresult import AbstractResult
 from emerge.log import Logger
-from emerge.graph import GraphRepresentation, GraphType
+from emerge.graph import GraphRepresentation
 
 # enums and superclass of the given metric
 from emerge.metrics.abstractmetric import EnumLowerKebabCase
 from emerge.metrics.metrics import GraphMetric
+from emerge.metrics.graphkernel import GraphMetricsKernel
 
 
 LOGGER = Logger(logging.getLogger('metrics'))
@@ -60,79 +61,38 @@ class FanInOutMetric(GraphMetric):
         self._calculate_metric_data()
 
     def _calculate_metric_data(self):
-        metric_keys: Dict[str, str] = {}
-        instances = [x for x in [self.dependency_graph_representation, self.inheritance_graph_representation, self.complete_graph_representation] if x]
         graph_instance: GraphRepresentation
 
-        for graph_instance in instances:
-            digraph: DiGraph = graph_instance.digraph
-            average_fan_in, average_fan_out = 0, 0
+        for graph_instance in self.graph_representations:
+            graph_name = self.graph_key_name(graph_instance.graph_type)
+            if graph_name is None:
+                continue
 
-            for node_with_unique_result_name in digraph.nodes:
-
-                fan_in = digraph.in_degree(node_with_unique_result_name)
-                fan_out = digraph.out_degree(node_with_unique_result_name)
-
-                LOGGER.debug(f'fan-in for {node_with_unique_result_name}: {fan_in}')
-                LOGGER.debug(f'fan-out for {node_with_unique_result_name}: {fan_out}')
-
-                if graph_instance.graph_type == GraphType.ENTITY_RESULT_DEPENDENCY_GRAPH or graph_instance.graph_type == GraphType.FILE_RESULT_DEPENDENCY_GRAPH:
-                    metric_keys = {'fan-in': self.Keys.FAN_IN_DEPENDENCY_GRAPH.value, 'fan-out': self.Keys.FAN_OUT_DEPENDENCY_GRAPH.value,
-                                   'avg-fan-in': self.Keys.AVG_FAN_IN_DEPENDENCY_GRAPH.value, 'avg-fan-out': self.Keys.AVG_FAN_OUT_DEPENDENCY_GRAPH.value}
-                                   
-                if graph_instance.graph_type == GraphType.ENTITY_RESULT_INHERITANCE_GRAPH:
-                    metric_keys = {'fan-in': self.Keys.FAN_IN_INHERITANCE_GRAPH.value, 'fan-out': self.Keys.FAN_OUT_INHERITANCE_GRAPH.value,
-                                   'avg-fan-in': self.Keys.AVG_FAN_IN_INHERITANCE_GRAPH.value, 'avg-fan-out': self.Keys.AVG_FAN_OUT_INHERITANCE_GRAPH.value}
-
-                if graph_instance.graph_type == GraphType.ENTITY_RESULT_COMPLETE_GRAPH:
-                    metric_keys = {'fan-in': self.Keys.FAN_IN_COMPLETE_GRAPH.value, 'fan-out': self.Keys.FAN_OUT_COMPLETE_GRAPH.value,
-                                   'avg-fan-in': self.Keys.AVG_FAN_IN_COMPLETE_GRAPH.value, 'avg-fan-out': self.Keys.AVG_FAN_OUT_COMPLETE_GRAPH.value}
-
-                data = {metric_keys['fan-in']: fan_in, metric_keys['fan-out']: fan_out}
-                if node_with_unique_result_name in self.local_data:
-                    self.local_data[node_with_unique_result_name].update(data)
-                else:
-                    self.local_data[node_with_unique_result_name] = data
-
-                average_fan_in += fan_in
-                average_fan_out += fan_out
-
-            try:
-
-                average_fan_in /= digraph.number_of_nodes()
-                average_fan_out /= digraph.number_of_nodes()
-
-                avg_data = {metric_keys['avg-fan-in']: average_fan_in,
-                            metric_keys['avg-fan-out']: average_fan_out}
-
-                LOGGER.debug(f'average fan-in in {graph_instance.graph_type.name}: {average_fan_in}')
-                LOGGER.debug(f'average fan-out in {graph_instance.graph_type.name}: {average_fan_out}')
-
-                biggest_fan_in = sorted(digraph.in_degree, key=lambda x: x[1], reverse=True)[0]
-                biggest_fan_in_name, biggest_fan_in_degree = biggest_fan_in[0], biggest_fan_in[1]
+            kernel = GraphMetricsKernel.for_graph_representation(graph_instance)
+            if kernel.number_of_nodes == 0:
+                LOGGER.error('graph representation has no nodes, skipping average metrics')
+                continue
 
-                biggest_fan_out = sorted(digraph.out_degree, key=lambda x: x[1], reverse=True)[0]
-                biggest_fan_out_name, biggest_fan_out_degree = biggest_fan_out[0], biggest_fan_out[1]
+            fan_in_key, fan_out_key = self.Keys[f'FAN_IN_{graph_name}'].value, self.Keys[f'FAN_OUT_{graph_name}'].value
+            fan_in, fan_out = kernel.fan_in(), kernel.fan_out()
 
-                if graph_instance.graph_type == GraphType.ENTITY_RESULT_DEPENDENCY_GRAPH or graph_instance.graph_type == GraphType.FILE_RESULT_DEPENDENCY_GRAPH:
-                    avg_data[self.Keys.MAX_FAN_IN_DEPENDENCY_GRAPH.value] = biggest_fan_in_degree
-                    avg_data[self.Keys.MAX_FAN_IN_NAME_DEPENDENCY_GRAPH.value] = biggest_fan_in_name
-                    avg_data[self.Keys.MAX_FAN_OUT_DEPENDENCY_GRAPH.value] = biggest_fan_out_degree
-                    avg_data[self.Keys.MAX_FAN_OUT_NAME_DEPENDENCY_GRAPH.value] = biggest_fan_out_name
+            for node_with_unique_result_name, node_fan_in, node_fan_out in zip(kernel.nodes, fan_in.tolist(), fan_out.tolist()):
+                self.add_local_data(node_with_unique_result_name, {fan_in_key: node_fan_in, fan_out_key: node_fan_out})
 
-                if graph_instance.graph_type == GraphType.ENTITY_RESULT_INHERITANCE_GRAPH:
-                    avg_data[self.Keys.MAX_FAN_IN_INHERITANCE_GRAPH.value] = biggest_fan_in_degree
-                    avg_data[self.Keys.MAX_FAN_IN_NAME_INHERITANCE_GRAPH.value] = biggest_fan_in_name
-                    avg_data[self.Keys.MAX_FAN_OUT_INHERITANCE_GRAPH.value] = biggest_fan_out_degree
-                    avg_data[self.Keys.MAX_FAN_OUT_NAME_INHERITANCE_GRAPH.value] = biggest_fan_out_name
+            average_fan_in = int(fan_in.sum()) / kernel.number_of_nodes
+            average_fan_out = int(fan_out.sum()) / kernel.number_of_nodes
 
-                if graph_instance.graph_type == GraphType.ENTITY_RESULT_COMPLETE_GRAPH:
-                    avg_data[self.Keys.MAX_FAN_IN_COMPLETE_GRAPH.value] = biggest_fan_in_degree
-                    avg_data[self.Keys.MAX_FAN_IN_NAME_COMPLETE_GRAPH.value] = biggest_fan_in_name
-                    avg_data[self.Keys.MAX_FAN_OUT_COMPLETE_GRAPH.value] = biggest_fan_out_degree
-                    avg_data[self.Keys.MAX_FAN_OUT_NAME_COMPLETE_GRAPH.value] = biggest_fan_out_name
+            LOGGER.debug(f'average fan-in in {graph_instance.graph_type.name}: {average_fan_in}')
+            LOGGER.debug(f'average fan-out in {graph_instance.graph_type.name}: {average_fan_out}')
 
-                self.overall_data.update(avg_data)
+            # the first node with the biggest fan-in/fan-out
+            biggest_fan_in_index, biggest_fan_out_index = int(np.argmax(fan_in)), int(np.argmax(fan_out))
 
-            except ZeroDivisionError:
-                LOGGER.error('graph representation has no nodes, skipping average metrics')
+            self.overall_data.update({
+                self.Keys[f'AVG_FAN_IN_{graph_name}'].value: average_fan_in,
+                self.Keys[f'AVG_FAN_OUT_{graph_name}'].value: average_fan_out,
+                self.Keys[f'MAX_FAN_IN_{graph_name}'].value: int(fan_in[biggest_fan_in_index]),
+                self.Keys[f'MAX_FAN_IN_NAME_{graph_name}'].value: kernel.nodes[biggest_fan_in_index],
+                self.Keys[f'MAX_FAN_OUT_{graph_name}'].value: int(fan_out[biggest_fan_out_index]),
+                self.Keys[f'MAX_FAN_OUT_NAME_{graph_name}'].value: kernel.nodes[biggest_fan_out_index],
+            })
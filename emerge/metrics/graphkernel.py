@@ -0,0 +1,157 @@
+"""
+Contains the GraphMetricsKernel, which converts the directed graph of a graph representation into a SciPy CSR adjacency matrix once and
+computes the fan-in, fan-out, PageRank and sampled betweenness centrality of all nodes with NumPy and sparse matrix products on it.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+from typing import Any, List, Tuple
+from weakref import WeakKeyDictionary
+import random
+
+import numpy as np
+from networkx import DiGraph
+from scipy.sparse import csr_array
+
+from emerge.graph import GraphRepresentation
+
+
+def adjacency_matrix(digraph: DiGraph) -> Tuple[List[Any], csr_array]:
+    """Returns the nodes of a directed graph and its adjacency matrix, where row i contains the successors of the i-th node. Every edge has a
+    weight of 1, the graphs of emerge are unweighted.
+    """
+    nodes = list(digraph)
+    node_indices = {node: index for index, node in enumerate(nodes)}
+    successor_counts = np.fromiter((len(successors) for _, successors in digraph.adjacency()), dtype=np.int64, count=len(nodes))
+    indptr = np.concatenate(([0], np.cumsum(successor_counts)))
+    indices = np.fromiter((node_indices[successor] for _, successors in digraph.adjacency() for successor in successors), dtype=np.int64,
+                          count=indptr[-1])
+
+    adjacency = csr_array((np.ones(len(indices)), indices, indptr), shape=(len(nodes), len(nodes)))
+    adjacency.sort_indices()
+    return nodes, adjacency
+
+
+def page_rank(adjacency: csr_array, alpha: float = 0.85, max_iterations: int = 100, tolerance: float = 1.0e-06) -> np.ndarray:
+    """Computes the PageRank of all nodes by power iteration exactly like networkx.pagerank() without personalization. Dangling nodes
+    distribute their rank to all nodes, the iteration stops as soon as the l1 change is below number of nodes * tolerance.
+    """
+    number_of_nodes = adjacency.shape[0]
+    if number_of_nodes == 0:
+        return np.zeros(0)
+
+    out_degrees = adjacency.sum(axis=1)
+    dangling = out_degrees == 0
+    inverse_out_degrees = np.divide(1.0, out_degrees, out=np.zeros(number_of_nodes), where=~dangling)
+    # the transposed matrix with columns scaled by the inverse out-degrees, so that every iteration is one product
+    transitions = (adjacency.T @ csr_array((inverse_out_degrees, np.arange(number_of_nodes), np.arange(number_of_nodes + 1)))).tocsr()
+
+    ranks = np.full(number_of_nodes, 1.0 / number_of_nodes)
+    for _ in range(max_iterations):
+        last_ranks = ranks
+        ranks = alpha * (transitions @ ranks + ranks[dangling].sum() / number_of_nodes) + (1 - alpha) / number_of_nodes
+        if np.abs(ranks - last_ranks).sum() < number_of_nodes * tolerance:
+            break
+    return ranks
+
+
+def sampled_betweenness(adjacency: csr_array, samples: int, seed: int, batch_elements: int = 1 << 22) -> np.ndarray:
+    """Computes the normalized betweenness centrality of all nodes from the shortest paths that start at randomly sampled nodes, exactly like
+    networkx.betweenness_centrality(k=samples, seed=seed), which samples the same nodes for the same seed. All nodes are used if there are
+    no more nodes than samples. The breadth-first searches of many sources run at once as products of the matrix with dense blocks of
+    one column per source, where a block has at most batch_elements values.
+    """
+    number_of_nodes = adjacency.shape[0]
+    betweenness = np.zeros(number_of_nodes)
+    if number_of_nodes <= 2:
+        return betweenness
+
+    if samples < number_of_nodes:
+        sources = np.array(random.Random(seed).sample(range(number_of_nodes), samples), dtype=np.int64)
+    else:
+        sources = np.arange(number_of_nodes, dtype=np.int64)
+    predecessors = adjacency.T.tocsr()
+    batch_size = max(1, batch_elements // number_of_nodes)
+
+    for batch_start in range(0, len(sources), batch_size):
+        batch = sources[batch_start:batch_start + batch_size]
+        columns = np.arange(len(batch))
+
+        # forward: the depth of every node and its number of shortest paths from every source of the batch
+        depths = np.full((number_of_nodes, len(batch)), -1, dtype=np.int32)
+        depths[batch, columns] = 0
+        path_counts = np.zeros((number_of_nodes, len(batch)))
+        path_counts[batch, columns] = 1.0
+        frontier, depth = path_counts.copy(), 0
+        while True:
+            frontier = predecessors @ frontier
+            frontier[depths >= 0] = 0.0
+            reached = frontier > 0
+            if not reached.any():
+                break
+            depth += 1
+            depths[reached] = depth
+            path_counts += frontier
+
+        # backward: accumulate the dependencies of the nodes level by level, starting at the deepest level
+        dependencies = np.zeros((number_of_nodes, len(batch)))
+        for level in range(depth, 0, -1):
+            level_nodes = depths == level
+            successor_shares = np.divide(1.0 + dependencies, path_counts, out=np.zeros_like(dependencies), where=level_nodes)
+            dependencies += np.where(depths == level - 1, path_counts * (adjacency @ successor_shares), 0.0)
+
+        betweenness += np.where(depths > 0, dependencies, 0.0).sum(axis=1)
+
+    # every node is normalized by the number of source and target pairs it can be between, sampled sources are never between their own pairs
+    if len(sources) == number_of_nodes:
+        return betweenness / ((number_of_nodes - 1) * (number_of_nodes - 2))
+    scales = np.full(number_of_nodes, 1.0 / (len(sources) * (number_of_nodes - 2)))
+    if len(sources) > 1:
+        scales[sources] = 1.0 / ((len(sources) - 1) * (number_of_nodes - 2))
+    return betweenness * scales
+
+
+class GraphMetricsKernel:
+    """The nodes and the adjacency matrix of the directed graph of a graph representation, which are shared by all graph metrics of the
+    representation. The matrix is built again if the graph was replaced or changed its size since.
+    """
+
+    _kernels: 'WeakKeyDictionary[GraphRepresentation, GraphMetricsKernel]' = WeakKeyDictionary()
+
+    def __init__(self, digraph: DiGraph):
+        self._digraph = digraph
+        self._size = (digraph.number_of_nodes(), digraph.number_of_edges())
+        self.nodes, self.adjacency = adjacency_matrix(digraph)
+
+    @classmethod
+    def for_graph_representation(cls, graph_representation: GraphRepresentation) -> 'GraphMetricsKernel':
+        """Returns the kernel of the current graph of a graph representation."""
+        digraph = graph_representation.digraph
+        kernel = cls._kernels.get(graph_representation)
+        if kernel is None or not kernel.is_built_from(digraph):
+            kernel = GraphMetricsKernel(digraph)
+            cls._kernels[graph_representation] = kernel
+        return kernel
+
+    def is_built_from(self, digraph: DiGraph) -> bool:
+        """Returns True if the kernel was built from the given graph and the graph did not change its size since."""
+        return self._digraph is digraph and self._size == (digraph.number_of_nodes(), digraph.number_of_edges())
+
+    @property
+    def number_of_nodes(self) -> int:
+        return len(self.nodes)
+
+    def fan_in(self) -> np.ndarray:
+        """The number of predecessors of every node."""
+        return np.bincount(self.adjacency.indices, minlength=self.number_of_nodes)
+
+    def fan_out(self) -> np.ndarray:
+        """The number of successors of every node."""
+        return np.diff(self.adjacency.indptr)
+
+    def page_rank(self) -> np.ndarray:
+        return page_rank(self.adjacency)
+
+    def sampled_betweenness(self, samples: int, seed: int) -> np.ndarray:
+        return sampled_betweenness(self.adjacency, samples, seed)
@@ -5,7 +5,7 @@ Defines concrete metrics based on the abstract interfaces to share/hide common c
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 # interfaces for inputs
 from emerge.abstractresult import AbstractResult
@@ -78,6 +78,28 @@ class GraphMetric(AbstractGraphMetric):
     def complete_graph_representation(self, value):
         self._complete_graph_representaion = value
 
+    @property
+    def graph_representations(self) -> List[GraphRepresentation]:
+        """All existing graph representations of the metric, in the order dependency, inheritance and complete graph."""
+        return [x for x in [self._dependency_graph_representaion, self._inheritance_graph_representaion, self._complete_graph_representaion] if x]
+
+    @staticmethod
+    def graph_key_name(graph_type: GraphType) -> Optional[str]:
+        """Returns the name of a graph type in the metric keys (e.g. DEPENDENCY_GRAPH for file and entity dependency graphs) or None."""
+        if graph_type in (GraphType.ENTITY_RESULT_DEPENDENCY_GRAPH, GraphType.FILE_RESULT_DEPENDENCY_GRAPH):
+            return 'DEPENDENCY_GRAPH'
+        if graph_type == GraphType.ENTITY_RESULT_INHERITANCE_GRAPH:
+            return 'INHERITANCE_GRAPH'
+        if graph_type == GraphType.ENTITY_RESULT_COMPLETE_GRAPH:
+            return 'COMPLETE_GRAPH'
+        return None
+
+    def add_local_data(self, node_name: str, data: Dict[str, Any]):
+        if node_name in self._local_data:
+            self._local_data[node_name].update(data)
+        else:
+            self._local_data[node_name] = data
+
     @property
     def analysis(self):
         return self._analysis
@@ -0,0 +1,115 @@
+"""
+Contains the community detection algorithms of the louvain modularity metric. Every algorithm partitions an undirected graph and returns
+the community of every node (consecutive community ids, in the order of the nodes of the graph) together with the modularity of the
+partition.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+from typing import Optional, Tuple
+
+import numpy as np
+import networkx as nx
+from networkx import Graph
+from networkx.algorithms.community import louvain_communities
+from scipy.sparse import csr_array, identity
+import community as community_louvain
+
+from emerge.metrics.abstractmetric import CommunityDetection
+
+
+# algorithms that work on the networkx graph or on its adjacency matrix
+GRAPH_ALGORITHMS = {CommunityDetection.LOUVAIN, CommunityDetection.NETWORKX_LOUVAIN}
+ADJACENCY_ALGORITHMS = {CommunityDetection.NETWORKX_LOUVAIN, CommunityDetection.LABEL_PROPAGATION}
+
+LABEL_PROPAGATION_MAX_ITERATIONS = 50
+
+
+def adjacency_matrix(undirected_graph: Graph) -> csr_array:
+    """Returns the symmetric adjacency matrix of an undirected graph, in the order of its nodes and with a weight of 1 for unweighted edges."""
+    return nx.to_scipy_sparse_array(undirected_graph, nodelist=list(undirected_graph), weight='weight', dtype=np.float64, format='csr')
+
+
+def modularity(adjacency: csr_array, communities: np.ndarray) -> float:
+    """Computes the modularity of a partition exactly like python-louvain does, a self-loop adds its weight twice to the degree of its node
+    but only once to the weight within its community.
+    """
+    self_loops = adjacency.diagonal()
+    degrees = adjacency.sum(axis=1) + self_loops
+    links = degrees.sum() / 2
+    if links == 0:
+        raise ValueError('A graph without link has an undefined modularity')
+
+    coo = adjacency.tocoo()
+    within_community = communities[coo.row] == communities[coo.col]
+    inner_weights = np.bincount(communities[coo.row[within_community]], weights=coo.data[within_community], minlength=communities.max() + 1)
+    inner_weights = (inner_weights + np.bincount(communities, weights=self_loops, minlength=len(inner_weights))) / 2
+    community_degrees = np.bincount(communities, weights=degrees, minlength=len(inner_weights))
+
+    return float(np.sum(inner_weights / links - (community_degrees / (2 * links)) ** 2))
+
+
+def louvain_partition(undirected_graph: Graph, resolution: float, seed: int) -> Tuple[np.ndarray, float]:
+    """The louvain method of python-louvain."""
+    partition = community_louvain.best_partition(undirected_graph, resolution=resolution, random_state=seed)
+    communities = np.fromiter((partition[node] for node in undirected_graph), dtype=np.int64, count=len(partition))
+    return communities, community_louvain.modularity(partition, undirected_graph)
+
+
+def networkx_louvain_partition(undirected_graph: Graph, adjacency: csr_array, resolution: float, seed: int) -> Tuple[np.ndarray, float]:
+    """The louvain method of networkx."""
+    node_indices = {node: index for index, node in enumerate(undirected_graph)}
+    communities = np.empty(len(node_indices), dtype=np.int64)
+    for community_id, community_nodes in enumerate(louvain_communities(undirected_graph, resolution=resolution, seed=seed)):
+        communities[[node_indices[node] for node in community_nodes]] = community_id
+    return communities, modularity(adjacency, communities)
+
+
+def label_propagation_partition(adjacency: csr_array, seed: int) -> Tuple[np.ndarray, float]:
+    """A label propagation on the adjacency matrix, where all nodes are updated at once in every iteration. Every node takes the label with
+    the largest weight among its neighbors and itself, equal weights are decided by a seeded random priority of the labels. To avoid that
+    labels oscillate between neighbors, only a random half of the nodes takes its new label in every iteration.
+    """
+    number_of_nodes = adjacency.shape[0]
+    random = np.random.default_rng(seed)
+    priorities = random.random(number_of_nodes)
+
+    # every node votes for the labels of its neighbors (by edge weight) and for its own label
+    nodes = np.arange(number_of_nodes, dtype=np.int64)
+    voters = (adjacency + identity(number_of_nodes, format='csr')).tocsr()
+
+    labels = nodes.copy()
+    for _ in range(LABEL_PROPAGATION_MAX_ITERATIONS):
+        votes = (voters @ csr_array((np.ones(number_of_nodes), (nodes, labels)), shape=(number_of_nodes, number_of_nodes))).tocsr()
+        first_votes = votes.indptr[:-1]
+        vote_voters = np.repeat(nodes, np.diff(votes.indptr))
+
+        # among the labels with the largest weight every node takes the one with the highest priority
+        largest_weights = np.maximum.reduceat(votes.data, first_votes)
+        candidates = np.where(votes.data == largest_weights[vote_voters], priorities[votes.indices], -1.0)
+        chosen = candidates == np.maximum.reduceat(candidates, first_votes)[vote_voters]
+        new_labels = np.empty(number_of_nodes, dtype=np.int64)
+        new_labels[vote_voters[chosen]] = votes.indices[chosen]
+
+        changed = new_labels != labels
+        if not changed.any():
+            break
+        updated = changed & (random.random(number_of_nodes) < 0.5)
+        labels[updated] = new_labels[updated]
+
+    _, communities = np.unique(labels, return_inverse=True)
+    communities = communities.astype(np.int64)
+    return communities, modularity(adjacency, communities)
+
+
+def detect_communities(algorithm: CommunityDetection, undirected_graph: Optional[Graph], adjacency: Optional[csr_array], resolution: float,
+                       seed: int) -> Tuple[np.ndarray, float]:
+    """Partitions a graph with the given algorithm, which is given the networkx graph for GRAPH_ALGORITHMS and the adjacency matrix for
+    ADJACENCY_ALGORITHMS. The label propagation does not depend on a resolution.
+    """
+    if algorithm == CommunityDetection.NETWORKX_LOUVAIN:
+        return networkx_louvain_partition(undirected_graph, adjacency, resolution, seed)
+    if algorithm == CommunityDetection.LABEL_PROPAGATION:
+        return label_propagation_partition(adjacency, seed)
+    return louvain_partition(undirected_graph, resolution, seed)
@@ -5,13 +5,16 @@ Contains an implementation of the louvain modularity graph metric.
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from enum import auto
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 import logging
 import coloredlogs
 
-from networkx import DiGraph
-import community as community_louvain
+import numpy as np
+from networkx import DiGraph, Graph
+from scipy.sparse import csr_array
 
 from emerge.abstractresult import AbstractResult
 from emerge.results import FileResult, EntityResult
@@ -19,8 +22,9 @@ from emerge.log import Logger
 from emerge.graph import GraphRepresentation, GraphType
 
 # enums and superclass of the given metric
-from emerge.metrics.abstractmetric import EnumLowerKebabCase
+from emerge.metrics.abstractmetric import EnumLowerKebabCase, CommunityDetection
 from emerge.metrics.metrics import GraphMetric
+from emerge.metrics.modularity.communities import GRAPH_ALGORITHMS, ADJACENCY_ALGORITHMS, adjacency_matrix, detect_communities
 
 
 LOGGER = Logger(logging.getLogger('metrics'))
@@ -53,6 +57,32 @@ class LouvainModularityMetric(GraphMetric):
     def calculate_from_results(self, results: Dict[str, AbstractResult]):
         self._calculate_metric_data(results)
 
+    def _community_detection(self, undirected_graph: Graph) -> CommunityDetection:
+        """Returns the configured community detection algorithm, or the label propagation for graphs above the configured node threshold."""
+        if undirected_graph.number_of_nodes() > self.analysis.community_detection_node_threshold:
+            LOGGER.info(f'detecting communities of {undirected_graph.number_of_nodes()} nodes by label propagation')
+            return CommunityDetection.LABEL_PROPAGATION
+        return self.analysis.community_detection
+
+    def _optimize_partitions(self, undirected_graph: Graph) -> List[Tuple[np.ndarray, float]]:
+        """Runs all optimization runs of the community detection of a graph, every run with its own seed, in worker processes if configured.
+        Returns the community of every node (in the order of the nodes of the graph) and the modularity of every run, in the order of the runs.
+        """
+        algorithm = self._community_detection(undirected_graph)
+        seeds = [self.analysis.louvain_random_seed + run for run in range(self.analysis.louvain_optimization_runs)]
+        workers = min(self.analysis.louvain_workers, len(seeds))
+
+        # every algorithm only gets the representation of the graph it works on, the adjacency matrix is built once for all runs
+        graph = undirected_graph if algorithm in GRAPH_ALGORITHMS else None
+        adjacency = adjacency_matrix(undirected_graph) if algorithm in ADJACENCY_ALGORITHMS else None
+
+        if workers > 1:
+            LOGGER.info(f'running {len(seeds)} louvain optimization runs with {workers} worker processes')
+            with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_louvain_worker, initargs=(graph, adjacency)) as executor:
+                return list(executor.map(_optimize_partition_in_worker, repeat(algorithm), repeat(self.analysis.louvain_resolution), seeds))
+
+        return [detect_communities(algorithm, graph, adjacency, self.analysis.louvain_resolution, seed) for seed in seeds]
+
     def _calculate_metric_data(self, results: Dict[str, AbstractResult]):
         instances = [x for x in [self.dependency_graph_representation, self.inheritance_graph_representation, self.complete_graph_representation] if x]
         graph_instance: GraphRepresentation
@@ -64,45 +94,38 @@ class LouvainModularityMetric(GraphMetric):
             graph_type_name = graph_instance.graph_type.name
 
             try:
-                optimization_runs = 5
+                optimization_runs = self.analysis.louvain_optimization_runs
                 sum_communities_found, sum_modularity = 0, 0.0
                 sum_biggest_five_community_distribution = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0}
 
-                for run in range(optimization_runs):
-
-                    partition_by_louvain = community_louvain.best_partition(undirected_graph, resolution=1.5)
+                partitions = self._optimize_partitions(undirected_graph)
+                for run, (partition_by_louvain, modularity) in enumerate(partitions):
 
-                    communities_found = max(partition_by_louvain.values()) + 1
-                    modularity = community_louvain.modularity(partition_by_louvain, undirected_graph)
+                    # community ids are consecutive, count the nodes of every community at once
+                    community_sizes = np.bincount(partition_by_louvain)
+                    communities_found = len(community_sizes)
 
                     sum_communities_found += communities_found
                     sum_modularity += modularity
 
-                    # sort by community size
-                    community_sizes = {}
-                    for i in range(communities_found):
-                        community_sizes[i] = sum(map((i).__eq__, partition_by_louvain.values()))
-
-                    sorted_community_sizes = {k: v for k, v in sorted(community_sizes.items(), key=lambda item: item[1], reverse=True)}
-                    biggest_five_communities = {k: sorted_community_sizes[k] for k in list(sorted_community_sizes)[:5]}
+                    # sort by community size, equal sizes by community id
+                    sorted_community_ids = np.argsort(-community_sizes, kind='stable')
+                    biggest_five_communities = community_sizes[sorted_community_ids[:5]].tolist()
 
-                    order = 0
-                    for _, size in biggest_five_communities.items():
+                    for order, size in enumerate(biggest_five_communities):
                         sum_biggest_five_community_distribution[order] += size
-                        order += 1
 
                     # fetch community ids in the last iteration and write metric data
                     if run == optimization_runs - 1:
 
                         # renumber key/value mappings so that increasing louvain community ids are sorted with descreasing partition sizes
-                        sorted_partion_by_louvain = {}
+                        # this adds more stability to the partition if e.g. coloring by a fixed input set of colors
+                        renumbered_community_ids = np.empty(communities_found, dtype=np.int64)
+                        renumbered_community_ids[sorted_community_ids] = np.arange(communities_found)
+                        renumbered_partition = renumbered_community_ids[partition_by_louvain].tolist()
 
-                        # this adds more stability to the non-deterministic partition if e.g. coloring by a fixed input set of colors
-                        new_community_id = 0
-                        for sorted_community_id in sorted_community_sizes.keys():
-                            new_partition = {k: new_community_id for k, v in partition_by_louvain.items() if v == sorted_community_id}
-                            sorted_partion_by_louvain.update(new_partition)
-                            new_community_id += 1
+                        nodes = list(undirected_graph)
+                        sorted_partion_by_louvain = {nodes[i]: renumbered_partition[i] for i in np.argsort(renumbered_partition, kind='stable')}
 
                         for node_name, _ in sorted_partion_by_louvain.items():
                             if node_name in results:
@@ -186,3 +209,18 @@ class LouvainModularityMetric(GraphMetric):
             
             except Exception as ex: # pylint: disable=broad-except
                 LOGGER.error(f'something went wrong, skipping metric {self.metric_name}: {ex}')
+
+
+# the graph and the adjacency matrix of a louvain worker process, set once by the initializer of the process pool
+_worker_graph: Optional[Graph] = None
+_worker_adjacency: Optional[csr_array] = None
+
+
+def _initialize_louvain_worker(undirected_graph: Optional[Graph], adjacency: Optional[csr_array]):
+    # pylint: disable=global-statement
+    global _worker_graph, _worker_adjacency
+    _worker_graph, _worker_adjacency = undirected_graph, adjacency
+
+
+def _optimize_partition_in_worker(algorithm: CommunityDetection, resolution: float, seed: int) -> Tuple[np.ndarray, float]:
+    return detect_communities(algorithm, _worker_graph, _worker_adjacency, resolution, seed)
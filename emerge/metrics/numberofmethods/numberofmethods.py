@@ -21,6 +21,7 @@ from emerge.log import Logger
 # enums and interface/type of the given metric
 from emerge.metrics.abstractmetric import EnumLowerKebabCase
 from emerge.metrics.metrics import CodeMetric
+from emerge.metrics.codekernel import CodeMetricsKernel
 
 
 LOGGER = Logger(logging.getLogger('metrics'))
@@ -35,6 +36,8 @@ class NumberOfMethodsMetric(CodeMetric):
         AVG_NUMBER_OF_METHODS_IN_ENTITY = auto()
         AVG_NUMBER_OF_METHODS_IN_FILE = auto()
 
+    KERNEL_VALUE = CodeMetricsKernel.Value.NUMBER_OF_METHODS
+
     def __init__(self, analysis: Analysis):
         super().__init__(analysis)
 
@@ -65,14 +68,10 @@ class NumberOfMethodsMetric(CodeMetric):
             self.compiled_re[name] = re.compile(pattern)
 
     def _calculate_local_metric_data(self, results: Dict[str, AbstractResult]):
+        methods = CodeMetricsKernel.for_analysis(self.analysis).values(self, results)
         for _, result in results.items():
             LOGGER.debug(f'calculating metric {self.pretty_metric_name} for result {result.unique_name}')
-
-            find_method_expression = self.__get_expression(result)
-
-            LOGGER.debug(f'extracting methods from result {result.scanned_file_name}')
-            full_string = " ".join(result.scanned_tokens)
-            number_of_methods = len(find_method_expression.findall(full_string))
+            number_of_methods = methods[result]
 
             if isinstance(result, AbstractFileResult):
                 result.metrics[self.Keys.NUMBER_OF_METHODS_IN_FILE.value] = number_of_methods
@@ -110,5 +109,6 @@ class NumberOfMethodsMetric(CodeMetric):
             self.overall_data[self.Keys.AVG_NUMBER_OF_METHODS_IN_ENTITY.value] = average_methods_in_entity
             LOGGER.debug(f'average method count per entity: {average_methods_in_entity}')
 
-    def __get_expression(self, result: AbstractResult) -> Pattern:
+    def method_expression(self, result: AbstractResult) -> Pattern:
+        """Returns the expression that finds the methods in the source of a result."""
         return self.compiled_re[result.scanned_language.name]
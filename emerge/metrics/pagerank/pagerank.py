@@ -0,0 +1,73 @@
+"""
+Contains the implementation of the PageRank graph metric.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+from typing import Dict
+from enum import auto
+
+import logging
+import coloredlogs
+
+import numpy as np
+
+from emerge.abstractresult import AbstractResult
+from emerge.log import Logger
+from emerge.graph import GraphRepresentation
+
+# enums and superclass of the given metric
+from emerge.metrics.abstractmetric import EnumLowerKebabCase
+from emerge.metrics.metrics import GraphMetric
+from emerge.metrics.graphkernel import GraphMetricsKernel
+
+
+LOGGER = Logger(logging.getLogger('metrics'))
+coloredlogs.install(level='E', logger=LOGGER.logger(), fmt=Logger.log_format)
+
+
+class PageRankMetric(GraphMetric):
+    """The PageRank of every node, i.e. how likely a random walk along the dependencies ends up in a node. Nodes that many (important)
+    nodes depend on get a high PageRank.
+    """
+
+    class Keys(EnumLowerKebabCase):
+        PAGE_RANK_DEPENDENCY_GRAPH = auto()
+        MAX_PAGE_RANK_DEPENDENCY_GRAPH = auto()
+        MAX_PAGE_RANK_NAME_DEPENDENCY_GRAPH = auto()
+
+        PAGE_RANK_INHERITANCE_GRAPH = auto()
+        MAX_PAGE_RANK_INHERITANCE_GRAPH = auto()
+        MAX_PAGE_RANK_NAME_INHERITANCE_GRAPH = auto()
+
+        PAGE_RANK_COMPLETE_GRAPH = auto()
+        MAX_PAGE_RANK_COMPLETE_GRAPH = auto()
+        MAX_PAGE_RANK_NAME_COMPLETE_GRAPH = auto()
+
+    def calculate_from_results(self, results: Dict[str, AbstractResult]):
+        self._calculate_metric_data()
+
+    def _calculate_metric_data(self):
+        graph_instance: GraphRepresentation
+
+        for graph_instance in self.graph_representations:
+            graph_name = self.graph_key_name(graph_instance.graph_type)
+            if graph_name is None:
+                continue
+
+            kernel = GraphMetricsKernel.for_graph_representation(graph_instance)
+            if kernel.number_of_nodes == 0:
+                LOGGER.error('graph representation has no nodes, skipping page rank')
+                continue
+
+            page_ranks = kernel.page_rank()
+            page_rank_key = self.Keys[f'PAGE_RANK_{graph_name}'].value
+            for node_with_unique_result_name, page_rank in zip(kernel.nodes, page_ranks.tolist()):
+                self.add_local_data(node_with_unique_result_name, {page_rank_key: page_rank})
+
+            biggest_page_rank_index = int(np.argmax(page_ranks))
+            self.overall_data.update({
+                self.Keys[f'MAX_PAGE_RANK_{graph_name}'].value: float(page_ranks[biggest_page_rank_index]),
+                self.Keys[f'MAX_PAGE_RANK_NAME_{graph_name}'].value: kernel.nodes[biggest_page_rank_index],
+            })
@@ -5,7 +5,7 @@ Contains the implementation of the source lines of code metric.
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import List, Dict
+from typing import Dict, Tuple
 from enum import Enum, auto
 import logging
 
@@ -21,6 +21,7 @@ from emerge.log import Logger
 # enums and interface/type of the given metric
 from emerge.metrics.abstractmetric import EnumLowerKebabCase
 from emerge.metrics.metrics import CodeMetric
+from emerge.metrics.codekernel import CodeMetricsKernel
 
 
 LOGGER = Logger(logging.getLogger('metrics'))
@@ -58,6 +59,8 @@ class SourceLinesOfCodeMetric(CodeMetric):
         TOTAL_SLOC_IN_FILES = auto()
         TOTAL_SLOC_IN_ENTITIES = auto()
 
+    KERNEL_VALUE = CodeMetricsKernel.Value.SOURCE_LINES_OF_CODE
+
     # def __init__(self, analysis: Analysis):
     #     super().__init__(analysis)
 
@@ -66,13 +69,10 @@ class SourceLinesOfCodeMetric(CodeMetric):
         self._calculate_global_metric_data(results)
 
     def _calculate_local_metric_data(self, results: Dict[str, AbstractResult]):
+        source_lines_of_code = CodeMetricsKernel.for_analysis(self.analysis).values(self, results)
         for _, result in results.items():
             LOGGER.debug(f'calculating metric {self.pretty_metric_name} for result {result.unique_name}')
-            comment_types = self.__get_comment_types(result)
-            sloc = self._count_sloc(result.scanned_tokens,
-                                    comment_types[CommentKeyword.LINE_COMMENT.name],
-                                    comment_types[CommentKeyword.START_BLOCK_COMMENT.name],
-                                    comment_types[CommentKeyword.STOP_BLOCK_COMMENT.name])
+            sloc = source_lines_of_code[result]
 
             if isinstance(result, AbstractFileResult):
                 result.metrics[self.Keys.SLOC_IN_FILE.value] = sloc
@@ -110,32 +110,12 @@ class SourceLinesOfCodeMetric(CodeMetric):
             self.overall_data[self.Keys.TOTAL_SLOC_IN_ENTITIES.value] = total_sloc_count
             LOGGER.debug(f'average sloc per entity: {total_sloc_count}/{average_sloc_in_entity}')
 
-    def _count_sloc(self, list_of_tokens: List[str], line_comment: str, start_block_comment: str, stop_block_comment: str) -> int:
-        source = " ".join(list_of_tokens)
-        source_lines = source.splitlines()
-        source_lines_without_comments = []
-        active_block_comment = False
-
-        for line in source_lines:
-            # starting a block comment
-            if start_block_comment in line and stop_block_comment not in line:
-                active_block_comment = True
-                continue
-            # stopping a block comment
-            if start_block_comment not in line and stop_block_comment in line:
-                active_block_comment = False
-                continue
-            # one line block comment
-            if start_block_comment in line and stop_block_comment in line:
-                continue
-            # regular line comment
-            if line.strip().startswith(line_comment):
-                continue
-
-            if not active_block_comment and line.strip():
-                source_lines_without_comments.append(line)
-
-        return len(source_lines_without_comments)
+    def comment_keywords(self, result: AbstractResult) -> Tuple[str, str, str]:
+        """Returns the line comment, start block comment and stop block comment keywords of the language of a result."""
+        comment_types = self.__get_comment_types(result)
+        return (comment_types[CommentKeyword.LINE_COMMENT.name],
+                comment_types[CommentKeyword.START_BLOCK_COMMENT.name],
+                comment_types[CommentKeyword.STOP_BLOCK_COMMENT.name])
 
     def __get_comment_types(self, result: AbstractResult):
         if result.scanned_language == LanguageType.C:
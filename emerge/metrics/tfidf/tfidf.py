@@ -5,13 +5,15 @@ Contains an implemetation of a TF/IDF metric to extract semantic keywords from s
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import Dict, Any
+from typing import Dict, Any, Set, Iterator, List, Tuple
 
 import logging
 import coloredlogs
+import numpy as np
 from sklearn.exceptions import NotFittedError
 
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer, HashingVectorizer
+from sklearn.preprocessing import normalize
 
 # interfaces for inputs
 from emerge.analysis import Analysis
@@ -19,6 +21,7 @@ from emerge.abstractresult import AbstractResult
 from emerge.log import Logger
 
 # enums and interface/type of the given metric
+from emerge.metrics.abstractmetric import TFIDFMode
 from emerge.metrics.metrics import CodeMetric
 
 LOGGER = Logger(logging.getLogger('metrics'))
@@ -27,8 +30,16 @@ coloredlogs.install(level='E', logger=LOGGER.logger(), fmt=Logger.log_format)
 class TFIDFMetric(CodeMetric):
     """Provides a metric based on TF-IDF to extract semantic keywords from source code."""
 
-    def __init__(self, analysis: Analysis):
+    MIN_SCORE = 0.2
+    MAX_TOKENS = 7
+
+    # the streaming mode processes this many documents at once and hashes every word to one of this many features
+    CHUNK_SIZE = 10_000
+    NUMBER_OF_FEATURES = 1 << 20
+
+    def __init__(self, analysis: Analysis, mode: TFIDFMode = TFIDFMode.EXACT):
         super().__init__(analysis)
+        self.mode = mode
         self.result_tokens: Dict[str, Any] = {}
 
         # pylint: disable=line-too-long
@@ -58,61 +69,139 @@ class TFIDFMetric(CodeMetric):
         return 'tfidf metric'
 
     def calculate_from_results(self, results: Dict[str, AbstractResult]):
-        self.read_tokens_from_results(results)
-        self.calculate_tfidf()
+        if self.mode == TFIDFMode.STREAMING:
+            self.calculate_streaming_tfidf(results)
+        else:
+            self.read_tokens_from_results(results)
+            self.calculate_tfidf()
 
     def read_tokens_from_results(self, results: Dict[str, AbstractResult]):
         """Read tokens from results, perform preprocessing and store them locally in self.result_tokens."""
+        self.result_tokens.update(self._documents_from_results(results))
+
+    def _documents_from_results(self, results: Dict[str, AbstractResult]) -> Iterator[Tuple[str, str]]:
+        """Yields the unique name and the preprocessed words (lowercased, alphabetic and no stopwords) of every result as one document."""
+        excluded_words_by_language: Dict[str, Set[str]] = {}
+
         for _, result in results.items():
-            tokens_as_string = ''
-            
-            for token in result.scanned_tokens:
-                if token.isalpha() and (token.lower() not in self.stopwords) \
-                and (token.lower() not in self.language_specific_stopwords[result.scanned_language.name]):
-                    tokens_as_string += token.lower()
-                    tokens_as_string += ' '
+            language = result.scanned_language.name
+            if language not in excluded_words_by_language:
+                excluded_words_by_language[language] = self.stopwords | self.language_specific_stopwords[language]
+            excluded_words = excluded_words_by_language[language]
 
-            self.result_tokens[result.unique_name] = tokens_as_string
+            words = [word for word in (token.lower() for token in result.scanned_tokens if token.isalpha()) if word not in excluded_words]
 
+            # every word is followed by a single space
+            yield result.unique_name, ''.join(f'{word} ' for word in words)
 
     def calculate_tfidf(self):
-        """this is where the actual calculation of TF-IDF takes place. This is done via scikit-learn and TfidfVectorizer.
-        After calculating the semantic keywords for any source code file or entity, we sort them by TF-IDF score and
-        store up to max_tokens in the local_data of this metric, to further be collected from the analysis.
+        """this is where the actual calculation of TF-IDF takes place. This is done via scikit-learn, by counting the words of all
+        documents once and weighting the counts by TF-IDF. After calculating the semantic keywords for any source code file or entity,
+        we select up to MAX_TOKENS keywords with a score above MIN_SCORE from its row of the sparse TF-IDF matrix, ordered by score,
+        and store them in the local_data of this metric, to further be collected from the analysis.
         """
 
-        tfidf = TfidfVectorizer()
-        sorted_tfidf = {}
-        
+        count_vectorizer = CountVectorizer()
+
         try:
-            tfidf.fit_transform(self.result_tokens.values())
-            feature_names = tfidf.get_feature_names_out()
+            counts = count_vectorizer.fit_transform(self.result_tokens.values())
+            feature_names = count_vectorizer.get_feature_names_out()
         except (ValueError, NotFittedError) as ex:
             LOGGER.error(f'something went wrong, skipping metric {self.pretty_metric_name}: {ex}')
             return
-          
-        for name, _ in self.result_tokens.items():
 
-            if not name in sorted_tfidf:
-                sorted_tfidf[name] = {}
-            
-            response = tfidf.transform([self.result_tokens[name]])
-            
-            for col in response.nonzero()[1]:
-                sorted_tfidf[name][feature_names[col]] = response[0, col]
+        # with sorted indices every row is normalized in the same order as a single transformed document, so the scores are identical
+        counts.sort_indices()
+        tfidf_matrix = TfidfTransformer().fit_transform(counts)
 
-            ordered_tfidf_by_name = {k: v for k, v in sorted(sorted_tfidf[name].items(), key=lambda item: item[1], reverse=True)}
+        for row, name in enumerate(self.result_tokens.keys()):
+            start, stop = tfidf_matrix.indptr[row], tfidf_matrix.indptr[row + 1]
+            scores, columns = tfidf_matrix.data[start:stop], tfidf_matrix.indices[start:stop]
 
             tfidf_metric_token_dict = {}
-            min_score = 0.2
-            max_tokens = 7
-            count_tokens = 1
-            for key, value in ordered_tfidf_by_name.items():
-                if min_score < value and count_tokens <= max_tokens:
-                    tfidf_metric_token_dict['tag_' + key] = value
-                    count_tokens += 1
-
-            if name in self.local_data:
-                self.local_data[name].update(tfidf_metric_token_dict)
-            else:
-                self.local_data[name] = tfidf_metric_token_dict
+            for index in self._top_scores(scores, columns):
+                tfidf_metric_token_dict['tag_' + feature_names[columns[index]]] = scores[index]
+            self._add_tags(name, tfidf_metric_token_dict)
+
+    def calculate_streaming_tfidf(self, results: Dict[str, AbstractResult]):
+        """Calculates the same keywords as calculate_tfidf(), but without keeping the words of all documents or a vocabulary in memory.
+        Every word is hashed to one of NUMBER_OF_FEATURES features and the documents are preprocessed and vectorized from the results in
+        chunks of CHUNK_SIZE documents, twice: the first pass counts the documents that contain every feature, the second pass weights
+        the counts of every chunk by TF-IDF and selects its keywords. Words that are hashed to the same feature share their score.
+        """
+
+        vectorizer = HashingVectorizer(n_features=self.NUMBER_OF_FEATURES, analyzer=self._terms, alternate_sign=False, norm=None)
+
+        document_frequencies = np.zeros(self.NUMBER_OF_FEATURES, dtype=np.int64)
+        number_of_documents = 0
+        for chunk in self._chunks(results):
+            counts = vectorizer.transform(document for _, document in chunk)
+            document_frequencies += np.bincount(counts.indices, minlength=self.NUMBER_OF_FEATURES)
+            number_of_documents += len(chunk)
+
+        if not document_frequencies.any():
+            LOGGER.error(f'something went wrong, skipping metric {self.pretty_metric_name}: no terms in {number_of_documents} documents')
+            return
+
+        # the smoothed inverse document frequency of the exact mode
+        inverse_document_frequencies = np.log((1 + number_of_documents) / (1 + document_frequencies)) + 1
+
+        for chunk in self._chunks(results):
+            tfidf_matrix = vectorizer.transform(document for _, document in chunk).astype(np.float64)
+            tfidf_matrix.data *= inverse_document_frequencies[tfidf_matrix.indices]
+            normalize(tfidf_matrix, copy=False)
+
+            # the feature of every term in this chunk, hashed just like the documents
+            vocabulary = sorted({term for _, document in chunk for term in self._terms(document)})
+            term_features = dict(zip(vocabulary, vectorizer.transform(vocabulary).indices))
+
+            for row, (name, document) in enumerate(chunk):
+                start, stop = tfidf_matrix.indptr[row], tfidf_matrix.indptr[row + 1]
+                scores, columns = tfidf_matrix.data[start:stop], tfidf_matrix.indices[start:stop]
+
+                # the first of all words of this document that are hashed to the same feature names it
+                feature_terms: Dict[int, str] = {}
+                for term in sorted(set(self._terms(document)), reverse=True):
+                    feature_terms[term_features[term]] = term
+                terms = np.array([feature_terms[column] for column in columns], dtype=str)
+
+                tfidf_metric_token_dict = {}
+                for index in self._top_scores(scores, terms):
+                    tfidf_metric_token_dict['tag_' + terms[index]] = scores[index]
+                self._add_tags(name, tfidf_metric_token_dict)
+
+    def _chunks(self, results: Dict[str, AbstractResult]) -> Iterator[List[Tuple[str, str]]]:
+        chunk: List[Tuple[str, str]] = []
+        for name, document in self._documents_from_results(results):
+            chunk.append((name, document))
+            if len(chunk) == self.CHUNK_SIZE:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _terms(document: str) -> List[str]:
+        """Returns the terms of a document like the vectorizer of the exact mode, which only accepts words of at least two characters."""
+        return [word for word in document.split(' ') if len(word) > 1]
+
+    def _add_tags(self, name: str, tfidf_metric_token_dict: Dict[str, Any]):
+        if name in self.local_data:
+            self.local_data[name].update(tfidf_metric_token_dict)
+        else:
+            self.local_data[name] = tfidf_metric_token_dict
+
+    def _top_scores(self, scores: np.ndarray, features: np.ndarray) -> np.ndarray:
+        """Returns the indices of up to MAX_TOKENS scores above MIN_SCORE, ordered by descending score and equal scores by feature."""
+        selected = np.flatnonzero(scores > self.MIN_SCORE)
+
+        if len(selected) > self.MAX_TOKENS:
+            # all scores above the smallest selected score are selected, and as many equal scores as fit, in the order of their features
+            partitioned = selected[np.argpartition(-scores[selected], self.MAX_TOKENS - 1)]
+            smallest_score = scores[partitioned[self.MAX_TOKENS - 1]]
+            above = selected[scores[selected] > smallest_score]
+            equal = selected[scores[selected] == smallest_score]
+            equal = equal[np.argsort(features[equal], kind='stable')][:self.MAX_TOKENS - len(above)]
+            selected = np.concatenate((above, equal))
+
+        return selected[np.lexsort((features[selected], -scores[selected]))]
@@ -21,6 +21,7 @@ from emerge.log import Logger
 # enums and interface/type of the given metric
 from emerge.metrics.abstractmetric import EnumLowerKebabCase
 from emerge.metrics.metrics import CodeMetric
+from emerge.metrics.codekernel import CodeMetricsKernel
 
 LOGGER = Logger(logging.getLogger('metrics'))
 coloredlogs.install(level='E', logger=LOGGER.logger(), fmt=Logger.log_format)
@@ -31,20 +32,25 @@ class WhitespaceMetric(CodeMetric):
     class Keys(EnumLowerKebabCase):
         WS_COMPLEXITY_IN_FILE = auto()
 
+    KERNEL_VALUE = CodeMetricsKernel.Value.WHITESPACE_COMPLEXITY
+
     def __init__(self, analysis: Analysis):
         super().__init__(analysis)
 
         self.leading_tabs_expr = re.compile(r'^(\t+)')
         self.leading_spaces_expr = re.compile(r'^( +)')
         self.empty_line_expr = re.compile(r'^\s*$')
+        self.spaces_expr = re.compile(r' +')
+        self.tabs_expr = re.compile(r'\t+')
 
     @property
     def pretty_metric_name(self) -> str:
         return 'whitespace metric'
     
     def calculate_from_results(self, results: Dict[str, AbstractResult]):
+        ws_complexities = CodeMetricsKernel.for_analysis(self.analysis).values(self, results)
         for _, result in results.items():
-            ws_complexity = sum(self.calculate_complexity_in(result.source))
+            ws_complexity = ws_complexities[result]
             result.metrics[self.Keys.WS_COMPLEXITY_IN_FILE.value] = ws_complexity
             self.local_data[result.unique_name] = {self.Keys.WS_COMPLEXITY_IN_FILE.value: ws_complexity}
 
@@ -54,8 +60,7 @@ class WhitespaceMetric(CodeMetric):
     ### implementation borrowed from Adam Tornhill
 
     def n_log_tabs(self, line):
-        pattern = re.compile(r' +')
-        wo_spaces = re.sub(pattern, '', line)
+        wo_spaces = self.spaces_expr.sub('', line)
         match = self.leading_tabs_expr.search(wo_spaces)
         if match:
             tabs = match.group()
@@ -63,8 +68,7 @@ class WhitespaceMetric(CodeMetric):
         return 0
     
     def n_log_spaces(self, line):
-        pattern = re.compile(r'\t+')
-        wo_tabs = re.sub(pattern, '', line)
+        wo_tabs = self.tabs_expr.sub('', line)
         match = self.leading_spaces_expr.search(wo_tabs)
         if match:
             spaces = match.group()
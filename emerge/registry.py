@@ -0,0 +1,97 @@
+"""
+Contains the registry of all available parsers and metrics. Their modules (and the libraries they depend on) are only imported as soon as
+an analysis needs them, so that emerge starts without importing every parser and metric.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+from typing import Dict, Iterator, List, Tuple, Type
+from collections.abc import Mapping
+import importlib
+
+from emerge.languages.abstractparser import AbstractParser, Parser, LanguageType
+from emerge.metrics.abstractmetric import AbstractMetric
+
+
+# module, class and language of every available parser by parser name, in the order parsers are iterated in
+PARSER_CLASSES: Dict[str, Tuple[str, str, LanguageType]] = {
+    Parser.JAVA_PARSER.name: ('emerge.languages.javaparser', 'JavaParser', LanguageType.JAVA),
+    Parser.SWIFT_PARSER.name: ('emerge.languages.swiftparser', 'SwiftParser', LanguageType.SWIFT),
+    Parser.C_PARSER.name: ('emerge.languages.cparser', 'CParser', LanguageType.C),
+    Parser.CPP_PARSER.name: ('emerge.languages.cppparser', 'CPPParser', LanguageType.CPP),
+    Parser.GROOVY_PARSER.name: ('emerge.languages.groovyparser', 'GroovyParser', LanguageType.GROOVY),
+    Parser.JAVASCRIPT_PARSER.name: ('emerge.languages.javascriptparser', 'JavaScriptParser', LanguageType.JAVASCRIPT),
+    Parser.TYPESCRIPT_PARSER.name: ('emerge.languages.typescriptparser', 'TypeScriptParser', LanguageType.TYPESCRIPT),
+    Parser.KOTLIN_PARSER.name: ('emerge.languages.kotlinparser', 'KotlinParser', LanguageType.KOTLIN),
+    Parser.OBJC_PARSER.name: ('emerge.languages.objcparser', 'ObjCParser', LanguageType.OBJC),
+    Parser.RUBY_PARSER.name: ('emerge.languages.rubyparser', 'RubyParser', LanguageType.RUBY),
+    Parser.PYTHON_PARSER.name: ('emerge.languages.pyparser', 'PythonParser', LanguageType.PY),
+    Parser.GO_PARSER.name: ('emerge.languages.goparser', 'GoParser', LanguageType.GO),
+}
+
+# module and class of every available metric by its configuration key (the same for file and entity scans)
+METRIC_CLASSES: Dict[str, Tuple[str, str]] = {
+    'number_of_methods': ('emerge.metrics.numberofmethods.numberofmethods', 'NumberOfMethodsMetric'),
+    'source_lines_of_code': ('emerge.metrics.sloc.sloc', 'SourceLinesOfCodeMetric'),
+    'fan_in_out': ('emerge.metrics.faninout.faninout', 'FanInOutMetric'),
+    'louvain_modularity': ('emerge.metrics.modularity.modularity', 'LouvainModularityMetric'),
+    'page_rank': ('emerge.metrics.pagerank.pagerank', 'PageRankMetric'),
+    'betweenness_centrality': ('emerge.metrics.betweenness.betweenness', 'BetweennessCentralityMetric'),
+    'tfidf': ('emerge.metrics.tfidf.tfidf', 'TFIDFMetric'),
+    'ws_complexity': ('emerge.metrics.whitespace.whitespace', 'WhitespaceMetric'),
+    'git': ('emerge.metrics.git.git', 'GitMetrics'),
+}
+
+
+def _load_class(module_name: str, class_name: str) -> type:
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def parser_class(parser_name: str) -> Type[AbstractParser]:
+    """Imports the module of a parser and returns the parser class."""
+    module_name, class_name, _ = PARSER_CLASSES[parser_name]
+    return _load_class(module_name, class_name)
+
+
+def metric_class(config_key: str) -> Type[AbstractMetric]:
+    """Imports the module of a metric and returns the metric class for a configuration key, e.g. 'tfidf'."""
+    return _load_class(*METRIC_CLASSES[config_key])
+
+
+def supported_languages() -> List[str]:
+    """Returns the names of all languages that can be parsed, without importing any parser."""
+    return [language_type.name for _, _, language_type in PARSER_CLASSES.values()]
+
+
+class ParserRegistry(Mapping):
+    """All created parsers by parser name, iterated over in the order of PARSER_CLASSES. A parser is only imported and created by
+    get_or_create() when an analysis needs it for the first time, only created parsers are contained in the registry.
+    """
+
+    def __init__(self):
+        self._parsers: Dict[str, AbstractParser] = {}
+
+    def __getitem__(self, parser_name: str) -> AbstractParser:
+        return self._parsers[parser_name]
+
+    def __iter__(self) -> Iterator[str]:
+        return (parser_name for parser_name in PARSER_CLASSES if parser_name in self._parsers)
+
+    def __len__(self) -> int:
+        return len(self._parsers)
+
+    @staticmethod
+    def is_available(parser_name: str) -> bool:
+        """Returns whether a parser with this name can be created, without importing it."""
+        return parser_name in PARSER_CLASSES
+
+    def get_or_create(self, parser_name: str) -> AbstractParser:
+        """Returns the parser with the given name, it is imported and created if it was not accessed before. Raises a KeyError for unknown
+        parser names.
+        """
+        if parser_name not in self._parsers:
+            if not self.is_available(parser_name):
+                raise KeyError(parser_name)
+            self._parsers[parser_name] = parser_class(parser_name)()
+        return self._parsers[parser_name]
@@ -5,13 +5,15 @@ Defines non-abstract result classes, e.g. FileResult or EntityResult.
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import Dict, List
+from typing import Dict, List, Optional
 from pathlib import Path
 import logging
+import time
 import coloredlogs
 import pyparsing as pp
 
-from emerge.languages.abstractparser import ParsingMixin, CoreParsingKeyword, LanguageType
+from emerge.languages.abstractparser import ParsingMixin, CoreParsingKeyword, LanguageType, TokenCursor, GrammarRegistry
+from emerge.languages.lexer import TokenStream, TokenView
 from emerge.abstractresult import AbstractFileResult, AbstractEntityResult
 from emerge.log import Logger
 from emerge.stats import Statistics
@@ -25,6 +27,10 @@ class EntityResult(AbstractEntityResult):
     An EntityResult has a unique/entity name and can contain inheritace dependencies.
     """
 
+    __slots__ = ('_analysis', '_scanned_file_name', '_absolute_name', '_display_name', '_scanned_language', '_scanned_by', '_scanned_tokens',
+                 '_scanned_import_dependencies', '_entity_name', '_module_name', '_unique_name', '_parent_file_result',
+                 '_scanned_inheritance_dependencies', '_metrics', '_token_stream')
+
     def __init__(self, *,
                  analysis,
                  scanned_file_name: str,
@@ -53,6 +59,7 @@ class EntityResult(AbstractEntityResult):
         self._parent_file_result = parent_file_result
         self._scanned_inheritance_dependencies: List[str] = []
         self._metrics: Dict = {}
+        self._token_stream: Optional[TokenStream] = None
 
     def __repr__(self):
         return f'''Entity result: {self.unique_name},
@@ -108,6 +115,17 @@ class EntityResult(AbstractEntityResult):
     def scanned_tokens(self) -> List[str]:
         return self._scanned_tokens
 
+    @scanned_tokens.setter
+    def scanned_tokens(self, value):
+        self._scanned_tokens = value
+        self._token_stream = None
+
+    @property
+    def token_stream(self) -> TokenStream:
+        if self._token_stream is None:
+            self._token_stream = TokenStream(self._scanned_tokens)
+        return self._token_stream
+
     @property
     def scanned_import_dependencies(self) -> List[str]:
         return self._scanned_import_dependencies
@@ -161,6 +179,10 @@ class FileResult(AbstractFileResult, ParsingMixin):
     """A FileResult is the most basic result type generated by a file scan. It contains the whole source code it could find within a file.
     """
 
+    __slots__ = ('_analysis', '_scanned_file_name', '_absolute_dir_path', '_relative_file_path_to_analysis', '_relative_analysis_path',
+                 '_absolute_name', '_display_name', '_unique_name', '_module_name', '_scanned_language', '_scanned_by', '_scanned_tokens', '_source',
+                 '_preprocessed_source', '_scanned_import_dependencies', '_extracted_import_dependencies', '_metrics', '_token_stream')
+
     def __init__(self,
                  anaylsis,
                  scanned_file_name: str,
@@ -176,9 +198,10 @@ class FileResult(AbstractFileResult, ParsingMixin):
                  ):
         self._analysis = anaylsis
         self._scanned_file_name = scanned_file_name
-        self._absolute_dir_path = Path(f'{ Path(anaylsis.source_directory).parent}/{Path(absolute_name).parent}')
+        # paths are kept as strings, which are much smaller than Path objects
+        self._absolute_dir_path = str(Path(f'{ Path(anaylsis.source_directory).parent}/{Path(absolute_name).parent}'))
         self._relative_file_path_to_analysis = relative_file_path_to_analysis
-        self._relative_analysis_path = Path(relative_file_path_to_analysis).parent
+        self._relative_analysis_path = str(Path(relative_file_path_to_analysis).parent)
         self._absolute_name = absolute_name
         self._display_name = display_name
         self._unique_name = relative_file_path_to_analysis  # os.path.basename(os.path.normpath(self._scanned_file_name))
@@ -189,7 +212,9 @@ class FileResult(AbstractFileResult, ParsingMixin):
         self._source = source
         self._preprocessed_source = preprocessed_source
         self._scanned_import_dependencies: List[str] = []
+        self._extracted_import_dependencies: Optional[List[str]] = None
         self._metrics: Dict = {}
+        self._token_stream: Optional[TokenStream] = None
 
     def __repr__(self):
         return f'''File result: {self.unique_name},
@@ -240,6 +265,10 @@ class FileResult(AbstractFileResult, ParsingMixin):
     def analysis(self):
         return self._analysis
 
+    @analysis.setter
+    def analysis(self, value):
+        self._analysis = value
+
     @property
     def scanned_file_name(self) -> str:
         return self._scanned_file_name
@@ -254,15 +283,15 @@ class FileResult(AbstractFileResult, ParsingMixin):
 
     @property
     def absolute_dir_path(self) -> Path:
-        return self._absolute_dir_path
+        return Path(self._absolute_dir_path)
 
     @absolute_dir_path.setter
     def absolute_dir_path(self, value):
-        self._absolute_dir_path = value
+        self._absolute_dir_path = str(value)
 
     @property
     def relative_analysis_path(self) -> Path:
-        return self._relative_analysis_path
+        return Path(self._relative_analysis_path)
 
     @property
     def module_name(self) -> str:
@@ -284,10 +313,23 @@ class FileResult(AbstractFileResult, ParsingMixin):
     def scanned_tokens(self) -> List[str]:
         return self._scanned_tokens
 
+    @property
+    def token_stream(self) -> TokenStream:
+        if self._token_stream is None:
+            self._token_stream = TokenStream(self._scanned_tokens)
+        return self._token_stream
+
     @property
     def source(self) -> str:
+        # in bounded memory mode the content of the file was released after parsing, read it again on demand
+        if self._source is None and self._analysis is not None and self._analysis.bounded_memory:
+            return self._analysis.load_source(self._absolute_name)
         return self._source
 
+    @source.setter
+    def source(self, value):
+        self._source = value
+
     @property
     def preprocessed_source(self) -> str:
         return self._preprocessed_source
@@ -300,6 +342,15 @@ class FileResult(AbstractFileResult, ParsingMixin):
     def scanned_import_dependencies(self, value):
         self._scanned_import_dependencies = value
 
+    @property
+    def extracted_import_dependencies(self) -> Optional[List[str]]:
+        # the import dependencies before they were resolved, only kept for the parse cache by parsers that resolve against other files
+        return self._extracted_import_dependencies
+
+    @extracted_import_dependencies.setter
+    def extracted_import_dependencies(self, value):
+        self._extracted_import_dependencies = value
+
     @property
     def metrics(self) -> Dict:
         return self._metrics
@@ -326,25 +377,7 @@ class FileResult(AbstractFileResult, ParsingMixin):
 
     @staticmethod
     def _filter_source_tokens_without_comments(list_of_words: List[str], line_comment_string: str, start_comment_string: str, stop_comment_string: str) -> str:
-        source = " ".join(list_of_words)
-        source_lines = source.splitlines()
-        source_lines_without_comments = []
-        active_block_comment = False
-
-        for line in source_lines:
-            if start_comment_string in line:
-                active_block_comment = True
-                continue
-            if stop_comment_string in line:
-                active_block_comment = False
-                continue
-            if line.strip().startswith(line_comment_string):
-                continue
-
-            if not active_block_comment:
-                source_lines_without_comments.append(line)
-
-        return "\n".join(source_lines_without_comments)
+        return TokenStream(list_of_words).source_without_comments(line_comment_string, start_comment_string, stop_comment_string)
 
     @staticmethod
     def filter_lines_with_keywords(list_of_words: List[str], list_of_filter_keywords: List[str]) -> str:
@@ -361,8 +394,11 @@ class FileResult(AbstractFileResult, ParsingMixin):
 
         return "\n".join(filtered_source_lines)
 
-    def generate_entity_results_from_scopes(self, entity_keywords, entity_expression, comment_keywords) -> List[EntityResult]:
-        """Generate entity results by extracting everything within a scope that begins with an entity keyword."""
+    def generate_entity_results_from_scopes(self, entity_keywords, entity_expression, comment_keywords,
+                                            grammars: Optional[GrammarRegistry] = None, grammar_name: str = 'entity') -> List[EntityResult]:
+        """Generate entity results by extracting everything within a scope that begins with an entity keyword.
+        If the grammars of the parser are given, the time spent parsing with the entity expression is recorded under the given grammar name.
+        """
         open_scope_character: str = CoreParsingKeyword.OPENING_CURVED_BRACKET.value
         close_scope_character: str = CoreParsingKeyword.CLOSING_CURVED_BRACKET.value
 
@@ -370,12 +406,13 @@ class FileResult(AbstractFileResult, ParsingMixin):
         start_block_comment_keyword: str = comment_keywords[CoreParsingKeyword.START_BLOCK_COMMENT.value]
         stop_block_comment_keyword: str = comment_keywords[CoreParsingKeyword.STOP_BLOCK_COMMENT.value]
 
-        found_entities: Dict[str, List[str]] = {}
+        # the scope of an entity is kept as token offsets [start, end), it begins at the entity keyword and ends before the closing bracket
+        # that restores the scope level in front of the entity keyword (or at the end of the file)
+        found_entities: Dict[str, List[int]] = {}
         created_entity_results: List[EntityResult] = []
 
-        list_of_words_with_newline_strings = self.scanned_tokens
-        source_string_no_comments = self._filter_source_tokens_without_comments(
-            list_of_words_with_newline_strings, line_comment_keyword, start_block_comment_keyword, stop_block_comment_keyword)
+        source_string_no_comments = self.token_stream.source_without_comments(
+            line_comment_keyword, start_block_comment_keyword, stop_block_comment_keyword)
 
         # workaround to bypass scope false positives
         source_string_no_comments = source_string_no_comments.replace("{}", "")
@@ -383,37 +420,49 @@ class FileResult(AbstractFileResult, ParsingMixin):
 
         filtered_list_no_comments = self.preprocess_file_content_and_generate_token_list(source_string_no_comments)
 
-        for _, obj, following in self._gen_word_read_ahead(filtered_list_no_comments):
-            if obj in entity_keywords:
-                read_ahead_string = self.create_read_ahead_string(obj, following)
+        # all entity scopes (including nested ones) are found in a single pass, open scopes are kept on a stack per scope level
+        open_scopes_by_level: Dict[int, List[List[int]]] = {}
+        scope_level = 0
+
+        token_cursor = TokenCursor(filtered_list_no_comments)
+        for index, obj in token_cursor:
+            if obj == open_scope_character:
+                scope_level += 1
+                continue
 
+            if obj == close_scope_character:
+                scope_level -= 1
+                for scope in open_scopes_by_level.pop(scope_level, []):
+                    scope[1] = index
+                continue
+
+            if obj in entity_keywords:
+                parsing_starts = time.perf_counter()
                 try:
-                    parsing_result = entity_expression.parseString(read_ahead_string)
+                    parsing_result = token_cursor.parse(entity_expression, index)
                 except pp.ParseException:
                     self.analysis.statistics.increment(Statistics.Key.PARSING_MISSES)
                     LOGGER.warning(f'warning: could not parse result {self=}')
-                    LOGGER.warning(f'next tokens: {[obj] + following[:ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value]}')
+                    LOGGER.warning(f'next tokens: {token_cursor.read_ahead(index, ParsingMixin.Constants.MAX_DEBUG_TOKENS_READAHEAD.value)}')
                     continue
+                finally:
+                    if grammars is not None:
+                        grammars.record_runtime(grammar_name, time.perf_counter() - parsing_starts, self.analysis.statistics)
 
                 LOGGER.debug(f'entity definition found: {parsing_result.entity_name}')
                 self.analysis.statistics.increment(Statistics.Key.PARSING_HITS)
 
-                scope_level = 0
-                found_entities[parsing_result.entity_name] = []
-                all_tokens = [obj] + following
-                for token in all_tokens:
-                    if token == open_scope_character:
-                        scope_level += 1
-
-                    if token == close_scope_character:
-                        scope_level -= 1
-                        if scope_level == 0:
-                            break
+                scope = [index, len(filtered_list_no_comments)]
+                found_entities[parsing_result.entity_name] = scope
+                open_scopes_by_level.setdefault(scope_level, []).append(scope)
 
-                    if parsing_result.entity_name in found_entities:
-                        found_entities[parsing_result.entity_name].append(token)
+        # entity tokens are views over one exactly sized tuple, that only keeps the tokens from the first to the last entity scope alive
+        scopes_start = min((scope_start for scope_start, _ in found_entities.values()), default=0)
+        scopes_end = max((scope_end for _, scope_end in found_entities.values()), default=0)
+        scoped_tokens = tuple(filtered_list_no_comments[scopes_start:scopes_end])
 
-        for entity_name, tokens in found_entities.items():
+        for entity_name, (scope_start, scope_end) in found_entities.items():
+            tokens = TokenView(scoped_tokens, scope_start - scopes_start, scope_end - scopes_start)
 
             unique_entity_name = self.absolute_name + "/" + entity_name
             entity_result = EntityResult(
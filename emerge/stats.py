@@ -5,11 +5,17 @@ Contains a statistics class which can gather/output local and global result and
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from enum import Enum, unique, auto
+import sys
 import logging
 import coloredlogs
 
+try:
+    import resource
+except ImportError:  # not available on windows
+    resource = None
+
 from emerge.log import Logger
 
 LOGGER = Logger(logging.getLogger('analysis'))
@@ -30,6 +36,8 @@ class Statistics:
         SCANNED_FILES = auto()
         SKIPPED_FILES = auto()
         SCANNING_RUNTIME = auto()
+        SCANNING_THREADS = auto()
+        SCANNING_THROUGHPUT = auto()
         TOTAL_RUNTIME = auto()
         ANALYSIS_DATE = auto()
         FILE_RESULTS_CREATION_RUNTIME = auto()
@@ -40,6 +48,15 @@ class Statistics:
         EXTRACTED_ENTITY_RESULTS = auto()
         PARSING_HITS = auto()
         PARSING_MISSES = auto()
+        FAST_PATH_HITS = auto()
+        FAST_PATH_FALLBACKS = auto()
+        SYNTAX_ERROR_FALLBACKS = auto()
+        PARSE_CACHE_HITS = auto()
+        PARSE_CACHE_MISSES = auto()
+        PARSE_CACHE_EVICTIONS = auto()
+        GRAMMAR_RUNTIME = auto()
+        RELOADED_SOURCES = auto()
+        PEAK_MEMORY = auto()
         RUNTIME = auto()
 
     def add(self, *, key, value: Any, prefix: str = None) -> None:
@@ -53,8 +70,38 @@ class Statistics:
     def update(self, *, key, value: Any) -> None:
         self.data[key.name.lower()] = value
 
-    def increment(self, key) -> None:
-        if (k := key.name.lower()) not in self.data:
-            self.data[k] = 1
+    def increment(self, key, value: Any = 1, prefix: str = None) -> None:
+        k = key.name.lower() if prefix is None else prefix + '-' + key.name.lower()
+        if k not in self.data:
+            self.data[k] = value
         else:
-            self.data[k] += 1
+            self.data[k] += value
+
+    def pop(self, *keys) -> Dict[str, Any]:
+        """Removes and returns the values of all given keys that are present."""
+        return {k: self.data.pop(k) for k in (key.name.lower() for key in keys) if k in self.data}
+
+    def pop_prefixed(self, key) -> Dict[str, Any]:
+        """Removes and returns all prefixed values of the given key."""
+        suffix = '-' + key.name.lower()
+        prefixed_values = {k: v for k, v in self.data.items() if k.endswith(suffix)}
+        for k in prefixed_values:
+            del self.data[k]
+        return prefixed_values
+
+    @staticmethod
+    def peak_memory_in_mb() -> Optional[float]:
+        """Returns the peak resident memory of this process in MB, or None if the platform does not report it."""
+        if resource is None:
+            return None
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # bytes on macOS, kilobytes on linux
+        return max_rss / 1024 / 1024 if sys.platform == 'darwin' else max_rss / 1024
+
+    def merge(self, data: Dict[str, Any]) -> None:
+        """Adds up the given values with the values of the same name, e.g. to collect statistics that were gathered in another process."""
+        for k, value in data.items():
+            if k not in self.data:
+                self.data[k] = value
+            else:
+                self.data[k] += value
@@ -0,0 +1,86 @@
+"""
+All unit tests that are related to releasing and reloading file contents with bounded_memory.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import os
+from pathlib import Path
+import tempfile
+import unittest
+
+from emerge.analysis import Analysis
+from emerge.analyzer import Analyzer
+from emerge.config import Configuration
+from emerge.graph import GraphType
+from emerge.registry import ParserRegistry
+
+
+class BoundedMemoryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.temp_path = Path(os.path.realpath(self.temp_directory.name))
+        self.source_directory = self.temp_path / 'project' / 'src'
+
+        self.files = {
+            'app/__init__.py': '',
+            'app/models.py': 'import os\n\nclass Base:\n    pass\n',
+            'app/views.py': 'from . import models\r\n\r\nclass View(models.Base):\r\n    pass\r\n',
+        }
+        for file_name, file_content in self.files.items():
+            file_path = self.source_directory / file_name
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_bytes(file_content.encode('utf-8'))
+
+        # a symlink to a file outside of the analysis, the file is scanned from the resolved path
+        linked_file = self.temp_path / 'shared' / 'helpers.py'
+        linked_file.parent.mkdir()
+        linked_file.write_text('import app.models\n', encoding='utf-8')
+        os.symlink(linked_file, self.source_directory / 'app' / 'helpers.py')
+
+    def tearDown(self):
+        self.temp_directory.cleanup()
+
+    def create_file_results(self, bounded_memory: bool, parsing_workers: int = 1) -> Analysis:
+        analysis = Analysis()
+        analysis.analysis_name = 'bounded'
+        analysis.source_directory = str(self.source_directory)
+        analysis.only_permit_languages = ['py']
+        analysis.only_permit_file_extensions = ['.py']
+        analysis.bounded_memory = bounded_memory
+        analysis.parsing_workers = parsing_workers
+
+        analyzer = Analyzer(Configuration('1.0.0'), ParserRegistry())
+        analyzer._create_filesystem_graph(analysis)  # pylint: disable=protected-access
+        if bounded_memory:
+            filesystem_nodes = analysis.graph_representations[GraphType.FILESYSTEM_GRAPH.name.lower()].filesystem_nodes.values()
+            self.assertTrue(all(node.content is None for node in filesystem_nodes))
+        analyzer._create_file_results(analysis)  # pylint: disable=protected-access
+        return analysis
+
+    def test_bounded_memory_scans_paths_only(self):
+        """Test that no file content is read while scanning with bounded_memory, but parsing still creates the same results."""
+        expected_analysis = self.create_file_results(bounded_memory=False)
+        expected_dependencies = {name: result.scanned_import_dependencies for name, result in expected_analysis.file_results.items()}
+
+        for parsing_workers in [1, 2]:
+            with self.subTest(parsing_workers=parsing_workers):
+                analysis = self.create_file_results(bounded_memory=True, parsing_workers=parsing_workers)
+                dependencies = {name: result.scanned_import_dependencies for name, result in analysis.file_results.items()}
+                self.assertEqual(dependencies, expected_dependencies)
+                self.assertTrue(all(result.source is not None for result in analysis.file_results.values()))
+
+    def test_released_sources_are_reloaded_from_the_scanned_path(self):
+        """Test that released sources are read again from the path they were scanned from, also for resolved symlinks."""
+        expected_sources = {name: result.source for name, result in self.create_file_results(bounded_memory=False).file_results.items()}
+        analysis = self.create_file_results(bounded_memory=True)
+
+        self.assertEqual(len(expected_sources), 4)
+        self.assertEqual({name: result.source for name, result in analysis.file_results.items()}, expected_sources)
+        self.assertEqual(analysis.reloaded_sources, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
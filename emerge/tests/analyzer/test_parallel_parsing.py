@@ -0,0 +1,97 @@
+"""
+All unit tests that are related to parsing files in worker processes.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+from typing import Dict, List
+from pathlib import Path
+import tempfile
+import unittest
+
+import yaml
+
+from tests.testdata.java import JAVA_TEST_FILES
+
+from emerge.analysis import Analysis
+from emerge.analyzer import Analyzer
+from emerge.config import Configuration
+from emerge.registry import ParserRegistry
+
+
+class ParallelParsingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.source_directory = Path(self.temp_directory.name) / 'sources'
+
+        files = {f'java/pkg{index % 2}/{Path(file_name).name}': file_content for index, (file_name, file_content) in enumerate(JAVA_TEST_FILES.items())}
+        files.update({
+            'py/app/__init__.py': '',
+            'py/app/models.py': 'import os\n\nclass Base:\n    pass\n\nclass User(Base):\n    path = os.path\n',
+            'py/app/views.py': 'from . import models\nfrom .models import User as AppUser\n\n\nclass UserView(object):\n    model = AppUser\n',
+            'py/app/admin.py': 'import app.models\nfrom app.views import UserView\n\nclass Admin(UserView, app.models.Base):\n    pass\n',
+            'py/app/broken.py': 'from . import models\n\nclass Broken(\n',
+        })
+        for file_name, file_content in files.items():
+            file_path = self.source_directory / file_name
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(file_content, encoding='utf-8')
+
+    def tearDown(self):
+        self.temp_directory.cleanup()
+
+    def analyze(self, parsing_workers: int) -> List[Analysis]:
+        export_directory = Path(self.temp_directory.name) / f'export-{parsing_workers}'
+        export_directory.mkdir()
+        analyses = [{
+            'analysis_name': language,
+            'source_directory': str(self.source_directory / language),
+            'only_permit_languages': [language],
+            'only_permit_file_extensions': [file_extension],
+            'parser_backend': 'ast',
+            'parsing_workers': parsing_workers,
+            'file_scan': ['number_of_methods', 'source_lines_of_code', 'dependency_graph', 'fan_in_out', 'louvain_modularity', 'tfidf'],
+            'entity_scan': ['dependency_graph', 'inheritance_graph', 'source_lines_of_code', 'number_of_methods', 'fan_in_out'],
+            'export': [{'directory': str(export_directory)}, {'json': None}]
+        } for language, file_extension in [('py', '.py'), ('java', '.java')]]
+
+        config_path = Path(self.temp_directory.name) / f'config-{parsing_workers}.yaml'
+        config_path.write_text(yaml.dump({'project_name': 'test', 'analyses': analyses}), encoding='utf-8')
+        configuration = Configuration('1.0.0')
+        configuration.load_config_from_yaml_file(str(config_path))
+
+        Analyzer(configuration, ParserRegistry()).start_analyzing()
+        return configuration.analyses
+
+    @staticmethod
+    def counted_statistics(analysis: Analysis) -> Dict:
+        """All statistics of an analysis that count something, without runtimes, throughput and memory."""
+        return {key: value for key, value in analysis.statistics.data.items() if isinstance(value, int)}
+
+    def test_parallel_parsing_equals_serial_parsing(self):
+        """Test that parsing with worker processes creates the same results, dependencies, metrics and statistics as parsing serially."""
+        serial_analyses = self.analyze(parsing_workers=1)
+        parallel_analyses = self.analyze(parsing_workers=2)
+
+        for serial_analysis, parallel_analysis in zip(serial_analyses, parallel_analyses):
+            self.assertEqual(list(parallel_analysis.results), list(serial_analysis.results))
+            self.assertGreater(serial_analysis.number_of_entity_results, 0)
+
+            for unique_name, serial_result in serial_analysis.results.items():
+                parallel_result = parallel_analysis.results[unique_name]
+                self.assertEqual(parallel_result.scanned_tokens, serial_result.scanned_tokens)
+                self.assertEqual(parallel_result.scanned_import_dependencies, serial_result.scanned_import_dependencies)
+                self.assertEqual(getattr(parallel_result, 'scanned_inheritance_dependencies', None),
+                                 getattr(serial_result, 'scanned_inheritance_dependencies', None))
+
+            self.assertEqual(parallel_analysis.local_metric_results, serial_analysis.local_metric_results)
+            self.assertEqual(parallel_analysis.overall_metric_results, serial_analysis.overall_metric_results)
+            self.assertEqual(self.counted_statistics(parallel_analysis), self.counted_statistics(serial_analysis))
+
+        self.assertEqual(serial_analyses[0].statistics.data['syntax_error_fallbacks'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
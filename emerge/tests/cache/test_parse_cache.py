@@ -0,0 +1,97 @@
+"""
+All unit tests that are related to the parse cache.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import unittest
+import tempfile
+
+from tests.testdata.java import JAVA_TEST_FILES
+
+from emerge.languages.javaparser import JavaParser
+from emerge.languages.cparser import CParser
+from emerge.analysis import Analysis
+from emerge.cache import ParseCache
+
+
+class ParseCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.parse_cache = ParseCache(self.temp_directory.name)
+        self.parser = JavaParser()
+        self.analysis = Analysis()
+        self.analysis.analysis_name = "test"
+        self.analysis.source_directory = "/tests"
+
+    def tearDown(self):
+        self.temp_directory.cleanup()
+
+    def test_restored_file_result_matches_parsed_file_result(self):
+        for file_name, file_content in JAVA_TEST_FILES.items():
+            full_file_path = "/tests/" + file_name
+            self.parser.generate_file_result_from_analysis(self.analysis, file_name=file_name, full_file_path=full_file_path, file_content=file_content)
+            parsed_result = self.parser.results[full_file_path]
+
+            key = self.parse_cache.key(self.parser, self.analysis, full_file_path, file_content)
+            self.assertIsNone(self.parse_cache.load(key))
+            self.parse_cache.store(key, ParseCache.entry_from_file_result(parsed_result, 0, 0))
+
+            restored_result = ParseCache.file_result_from_entry(self.parse_cache.load(key), self.parser, self.analysis,
+                                                                full_file_path=full_file_path, file_content=file_content)
+            self.assertEqual(parsed_result.unique_name, restored_result.unique_name)
+            self.assertEqual(parsed_result.scanned_tokens, restored_result.scanned_tokens)
+            self.assertEqual(parsed_result.scanned_import_dependencies, restored_result.scanned_import_dependencies)
+            self.assertEqual(parsed_result.module_name, restored_result.module_name)
+            self.assertEqual(parsed_result.scanned_language, restored_result.scanned_language)
+
+    def test_key_depends_on_content_and_configuration(self):
+        key = self.parse_cache.key(self.parser, self.analysis, "/tests/A.java", "class A {}")
+        self.assertNotEqual(key, self.parse_cache.key(self.parser, self.analysis, "/tests/A.java", "class B {}"))
+
+        self.analysis.ignore_dependencies_containing.append('java.util')
+        self.assertNotEqual(key, self.parse_cache.key(self.parser, self.analysis, "/tests/A.java", "class A {}"))
+
+    def test_restored_dependencies_are_resolved_against_current_files(self):
+        """Test that adding or removing other files does not change the key, but the dependencies of a restored result are resolved against
+        the files of the current analysis."""
+        parser = CParser()
+        full_file_path, file_content = '/project/core/src/main.c', '#include <time.h>\n#include "util.h"\n'
+
+        analyses = []
+        for scanned_file_names in [{'core/src/main.c', 'core/include/util.h'}, {'core/src/main.c'}, {'core/src/main.c', 'core/lib/util.h'}]:
+            analysis = Analysis()
+            analysis.analysis_name = "test"
+            analysis.source_directory = "/project/core"
+            analysis.cache_directory = self.temp_directory.name
+            analysis.absolute_scanned_file_names.update(scanned_file_names)
+            analyses.append(analysis)
+
+        parser.generate_file_result_from_analysis(analyses[0], file_name='main.c', full_file_path=full_file_path, file_content=file_content)
+        parsed_result = parser.results['core/src/main.c']
+        self.assertEqual(parsed_result.scanned_import_dependencies, ['time.h', 'core/include/util.h'])
+        self.assertEqual(parsed_result.extracted_import_dependencies, ['<time.h>', 'util.h'])
+
+        key = self.parse_cache.key(parser, analyses[0], full_file_path, file_content)
+        self.parse_cache.store(key, ParseCache.entry_from_file_result(parsed_result, 2, 0))
+
+        for analysis, expected_dependencies in zip(analyses[1:], [['time.h', 'util.h'], ['time.h', 'core/lib/util.h']]):
+            self.assertEqual(key, self.parse_cache.key(parser, analysis, full_file_path, file_content))
+            restored_result = ParseCache.file_result_from_entry(self.parse_cache.load(key), parser, analysis, full_file_path=full_file_path,
+                                                                file_content=file_content)
+            self.assertEqual(restored_result.scanned_import_dependencies, expected_dependencies)
+            self.assertEqual(analysis.statistics.data['parsing_hits'], 2)
+
+    def test_evict_least_recently_used_entries(self):
+        self.parse_cache.max_size_in_bytes = 0
+        for i in range(3):
+            self.parse_cache.store(f'{i:064d}', {'payload': i})
+
+        self.assertEqual(3, self.parse_cache.evict())
+        self.assertIsNone(self.parse_cache.load(f'{0:064d}'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,8 +6,9 @@ All unit tests that are related to configuration.
 # License: MIT
 
 import unittest
-from emerge.config import Configuration
+from emerge.config import Configuration, ConfigKeyAnalysis
 from emerge.config import Analysis, YamlLoader
+from emerge.metrics.abstractmetric import TFIDFMode
 import coloredlogs
 import logging
 
@@ -36,5 +37,27 @@ class ConfigurationTestCase(unittest.TestCase):
         LOGGER.info(f'completed testing of CurrentConfiguration init')
 
 
+    def test_tfidf_mode_for_value(self):
+        """Test that the TF-IDF mode is read from the option of a configured tfidf metric and invalid options are rejected."""
+        self.assertEqual(self.configuration._tfidf_mode_for_value('tfidf'), TFIDFMode.EXACT)
+        self.assertEqual(self.configuration._tfidf_mode_for_value('tfidf()'), TFIDFMode.EXACT)
+        self.assertEqual(self.configuration._tfidf_mode_for_value('tfidf(streaming)'), TFIDFMode.STREAMING)
+        self.assertEqual(self.configuration._tfidf_mode_for_value('tfidf(exact)'), TFIDFMode.EXACT)
+        with self.assertRaises(Exception):
+            self.configuration._tfidf_mode_for_value('tfidf(fast)')
+
+    def test_positive_and_non_negative_int(self):
+        """Test that integer keys are validated as positive or non-negative, where booleans are no integers."""
+        analysis_dict = {'parsing_workers': 4, 'louvain_random_seed': 0, 'betweenness_samples': 0, 'louvain_workers': True, 'betweenness_random_seed': -1}
+        self.assertEqual(self.configuration._positive_int(analysis_dict, ConfigKeyAnalysis.PARSING_WORKERS), 4)
+        self.assertEqual(self.configuration._non_negative_int(analysis_dict, ConfigKeyAnalysis.LOUVAIN_RANDOM_SEED), 0)
+
+        with self.assertRaisesRegex(Exception, 'betweenness_samples must be a positive integer'):
+            self.configuration._positive_int(analysis_dict, ConfigKeyAnalysis.BETWEENNESS_SAMPLES)
+        with self.assertRaisesRegex(Exception, 'louvain_workers must be a positive integer'):
+            self.configuration._positive_int(analysis_dict, ConfigKeyAnalysis.LOUVAIN_WORKERS)
+        with self.assertRaisesRegex(Exception, 'betweenness_random_seed must be a non-negative integer'):
+            self.configuration._non_negative_int(analysis_dict, ConfigKeyAnalysis.BETWEENNESS_RANDOM_SEED)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,97 @@
+"""
+All unit tests that are related to the parallel filesystem scanner and the source loader.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import unittest
+import tempfile
+import os
+import coloredlogs
+import logging
+
+from emerge.files import FileSystemScanner, SourceLoader
+
+LOGGER = logging.getLogger('TESTS')
+coloredlogs.install(level='INFO', logger=LOGGER, fmt='\n%(asctime)s %(name)s %(levelname)s %(message)s')
+
+
+class FileSystemScannerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.source_directory = self.temp_directory.name
+
+        for directory in ['a/b/c', 'a/d', 'e', 'build/f']:
+            os.makedirs(os.path.join(self.source_directory, directory))
+
+        for file_name in ['a/one.java', 'a/b/two.java', 'a/b/c/three.java', 'a/d/four.kt', 'e/five.py', 'build/f/six.java', 'seven.go']:
+            with open(os.path.join(self.source_directory, file_name), 'w', encoding='ISO-8859-1') as file:
+                file.write(f'// {file_name}\r\nclass X {{}}\n')
+
+        os.symlink(os.path.join(self.source_directory, 'a'), os.path.join(self.source_directory, 'e', 'linked_dir'))
+        os.symlink(os.path.join(self.source_directory, 'seven.go'), os.path.join(self.source_directory, 'e', 'linked.go'))
+
+    def tearDown(self):
+        self.temp_directory.cleanup()
+
+    def test_walk_matches_os_walk(self):
+        for max_workers in [1, 4]:
+            scanner = FileSystemScanner(max_workers=max_workers, ignore_directories=['build'])
+            scanner.scan(self.source_directory)
+
+            expected = []
+            for root, dirs, files in os.walk(self.source_directory):
+                dirs[:] = [d for d in dirs if d not in ['build']]
+                expected.append((root, list(dirs), list(files)))
+
+            self.assertEqual(expected, list(scanner.walk(self.source_directory)))
+            self.assertTrue(scanner.is_symlink(os.path.join(self.source_directory, 'e', 'linked.go')))
+            self.assertFalse(scanner.is_symlink(os.path.join(self.source_directory, 'seven.go')))
+
+    def test_read_files_keeps_order_and_encoding(self):
+        scanner = FileSystemScanner(max_workers=4)
+        paths = [os.path.join(self.source_directory, name) for name in ['seven.go', 'a/one.java', 'e/five.py']]
+
+        expected = []
+        for path in paths:
+            with open(path, encoding='ISO-8859-1') as file:
+                expected.append(file.read())
+
+        self.assertEqual(expected, scanner.read_files(paths))
+        self.assertEqual(sum(len(content) for content in expected), scanner.scanned_bytes)
+
+
+
+class SourceLoaderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.paths = []
+        for index, content in enumerate([b'line\r\nother\rlast\n', b'caf\xe9\n' * 100, b'']):
+            path = os.path.join(self.temp_directory.name, f'{index}.py')
+            with open(path, 'wb') as file:
+                file.write(content)
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.temp_directory.cleanup()
+
+    def test_load_matches_scanner(self):
+        """Test that files read with and without mmap have the same content as read by the filesystem scanner."""
+        expected = FileSystemScanner(max_workers=1).read_files(self.paths)
+        for mmap_threshold_in_bytes in [1, SourceLoader.MMAP_THRESHOLD_IN_BYTES]:
+            source_loader = SourceLoader(mmap_threshold_in_bytes=mmap_threshold_in_bytes)
+            self.assertEqual(expected, [source_loader.load(path) for path in self.paths])
+
+    def test_least_recently_loaded_contents_are_released(self):
+        """Test that only the most recently loaded contents are kept and released contents are read again."""
+        source_loader = SourceLoader(max_cached_files=2)
+        for path in [self.paths[0], self.paths[1], self.paths[0], self.paths[2], self.paths[0], self.paths[1]]:
+            source_loader.load(path)
+        self.assertEqual(source_loader.loaded_files, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
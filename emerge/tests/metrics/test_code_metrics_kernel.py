@@ -0,0 +1,89 @@
+"""
+All unit tests that are related to the CodeMetricsKernel, which computes the source lines of code, the whitespace complexity and the number
+of methods in one fused pass.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import random
+import sys
+import unittest
+
+from tests.testdata.java import JAVA_TEST_FILES
+from tests.testdata.py import PYTHON_TEST_FILES
+from tests.testdata.ruby import RUBY_TEST_FILES
+
+from emerge.analysis import Analysis
+from emerge.languages.lexer import TokenStream
+from emerge.languages.javaparser import JavaParser
+from emerge.languages.pyparser import PythonParser
+from emerge.languages.rubyparser import RubyParser
+from emerge.metrics.codekernel import CodeMetricsKernel, count_source_lines, whitespace_complexities, \
+    WHITESPACE_CHARACTERS, LINE_BREAK_CHARACTERS
+from emerge.metrics.numberofmethods.numberofmethods import NumberOfMethodsMetric
+from emerge.metrics.sloc.sloc import SourceLinesOfCodeMetric
+from emerge.metrics.whitespace.whitespace import WhitespaceMetric
+
+
+class CodeMetricsKernelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.analysis = Analysis()
+        self.analysis.analysis_name = 'test'
+        self.analysis.source_directory = '/source'
+
+        # random sources with every kind of whitespace, line break and comment keyword of the supported languages
+        random.seed(42)
+        fragments = ['foo', 'x', '{', '}', ' ', '  ', '\t', '\n', '\r', '\r\n', '\x0b', '\x0c', '\x85', '\xa0', ' ',
+                     '//', '#', '/*', '*/', '"""', '=begin', '=end']
+        self.sources = [''.join(random.choice(fragments) for _ in range(random.randrange(30))) for _ in range(500)]
+        self.comment_keywords = [('//', '/*', '*/'), ('#', '"""', '"""'), ('#', '=begin', '=end')]
+
+    def tearDown(self):
+        pass
+
+    def test_character_classes(self):
+        """Test that the whitespace and line break characters are exactly the ones that str.isspace() and str.splitlines() use."""
+        characters = [chr(code) for code in range(sys.maxunicode + 1)]
+        self.assertEqual(WHITESPACE_CHARACTERS, ''.join(c for c in characters if c.isspace()))
+        self.assertEqual(LINE_BREAK_CHARACTERS, ''.join(c for c in characters if len(f'a{c}b'.splitlines()) == 2))
+
+    def test_count_source_lines_equals_token_stream(self):
+        """Test that counting source lines over concatenated sources gives exactly the counts of every single token stream."""
+        for comment_keywords in self.comment_keywords:
+            expected = [TokenStream([source]).count_source_lines(*comment_keywords) for source in self.sources]
+            self.assertEqual(count_source_lines(self.sources, *comment_keywords), expected)
+        self.assertEqual(count_source_lines([], '//', '/*', '*/'), [])
+
+    def test_whitespace_complexities_equal_whitespace_metric(self):
+        """Test that the whitespace complexities are exactly the sums of the line complexities, including the integer 0 without code."""
+        whitespace_metric = WhitespaceMetric(self.analysis)
+        expected = [sum(whitespace_metric.calculate_complexity_in(source)) for source in self.sources]
+        calculated = whitespace_complexities(self.sources)
+        self.assertEqual(calculated, expected)
+        self.assertEqual([type(value) for value in calculated], [type(value) for value in expected])
+
+    def test_fused_metrics_equal_single_metrics(self):
+        """Test that all fused metrics get the values that each metric computed for every single result before."""
+        for parser, test_files in [(JavaParser(), JAVA_TEST_FILES), (PythonParser(), PYTHON_TEST_FILES), (RubyParser(), RUBY_TEST_FILES)]:
+            for file_name, file_content in test_files.items():
+                parser.generate_file_result_from_analysis(self.analysis, file_name=file_name, full_file_path='/source/' + file_name,
+                                                          file_content=file_content)
+            self.analysis.collect_results_from_parser(parser)
+
+        metrics = [SourceLinesOfCodeMetric(self.analysis), WhitespaceMetric(self.analysis), NumberOfMethodsMetric(self.analysis)]
+        self.analysis.metrics_for_file_results.update({metric.metric_name: metric for metric in metrics})
+        results = self.analysis.file_results
+        kernel = CodeMetricsKernel.for_analysis(self.analysis)
+        kernel.MAX_BATCH_CHARACTERS = 1_000
+
+        source_lines_of_code, ws_complexities, methods = [kernel.values(metric, results) for metric in metrics]
+        for result in results.values():
+            self.assertEqual(source_lines_of_code[result], result.token_stream.count_source_lines(*metrics[0].comment_keywords(result)))
+            self.assertEqual(ws_complexities[result], metrics[1].calulate_from_source(result.source))
+            self.assertEqual(methods[result], len(metrics[2].method_expression(result).findall(result.token_stream.source)))
+
+
+if __name__ == '__main__':
+    unittest.main()
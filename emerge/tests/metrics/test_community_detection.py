@@ -0,0 +1,67 @@
+"""
+All unit tests that are related to the community detection algorithms of the louvain modularity metric.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import random
+import unittest
+
+import numpy as np
+import networkx as nx
+import community as community_louvain
+
+from emerge.metrics.abstractmetric import CommunityDetection
+from emerge.metrics.modularity.communities import adjacency_matrix, modularity, detect_communities
+
+
+class CommunityDetectionTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # cliques of 8 nodes in a ring, every clique is connected to the next one by a single edge
+        self.caveman_graph = nx.connected_caveman_graph(12, 8)
+        self.caveman_adjacency = adjacency_matrix(self.caveman_graph)
+
+    def tearDown(self):
+        pass
+
+    def test_modularity_equals_python_louvain(self):
+        """Test that the modularity of random partitions of weighted graphs with self-loops equals the modularity of python-louvain."""
+        random.seed(0)
+        for seed in range(20):
+            graph = nx.gnm_random_graph(random.randrange(2, 50), random.randrange(1, 150), seed=seed)
+            graph.add_edge(0, 0, weight=2.5)
+            for node_a, node_b in list(graph.edges())[:5]:
+                graph[node_a][node_b]['weight'] = random.random() * 3
+
+            communities = np.unique([random.randrange(4) for _ in graph], return_inverse=True)[1].astype(np.int64)
+            partition = {node: int(communities[index]) for index, node in enumerate(graph)}
+            self.assertAlmostEqual(modularity(adjacency_matrix(graph), communities), community_louvain.modularity(partition, graph), places=12)
+
+    def test_algorithms_find_cliques_reproducibly(self):
+        """Test that every algorithm finds the cliques of a caveman graph with consecutive community ids and the same result per seed."""
+        cliques = {frozenset(range(clique * 8, (clique + 1) * 8)) for clique in range(12)}
+        for algorithm in CommunityDetection:
+            communities, partition_modularity = detect_communities(algorithm, self.caveman_graph, self.caveman_adjacency, 1.0, 7)
+
+            self.assertEqual(set(communities.tolist()), set(range(communities.max() + 1)))
+            self.assertEqual({frozenset(np.flatnonzero(communities == community).tolist()) for community in set(communities.tolist())}, cliques)
+            self.assertAlmostEqual(partition_modularity, modularity(self.caveman_adjacency, communities), places=12)
+
+            repeated_communities, _ = detect_communities(algorithm, self.caveman_graph, self.caveman_adjacency, 1.0, 7)
+            self.assertEqual(repeated_communities.tolist(), communities.tolist())
+
+    def test_label_propagation_without_graph(self):
+        """Test that the label propagation only needs the adjacency matrix and keeps isolated nodes in their own communities."""
+        graph = nx.Graph(self.caveman_graph)
+        graph.add_nodes_from(['isolated a', 'isolated b'])
+        communities, _ = detect_communities(CommunityDetection.LABEL_PROPAGATION, None, adjacency_matrix(graph), 1.0, 0)
+
+        self.assertEqual(len(communities), graph.number_of_nodes())
+        self.assertEqual(len(set(communities.tolist())), 14)
+        self.assertNotEqual(communities[-1], communities[-2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+All unit tests that are related to the GraphMetricsKernel and the graph metrics that are computed on its adjacency matrix.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import unittest
+
+import numpy as np
+import networkx as nx
+
+from emerge.analysis import Analysis
+from emerge.graph import GraphRepresentation, GraphType
+from emerge.metrics.graphkernel import GraphMetricsKernel, page_rank, sampled_betweenness
+from emerge.metrics.faninout.faninout import FanInOutMetric
+from emerge.metrics.pagerank.pagerank import PageRankMetric
+from emerge.metrics.betweenness.betweenness import BetweennessCentralityMetric
+
+
+class GraphMetricsKernelTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.analysis = Analysis()
+        self.analysis.analysis_name = 'test'
+        self.analysis.source_directory = '/source'
+
+        # a random dependency graph with a self-loop, dangling nodes and names that are not ordered like the nodes
+        graph = nx.gnm_random_graph(60, 240, seed=1, directed=True)
+        graph.add_edge(3, 3)
+        self.digraph = nx.relabel_nodes(graph, {node: f'src/file{node * 7 % 61}.py' for node in graph})
+
+        self.graph_representation = GraphRepresentation(GraphType.FILE_RESULT_DEPENDENCY_GRAPH)
+        self.graph_representation.digraph = self.digraph
+        self.graph_representations = {GraphType.FILE_RESULT_DEPENDENCY_GRAPH.name.lower(): self.graph_representation}
+
+    def tearDown(self):
+        pass
+
+    def test_adjacency_is_built_once_per_graph(self):
+        """Test that the kernel of a graph representation is shared until its graph changes."""
+        kernel = GraphMetricsKernel.for_graph_representation(self.graph_representation)
+        self.assertIs(GraphMetricsKernel.for_graph_representation(self.graph_representation), kernel)
+        self.assertEqual(kernel.nodes, list(self.digraph))
+        self.assertEqual(kernel.fan_in().tolist(), [self.digraph.in_degree(node) for node in kernel.nodes])
+        self.assertEqual(kernel.fan_out().tolist(), [self.digraph.out_degree(node) for node in kernel.nodes])
+
+        self.digraph.add_edge('src/file0.py', 'src/new.py')
+        changed_kernel = GraphMetricsKernel.for_graph_representation(self.graph_representation)
+        self.assertIsNot(changed_kernel, kernel)
+        self.assertEqual(changed_kernel.nodes[-1], 'src/new.py')
+
+    def test_page_rank_and_betweenness_equal_networkx(self):
+        """Test that PageRank and the (sampled) betweenness centrality equal the values of networkx."""
+        kernel = GraphMetricsKernel.for_graph_representation(self.graph_representation)
+
+        expected_page_ranks = nx.pagerank(self.digraph)
+        np.testing.assert_allclose(page_rank(kernel.adjacency), [expected_page_ranks[node] for node in kernel.nodes], rtol=1e-12)
+
+        for samples in [2, 10, 100]:
+            expected_centralities = nx.betweenness_centrality(self.digraph, k=min(samples, len(self.digraph)), seed=5)
+            np.testing.assert_allclose(sampled_betweenness(kernel.adjacency, samples, 5, batch_elements=200),
+                                       [expected_centralities[node] for node in kernel.nodes], rtol=1e-12, atol=1e-15)
+
+    def test_fan_in_out_metric(self):
+        """Test that the fan-in/fan-out metric writes the degrees of every node, their averages and the first nodes with the biggest degrees."""
+        metric = FanInOutMetric(self.analysis, self.graph_representations)
+        metric.calculate_from_results({})
+
+        for node in self.digraph:
+            self.assertEqual(metric.local_data[node], {'fan-in-dependency-graph': self.digraph.in_degree(node),
+                                                       'fan-out-dependency-graph': self.digraph.out_degree(node)})
+        biggest_fan_in = sorted(self.digraph.in_degree, key=lambda x: x[1], reverse=True)[0]
+        biggest_fan_out = sorted(self.digraph.out_degree, key=lambda x: x[1], reverse=True)[0]
+        self.assertEqual(metric.overall_data, {
+            'avg-fan-in-dependency-graph': sum(d for _, d in self.digraph.in_degree) / 60,
+            'avg-fan-out-dependency-graph': sum(d for _, d in self.digraph.out_degree) / 60,
+            'max-fan-in-dependency-graph': biggest_fan_in[1], 'max-fan-in-name-dependency-graph': biggest_fan_in[0],
+            'max-fan-out-dependency-graph': biggest_fan_out[1], 'max-fan-out-name-dependency-graph': biggest_fan_out[0],
+        })
+
+    def test_centrality_metrics(self):
+        """Test that the PageRank and betweenness centrality metrics write the value of every node and the node with the highest value."""
+        self.analysis.betweenness_samples = 20
+        for metric_class, key, expected in [(PageRankMetric, 'page-rank-dependency-graph', nx.pagerank(self.digraph)),
+                                            (BetweennessCentralityMetric, 'betweenness-centrality-dependency-graph',
+                                             nx.betweenness_centrality(self.digraph, k=20, seed=0))]:
+            metric = metric_class(self.analysis, self.graph_representations)
+            metric.calculate_from_results({})
+
+            for node in self.digraph:
+                self.assertAlmostEqual(metric.local_data[node][key], expected[node], places=12)
+            self.assertEqual(metric.overall_data[f'max-{key}'], max(data[key] for data in metric.local_data.values()))
+            self.assertEqual(metric.local_data[metric.overall_data[f'max-{key.replace("-dependency-graph", "")}-name-dependency-graph']][key],
+                             metric.overall_data[f'max-{key}'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+All unit tests that are related to the louvain modularity metric.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import unittest
+from collections import Counter
+
+import networkx as nx
+import community as community_louvain
+
+from emerge.analysis import Analysis
+from emerge.graph import GraphRepresentation, GraphType
+from emerge.metrics.modularity.modularity import LouvainModularityMetric
+
+
+class LouvainModularityTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.analysis = Analysis()
+        self.analysis.analysis_name = 'test'
+        self.analysis.source_directory = '/source'
+        self.analysis.louvain_optimization_runs = 3
+
+        # connected cliques of different sizes with a few edges between them, the nodes are named like files
+        graph = nx.DiGraph()
+        for clique, size in enumerate([9, 7, 7, 5, 4, 3]):
+            nodes = [f'src/module{clique}/file{i}.py' for i in range(size)]
+            graph.add_edges_from((a, b) for a in nodes for b in nodes if a < b)
+            graph.add_edge(nodes[0], f'src/module{(clique + 1) % 6}/file1.py')
+
+        self.graph_representation = GraphRepresentation(GraphType.FILE_RESULT_DEPENDENCY_GRAPH)
+        self.graph_representation.digraph = graph
+        self.graph_representations = {GraphType.FILE_RESULT_DEPENDENCY_GRAPH.name.lower(): self.graph_representation}
+
+    def tearDown(self):
+        pass
+
+    def calculate_metric(self) -> LouvainModularityMetric:
+        metric = LouvainModularityMetric(self.analysis, self.graph_representations)
+        metric.calculate_from_results({})
+        return metric
+
+    def test_communities_are_seeded_and_sorted_by_size(self):
+        """Test that the communities of the last run are the seeded partition of python-louvain, renumbered by decreasing size."""
+        metric = self.calculate_metric()
+        key = 'file_result_dependency_graph_louvain-modularity-in-file'
+        communities = {node: data[key] for node, data in metric.local_data.items()}
+
+        undirected_graph = self.graph_representation.digraph.to_undirected()
+        expected_partition = community_louvain.best_partition(undirected_graph, resolution=1.5, random_state=2)
+        self.assertEqual(sorted(Counter(communities.values()).values(), reverse=True),
+                         sorted(Counter(expected_partition.values()).values(), reverse=True))
+        self.assertEqual({frozenset(n for n in communities if communities[n] == c) for c in communities.values()},
+                         {frozenset(n for n in expected_partition if expected_partition[n] == c) for c in expected_partition.values()})
+
+        sizes = [Counter(communities.values())[community] for community in range(len(set(communities.values())))]
+        self.assertEqual(sizes, sorted(sizes, reverse=True))
+
+        modularities = [community_louvain.modularity(community_louvain.best_partition(undirected_graph, resolution=1.5, random_state=seed),
+                                                     undirected_graph) for seed in range(3)]
+        self.assertEqual(metric.overall_data['louvain-modularity-dependency-graph'], max(round(sum(modularities) / 3, 2), 0))
+
+    def test_parallel_runs_equal_sequential_runs(self):
+        """Test that running the optimization runs in worker processes gives exactly the same metric data."""
+        sequential_metric = self.calculate_metric()
+        self.analysis.louvain_workers = 2
+        parallel_metric = self.calculate_metric()
+
+        self.assertTrue(sequential_metric.local_data)
+        self.assertEqual(parallel_metric.local_data, sequential_metric.local_data)
+        self.assertEqual(parallel_metric.overall_data, sequential_metric.overall_data)
+
+    def test_large_graphs_use_label_propagation(self):
+        """Test that graphs above the node threshold are partitioned by label propagation, which writes the same metric keys."""
+        louvain_metric = self.calculate_metric()
+        self.analysis.community_detection_node_threshold = 10
+        label_propagation_metric = self.calculate_metric()
+
+        communities = {node: data['file_result_dependency_graph_louvain-modularity-in-file'] for node, data in label_propagation_metric.local_data.items()}
+        cliques = {frozenset(node for node in communities if node.startswith(f'src/module{clique}/')) for clique in range(6)}
+        self.assertEqual({frozenset(node for node in communities if communities[node] == c) for c in communities.values()}, cliques)
+        self.assertEqual(label_propagation_metric.local_data.keys(), louvain_metric.local_data.keys())
+        self.assertEqual(label_propagation_metric.overall_data.keys(), louvain_metric.overall_data.keys())
+        self.assertGreater(label_propagation_metric.overall_data['louvain-modularity-dependency-graph'], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,10 +5,12 @@ All unit tests that are related to the tfidf metric.
 # Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
 # License: MIT
 
+import random
 import unittest
 from typing import Dict
 import logging
 import coloredlogs
+from sklearn.feature_extraction.text import TfidfVectorizer
 
 from tests.testdata.go import GO_TEST_FILES
 from tests.testdata.c import C_TEST_FILES
@@ -40,6 +42,7 @@ from emerge.languages.abstractparser import AbstractParser
 from emerge.analysis import Analysis
 from emerge.analyzer import Analyzer
 from emerge.metrics.tfidf.tfidf import TFIDFMetric
+from emerge.metrics.abstractmetric import TFIDFMode
 from emerge.results import FileResult
 
 LOGGER = logging.getLogger('TESTS')
@@ -155,3 +158,42 @@ class TFIDFTestCase(unittest.TestCase):
         self.assertFalse(self.analysis.overall_metric_results)
         self.analyzer._calculate_code_metric_results(self.analysis)
         self.assertTrue(self.analysis.local_metric_results)
+
+    def test_tags_equal_single_document_transform(self):
+        """Test that the tags from the sparse TF-IDF matrix are the ones that transforming every single document again selected, in the same order."""
+        random.seed(7)
+        words = [''.join(random.choice('abcdefgh') for _ in range(random.randrange(2, 5))) for _ in range(300)]
+        self.tfidf_metric.result_tokens = {f'document{d}': ''.join(f'{random.choice(words)} ' for _ in range(random.randrange(40)))
+                                           for d in range(300)}
+        self.tfidf_metric.calculate_tfidf()
+
+        vectorizer = TfidfVectorizer()
+        vectorizer.fit(self.tfidf_metric.result_tokens.values())
+        feature_names = vectorizer.get_feature_names_out()
+        for name, document in self.tfidf_metric.result_tokens.items():
+            response = vectorizer.transform([document])
+            scores = {feature_names[column]: response[0, column] for column in response.nonzero()[1]}
+            expected = [('tag_' + k, v) for k, v in sorted(scores.items(), key=lambda item: item[1], reverse=True) if v > 0.2][:7]
+            self.assertEqual(list(self.tfidf_metric.local_data[name].items()), expected)
+
+    def test_streaming_tags_equal_exact_tags(self):
+        """Test that the streaming mode selects the same tags with the same scores as the exact mode, over several chunks."""
+        for parser_name, test_data_dict in self.test_data.items():
+            for file_name, file_content in test_data_dict.items():
+                self.parsers[parser_name].generate_file_result_from_analysis(
+                    self.analysis, file_name=file_name, full_file_path="/source/tests/" + file_name, file_content=file_content)
+                self.analysis.collect_results_from_parser(self.parsers[parser_name])
+
+        streaming_tfidf_metric = TFIDFMetric(self.analysis, TFIDFMode.STREAMING)
+        streaming_tfidf_metric.CHUNK_SIZE = 3
+        # enough features that no two words of the test data are hashed to the same feature
+        streaming_tfidf_metric.NUMBER_OF_FEATURES = 1 << 22
+        streaming_tfidf_metric.calculate_from_results(self.analysis.file_results)
+        self.tfidf_metric.calculate_from_results(self.analysis.file_results)
+
+        self.assertTrue(any(self.tfidf_metric.local_data.values()))
+        self.assertFalse(streaming_tfidf_metric.result_tokens)
+        for name, tags in self.tfidf_metric.local_data.items():
+            self.assertEqual(list(streaming_tfidf_metric.local_data[name]), list(tags))
+            for tag, score in tags.items():
+                self.assertAlmostEqual(streaming_tfidf_metric.local_data[name][tag], score)
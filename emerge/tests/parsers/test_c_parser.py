@@ -48,3 +48,11 @@ class CParserTestCase(unittest.TestCase):
             self.assertTrue(result.scanned_file_name.strip())
             self.assertTrue(result.scanned_by.strip())
             self.assertTrue(result.scanned_language == LanguageType.C)
+
+    def test_only_quoted_includes_are_resolved_by_path_suffix(self):
+        """Test that a system header include stays a global dependency, even if a scanned file elsewhere has the same name."""
+        self.analysis.source_directory = "/project/core"
+        self.analysis.absolute_scanned_file_names.update({'core/cpp/time.h', 'core/src/main.c'})
+        self.parser.generate_file_result_from_analysis(self.analysis, file_name='main.c', full_file_path='/project/core/src/main.c',
+                                                       file_content='#include <time.h>\n#include "time.h"\n')
+        self.assertEqual(self.parser.results['core/src/main.c'].scanned_import_dependencies, ['time.h', 'core/cpp/time.h'])
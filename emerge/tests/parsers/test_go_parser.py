@@ -6,6 +6,8 @@ All unit tests that are related to GoParser.
 # License: MIT
 
 import unittest
+import tempfile
+from pathlib import Path
 from typing import Dict
 
 from tests.testdata.go import GO_TEST_FILES
@@ -54,3 +56,30 @@ class GoParserTestCase(unittest.TestCase):
             self.assertTrue(result.scanned_file_name.strip())
             self.assertTrue(result.scanned_by.strip())
             self.assertTrue(result.scanned_language == LanguageType.GO)
+
+    def test_package_imports_are_resolved_by_used_symbols(self):
+        """Test that package imports are resolved to the files of a package whose funcs or structs are used, and file imports to the file."""
+        files = {
+            'pkg/util/strings.go': 'package util\n\nfunc Reverse(s string) string { return s }\ntype Builder struct {}\n',
+            'pkg/util/math.go': 'package util\n\nfunc Clamp(v int) int { return v }\n',
+            'cmd/main.go': 'package main\n\nimport (\n\t"github.com/org/repo/pkg/util"\n\t"github.com/org/repo/pkg/util/strings"\n\t"fmt"\n)\n\n' +
+                           'func main() { util.Clamp(1) }\n',
+        }
+
+        with tempfile.TemporaryDirectory() as temp_directory:
+            source_directory = Path(temp_directory) / 'repo'
+            for file_name, file_content in files.items():
+                (source_directory / file_name).parent.mkdir(parents=True, exist_ok=True)
+                (source_directory / file_name).write_text(file_content, encoding='utf-8')
+
+            self.analysis.source_directory = str(source_directory)
+            self.analysis.only_permit_file_extensions = ['.go']
+            self.analysis.create_graph_representation(GraphType.FILESYSTEM_GRAPH)
+            self.analysis.create_filesystem_graph()
+
+            for file_name, file_content in files.items():
+                self.parser.generate_file_result_from_analysis(self.analysis, file_name=Path(file_name).name,
+                                                               full_file_path=str(source_directory / file_name), file_content=file_content)
+            self.parser.after_generated_file_results(self.analysis)
+
+        self.assertEqual(self.parser.results['repo/cmd/main.go'].scanned_import_dependencies, ['repo/pkg/util/math.go', 'repo/pkg/util/strings.go', 'fmt'])
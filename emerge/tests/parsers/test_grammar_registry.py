@@ -0,0 +1,85 @@
+"""
+All unit tests that are related to the GrammarRegistry and the runtime statistics of its grammars.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import pickle
+import unittest
+
+import pyparsing as pp
+
+from emerge.languages.abstractparser import GrammarRegistry, TokenCursor
+from emerge.languages.goparser import GoParser
+from emerge.languages.javaparser import JavaParser
+from emerge.stats import Statistics
+
+
+class GrammarRegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.grammars = GrammarRegistry('JAVA')
+        self.grammars.register('import', pp.Keyword('import') + pp.Word(pp.alphanums + '.').setResultsName('import_entity_name') + pp.Literal(';'))
+        self.grammars.register_pattern('import', r'(?<!\S)import (?P<import_entity_name>[a-z.]+) ;')
+        self.statistics = Statistics()
+        self.cursor = TokenCursor(['package', 'foo', ';', 'import', 'java.util.List', ';', 'import', 'foo.bar', ';'])
+
+    def tearDown(self):
+        pass
+
+    def test_registered_grammars_do_not_enable_packrat(self):
+        """Test that registering grammars and creating parsers does not change the global packrat setting of pyparsing."""
+        packrat_enabled = pp.ParserElement._packratEnabled  # pylint: disable=protected-access
+        JavaParser()
+        pickle.loads(pickle.dumps(self.grammars))
+        self.assertEqual(pp.ParserElement._packratEnabled, packrat_enabled)  # pylint: disable=protected-access
+
+        self.assertIn('import', self.grammars)
+        self.assertNotIn('package', self.grammars)
+        self.assertTrue(self.grammars['import'].streamlined)
+
+    def test_parse_records_grammar_runtime(self):
+        """Test that parsing at a token records the runtime of the grammar, prefixed with the language and the grammar name."""
+        result = self.grammars.parse('import', self.cursor, 3, self.statistics)
+        self.assertEqual(result.import_entity_name, 'java.util.List')
+        with self.assertRaises(pp.ParseException):
+            self.grammars.parse('import', self.cursor, 0, self.statistics)
+
+        runtimes = self.statistics.pop_prefixed(Statistics.Key.GRAMMAR_RUNTIME)
+        self.assertEqual(list(runtimes), ['java-import-grammar_runtime'])
+        self.assertGreater(runtimes['java-import-grammar_runtime'].total_seconds(), 0)
+
+        self.grammars.search('import', self.cursor.source, self.statistics)
+        self.assertIn('java-import-grammar_runtime', self.statistics.data)
+
+    def test_fast_path_hits_and_fallbacks(self):
+        """Test that the fast path counts its hits and its fallbacks to the grammar where the regular expression does not match."""
+        hit = self.grammars.parse('import', self.cursor, 6, self.statistics, fast_path=True)
+        fallback = self.grammars.parse('import', self.cursor, 3, self.statistics, fast_path=True)
+        self.assertEqual(hit.import_entity_name, 'foo.bar')
+        self.assertEqual(fallback.import_entity_name, 'java.util.List')
+
+        self.assertEqual(self.statistics.data['fast_path_hits'], 1)
+        self.assertEqual(self.statistics.data['fast_path_fallbacks'], 1)
+        self.assertIn('java-import-pattern-grammar_runtime', self.statistics.data)
+        self.assertIn('java-import-grammar_runtime', self.statistics.data)
+
+    def test_anchored_search_equals_search_string(self):
+        """Test that searching only at the anchor of a grammar finds the same matches as searchString, also for anchors within words,
+        anchors that do not start a match and a source that ends with the anchor."""
+        grammar = GoParser.create_golang_dependencies_grammar()
+        self.grammars.register('go-import', grammar, anchor='import')
+        sources = [
+            'package main import ( " fmt " \n " github.com/a/b " \n ) func main ( ) { }',
+            'package main import " os " \n var reimport = " x " \n imports := 1 \n import',
+            'package main \t import\t( \n alias " github.com/a/c " \n ) importer " y " \n',
+            'package main func main ( ) { }',
+        ]
+        for source in sources:
+            self.assertEqual(self.grammars.search('go-import', source, self.statistics).asList(), grammar.searchString(source).asList())
+        self.assertIn('java-go-import-grammar_runtime', self.statistics.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
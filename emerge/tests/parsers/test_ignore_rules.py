@@ -0,0 +1,48 @@
+"""
+All unit tests that are related to IgnoreRules.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import re
+import unittest
+
+from emerge.languages.ignorerules import IgnoreRules
+
+
+def is_ignored_by_checking_every_rule(name, ignored_substrings, ignored_expressions, case_insensitive):
+    for ignored_substring in ignored_substrings:
+        if (ignored_substring.lower() in name.lower()) if case_insensitive else (ignored_substring in name):
+            return True
+    return any(re.compile(expression).match(name) for expression in ignored_expressions)
+
+
+class IgnoreRulesTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.ignored_substrings = ['java.util', 'Generated', 'a|b', 'vendor/']
+        self.ignored_expressions = [r'^Test', r'.*Mock$', r'(\w)\1x', r'(?i)proto', r'foo|bar']
+        self.names = [
+            'java.util.List', 'JAVA.UTIL.Map', 'com.example.Generated', 'com.example.generated', 'a|b', 'ab', 'vendor/lib.h',
+            'TestFoo', 'FooTest', 'ServiceMock', 'Mockery', 'aax', 'abx', 'Protocol', 'barista', 'xfoo', ''
+        ]
+
+    def tearDown(self):
+        pass
+
+    def test_is_ignored_equals_checking_every_rule(self):
+        """Test that the compiled rules decide exactly like checking every single rule."""
+        for case_insensitive in [False, True]:
+            ignore_rules = IgnoreRules(self.ignored_substrings, [re.compile(e) for e in self.ignored_expressions], case_insensitive)
+            for name in self.names:
+                self.assertEqual(ignore_rules.is_ignored(name),
+                                 is_ignored_by_checking_every_rule(name, self.ignored_substrings, self.ignored_expressions, case_insensitive), name)
+
+    def test_verdicts_are_bounded(self):
+        """Test that memoized verdicts are bounded and do not change the decision."""
+        ignore_rules = IgnoreRules(['util'], [], max_memoized_verdicts=2)
+        for _ in range(2):
+            self.assertEqual([ignore_rules.is_ignored(name) for name in ['a.util', 'b', 'c', 'd.util']], [True, False, False, True])
+        self.assertFalse(IgnoreRules([], []))
+        self.assertFalse(IgnoreRules([], []).is_ignored('anything'))
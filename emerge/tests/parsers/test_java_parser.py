@@ -12,8 +12,9 @@ from tests.testdata.java import JAVA_TEST_FILES
 
 from emerge.languages.javaparser import JavaParser
 from emerge.results import FileResult, EntityResult
-from emerge.languages.abstractparser import LanguageType
+from emerge.languages.abstractparser import LanguageType, ImportExtractor
 from emerge.analysis import Analysis
+from emerge.stats import Statistics
 
 
 class JavaParserTestCase(unittest.TestCase):
@@ -74,3 +75,33 @@ class JavaParserTestCase(unittest.TestCase):
             self.assertTrue(result.scanned_file_name.strip())
             self.assertTrue(result.scanned_by.strip())
             self.assertTrue(result.scanned_language == LanguageType.JAVA)
+
+    def test_grammar_runtimes_are_recorded(self):
+        """Check that the time spent in every registered grammar is added to the statistics."""
+        for file_name, file_content in self.example_data.items():
+            self.parser.generate_file_result_from_analysis(self.analysis, file_name=file_name, full_file_path="/tests/" + file_name, file_content=file_content)
+        self.parser.generate_entity_results_from_analysis(self.analysis)
+
+        grammar_runtimes = self.analysis.statistics.pop_prefixed(Statistics.Key.GRAMMAR_RUNTIME)
+        self.assertTrue(grammar_runtimes)
+        self.assertIn('java-import-grammar_runtime', grammar_runtimes)
+        self.assertIn('java-entity-grammar_runtime', grammar_runtimes)
+        self.assertFalse(self.analysis.statistics.pop_prefixed(Statistics.Key.GRAMMAR_RUNTIME))
+
+    def test_regex_import_extractor_finds_the_same_imports(self):
+        """Check that the regex import extractor finds the same imports as pyparsing and counts its fast path hits."""
+        for file_name, file_content in self.example_data.items():
+            self.parser.generate_file_result_from_analysis(self.analysis, file_name=file_name, full_file_path="/tests/" + file_name, file_content=file_content)
+        imports_by_pyparsing = {name: result.scanned_import_dependencies for name, result in self.parser.results.items()}
+
+        regex_parser = JavaParser()
+        self.analysis.import_extractor = ImportExtractor.REGEX
+        for file_name, file_content in self.example_data.items():
+            regex_parser.generate_file_result_from_analysis(self.analysis, file_name=file_name, full_file_path="/tests/" + file_name, file_content=file_content)
+        imports_by_regex = {name: result.scanned_import_dependencies for name, result in regex_parser.results.items()}
+
+        self.assertEqual(imports_by_pyparsing, imports_by_regex)
+        self.assertEqual(
+            self.analysis.statistics.data[Statistics.Key.FAST_PATH_HITS.name.lower()],
+            sum(len(dependencies) for dependencies in imports_by_regex.values())
+        )
@@ -0,0 +1,149 @@
+"""
+All unit tests that are related to the Lexer and the TokenStream.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import re
+import unittest
+
+from emerge.languages.lexer import Lexer, TokenStream, TokenIndex, TokenView, LineMark, DEFAULT_TOKEN_MAPPING
+
+
+def tokenize_by_sequential_replacement(source, mapping):
+    for origin, mapped in mapping.items():
+        source = source.replace(origin, mapped)
+    return re.findall(r'\S+|\n', source)
+
+
+class LexerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.sources = [
+            '',
+            'package com.example;\n\nimport com.example.Foo;\n',
+            'func main(args ...string) {\n\tx := a....b && c\n}\r\n',
+            'if (a<b) { return !c[0]?d:e; }\n\n\n// comment\n/* block */',
+        ]
+
+    def tearDown(self):
+        pass
+
+    def test_tokenize_equals_sequential_replacement(self):
+        """Test that the compiled lexer creates exactly the same tokens as applying all mapping replacements one after another."""
+        go_mapping = dict(DEFAULT_TOKEN_MAPPING)
+        go_mapping.update({'"': ' " ', '&': ' & ', '...': ' ... '})
+
+        for mapping in [DEFAULT_TOKEN_MAPPING, go_mapping]:
+            lexer = Lexer(mapping)
+            for source in self.sources:
+                self.assertEqual(lexer.tokenize(source), tokenize_by_sequential_replacement(source, mapping))
+
+    def test_tokenize_falls_back_for_overlapping_mappings(self):
+        """Test that mappings with overlapping keys are tokenized by sequential replacement."""
+        mapping = {'::': ' :: ', ':': ' : ', '->': '.'}
+        lexer = Lexer(mapping)
+        source = 'a::b:c->d'
+        self.assertEqual(lexer.tokenize(source), tokenize_by_sequential_replacement(source, mapping))
+
+    def test_tokens_are_interned(self):
+        """Test that equal tokens of different sources are the same string object."""
+        lexer = Lexer.default()
+        first_tokens = lexer.tokenize('import Foo;')
+        second_tokens = lexer.tokenize('class Foo extends Bar')
+        self.assertIs(first_tokens[first_tokens.index('Foo')], second_tokens[second_tokens.index('Foo')])
+
+    def test_lexers_are_compiled_once_per_mapping(self):
+        """Test that the same lexer is returned for equal mappings."""
+        self.assertIs(Lexer.for_mapping(dict(DEFAULT_TOKEN_MAPPING)), Lexer.default())
+
+
+class TokenStreamTestCase(unittest.TestCase):
+
+    def setUp(self):
+        source = 'import a;\n// import b;\n\n/* import c;\nimport d; */\nimport e; /* f */\nimport g;\n'
+        self.token_stream = TokenStream(Lexer.default().tokenize(source))
+
+    def tearDown(self):
+        pass
+
+    def test_line_marks(self):
+        """Test that every line is marked with its comment state."""
+        line_marks = self.token_stream.line_marks('//', '/*', '*/')
+        self.assertEqual(line_marks, [
+            LineMark.NONE,
+            LineMark.LINE_COMMENT,
+            LineMark.BLANK,
+            LineMark.START_BLOCK_COMMENT,
+            LineMark.STOP_BLOCK_COMMENT,
+            LineMark.START_BLOCK_COMMENT | LineMark.STOP_BLOCK_COMMENT,
+            LineMark.NONE
+        ])
+
+    def test_tokens_without_comments(self):
+        """Test that comment lines are removed, a block comment started by a line lasts until the next line with a stop keyword."""
+        tokens_without_comments = self.token_stream.tokens_without_comments('//', '/*', '*/')
+        self.assertEqual(tokens_without_comments, ['import', 'a', ';', '\n'])
+
+    def test_count_source_lines(self):
+        """Test that blank lines and comments are not counted, one line block comments do not open a block comment."""
+        self.assertEqual(self.token_stream.count_source_lines('//', '/*', '*/'), 2)
+
+    def test_line_number(self):
+        """Test that line numbers are derived from newline tokens."""
+        tokens = self.token_stream.tokens
+        self.assertEqual(self.token_stream.line_number(0), 1)
+        self.assertEqual(self.token_stream.line_number(tokens.index('\n')), 1)
+        self.assertEqual(self.token_stream.line_number(tokens.index('g')), 7)
+
+
+class TokenIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.token_index = TokenIndex()
+        self.token_index.add('a.swift', ['class', 'A', ':', 'B', '{', 'let', 'b', '=', 'B', '(', ')', '}'])
+        self.token_index.add('b.swift', ['class', 'B', '{', '}'])
+
+    def tearDown(self):
+        pass
+
+    def test_names_containing(self):
+        """Test that every name is returned once per token, in the order in which the names were added."""
+        self.assertEqual(self.token_index.names_containing('B'), ['a.swift', 'b.swift'])
+        self.assertEqual(self.token_index.names_containing('A'), ['a.swift'])
+        self.assertEqual(self.token_index.names_containing('C'), [])
+
+
+class TokenViewTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tokens = ['class', 'A', '{', 'class', 'B', '{', '}', '}']
+
+    def tearDown(self):
+        pass
+
+    def test_view_behaves_like_a_slice(self):
+        """Test that a view behaves like and compares equal to the slice of the tokens it covers."""
+        for start, stop in [(0, 8), (3, 7), (5, 5), (6, 20)]:
+            view = TokenView(self.tokens, start, stop)
+            self.assertEqual(view, self.tokens[start:stop])
+            self.assertEqual(list(view), self.tokens[start:stop])
+            self.assertEqual(len(view), len(self.tokens[start:stop]))
+            self.assertEqual(view[1:], self.tokens[start:stop][1:])
+        view = TokenView(self.tokens, 3, 7)
+        self.assertEqual((view[0], view[-1]), ('class', '}'))
+        self.assertIn('B', view)
+        self.assertNotIn('A', view)
+        with self.assertRaises(IndexError):
+            _ = view[4]
+
+    def test_slices_are_views(self):
+        """Test that contiguous slices of a view are views over the same tokens and that slices with a step equal the sliced list."""
+        view = TokenView(self.tokens, 2, 8)
+        for index in [slice(1, None), slice(None, -1), slice(2, 4), slice(-3, None), slice(4, 2), slice(0, 100)]:
+            self.assertIsInstance(view[index], TokenView)
+            self.assertEqual(view[index], self.tokens[2:8][index])
+        self.assertEqual(view[1:][1:3], self.tokens[4:6])
+        self.assertEqual(view[::2], self.tokens[2:8][::2])
+        self.assertEqual(view[::-1], self.tokens[2:8][::-1])
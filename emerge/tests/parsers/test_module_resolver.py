@@ -0,0 +1,87 @@
+"""
+All unit tests that are related to the ModuleResolver.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import unittest
+
+from emerge.languages.abstractparser import ParsingMixin
+from emerge.languages.moduleresolver import ModuleResolver
+
+
+class ModuleResolverTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.module_resolver = ModuleResolver('/project/web', ['web/src/app.ts', 'web/src/lib/index.ts'], {'@lib/': 'src/lib/', 'lib': 'LIB'})
+
+    def tearDown(self):
+        pass
+
+    def test_exists_only_for_scanned_files(self):
+        """Test that paths are normalized and only scanned files exist."""
+        self.assertTrue(self.module_resolver.exists('/project/web/src/app.ts'))
+        self.assertTrue(self.module_resolver.exists('/project/web/src/lib/../app.ts'))
+        self.assertFalse(self.module_resolver.exists('/project/web/src/lib'))
+        self.assertFalse(self.module_resolver.exists('/project/web/src/other.ts'))
+
+    def test_resolve_relative_path_equals_parsing_mixin(self):
+        """Test that relative paths are resolved exactly like ParsingMixin.resolve_relative_dependency_path() resolves them."""
+        for dependency in ['./app', '../web/src/app', 'lib/index', '../../outside', '']:
+            self.assertEqual(self.module_resolver.resolve_relative_path(dependency, '/project/web/src'),
+                             ParsingMixin.resolve_relative_dependency_path(dependency, '/project/web/src', '/project/web'))
+
+    def test_replace_import_alias(self):
+        """Test that the first configured alias that is contained in a dependency is replaced."""
+        self.assertEqual(self.module_resolver.replace_import_alias('@lib/index'), 'src/lib/index')
+        self.assertEqual(self.module_resolver.replace_import_alias('./mylib'), './myLIB')
+        self.assertEqual(self.module_resolver.replace_import_alias('react'), 'react')
+
+    def test_memoize(self):
+        """Test that a dependency is resolved only once per parser and directory."""
+        calls = []
+        for _ in range(3):
+            self.module_resolver.memoize('TS', 'src', './app', lambda: calls.append(1) or 'src/app.ts')
+        self.module_resolver.memoize('JS', 'src', './app', lambda: calls.append(1) or 'src/app.js')
+        self.assertEqual(len(calls), 2)
+
+
+class IncludeResolverTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.module_resolver = ModuleResolver('/project/core', [
+            'core/src/main.c', 'core/src/util.h', 'core/include/api.h', 'core/src/net/socket.h', 'core/lib/net/socket.h', 'core/lib/io/file.h'
+        ], {}, include_directories=['include', 'lib'])
+
+    def tearDown(self):
+        pass
+
+    def test_resolve_include_relative_to_result(self):
+        """Test that includes are resolved relative to the directory of the including result first."""
+        self.assertEqual(self.module_resolver.resolve_include('util.h', '/project/core/src', 'core/src'), 'core/src/util.h')
+        self.assertEqual(self.module_resolver.resolve_include('net/socket.h', '/project/core/src', 'core/src'), 'core/src/net/socket.h')
+
+    def test_resolve_include_in_include_directories(self):
+        """Test that includes are searched in the configured include directories in their configured order."""
+        self.assertEqual(self.module_resolver.resolve_include('api.h', '/project/core/src', 'core/src'), 'core/include/api.h')
+        self.assertEqual(self.module_resolver.resolve_include('io/file.h', '/project/core/src', 'core/src'), 'core/lib/io/file.h')
+        self.assertIsNone(self.module_resolver.resolve_include('stdio.h', '/project/core/src', 'core/src'))
+
+    def test_resolve_include_by_path_suffix(self):
+        """Test that remaining includes are resolved to the scanned file ending with the include that is closest to the including result."""
+        module_resolver = ModuleResolver('/project/core', ['core/a/x/net/socket.h', 'core/b/net/socket.h', 'core/b/y/main.c'], {})
+        self.assertEqual(module_resolver.resolve_include('net/socket.h', '/project/core/b/y', 'core/b/y'), 'core/b/net/socket.h')
+        self.assertEqual(module_resolver.resolve_include('net/socket.h', '/project/core/a', 'core/a'), 'core/a/x/net/socket.h')
+        self.assertEqual(module_resolver.resolve_include('net/socket.h', '/project/core/c', 'core/c'), 'core/b/net/socket.h')
+        self.assertIsNone(module_resolver.resolve_include('../net/socket.h', '/project/core/c', 'core/c'))
+
+    def test_angle_bracket_includes_are_not_resolved_by_path_suffix(self):
+        """Test that angle bracket includes are only searched relative to the result and in the include directories, so that system headers
+        stay unresolved even if a scanned file has the same name."""
+        module_resolver = ModuleResolver('/project/core', ['core/cpp/time.h', 'core/src/main.c', 'core/include/api.h'], {},
+                                         include_directories=['include'])
+        self.assertEqual(module_resolver.resolve_include('time.h', '/project/core/src', 'core/src'), 'core/cpp/time.h')
+        self.assertIsNone(module_resolver.resolve_include('time.h', '/project/core/src', 'core/src', quoted=False))
+        self.assertEqual(module_resolver.resolve_include('api.h', '/project/core/src', 'core/src', quoted=False), 'core/include/api.h')
+        self.assertEqual(module_resolver.resolve_include('time.h', '/project/core/cpp', 'core/cpp', quoted=False), 'core/cpp/time.h')
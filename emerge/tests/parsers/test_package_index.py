@@ -0,0 +1,53 @@
+"""
+All unit tests that are related to the PackageIndex.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import unittest
+
+from emerge.languages.packageindex import PackageIndex
+
+
+def resolve_by_substring_search(unique_names, dependency, file_extension, match_enclosing_paths):
+    import_path = dependency.replace(".", "/") + file_extension
+    for unique_name in unique_names:
+        if unique_name in import_path or (match_enclosing_paths and import_path in unique_name):
+            return unique_name
+    return None
+
+
+class PackageIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.unique_names = [
+            'app/src/main/com/example/Foo.kt',
+            'com/example/Foo.kt',
+            'lib/com/example/Bar.kt',
+            'Bar.kt',
+            'lib/com/example/util/Baz.kt',
+            'gen/build.kts',
+        ]
+        self.dependencies = [
+            'com.example.Foo', 'example.Foo', 'com.example.Bar', 'Bar', 'ar', 'com.example.*', 'com.example.Foo.Inner',
+            'util.Baz', 'kotlin.collections.List', 'build', ''
+        ]
+
+    def tearDown(self):
+        pass
+
+    def test_resolve_equals_substring_search(self):
+        """Test that imports are resolved to the same file results as by a substring search over all file results."""
+        for match_enclosing_paths in [False, True]:
+            package_index = PackageIndex(self.unique_names, '.kt', match_enclosing_paths)
+            for dependency in self.dependencies:
+                self.assertEqual(package_index.resolve(dependency),
+                                 resolve_by_substring_search(self.unique_names, dependency, '.kt', match_enclosing_paths))
+
+    def test_resolve_prefers_the_first_file_result(self):
+        """Test that the first matching file result is returned and wildcard or unknown imports are not resolved."""
+        package_index = PackageIndex(self.unique_names, '.kt', match_enclosing_paths=True)
+        self.assertEqual(package_index.resolve('com.example.Foo'), 'app/src/main/com/example/Foo.kt')
+        self.assertIsNone(package_index.resolve('com.example.*'))
+        self.assertIsNone(package_index.resolve('kotlin.collections.List'))
@@ -0,0 +1,64 @@
+"""
+All unit tests that are related to the ParserRegistry and the mapping of file extensions to parsers.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import unittest
+
+from emerge.registry import ParserRegistry, PARSER_CLASSES, METRIC_CLASSES, parser_class, metric_class, supported_languages
+from emerge.files import FileScanMapper, LanguageExtension
+
+
+class ParserRegistryTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.parsers = ParserRegistry()
+
+    def tearDown(self):
+        pass
+
+    def test_parsers_are_created_on_first_access(self):
+        """Test that every parser is available, but only parsers that were created are contained, counted and iterated over in registry order."""
+        self.assertTrue(all(self.parsers.is_available(parser_name) for parser_name in PARSER_CLASSES))
+        self.assertFalse(self.parsers.is_available('UNKNOWN_PARSER'))
+        self.assertFalse(list(self.parsers.items()))
+        self.assertNotIn('PYTHON_PARSER', self.parsers)
+
+        python_parser = self.parsers.get_or_create('PYTHON_PARSER')
+        java_parser = self.parsers.get_or_create('JAVA_PARSER')
+        self.assertIs(self.parsers.get_or_create('PYTHON_PARSER'), python_parser)
+        self.assertIs(self.parsers['PYTHON_PARSER'], python_parser)
+        self.assertEqual(list(self.parsers.values()), [java_parser, python_parser])
+        self.assertEqual(len(self.parsers), 2)
+        self.assertEqual(set(self.parsers), {parser_name for parser_name in PARSER_CLASSES if parser_name in self.parsers})
+
+        self.assertNotIn('GO_PARSER', self.parsers)
+        with self.assertRaises(KeyError):
+            _ = self.parsers['GO_PARSER']
+        with self.assertRaises(KeyError):
+            self.parsers.get_or_create('UNKNOWN_PARSER')
+
+    def test_registered_classes_match_their_names(self):
+        """Test that every registered parser has the name and language it is registered with and every metric can be imported."""
+        for parser_name, (_, _, language_type) in PARSER_CLASSES.items():
+            self.assertEqual(parser_class(parser_name).parser_name(), parser_name)
+            self.assertEqual(parser_class(parser_name).language_type(), language_type.name)
+        self.assertEqual(supported_languages(), [language_type.name for _, _, language_type in PARSER_CLASSES.values()])
+
+        for config_key in METRIC_CLASSES:
+            self.assertTrue(metric_class(config_key).__name__)
+
+    def test_choose_parser(self):
+        """Test that file extensions are mapped to registered parsers and header files only by the permitted languages."""
+        for language_extension in LanguageExtension:
+            parser_name = FileScanMapper.choose_parser(language_extension.value)
+            if language_extension == LanguageExtension.C_HEADER:
+                self.assertIsNone(parser_name)
+            else:
+                self.assertTrue(self.parsers.is_available(parser_name))
+
+        self.assertEqual(FileScanMapper.choose_parser('.h', ['cpp', 'objc']), 'OBJC_PARSER')
+        self.assertEqual(FileScanMapper.choose_parser('.h', ['cpp']), 'CPP_PARSER')
+        self.assertIsNone(FileScanMapper.choose_parser('.txt', ['cpp']))
@@ -7,9 +7,11 @@ All unit tests that are related to the ParsingMixin.
 
 import unittest
 
+import pyparsing as pp
+
 from emerge.results import FileResult
 from emerge.analysis import Analysis
-from emerge.languages.abstractparser import LanguageType, ParsingMixin
+from emerge.languages.abstractparser import LanguageType, ParsingMixin, TokenCursor
 
 
 class ParsingMixinTestCase(unittest.TestCase):
@@ -82,3 +84,34 @@ class ParsingMixinTestCase(unittest.TestCase):
         )
         
         self.assertTrue(resolved_dependency2 == expected_resolved_dependency2_path)
+
+    def test_token_cursor_parse_equals_parsing_read_ahead_string(self):
+        """Test that parsing at a token cursor position gives the same result as parsing the joined read ahead string."""
+
+        tokens = ['package', 'com.example', ';', 'import', 'com.example.Foo', ';', 'import', 'com.example.Bar', ';']
+        expression = pp.Keyword('import') + pp.Word(pp.alphanums + '.').setResultsName('import_name') + pp.Literal(';')
+        token_cursor = TokenCursor(tokens)
+
+        for index, obj in token_cursor:
+            self.assertEqual(token_cursor.read_ahead_string(index), " ".join(tokens[index:]))
+            if obj != 'import':
+                with self.assertRaises(pp.ParseException):
+                    token_cursor.parse(expression, index)
+                continue
+
+            expected_result = expression.parseString(" ".join(tokens[index:]))
+            parsing_result = token_cursor.parse(expression, index)
+            self.assertEqual(parsing_result.asList(), expected_result.asList())
+            self.assertEqual(parsing_result.import_name, expected_result.import_name)
+
+    def test_token_cursor_read_ahead_is_bounded(self):
+        """Test that the read ahead window of a token cursor is bounded by the given number of tokens."""
+
+        tokens = [f'token{i}' for i in range(100)]
+        token_cursor = TokenCursor(tokens)
+
+        self.assertEqual(token_cursor.read_ahead(10, 5), tokens[10:16])
+        self.assertEqual(token_cursor.read_ahead(98, 5), tokens[98:])
+        self.assertEqual(list(token_cursor.following(95)), tokens[95:])
+        self.assertEqual(list(token_cursor.following(100)), [])
+        self.assertEqual(next(token_cursor.following(50)), 'token50')
@@ -6,14 +6,18 @@ All unit tests that are related to PythonParser.
 # License: MIT
 
 from typing import Dict
+from pathlib import Path
+import pickle
+import tempfile
 import unittest
 
 from tests.testdata.py import PYTHON_TEST_FILES
 
 from emerge.languages.pyparser import PythonParser
-from emerge.results import FileResult
-from emerge.languages.abstractparser import LanguageType
+from emerge.results import FileResult, EntityResult
+from emerge.languages.abstractparser import LanguageType, ParserBackend
 from emerge.analysis import Analysis
+from emerge.abstractresult import ResultStore
 
 
 class PythonParserTestCase(unittest.TestCase):
@@ -48,3 +52,91 @@ class PythonParserTestCase(unittest.TestCase):
             self.assertTrue(result.scanned_file_name.strip())
             self.assertTrue(result.scanned_by.strip())
             self.assertTrue(result.scanned_language == LanguageType.PY)
+
+
+class PythonParserSyntaxTreeTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_directory = tempfile.TemporaryDirectory()
+        self.source_directory = Path(self.temp_directory.name) / 'project'
+        self.files = {
+            'app/__init__.py': '',
+            'app/models.py': 'import os\n\nclass Base:\n    pass\n\nclass User(Base):\n    path = os.path\n',
+            'app/views.py': 'from . import models\nfrom .models import User as AppUser\n\n\nclass UserView(object):\n    model = AppUser\n\n    class Meta:\n        base = models.Base\n',
+            'app/broken.py': 'from . import models\n\nclass Broken(\n',
+        }
+        for file_name, file_content in self.files.items():
+            file_path = self.source_directory / file_name
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(file_content, encoding='utf-8')
+
+        self.parser = PythonParser()
+        self.analysis = Analysis()
+        self.analysis.analysis_name = "test"
+        self.analysis.source_directory = str(self.source_directory)
+        self.analysis.parser_backend = ParserBackend.AST
+
+        for file_name, file_content in self.files.items():
+            self.parser.generate_file_result_from_analysis(self.analysis, file_name=Path(file_name).name,
+                                                           full_file_path=str(self.source_directory / file_name), file_content=file_content)
+
+    def tearDown(self):
+        self.temp_directory.cleanup()
+
+    def test_imports_are_resolved_from_syntax_tree(self):
+        """Test that relative imports are resolved to module files and global imports are kept by their name."""
+        self.assertEqual(self.parser.results['project/app/models.py'].scanned_import_dependencies, ['os'])
+        self.assertEqual(self.parser.results['project/app/views.py'].scanned_import_dependencies, ['project/app/models.py'])
+
+    def test_syntax_errors_fall_back_to_tokens(self):
+        """Test that files with syntax errors are still parsed by the token backend."""
+        self.assertEqual(self.analysis.statistics.data['syntax_error_fallbacks'], 1)
+        self.assertTrue(self.parser.results['project/app/broken.py'].scanned_import_dependencies)
+
+    def test_generate_entity_results(self):
+        """Test that classes are created as entities with qualified inheritance and import dependencies."""
+        self.parser.generate_entity_results_from_analysis(self.analysis)
+        entity_results: Dict[str, EntityResult] = {k: v for (k, v) in self.parser.results.items() if isinstance(v, EntityResult)}
+
+        self.assertEqual(sorted(entity_results), [
+            'project.app.models.Base', 'project.app.models.User', 'project.app.views.UserView', 'project.app.views.UserView.Meta'
+        ])
+        self.assertEqual(entity_results['project.app.models.User'].scanned_inheritance_dependencies, ['project.app.models.Base'])
+        self.assertEqual(entity_results['project.app.views.UserView'].scanned_inheritance_dependencies, ['object'])
+        self.assertEqual(entity_results['project.app.views.UserView'].scanned_import_dependencies,
+                         ['project.app.models.User', 'project.app.models.Base'])
+        self.assertEqual(entity_results['project.app.views.UserView.Meta'].scanned_import_dependencies, ['project.app.models.Base'])
+        self.assertIn('path', entity_results['project.app.models.User'].scanned_tokens)
+
+    def test_results_parsed_elsewhere_do_not_count_imports_again(self):
+        """Test that results that were not parsed by this parser, e.g. by parsing workers, are parsed again for their classes without
+        counting their imports a second time."""
+        parsing_hits = self.analysis.statistics.data['parsing_hits']
+        for unique_name, result in list(self.parser.results.file_results_of(self.analysis).items()):
+            copied_result = pickle.loads(pickle.dumps(result))
+            copied_result.analysis = self.analysis
+            self.parser.results[unique_name] = copied_result
+
+        self.parser.generate_entity_results_from_analysis(self.analysis)
+        entity_results = self.parser.results.entity_results_of(self.analysis)
+        self.assertEqual(len(entity_results), 4)
+        self.assertEqual(self.analysis.statistics.data['parsing_hits'], parsing_hits + len(entity_results))
+
+    def test_class_definitions_are_not_reused_by_later_analyses(self):
+        """Test that a later analysis of a changed file with the same name creates the entities of the changed file."""
+        self.parser.generate_entity_results_from_analysis(self.analysis)
+        analysis = Analysis()
+        analysis.analysis_name = "test"
+        analysis.source_directory = str(self.source_directory)
+        analysis.parser_backend = ParserBackend.AST
+
+        # the changed file is parsed by another parser, like a parsing worker would
+        worker_parser = PythonParser()
+        worker_parser.generate_file_result_from_analysis(analysis, file_name='models.py', full_file_path=str(self.source_directory / 'app/models.py'),
+                                                         file_content='class Account:\n    pass\n')
+        self.parser.results = ResultStore()
+        self.parser.results['project/app/models.py'] = worker_parser.results['project/app/models.py']
+        self.parser.generate_entity_results_from_analysis(analysis)
+
+        self.assertEqual(sorted(name for name, result in self.parser.results.items() if isinstance(result, EntityResult)),
+                         ['project.app.models.Account'])
@@ -0,0 +1,75 @@
+"""
+All unit tests that are related to the ResultStore, which indexes file and entity results.
+"""
+
+# Authors: Grzegorz Lato <grzegorz.lato@gmail.com>
+# License: MIT
+
+import unittest
+
+from emerge.analysis import Analysis
+from emerge.abstractresult import ResultStore, AbstractFileResult, AbstractEntityResult
+from emerge.languages.abstractparser import LanguageType
+from emerge.languages.javaparser import JavaParser
+
+
+class ResultStoreTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.analyses = []
+        self.parser = JavaParser()
+        for name in ['first', 'second']:
+            analysis = Analysis()
+            analysis.analysis_name = name
+            analysis.source_directory = '/project/src'
+            self.analyses.append(analysis)
+
+            for index in range(2):
+                source = f'package com.{name};\n\nclass Foo{index} {{\n}}\n\nclass Bar extends Foo{index} {{\n}}\n'
+                self.parser.generate_file_result_from_analysis(analysis, file_name=f'Foo{index}.java', full_file_path=f'src/{name}/Foo{index}.java',
+                                                               file_content=source)
+            self.parser.generate_entity_results_from_analysis(analysis)
+
+        self.results = dict(self.parser.results)
+
+    def tearDown(self):
+        pass
+
+    def test_indexes_match_filtered_results(self):
+        """Test that all indexes contain exactly the results that filtering all results would find, in the same order."""
+        store = ResultStore(self.results)
+        self.assertEqual(dict(store), self.results)
+        self.assertEqual(dict(store.file_results), {k: v for k, v in self.results.items() if isinstance(v, AbstractFileResult)})
+        self.assertEqual(dict(store.entity_results), {k: v for k, v in self.results.items() if isinstance(v, AbstractEntityResult)})
+        self.assertEqual(dict(store.results_in_language(LanguageType.JAVA)), self.results)
+
+        for analysis in self.analyses:
+            self.assertEqual(list(store.file_results_of(analysis)),
+                             [k for k, v in self.results.items() if v.analysis is analysis and isinstance(v, AbstractFileResult)])
+            self.assertEqual(list(store.entity_results_of(analysis)),
+                             [k for k, v in self.results.items() if v.analysis is analysis and isinstance(v, AbstractEntityResult)])
+
+        self.assertIs(store.result_by_unique_name('src/second/Foo1.java'), self.results['src/second/Foo1.java'])
+        self.assertIs(store.result_by_entity_name('Bar'), self.results['com.first.Bar'])
+        self.assertIsNone(store.result_by_entity_name('Baz'))
+
+    def test_indexes_follow_changes(self):
+        """Test that replaced and removed results are removed from all indexes and the first added result is still found by name."""
+        store = ResultStore(self.results)
+        del store['com.first.Bar']
+        self.assertIs(store.result_by_entity_name('Bar'), self.results['com.second.Bar'])
+        self.assertNotIn('com.first.Bar', store.entity_results_of(self.analyses[0]))
+
+        store['com.first.Bar'] = self.results['com.first.Foo0']
+        self.assertIs(store.result_by_entity_name('Bar'), self.results['com.second.Bar'])
+        store['com.second.Bar'] = self.results['com.second.Foo0']
+        self.assertIsNone(store.result_by_entity_name('Bar'))
+
+        store.clear()
+        self.assertFalse(store)
+        self.assertFalse(store.file_results)
+        self.assertIsNone(store.result_by_unique_name('src/second/Foo1.java'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -77,5 +77,18 @@ class SwiftParserTestCase(unittest.TestCase):
             self.assertTrue(all(isinstance(dependency, str) for dependency in result.scanned_import_dependencies))
 
 
+    def test_generate_entity_results_from_nested_scopes(self):
+        """Generate entity results from nested scopes and check that every scope ends at its own closing bracket."""
+        source = 'class Outer {\n struct Inner {\n let a = 1\n }\n let b = 2\n}\n\nenum Kind {\n case first\n}\n'
+        self.parser.generate_file_result_from_analysis(self.analysis, file_name='Outer.swift', full_file_path='/tests/Outer.swift', file_content=source)
+        self.parser.generate_entity_results_from_analysis(self.analysis)
+        self.analysis.collect_results_from_parser(self.parser)
+        entity_results = self.analysis.entity_results
+
+        self.assertEqual(entity_results['Inner'].scanned_tokens, ['struct', 'Inner', '{', '\n', 'let', 'a', '=', '1', '\n'])
+        self.assertEqual(entity_results['Kind'].scanned_tokens, ['enum', 'Kind', '{', '\n', 'case', 'first', '\n'])
+        self.assertEqual(entity_results['Outer'].scanned_tokens[-5:], ['let', 'b', '=', '2', '\n'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -47,6 +47,7 @@ setup(
         "networkx",
         "scikit-learn",
         "numpy",
+        "scipy",
         "prettytable",
         "py",
         "pycodestyle",
@@ -64,6 +65,8 @@ setup(
         "emerge/metrics": "./emerge/metrics",
         "emerge/metrics/faninout": "./emerge/metrics/faninout",
         "emerge/metrics/modularity": "./emerge/metrics/modularity",
+        "emerge/metrics/pagerank": "./emerge/metrics/pagerank",
+        "emerge/metrics/betweenness": "./emerge/metrics/betweenness",
         "emerge/metrics/numberofmethods": "./emerge/metrics/numberofmethods",
         "emerge/metrics/sloc": "./emerge/metrics/sloc",
         "emerge/metrics/tfidf": ".emerge/metrics/tfidf",
@@ -76,6 +79,8 @@ setup(
         'emerge.metrics',
         'emerge.metrics.faninout',
         'emerge.metrics.modularity',
+        'emerge.metrics.pagerank',
+        'emerge.metrics.betweenness',
         'emerge.metrics.numberofmethods',
         'emerge.metrics.sloc',
         'emerge.metrics.tfidf',